@@ -7,10 +7,16 @@ Title:
 
 Subpackages:
     genetic_correlation
+    gwas_preparation
+    ldsc
     polygenic_score
 
 Modules:
-
+    batch_execution
+    parameter_table
+    profiling
+    reporting
+    storage
 
 Author:
 
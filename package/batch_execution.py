@@ -0,0 +1,682 @@
+"""
+Supply functionality for execution of batch instances on a local server as an
+alternative to submission of batch jobs to a cluster scheduler.
+
+This module 'batch_execution' is part of the 'psychiatry_biomarkers' package.
+
+Author:
+
+    T. Cameron Waller, Ph.D.
+    tcameronwaller@gmail.com
+    Rochester, Minnesota 55902
+    United States of America
+
+License:
+
+    This file is part of the project package directory 'psychiatry_biomarkers'
+    (https://github.com/tcameronwaller/psychiatry_biomarkers/).
+
+    Project 'psychiatry_biomarkers' supports data analysis with team in
+    psychiatry and pharmacogenomics.
+    Copyright (C) 2024 Thomas Cameron Waller
+
+    The code within project 'psychiatry_biomarkers' is free software: you can
+    redistribute it and/or modify it under the terms of the GNU General Public
+    License as published by the Free Software Foundation, either version 3 of
+    the GNU General Public License, or (at your option) any later version.
+
+    The code within project 'psychiatry_biomarkers' is distributed in the hope
+    that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+    warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with project 'psychiatry_biomarkers'. If not, see
+    <http://www.gnu.org/licenses/>.
+"""
+
+###############################################################################
+# Notes
+
+# Driver scripts such as "6_4_estimate_gwas_genetic_correlation_ldsc_all.sh"
+# and "5_1_fill_dbsnp_rs_identifiers.sh" write a file "batch_instances.txt"
+# with one instance per line and with fields of each instance delimited by
+# semicolons (";"). The scripts then pass this file to a script for the
+# cluster scheduler, such as "ldsc_correlation_batch_1.sh" or
+# "slurm_job_fill_dbsnp_rsid.sh", which calls a script for a single instance.
+
+# This module reads the same file of batch instances and calls the script for
+# a single instance within a pool of local processes. Each instance writes a
+# record of its status to the "status" child directory of the batch
+# directory, so that a subsequent execution can resume by skipping the
+# instances that already completed. The record includes a hash of the text of
+# the instance, and an execution only skips an instance if the record of its
+# status has the same hash, so that instances whose text changed after the
+# file of batch instances was written again run again.
+
+# The template of arguments for the script of a single instance designates
+# fields of the batch instance by their indices in braces, for example
+# "{1} {2} {0} /path/to/eur_w_ld_chr 2 true" for the order of arguments to
+# "estimate_gwas_genetic_correlation_ldsc.sh" from the instances of
+# "6_4_estimate_gwas_genetic_correlation_ldsc_all.sh".
+
+###############################################################################
+# Installation and importation
+
+# Standard
+
+import os
+import hashlib
+import subprocess
+import resource
+import time
+import math
+
+# Relevant
+
+import pandas
+pandas.options.mode.chained_assignment = None # default = "warn"
+
+# Custom
+import partner.utility as putly
+import partner.parallelization as prall
+import psychiatry_biomarkers.profiling as pbprf
+
+###############################################################################
+# Functionality
+
+
+##########
+# 1. Read and organize batch instances.
+
+
+def read_source_batch_instances(
+    path_file_batch_instances=None,
+    delimiter=None,
+    report=None,
+):
+    """
+    Reads and organizes batch instances from file.
+
+    arguments:
+        path_file_batch_instances (str): path to file of batch instances, one
+            instance per line
+        delimiter (str): delimiter between fields within each instance
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (list<dict>): batch instances
+
+    """
+
+    # Read information from file.
+    with open(path_file_batch_instances, "r") as file_instances:
+        lines = file_instances.read().splitlines()
+    # Organize information.
+    instances = list()
+    for line in lines:
+        line = line.strip()
+        if (len(line) > 0):
+            instance = dict()
+            instance["index"] = len(instances)
+            instance["line"] = line
+            instance["fields"] = line.split(delimiter)
+            instances.append(instance)
+        pass
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=5)
+        print("count of batch instances: " + str(len(instances)))
+        if (len(instances) > 0):
+            print("first batch instance: " + instances[0]["line"])
+            print("last batch instance: " + instances[-1]["line"])
+        putly.print_terminal_partition(level=5)
+        pass
+    # Return information.
+    return instances
+
+
+def define_instance_command(
+    fields=None,
+    path_file_script=None,
+    template_arguments=None,
+):
+    """
+    Defines the command to call the script for a single batch instance.
+
+    arguments:
+        fields (list<str>): fields of batch instance
+        path_file_script (str): path to script for a single instance
+        template_arguments (str): template of arguments to script, with fields
+            of the instance designated by indices in braces; if None, then pass
+            all fields in their original sequence
+
+    raises:
+
+    returns:
+        (list<str>): command and its arguments
+
+    """
+
+    if (template_arguments is None) or (len(template_arguments.strip()) == 0):
+        arguments = list(fields)
+    else:
+        arguments = [
+            argument.format(*fields)
+            for argument in template_arguments.split()
+        ]
+    command = ["/usr/bin/bash", path_file_script,]
+    command.extend(arguments)
+    return command
+
+
+def define_path_file_instance_status(
+    index=None,
+    path_directory_batch=None,
+):
+    """
+    Defines the path to the file for the record of status of a batch instance.
+
+    arguments:
+        index (int): index of batch instance
+        path_directory_batch (str): path to batch directory
+
+    raises:
+
+    returns:
+        (str): path to file
+
+    """
+
+    return os.path.join(
+        path_directory_batch, "status",
+        str("instance_" + str(index).zfill(6) + ".tsv"),
+    )
+
+
+def calculate_instance_hash(
+    line=None,
+):
+    """
+    Calculates a hash of the text of a batch instance.
+
+    arguments:
+        line (str): text of batch instance
+
+    raises:
+
+    returns:
+        (str): hexadecimal SHA-256 hash
+
+    """
+
+    return hashlib.sha256(str(line).encode("utf-8")).hexdigest()
+
+
+def read_instance_status_record(
+    index=None,
+    line=None,
+    path_directory_batch=None,
+):
+    """
+    Reads the record of status of a batch instance from a previous execution,
+    if the record belongs to the same text of the instance.
+
+    arguments:
+        index (int): index of batch instance
+        line (str): text of batch instance
+        path_directory_batch (str): path to batch directory
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table of a single record, or None if there
+            is no record for the same text of the instance
+
+    """
+
+    path_file = define_path_file_instance_status(
+        index=index,
+        path_directory_batch=path_directory_batch,
+    )
+    if not os.path.exists(path_file):
+        return None
+    table = pandas.read_csv(
+        path_file,
+        sep="\t",
+        header=0,
+        dtype={"status": "string", "hash": "string",},
+    )
+    # Records from before the introduction of hashes do not have a hash.
+    if (
+        ("hash" not in table.columns) or
+        (str(table["hash"].iloc[0]) != calculate_instance_hash(line=line))
+    ):
+        return None
+    return table
+
+
+def read_instance_status(
+    index=None,
+    line=None,
+    path_directory_batch=None,
+):
+    """
+    Reads the status of a batch instance from a previous execution.
+
+    arguments:
+        index (int): index of batch instance
+        line (str): text of batch instance
+        path_directory_batch (str): path to batch directory
+
+    raises:
+
+    returns:
+        (str): status of batch instance, or None if there is no record for the
+            same text of the instance
+
+    """
+
+    table = read_instance_status_record(
+        index=index,
+        line=line,
+        path_directory_batch=path_directory_batch,
+    )
+    if table is None:
+        return None
+    return str(table["status"].iloc[0])
+
+
+##########
+# 2. Execute batch instances.
+
+
+def define_function_limit_resources(
+    memory_instance=None,
+):
+    """
+    Defines a function that limits resources of the child process for a batch
+    instance before it calls the script.
+
+    arguments:
+        memory_instance (int): maximal virtual memory in bytes for the process
+            of each instance, or None for no limit
+
+    raises:
+
+    returns:
+        (object): function
+
+    """
+
+    def limit_resources():
+        if memory_instance is not None:
+            resource.setrlimit(
+                resource.RLIMIT_AS, (int(memory_instance), int(memory_instance)),
+            )
+        pass
+    return limit_resources
+
+
+@pbprf.profile_procedure(category="instance", keys_arguments=["index", "line",])
+def control_execute_batch_instance(
+    instance=None,
+    parameters=None,
+):
+    """
+    Control procedure to call the script for a single batch instance with
+    retries after failure, and to write a record of its status to file.
+
+    arguments:
+        instance (dict): parameters specific to current instance
+            index (int): index of batch instance
+            line (str): text of batch instance
+            fields (list<str>): fields of batch instance
+        parameters (dict): parameters common to all instances
+            path_file_script (str): path to script for a single instance
+            template_arguments (str): template of arguments to script
+            path_directory_batch (str): path to batch directory
+            threads_instance (int): count of threads for each instance
+            memory_instance (int): maximal virtual memory in bytes for each
+                instance
+            retries (int): count of retries after failure
+            delay_retry (float): delay in seconds before the first retry, which
+                doubles for each subsequent retry
+            report (bool): whether to print reports
+
+    raises:
+
+    returns:
+
+    """
+
+    # Organize command and environment.
+    command = define_instance_command(
+        fields=instance["fields"],
+        path_file_script=parameters["path_file_script"],
+        template_arguments=parameters["template_arguments"],
+    )
+    environment = dict(os.environ)
+    for variable in [
+        "OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+        "NUMEXPR_NUM_THREADS",
+    ]:
+        environment[variable] = str(parameters["threads_instance"])
+    path_file_log = os.path.join(
+        parameters["path_directory_batch"], "log",
+        str("instance_" + str(instance["index"]).zfill(6) + ".log"),
+    )
+    # Call script with retries.
+    time_start = time.time()
+    attempts = 0
+    code_return = None
+    while (attempts <= parameters["retries"]):
+        if (attempts > 0):
+            with pbprf.profile_span(name="delay_retry", category="wait"):
+                time.sleep(parameters["delay_retry"] * (2 ** (attempts - 1)))
+        attempts += 1
+        with open(path_file_log, "a") as file_log, pbprf.profile_span(
+            name="script",
+            category="process",
+            arguments={"attempt": attempts,},
+        ) as span:
+            file_log.write(str(
+                "attempt: " + str(attempts) + "; command: " +
+                " ".join(command) + "\n"
+            ))
+            file_log.flush()
+            process = subprocess.run(
+                command,
+                stdout=file_log,
+                stderr=subprocess.STDOUT,
+                cwd=parameters["path_directory_batch"],
+                env=environment,
+                preexec_fn=define_function_limit_resources(
+                    memory_instance=parameters["memory_instance"],
+                ),
+            )
+            span["code_return"] = process.returncode
+        code_return = process.returncode
+        if (code_return == 0):
+            break
+        pass
+    time_end = time.time()
+    # Collect information.
+    record = dict()
+    record["index"] = instance["index"]
+    record["instance"] = instance["line"]
+    record["hash"] = calculate_instance_hash(line=instance["line"])
+    record["status"] = "complete" if (code_return == 0) else "failure"
+    record["attempts"] = attempts
+    record["code_return"] = code_return
+    record["time_start"] = time_start
+    record["time_end"] = time_end
+    record["seconds"] = (time_end - time_start)
+    # Write product information to file.
+    pandas.DataFrame(data=[record,]).to_csv(
+        define_path_file_instance_status(
+            index=instance["index"],
+            path_directory_batch=parameters["path_directory_batch"],
+        ),
+        sep="\t",
+        header=True,
+        index=False,
+    )
+    # Report.
+    if parameters["report"]:
+        print(str(
+            "batch instance " + str(instance["index"]) + ": " +
+            record["status"] + " after " + str(attempts) + " attempts in " +
+            str(round(record["seconds"], 1)) + " seconds"
+        ))
+    pass
+
+
+def define_count_parallel_processes(
+    cores=None,
+    threads_instance=None,
+    memory_total=None,
+    memory_instance=None,
+):
+    """
+    Defines the count of batch instances to execute simultaneously within the
+    limits of processing cores and memory.
+
+    arguments:
+        cores (int): count of processing cores available to all instances
+        threads_instance (int): count of threads for each instance
+        memory_total (int): memory in bytes available to all instances, or
+            None for no limit
+        memory_instance (int): maximal virtual memory in bytes for each
+            instance, or None for no limit
+
+    raises:
+
+    returns:
+        (int): count of parallel processes
+
+    """
+
+    count = max(1, math.floor(cores / max(1, threads_instance)))
+    if (memory_total is not None) and (memory_instance is not None):
+        count = min(count, max(1, math.floor(memory_total / memory_instance)))
+    return int(count)
+
+
+def summarize_batch_status(
+    instances=None,
+    path_directory_batch=None,
+    time_start=None,
+    time_end=None,
+    report=None,
+):
+    """
+    Collects records of status from all batch instances and summarizes the
+    throughput of the execution.
+
+    arguments:
+        instances (list<dict>): batch instances
+        path_directory_batch (str): path to batch directory
+        time_start (float): time at start of execution
+        time_end (float): time at end of execution
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (dict<object>): collection of information
+
+    """
+
+    # Collect records of status for the same text of each instance.
+    tables = list()
+    for instance in instances:
+        table_instance = read_instance_status_record(
+            index=instance["index"],
+            line=instance["line"],
+            path_directory_batch=path_directory_batch,
+        )
+        if table_instance is not None:
+            tables.append(table_instance)
+        pass
+    if (len(tables) > 0):
+        table = pandas.concat(
+            tables,
+            axis="index",
+            join="outer",
+            ignore_index=True,
+            copy=True,
+        )
+    else:
+        table = pandas.DataFrame(columns=["index", "status", "seconds",])
+    # Summarize throughput.
+    count_complete = int((table["status"] == "complete").sum())
+    count_failure = int((table["status"] == "failure").sum())
+    count_pending = len(instances) - table.shape[0]
+    table_execution = table.loc[
+        (table["time_start"] >= time_start), :
+    ] if ("time_start" in table.columns) else table
+    count_complete_execution = int(
+        (table_execution["status"] == "complete").sum()
+    )
+    seconds_wall = (time_end - time_start)
+    summary = dict()
+    summary["count_instances"] = len(instances)
+    summary["count_complete"] = count_complete
+    summary["count_failure"] = count_failure
+    summary["count_pending"] = count_pending
+    summary["seconds_wall"] = seconds_wall
+    summary["count_complete_execution"] = count_complete_execution
+    summary["seconds_instance_mean"] = float(
+        table_execution["seconds"].mean()
+    )
+    summary["instances_per_hour"] = (
+        (count_complete_execution / seconds_wall * 3600)
+        if (seconds_wall > 0) else 0.0
+    )
+    # Collect information.
+    pail = dict()
+    pail["table_status"] = table
+    pail["summary"] = summary
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=4)
+        for key in summary.keys():
+            print(str(key + ": " + str(summary[key])))
+        putly.print_terminal_partition(level=4)
+        pass
+    # Return information.
+    return pail
+
+
+@pbprf.profile_procedure(category="control")
+def control_execute_batch_instances(
+    path_file_batch_instances=None,
+    path_file_script=None,
+    template_arguments=None,
+    path_directory_batch=None,
+    delimiter=None,
+    cores=None,
+    threads_instance=None,
+    memory_total=None,
+    memory_instance=None,
+    retries=None,
+    delay_retry=None,
+    resume=None,
+    report=None,
+):
+    """
+    Control procedure to execute batch instances within a pool of local
+    processes.
+
+    arguments:
+        path_file_batch_instances (str): path to file of batch instances
+        path_file_script (str): path to script for a single instance
+        template_arguments (str): template of arguments to script, with fields
+            of the instance designated by indices in braces
+        path_directory_batch (str): path to batch directory for records of
+            status and logs
+        delimiter (str): delimiter between fields within each instance
+        cores (int): count of processing cores available to all instances
+        threads_instance (int): count of threads for each instance
+        memory_total (int): memory in bytes available to all instances
+        memory_instance (int): maximal virtual memory in bytes for each
+            instance
+        retries (int): count of retries after failure
+        delay_retry (float): delay in seconds before the first retry
+        resume (bool): whether to skip instances that completed in a previous
+            execution
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (dict<object>): collection of information
+
+    """
+
+    # Initialize directories.
+    putly.create_directories(path=os.path.join(path_directory_batch, "status"))
+    putly.create_directories(path=os.path.join(path_directory_batch, "log"))
+    # Read source information from file.
+    instances = read_source_batch_instances(
+        path_file_batch_instances=path_file_batch_instances,
+        delimiter=delimiter,
+        report=report,
+    )
+    # Filter instances that completed in a previous execution.
+    if resume:
+        instances_pending = list(filter(
+            lambda instance: (read_instance_status(
+                index=instance["index"],
+                line=instance["line"],
+                path_directory_batch=path_directory_batch,
+            ) != "complete"),
+            instances,
+        ))
+    else:
+        instances_pending = instances
+    # Collect parameters common across all instances.
+    parameters = dict()
+    parameters["path_file_script"] = os.path.abspath(path_file_script)
+    parameters["template_arguments"] = template_arguments
+    parameters["path_directory_batch"] = path_directory_batch
+    parameters["threads_instance"] = threads_instance
+    parameters["memory_instance"] = memory_instance
+    parameters["retries"] = retries
+    parameters["delay_retry"] = delay_retry
+    parameters["report"] = report
+    count_processes = define_count_parallel_processes(
+        cores=cores,
+        threads_instance=threads_instance,
+        memory_total=memory_total,
+        memory_instance=memory_instance,
+    )
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=3)
+        print("module: psychiatry_biomarkers.batch_execution.py")
+        print("function: control_execute_batch_instances()")
+        putly.print_terminal_partition(level=5)
+        print("count of pending instances: " + str(len(instances_pending)))
+        print("count of parallel processes: " + str(count_processes))
+        putly.print_terminal_partition(level=5)
+        pass
+    # Execute procedure iteratively with parallelization across instances.
+    time_start = time.time()
+    if (len(instances_pending) > 0):
+        prall.drive_procedure_parallel(
+            function_control=control_execute_batch_instance,
+            instances=instances_pending,
+            parameters=parameters,
+            cores=count_processes,
+            report=report,
+        )
+    time_end = time.time()
+    # Summarize status and throughput.
+    pail = summarize_batch_status(
+        instances=instances,
+        path_directory_batch=path_directory_batch,
+        time_start=time_start,
+        time_end=time_end,
+        report=report,
+    )
+    # Write product information to file.
+    putly.write_tables_to_file(
+        pail_write={"table_batch_status": pail["table_status"],},
+        path_directory=path_directory_batch,
+        reset_index_rows=False,
+        write_index_rows=False,
+        write_index_columns=True,
+        type="text",
+        delimiter="\t",
+        suffix=".tsv",
+    )
+    # Return information.
+    return pail
+
+
+###############################################################################
+# End
@@ -70,6 +70,9 @@ import partner.description as pdesc
 #import partner.regression as preg
 import partner.plot as pplot
 import partner.parallelization as prall
+import psychiatry_biomarkers.parameter_table as pbpar
+import psychiatry_biomarkers.profiling as pbprf
+import psychiatry_biomarkers.reporting as pbrpt
 
 ###############################################################################
 # Functionality
@@ -227,6 +230,7 @@ def initialize_directory_group_analysis(
 # 2.1. Read parameters about studies
 
 
+@pbprf.profile_procedure(category="read")
 def read_source_parameter_studies_process(
     paths=None,
     report=None,
@@ -265,31 +269,26 @@ def read_source_parameter_studies_process(
         "table_gwas_translation_tcw_2023-12-30.tsv",
     )
     # Read information from file.
+    # The procedure validates the table against its schema.
     # Specify variable types of columns within table.
     types_columns = dict()
-    types_columns["inclusion"] = "int32"
-    types_columns["study"] = "string"
-    types_columns["phenotype"] = "string"
-    types_columns["sex"] = "string"
     types_columns["observations_total"] = "float32"
     types_columns["cases"] = "float32"
     types_columns["controls"] = "float32"
     types_columns["observations_effective"] = "float32"
     types_columns["prevalence_sample"] = "float32"
     types_columns["prevalence_population"] = "float32"
-    table = pandas.read_csv(
-        path_file_table_studies,
-        sep="\t",
-        header=0,
-        dtype=types_columns,
-        na_values=[
-            "nan", "na", "NAN", "NA", "<nan>", "<na>", "<NAN>", "<NA>",
-        ],
+    table = pbpar.read_parameter_table(
+        path_file_table=path_file_table_studies,
+        types_columns=types_columns,
+        path_directory_cache=None,
+        report=False,
     )
     # Return information.
     return table
 
 
+@pbprf.profile_procedure(category="read")
 def read_source_parameter_studies_polish(
     paths=None,
     report=None,
@@ -364,6 +363,7 @@ def read_source_parameter_studies_polish(
 # 2.2. Read and organize SNP heritabilities in table for supplement
 
 
+@pbprf.profile_procedure(category="read")
 def read_source_data_snp_heritability(
     paths=None,
     report=None,
@@ -568,6 +568,7 @@ def read_organize_source_parameter_snp_heritability(
 # Currently set for the sex-hormones versus psychiatric and substance use disorders
 
 
+@pbprf.profile_procedure(category="control")
 def control_read_organize_snp_heritability_table_supplement(
     paths=None,
     report=None,
@@ -709,20 +710,11 @@ def control_read_organize_snp_heritability_table_supplement(
         suffix=".tsv",
     )
     # Report.
-    if report:
-        putly.print_terminal_partition(level=4)
-        print("Source table before organization:")
-        print(table_heritability)
-        print("Column labels:")
-        labels_columns = table_heritability.columns.to_list()
-        print(labels_columns)
-        putly.print_terminal_partition(level=4)
-        count_columns = (table_heritability.shape[1])
-        print("count of columns in table: " + str(count_columns))
-        count_rows = (table_heritability.shape[0])
-        print("count of rows in source table: " + str(count_rows))
-        putly.print_terminal_partition(level=4)
-        pass
+    pbrpt.report_table(
+        table=table_heritability,
+        name="table_heritability",
+        report=report,
+    )
     # Return information.
     return table_heritability
 
@@ -731,6 +723,7 @@ def control_read_organize_snp_heritability_table_supplement(
 # 2.3. Read and assemble genetic correlations
 
 
+@pbprf.profile_procedure(category="read")
 def read_organize_source_data_genetic_correlations(
     paths=None,
     report=None,
@@ -815,6 +808,7 @@ def read_organize_source_data_genetic_correlations(
     return pail
 
 
+@pbprf.profile_procedure(category="control")
 def control_assemble_genetic_correlations(
     paths=None,
     report=None,
@@ -855,21 +849,11 @@ def control_assemble_genetic_correlations(
         copy=True,
     )
     # Report.
-    if report:
-        putly.print_terminal_partition(level=4)
-        print("Source table before organization:")
-        print(table)
-        print("Column labels:")
-        labels_columns = table.columns.to_list()
-        print(labels_columns)
-        putly.print_terminal_partition(level=4)
-        count_columns = (table.shape[1])
-        print("Count of columns in table: " + str(count_columns))
-
-        count_rows = (table.shape[0])
-        print("Count of rows in source table: " + str(count_rows))
-        putly.print_terminal_partition(level=4)
-        pass
+    pbrpt.report_table(
+        table=table,
+        name="table_genetic_correlations",
+        report=report,
+    )
     # Return information.
     return table
 
@@ -922,6 +906,7 @@ def organize_source_plot_table_index(
     return table_copy
 
 
+@pbprf.profile_procedure(category="read")
 def read_organize_source_plot(
     group_analysis=None,
     name_table=None,
@@ -967,19 +952,29 @@ def read_organize_source_plot(
         str(name_table + "_for_plot.pickle"),
     )
     # Read information from file.
-    table_raw = pandas.read_pickle(
-        path_file_table,
+    with pbrpt.report_duration(
+        name=str("read " + name_table + "_for_plot"),
+        report=report,
+    ):
+        table_raw = pandas.read_pickle(
+            path_file_table,
+        )
+    pbrpt.report_table(
+        table=table_raw,
+        name=str(name_table + "_for_plot"),
+        report=report,
     )
-    print("here is the table before organizing the index...")
-    print(table_raw)
     # Organize information in table from source.
     # Collect information.
     table = organize_source_plot_table_index(
         table=table_raw,
         report=report,
     )
-    print("here is the table after organizing the index...")
-    print(table)
+    pbrpt.report_table(
+        table=table,
+        name=str(name_table + "_for_plot_index"),
+        report=report,
+    )
     # This functionality is useful for reading a similarly-formatted table from
     # tab-delimited text file.
     if False:
@@ -1000,6 +995,7 @@ def read_organize_source_plot(
 # 2.5. Read and organize information for network nodes and links
 
 
+@pbprf.profile_procedure(category="read")
 def read_organize_source_supplemental_tables_for_network(
     paths=None,
     report=None,
@@ -1068,29 +1064,18 @@ def read_organize_source_supplemental_tables_for_network(
         copy=True,
     )
     # Report.
-    if report:
-        putly.print_terminal_partition(level=4)
-        putly.print_terminal_partition(level=3)
-        print(str(
-            "module: psychiatry_biomarkers.genetic_correlation." +
-            "thyroid_organization.py"
-        ))
-        print(
+    pbrpt.report_message(
+        message=str(
             "function: read_organize_source_supplemental_tables_for_network()"
-        )
-        print("column labels:")
-        labels_columns = table.columns.to_list()
-        print(labels_columns)
-        putly.print_terminal_partition(level=4)
-        count_columns = (table.shape[1])
-        print("count of columns in table: " + str(count_columns))
-        count_rows = (table.shape[0])
-        print("count of rows in source table: " + str(count_rows))
-        putly.print_terminal_partition(level=4)
-        print("table:")
-        print(table)
-        putly.print_terminal_partition(level=4)
-        pass
+        ),
+        report=report,
+        level=2,
+    )
+    pbrpt.report_table(
+        table=table,
+        name="table_supplement_network",
+        report=report,
+    )
     # Return information.
     return table
 
@@ -1099,6 +1084,7 @@ def read_organize_source_supplemental_tables_for_network(
 # 2.6. Read and organize information queries
 
 
+@pbprf.profile_procedure(category="read")
 def read_organize_source_supplemental_tables_for_query(
     paths=None,
     report=None,
@@ -1175,6 +1161,7 @@ def read_organize_source_supplemental_tables_for_query(
 # 3. Organize genetic correlations in tables for supplements and plots
 
 
+@pbprf.profile_procedure(category="transform")
 def organize_genetic_correlation_table_general(
     group_analysis=None,
     name_table=None,
@@ -1372,6 +1359,7 @@ def organize_genetic_correlation_table_general(
     return table_general
 
 
+@pbprf.profile_procedure(category="transform")
 def organize_genetic_correlation_table_supplement(
     group_analysis=None,
     name_table=None,
@@ -1513,6 +1501,7 @@ def organize_genetic_correlation_table_supplement(
     return table_supplement
 
 
+@pbprf.profile_procedure(category="transform")
 def simplify_transform_long_table_plot_symmetrical(
     studies_primary_keep=None,
     studies_secondary_keep=None,
@@ -1714,6 +1703,7 @@ def simplify_transform_long_table_plot_symmetrical(
     return table_long
 
 
+@pbprf.profile_procedure(category="transform")
 def simplify_transform_long_table_plot_asymmetrical(
     studies_primary_keep=None,
     studies_secondary_keep=None,
@@ -1808,6 +1798,7 @@ def simplify_transform_long_table_plot_asymmetrical(
     return table_long
 
 
+@pbprf.profile_procedure(category="transform")
 def organize_genetic_correlation_table_plot(
     group_analysis=None,
     name_table=None,
@@ -1950,6 +1941,9 @@ def organize_genetic_correlation_table_plot(
     return table_plot
 
 
+@pbprf.profile_procedure(
+    category="control", keys_arguments=["group_analysis",],
+)
 def control_prepare_genetic_correlation_table_supplement_plot(
     instance=None,
     parameters=None,
@@ -2097,29 +2091,36 @@ def control_prepare_genetic_correlation_table_supplement_plot(
 
     ##########
     # Write product information to file.
-    putly.write_tables_to_file_in_child_directories(
-        pail_write=pail_write_directories_text,
-        path_directory_parent=paths["out_data_group_analysis"],
-        reset_index_rows=False,
-        write_index_rows=True,
-        write_index_columns=True,
-        type="text",
-        delimiter="\t",
-        suffix=".tsv",
-    )
-    putly.write_tables_to_file_in_child_directories(
-        pail_write=pail_write_directories_pickle,
-        path_directory_parent=paths["out_data_group_analysis"],
-        reset_index_rows=False,
-        write_index_rows=None,
-        write_index_columns=None,
-        type="pickle",
-        delimiter=None,
-        suffix=".pickle",
-    )
+    with pbprf.profile_span(
+        name="write_tables_group_analysis",
+        category="write",
+        rows_in=(table_supplement.shape[0] + table_plot.shape[0]),
+        arguments={"group_analysis": group_analysis,},
+    ):
+        putly.write_tables_to_file_in_child_directories(
+            pail_write=pail_write_directories_text,
+            path_directory_parent=paths["out_data_group_analysis"],
+            reset_index_rows=False,
+            write_index_rows=True,
+            write_index_columns=True,
+            type="text",
+            delimiter="\t",
+            suffix=".tsv",
+        )
+        putly.write_tables_to_file_in_child_directories(
+            pail_write=pail_write_directories_pickle,
+            path_directory_parent=paths["out_data_group_analysis"],
+            reset_index_rows=False,
+            write_index_rows=None,
+            write_index_columns=None,
+            type="pickle",
+            delimiter=None,
+            suffix=".pickle",
+        )
     pass
 
 
+@pbprf.profile_procedure(category="control")
 def control_prepare_genetic_correlation_tables_supplement_plot(
     table_rg=None,
     paths=None,
@@ -2311,6 +2312,7 @@ def test():
 # as Links between them.
 
 
+@pbprf.profile_procedure(category="control")
 def control_prepare_genetic_correlation_network_nodes_links(
     paths=None,
     report=None,
@@ -2438,6 +2440,7 @@ def control_prepare_genetic_correlation_network_nodes_links(
 
 
 # This function will probably become obsolete... TCW; 19 September 2024
+@pbprf.profile_procedure(category="control")
 def control_prepare_genetic_correlation_network_nodes_links_from_scratch(
     table_rg=None,
     paths=None,
@@ -2732,13 +2735,11 @@ def create_heatmap_figure_for_table_groups(
             )
 
         # Report.
-        if report:
-            putly.print_terminal_partition(level=4)
-            print("Name of group:")
-            print(name)
-            print("Table for group after split:")
-            print(table_group)
-            putly.print_terminal_partition(level=4)
+        pbrpt.report_table(
+            table=table_group,
+            name=str(name),
+            report=report,
+        )
         # Complete procedures on each group table after split.
         # For example, calculate summary statistics on each group and then
         # collect within a new summary table.
@@ -2755,6 +2756,7 @@ def create_heatmap_figure_for_table_groups(
     pass
 
 
+@pbprf.profile_procedure(category="control")
 def control_plot_charts(
     paths=None,
     report=None,
@@ -2845,6 +2847,7 @@ def control_plot_charts(
 # 6. Query values in tables
 
 
+@pbprf.profile_procedure(category="control")
 def control_query_genetic_correlation_tables(
     paths=None,
     report=None,
@@ -0,0 +1,80 @@
+"""
+Supply functionality for projects relating to biomarkers in neuropsychiatric
+disorders.
+
+Title:
+    psychiatry_biomarkers
+
+Subpackages:
+    genetic_correlation
+    gwas_preparation
+    ldsc
+    polygenic_score
+
+Modules:
+    assembly
+    bgzf
+    columnar
+    constraint
+    dbsnp
+    duplication
+    effective
+    frequency
+    harmonization
+    merge
+    pipeline
+    position_index
+    presence
+    qq_plot
+    quality_profile
+    standard_format
+    translation
+    variant_key
+
+Author:
+
+    T. Cameron Waller, Ph.D.
+    tcameronwaller@gmail.com
+    Rochester, Minnesota 55902
+    United States of America
+
+License:
+
+    This file is part of the project package directory 'psychiatry_biomarkers'
+    (https://github.com/tcameronwaller/psychiatry_biomarkers/).
+
+    Project 'psychiatry_biomarkers' supports data analysis with team in
+    psychiatry and pharmacogenomics.
+    Copyright (C) 2024 Thomas Cameron Waller
+
+    The code within project 'psychiatry_biomarkers' is free software: you can
+    redistribute it and/or modify it under the terms of the GNU General Public
+    License as published by the Free Software Foundation, either version 3 of
+    the GNU General Public License, or (at your option) any later version.
+
+    The code within project 'psychiatry_biomarkers' is distributed in the hope
+    that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+    warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with project 'psychiatry_biomarkers'. If not, see
+    <http://www.gnu.org/licenses/>.
+"""
+
+###############################################################################
+# Notes
+
+
+###############################################################################
+# Installation and importation
+
+# Standard.
+
+# Relevant.
+
+# Custom.
+
+
+###############################################################################
+# End
@@ -0,0 +1,680 @@
+"""
+Supply functionality for translation of genomic coordinates in GWAS summary
+statistics between assemblies of the human genome by chain files.
+
+This module 'assembly' is part of the 'gwas_preparation' package within the
+'psychiatry_biomarkers' package.
+
+Author:
+
+    T. Cameron Waller, Ph.D.
+    tcameronwaller@gmail.com
+    Rochester, Minnesota 55902
+    United States of America
+
+License:
+
+    This file is part of the project package directory 'psychiatry_biomarkers'
+    (https://github.com/tcameronwaller/psychiatry_biomarkers/).
+
+    Project 'psychiatry_biomarkers' supports data analysis with team in
+    psychiatry and pharmacogenomics.
+    Copyright (C) 2024 Thomas Cameron Waller
+
+    The code within project 'psychiatry_biomarkers' is free software: you can
+    redistribute it and/or modify it under the terms of the GNU General Public
+    License as published by the Free Software Foundation, either version 3 of
+    the GNU General Public License, or (at your option) any later version.
+
+    The code within project 'psychiatry_biomarkers' is distributed in the hope
+    that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+    warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with project 'psychiatry_biomarkers'. If not, see
+    <http://www.gnu.org/licenses/>.
+"""
+
+###############################################################################
+# Notes
+
+# The driver script "2_translate_gwas_assembly_to_grch37.sh" calls CrossMap
+# through "map_gwas_standard_format_bed.sh" for each study in a different
+# assembly, with a round trip through files in BED format. This module reads
+# each chain file once into arrays of aligned blocks in sort order of their
+# positions in the source assembly, and it maps the positions of all variants
+# in a chunk at once by binary search ("numpy.searchsorted").
+
+# Format of chain files (https://genome.ucsc.edu/goldenPath/help/chain.html).
+# chain [score] [tName] [tSize] [tStrand] [tStart] [tEnd] [qName] [qSize]
+#   [qStrand] [qStart] [qEnd] [id]
+# [size] [dt] [dq]
+# ...
+# [size]
+# The "t" coordinates are in the source assembly, and the "q" coordinates are
+# in the target assembly. Coordinates are zero-based and half-open, and the
+# "q" coordinates of chains on the reverse strand count from the end of the
+# chromosome.
+
+# Variants that fall outside all aligned blocks or within more than one
+# aligned block do not map, following CrossMap's behavior for ambiguous
+# regions. Variants that map to the reverse strand have the reverse
+# complements of their alleles. For alleles of more than one nucleotide and
+# of the same length, the position moves to the other end of their span,
+# which must map within the same block. Insertions and deletions on the
+# reverse strand do not map, since their representation in the target
+# assembly would need the nucleotide before the variant from the target
+# reference genome.
+
+# The table "table_gwas_assembly_tcw_2023-12-30.tsv" designates the chain file
+# for each study that needs translation of coordinates. The procedure copies
+# the files of all other studies without change.
+
+###############################################################################
+# Installation and importation
+
+# Standard
+
+import os
+import gzip
+import shutil
+
+# Relevant
+
+import numpy
+import pandas
+pandas.options.mode.chained_assignment = None # default = "warn"
+
+# Custom
+import partner.utility as putly
+import partner.parallelization as prall
+import psychiatry_biomarkers.gwas_preparation.standard_format as pbstd
+import psychiatry_biomarkers.profiling as pbprf
+
+###############################################################################
+# Functionality
+
+
+##########
+# 1. Read chain file.
+
+
+def read_source_chain_blocks(
+    path_file_chain=None,
+    report=None,
+):
+    """
+    Reads a chain file and organizes its aligned blocks within arrays for each
+    chromosome of the source assembly, in sort order of their start positions.
+
+    arguments:
+        path_file_chain (str): path to chain file, optionally with compression
+            by GZip
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (dict<dict>): arrays of aligned blocks for each source chromosome
+
+    """
+
+    # Collect blocks.
+    blocks = dict()
+    if path_file_chain.endswith(".gz"):
+        file_chain = gzip.open(path_file_chain, "rt")
+    else:
+        file_chain = open(path_file_chain, "r")
+    with file_chain:
+        position_source = None
+        position_target = None
+        for line in file_chain:
+            fields = line.split()
+            if (len(fields) == 0):
+                continue
+            if (fields[0] == "chain"):
+                chromosome_source = fields[2]
+                position_source = int(fields[5])
+                chromosome_target = fields[7]
+                size_target = int(fields[8])
+                strand_target = fields[9]
+                position_target = int(fields[10])
+                if chromosome_source not in blocks.keys():
+                    blocks[chromosome_source] = {
+                        "start": list(),
+                        "end": list(),
+                        "chromosome": list(),
+                        "start_target": list(),
+                        "reverse": list(),
+                        "size_target": list(),
+                    }
+                collection = blocks[chromosome_source]
+                continue
+            size = int(fields[0])
+            collection["start"].append(position_source)
+            collection["end"].append(position_source + size)
+            collection["chromosome"].append(chromosome_target)
+            collection["start_target"].append(position_target)
+            collection["reverse"].append(strand_target == "-")
+            collection["size_target"].append(size_target)
+            if (len(fields) == 3):
+                position_source += (size + int(fields[1]))
+                position_target += (size + int(fields[2]))
+            pass
+        pass
+    # Organize arrays in sort order.
+    chains = dict()
+    count_blocks = 0
+    for chromosome in blocks.keys():
+        collection = blocks[chromosome]
+        start = numpy.array(collection["start"], dtype="int64")
+        order = numpy.argsort(start, kind="stable")
+        arrays = dict()
+        arrays["start"] = start[order]
+        arrays["end"] = numpy.array(collection["end"], dtype="int64")[order]
+        # Maximal end of all blocks up to each block in sort order and ends
+        # in their own sort order support queries of the blocks that cover
+        # each position, including blocks that overlap.
+        arrays["end_maximum"] = numpy.maximum.accumulate(arrays["end"])
+        arrays["end_sort"] = numpy.sort(arrays["end"], kind="stable")
+        arrays["chromosome"] = numpy.array(
+            collection["chromosome"], dtype="object"
+        )[order]
+        arrays["start_target"] = numpy.array(
+            collection["start_target"], dtype="int64"
+        )[order]
+        arrays["reverse"] = numpy.array(
+            collection["reverse"], dtype="bool"
+        )[order]
+        arrays["size_target"] = numpy.array(
+            collection["size_target"], dtype="int64"
+        )[order]
+        chains[chromosome] = arrays
+        count_blocks += start.shape[0]
+        pass
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=5)
+        print("chain file: " + os.path.basename(path_file_chain))
+        print("count of source chromosomes: " + str(len(chains)))
+        print("count of aligned blocks: " + str(count_blocks))
+        putly.print_terminal_partition(level=5)
+        pass
+    # Return information.
+    return chains
+
+
+##########
+# 2. Map positions.
+
+
+def map_chromosome_positions(
+    arrays=None,
+    positions=None,
+):
+    """
+    Maps positions on a single chromosome from the source assembly to the
+    target assembly.
+
+    arguments:
+        arrays (dict<object>): arrays of aligned blocks for the chromosome
+        positions (object): NumPy array of one-based positions in source
+
+    raises:
+
+    returns:
+        (dict<object>): arrays of target chromosomes, one-based target
+            positions, indicators of reverse strand, and indicators of map
+
+    """
+
+    coordinates = positions - 1
+    # Count the blocks that cover each position. Every block that ends at or
+    # before a position also starts before it, so the count is the count of
+    # blocks that start at or before the position minus the count of blocks
+    # that end at or before the position.
+    counts_cover = (
+        numpy.searchsorted(arrays["start"], coordinates, side="right") -
+        numpy.searchsorted(arrays["end_sort"], coordinates, side="right")
+    )
+    # Find the first block in sort order that ends after each position. If
+    # any block covers the position, then this block covers it, even when
+    # shorter blocks start after it and before the position.
+    indices = numpy.searchsorted(
+        arrays["end_maximum"], coordinates, side="right",
+    )
+    indices_clip = numpy.minimum(indices, (arrays["start"].shape[0] - 1))
+    # Exclude positions within more than one block.
+    indicator_map = (counts_cover == 1)
+    # Calculate target positions.
+    offset = coordinates - arrays["start"][indices_clip]
+    target = arrays["start_target"][indices_clip] + offset
+    reverse = arrays["reverse"][indices_clip]
+    target = numpy.where(
+        reverse, (arrays["size_target"][indices_clip] - target - 1), target,
+    )
+    # Collect information.
+    pail = dict()
+    pail["chromosome"] = numpy.where(
+        indicator_map, arrays["chromosome"][indices_clip], None,
+    )
+    pail["position"] = numpy.where(indicator_map, (target + 1), -1)
+    pail["reverse"] = (reverse & indicator_map)
+    pail["map"] = indicator_map
+    # Return information.
+    return pail
+
+
+def map_gwas_chunk_assembly(
+    table=None,
+    chains=None,
+    counts=None,
+):
+    """
+    Maps genomic coordinates of a chunk of GWAS summary statistics in the
+    standard format from the source assembly to the target assembly.
+
+    arguments:
+        table (object): Pandas data-frame table of GWAS summary statistics in
+            standard format
+        chains (dict<dict>): arrays of aligned blocks for each source
+            chromosome
+        counts (dict<int>): counts of variants to update
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table of variants that map
+
+    """
+
+    # Copy information.
+    table = table.copy(deep=True)
+    table.reset_index(
+        level=None,
+        inplace=True,
+        drop=True,
+    )
+    counts["source"] += table.shape[0]
+    # Organize information.
+    chromosomes = table["CHR"].astype("string").fillna("").to_numpy(
+        dtype="object"
+    )
+    positions = table["BP"].fillna(0).to_numpy(dtype="int64")
+    target_chromosome = numpy.full(table.shape[0], None, dtype="object")
+    target_position = numpy.full(table.shape[0], -1, dtype="int64")
+    target_reverse = numpy.zeros(table.shape[0], dtype="bool")
+    indicator_map = numpy.zeros(table.shape[0], dtype="bool")
+    # Map positions for each chromosome.
+    for chromosome in pandas.unique(chromosomes):
+        if chromosome not in chains.keys():
+            continue
+        indices = numpy.flatnonzero(chromosomes == chromosome)
+        pail = map_chromosome_positions(
+            arrays=chains[chromosome],
+            positions=positions[indices],
+        )
+        target_chromosome[indices] = pail["chromosome"]
+        target_position[indices] = pail["position"]
+        target_reverse[indices] = pail["reverse"]
+        indicator_map[indices] = pail["map"]
+        pass
+    indicator_map = (indicator_map & (positions > 0))
+    # Organize alleles on the reverse strand.
+    lengths_first = table["A1"].astype("string").str.len().fillna(0).to_numpy(
+        dtype="int64"
+    )
+    lengths_second = table["A2"].astype("string").str.len().fillna(
+        0
+    ).to_numpy(dtype="int64")
+    indicator_reverse = (indicator_map & target_reverse)
+    # Drop insertions and deletions on the reverse strand.
+    indicator_reverse_drop = (
+        indicator_reverse & (lengths_first != lengths_second)
+    )
+    # Move the position of alleles of more than one nucleotide to the other
+    # end of their span, which maps to the first position on the forward
+    # strand of the target assembly.
+    indicator_span = (
+        indicator_reverse & ~indicator_reverse_drop & (lengths_first > 1)
+    )
+    for chromosome in pandas.unique(chromosomes[indicator_span]):
+        indices = numpy.flatnonzero(
+            indicator_span & (chromosomes == chromosome)
+        )
+        pail = map_chromosome_positions(
+            arrays=chains[chromosome],
+            positions=(positions[indices] + lengths_first[indices] - 1),
+        )
+        indicator_end = (
+            pail["map"] & pail["reverse"] &
+            (pail["chromosome"] == target_chromosome[indices]) &
+            (pail["position"] == (
+                target_position[indices] - lengths_first[indices] + 1
+            ))
+        )
+        target_position[indices] = numpy.where(
+            indicator_end, pail["position"], target_position[indices],
+        )
+        indicator_reverse_drop[indices[~indicator_end]] = True
+        pass
+    indicator_map = (indicator_map & ~indicator_reverse_drop)
+    # Organize variants that map.
+    table["CHR"] = pandas.Series(target_chromosome, dtype="string")
+    table["BP"] = pandas.Series(target_position, dtype="Int64")
+    reverse = pandas.Series(indicator_map & target_reverse)
+    for column in ["A1", "A2",]:
+        table.loc[reverse, column] = pbstd.reverse_complement_alleles(
+            series=table.loc[reverse, column].astype("string")
+        )
+        pass
+    table = table.loc[indicator_map, :]
+    # Update counts.
+    counts["map"] += int(indicator_map.sum())
+    counts["unmap"] += int((~indicator_map).sum())
+    counts["reverse"] += int((indicator_map & target_reverse).sum())
+    counts["reverse_drop"] += int(indicator_reverse_drop.sum())
+    counts["chromosome_change"] += int(
+        (indicator_map & (target_chromosome != chromosomes)).sum()
+    )
+    # Return information.
+    return table
+
+
+@pbprf.profile_procedure(category="study", keys_arguments=["study",])
+def control_map_study_assembly(
+    instance=None,
+    parameters=None,
+):
+    """
+    Control procedure to map genomic coordinates of GWAS summary statistics
+    for a single study in chunks of rows and to write the product and counts
+    of variants to file.
+
+    arguments:
+        instance (dict): parameters specific to current instance
+            study (str): identifier of study
+            chain (str): name of chain, or None to copy without change
+            path_file_source (str): path to source file
+            path_file_product (str): path to product file
+        parameters (dict): parameters common to all instances
+            paths_chain (dict<str>): paths to chain files for each name of
+                chain
+            size_chunk (int): count of rows in each chunk
+            path_directory_batch (str): path to directory for records of
+                individual studies
+            report (bool): whether to print reports
+
+    raises:
+
+    returns:
+
+    """
+
+    # Copy studies that do not need translation of coordinates.
+    if instance["chain"] is None:
+        shutil.copyfile(
+            instance["path_file_source"], instance["path_file_product"],
+        )
+        return
+    # Read chain file.
+    chains = read_source_chain_blocks(
+        path_file_chain=parameters["paths_chain"][instance["chain"]],
+        report=False,
+    )
+    # Map, and write in chunks.
+    counts = {
+        "source": 0, "map": 0, "unmap": 0, "reverse": 0,
+        "reverse_drop": 0, "chromosome_change": 0,
+    }
+    reader = pbstd.read_gwas_standard_format_chunks(
+        path_file=instance["path_file_source"],
+        columns=None,
+        size_chunk=parameters["size_chunk"],
+    )
+    first = True
+    for table_chunk in reader:
+        table_product = map_gwas_chunk_assembly(
+            table=table_chunk,
+            chains=chains,
+            counts=counts,
+        )
+        pbstd.write_gwas_standard_format_chunk(
+            table=table_product,
+            path_file=instance["path_file_product"],
+            header=first,
+            mode=("w" if first else "a"),
+        )
+        first = False
+        pass
+    # Collect information.
+    record = dict()
+    record["study"] = instance["study"]
+    record["chain"] = instance["chain"]
+    record.update(counts)
+    # Write product information to file.
+    pandas.DataFrame(data=[record,]).to_pickle(
+        os.path.join(
+            parameters["path_directory_batch"],
+            str(instance["study"] + ".pickle"),
+        )
+    )
+    # Report.
+    if parameters["report"]:
+        print(str(
+            "study: " + instance["study"] + "; chain: " + instance["chain"] +
+            "; variants: " + str(counts["source"]) + " to " +
+            str(counts["map"])
+        ))
+        pass
+    pass
+
+
+##########
+# 3. Drive translation of coordinates across studies.
+
+
+def control_map_studies_assembly(
+    path_file_table_assembly=None,
+    paths_chain=None,
+    path_directory_source=None,
+    path_directory_product=None,
+    size_chunk=None,
+    cores=None,
+    report=None,
+):
+    """
+    Control procedure to map genomic coordinates of GWAS summary statistics to
+    the target assembly for all studies in the source directory.
+
+    arguments:
+        path_file_table_assembly (str): path to file for table of chains for
+            studies that need translation of coordinates
+        paths_chain (dict<str>): paths to chain files for each name of chain
+        path_directory_source (str): path to directory of source files in
+            standard format ("*.txt.gz")
+        path_directory_product (str): path to directory of product files
+        size_chunk (int): count of rows in each chunk
+        cores (int): count of processing cores for parallel processes
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table of counts of variants
+
+    """
+
+    # Initialize directories.
+    path_directory_batch = os.path.join(path_directory_product, "batch",)
+    putly.remove_directory(path=path_directory_batch) # caution
+    putly.create_directories(path=path_directory_batch)
+    # Read source information from file.
+    table_assembly = pandas.read_csv(
+        path_file_table_assembly,
+        sep="\t",
+        header=0,
+        dtype="string",
+    )
+    chains_study = dict(zip(
+        table_assembly["study"].str.strip(), table_assembly["chain"].str.strip(),
+    ))
+    # Collect parameters specific to each instance.
+    names_file = sorted(list(filter(
+        lambda name: name.endswith(".txt.gz"),
+        os.listdir(path_directory_source),
+    )))
+    instances = list()
+    for name_file in names_file:
+        study = pbstd.define_study_identifier_from_file_name(
+            path_file=name_file,
+            suffix=".txt.gz",
+        )
+        instance = dict()
+        instance["study"] = study
+        instance["chain"] = chains_study.get(study, None)
+        instance["path_file_source"] = os.path.join(
+            path_directory_source, name_file,
+        )
+        instance["path_file_product"] = os.path.join(
+            path_directory_product, name_file,
+        )
+        instances.append(instance)
+        pass
+    # Collect parameters common across all instances.
+    parameters = dict()
+    parameters["paths_chain"] = paths_chain
+    parameters["size_chunk"] = size_chunk
+    parameters["path_directory_batch"] = path_directory_batch
+    parameters["report"] = report
+    # Execute procedure iteratively with parallelization across instances.
+    prall.drive_procedure_parallel(
+        function_control=control_map_study_assembly,
+        instances=instances,
+        parameters=parameters,
+        cores=cores,
+        report=report,
+    )
+    # Collect records from all studies.
+    tables = list()
+    for instance in instances:
+        path_file_record = os.path.join(
+            path_directory_batch, str(instance["study"] + ".pickle"),
+        )
+        if os.path.exists(path_file_record):
+            tables.append(pandas.read_pickle(path_file_record))
+        pass
+    if (len(tables) > 0):
+        table = pandas.concat(
+            tables,
+            axis="index",
+            join="outer",
+            ignore_index=True,
+            copy=True,
+        )
+    else:
+        table = pandas.DataFrame(columns=["study", "chain",])
+    # Write product information to file.
+    putly.write_tables_to_file(
+        pail_write={"table_assembly_counts": table,},
+        path_directory=path_directory_product,
+        reset_index_rows=False,
+        write_index_rows=False,
+        write_index_columns=True,
+        type="text",
+        delimiter="\t",
+        suffix=".tsv",
+    )
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=4)
+        print("count of studies: " + str(len(instances)))
+        print("count of studies with translation: " + str(table.shape[0]))
+        putly.print_terminal_partition(level=4)
+        pass
+    # Return information.
+    return table
+
+
+###############################################################################
+# Procedure
+
+
+def execute_procedure(
+    path_directory_dock=None,
+):
+    """
+    Function to execute module's main behavior.
+
+    arguments:
+        path_directory_dock (str): path to dock directory for source and product
+            directories and files
+
+    raises:
+
+    returns:
+
+    """
+
+    ##########
+    # Parameters.
+    identifier_preparation = "gwas_preparation_2023-12-30"
+    identifier_parameter = "tcw_2023-12-30"
+    size_chunk = 1000000
+    cores = 8
+    report = True
+
+    ##########
+    # Paths.
+    path_directory_source = os.path.join(
+        path_directory_dock, identifier_preparation, "1_gwas_format_standard",
+    )
+    path_directory_product = os.path.join(
+        path_directory_dock, identifier_preparation, "2_gwas_assembly_grch37",
+    )
+    path_file_table_assembly = os.path.join(
+        path_directory_dock, "parameters", "psychiatric_metabolism",
+        str("table_gwas_assembly_" + identifier_parameter + ".tsv"),
+    )
+    path_directory_chain = os.path.join(
+        path_directory_dock, "reference", "crossmap", "ensembl",
+    )
+    paths_chain = dict()
+    paths_chain["NCBI36_to_GRCh37"] = os.path.join(
+        path_directory_chain, "NCBI36_to_GRCh37.chain.gz",
+    )
+    paths_chain["GRCh38_to_GRCh37"] = os.path.join(
+        path_directory_chain, "GRCh38_to_GRCh37.chain.gz",
+    )
+    putly.remove_directory(path=path_directory_product) # caution
+    putly.create_directories(path=path_directory_product)
+
+    ##########
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=3)
+        print("module: psychiatry_biomarkers.gwas_preparation.assembly.py")
+        print("function: execute_procedure()")
+        putly.print_terminal_partition(level=5)
+        print("preparation: " + str(identifier_preparation))
+        print("parameter: " + str(identifier_parameter))
+        putly.print_terminal_partition(level=5)
+        pass
+
+    ##########
+    # Map genomic coordinates for all studies.
+    control_map_studies_assembly(
+        path_file_table_assembly=path_file_table_assembly,
+        paths_chain=paths_chain,
+        path_directory_source=path_directory_source,
+        path_directory_product=path_directory_product,
+        size_chunk=size_chunk,
+        cores=cores,
+        report=report,
+    )
+    pass
+
+
+###############################################################################
+# End
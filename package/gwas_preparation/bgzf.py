@@ -0,0 +1,797 @@
+"""
+Supply functionality for files of text with block compression in the BGZF
+format and for positional indices in the format of Tabix.
+
+This module 'bgzf' is part of the 'gwas_preparation' package within the
+'psychiatry_biomarkers' package.
+
+Author:
+
+    T. Cameron Waller, Ph.D.
+    tcameronwaller@gmail.com
+    Rochester, Minnesota 55902
+    United States of America
+
+License:
+
+    This file is part of the project package directory 'psychiatry_biomarkers'
+    (https://github.com/tcameronwaller/psychiatry_biomarkers/).
+
+    Project 'psychiatry_biomarkers' supports data analysis with team in
+    psychiatry and pharmacogenomics.
+    Copyright (C) 2024 Thomas Cameron Waller
+
+    The code within project 'psychiatry_biomarkers' is free software: you can
+    redistribute it and/or modify it under the terms of the GNU General Public
+    License as published by the Free Software Foundation, either version 3 of
+    the GNU General Public License, or (at your option) any later version.
+
+    The code within project 'psychiatry_biomarkers' is distributed in the hope
+    that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+    warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with project 'psychiatry_biomarkers'. If not, see
+    <http://www.gnu.org/licenses/>.
+"""
+
+###############################################################################
+# Notes
+
+# BGZF is a series of GZip members, each with no more than 64 KiB of data and
+# with the size of the member in an extra field of its header, so any tool
+# that reads GZip can read a file in BGZF, and a reader can start at any
+# member. A virtual offset combines the offset of a member within the
+# compressed file (upper 48 bits) with an offset within the data of that
+# member (lower 16 bits).
+# https://samtools.github.io/hts-specs/SAMv1.pdf
+
+# The positional index is in the format of Tabix (".tbi"), so "tabix",
+# "bcftools", and "pysam" can use it as well as the functions here. Each
+# chromosome has bins of the UCSC scheme with chunks of virtual offsets and a
+# linear index of the least virtual offset within each window of 16 kb.
+# https://samtools.github.io/hts-specs/tabix.pdf
+
+# The index requires the file to be in sort order by position within
+# chromosomes, with all records of each chromosome together.
+
+# Compression of members is independent, so threads compress members in
+# parallel while the module "zlib" releases the global interpreter lock.
+
+###############################################################################
+# Installation and importation
+
+# Standard
+
+import os
+import io
+import csv
+import struct
+import zlib
+import gzip
+import concurrent.futures
+
+# Relevant
+
+import numpy
+import pandas
+pandas.options.mode.chained_assignment = None # default = "warn"
+
+# Custom
+
+###############################################################################
+# Functionality
+
+
+##########
+# 1. Write and read members of BGZF.
+
+
+def define_bgzf_constants():
+    """
+    Defines constants of the BGZF format.
+
+    arguments:
+
+    raises:
+
+    returns:
+        (dict): constants
+
+    """
+
+    constants = dict()
+    # Maximal size of data in a member, as in "bgzip", which guarantees that
+    # the compressed member fits within 64 KiB.
+    constants["size_data"] = 65280
+    # Empty member that marks the end of file.
+    constants["end_file"] = bytes.fromhex(
+        "1f8b08040000000000ff0600424302001b0003000000000000000000"
+    )
+    return constants
+
+
+def compress_bgzf_member(
+    data=None,
+    level=None,
+):
+    """
+    Compresses data to a single member of BGZF.
+
+    arguments:
+        data (bytes): data of no more than 65280 bytes
+        level (int): level of compression from 0 to 9
+
+    raises:
+
+    returns:
+        (bytes): member of BGZF
+
+    """
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    data_compressed = compressor.compress(data) + compressor.flush()
+    size_block = len(data_compressed) + 26
+    header = struct.pack(
+        "<BBBBIBBHBBHH",
+        31, 139, 8, 4, 0, 0, 255, 6, 66, 67, 2, (size_block - 1),
+    )
+    footer = struct.pack(
+        "<II", (zlib.crc32(data) & 0xffffffff), len(data),
+    )
+    return header + data_compressed + footer
+
+
+def compress_bgzf_members(
+    data=None,
+    level=None,
+    threads=None,
+):
+    """
+    Compresses data to a series of members of BGZF, with parallel threads.
+
+    arguments:
+        data (bytes): data
+        level (int): level of compression from 0 to 9
+        threads (int): count of threads for compression
+
+    raises:
+
+    returns:
+        (list<bytes>): members of BGZF
+
+    """
+
+    size_data = define_bgzf_constants()["size_data"]
+    blocks = [
+        data[start:(start + size_data)]
+        for start in range(0, len(data), size_data)
+    ]
+    if (threads is None) or (threads < 2) or (len(blocks) < 2):
+        members = [
+            compress_bgzf_member(data=block, level=level) for block in blocks
+        ]
+    else:
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=threads
+        ) as executor:
+            members = list(executor.map(
+                lambda block: compress_bgzf_member(data=block, level=level),
+                blocks,
+            ))
+    return members
+
+
+def write_bgzf_data(
+    data=None,
+    path_file=None,
+    mode=None,
+    level=None,
+    threads=None,
+):
+    """
+    Writes data to file in BGZF, with a member to mark the end of file.
+
+    In append mode, the member that marks the end of the existing file is
+    removed first, since readers of BGZF stop at an empty member.
+
+    arguments:
+        data (bytes): data
+        path_file (str): path to file
+        mode (str): mode of write, either 'w' to write new or 'a' to append
+        level (int): level of compression from 0 to 9, or None for 6
+        threads (int): count of threads for compression, or None for 1
+
+    raises:
+
+    returns:
+
+    """
+
+    end_file = define_bgzf_constants()["end_file"]
+    if level is None:
+        level = 6
+    members = compress_bgzf_members(
+        data=data,
+        level=level,
+        threads=threads,
+    )
+    if (mode == "a") and os.path.exists(path_file):
+        handle = open(path_file, "r+b")
+        handle.seek(0, os.SEEK_END)
+        size_file = handle.tell()
+        if (size_file >= len(end_file)):
+            handle.seek((size_file - len(end_file)), os.SEEK_SET)
+            if (handle.read(len(end_file)) == end_file):
+                handle.seek((size_file - len(end_file)), os.SEEK_SET)
+                handle.truncate()
+        handle.seek(0, os.SEEK_END)
+    else:
+        handle = open(path_file, "wb")
+    with handle:
+        for member in members:
+            handle.write(member)
+        handle.write(end_file)
+    pass
+
+
+def read_bgzf_member(
+    handle=None,
+):
+    """
+    Reads and decompresses the next member of BGZF from an open file.
+
+    arguments:
+        handle (object): handle to file open for read in binary mode
+
+    raises:
+        ValueError: if the member is not in BGZF
+
+    returns:
+        (tuple): data of member and size of member in the compressed file,
+            or None at the end of file
+
+    """
+
+    header = handle.read(12)
+    if (len(header) == 0):
+        return None
+    if (len(header) < 12) or (header[0:2] != b"\x1f\x8b") or (
+        not (header[3] & 4)
+    ):
+        raise ValueError("member is not in BGZF")
+    length_extra = struct.unpack("<H", header[10:12])[0]
+    extra = handle.read(length_extra)
+    size_block = None
+    position = 0
+    while (position + 4) <= len(extra):
+        identifier = extra[position:(position + 2)]
+        length_field = struct.unpack(
+            "<H", extra[(position + 2):(position + 4)]
+        )[0]
+        if (identifier == b"BC") and (length_field == 2):
+            size_block = struct.unpack(
+                "<H", extra[(position + 4):(position + 6)]
+            )[0] + 1
+        position += (4 + length_field)
+        pass
+    if size_block is None:
+        raise ValueError("member is not in BGZF")
+    remainder = handle.read(size_block - 12 - length_extra)
+    data = zlib.decompress(remainder[:-8], -15)
+    return (data, size_block)
+
+
+def read_bgzf_data_range(
+    handle=None,
+    offset_virtual_start=None,
+    offset_virtual_end=None,
+):
+    """
+    Reads and decompresses data of BGZF between two virtual offsets.
+
+    arguments:
+        handle (object): handle to file open for read in binary mode
+        offset_virtual_start (int): virtual offset of start, inclusive
+        offset_virtual_end (int): virtual offset of end, exclusive
+
+    raises:
+
+    returns:
+        (bytes): data
+
+    """
+
+    offset_start = (offset_virtual_start >> 16)
+    offset_end = (offset_virtual_end >> 16)
+    handle.seek(offset_start, os.SEEK_SET)
+    offset = offset_start
+    pieces = list()
+    while (offset <= offset_end):
+        member = read_bgzf_member(handle=handle)
+        if member is None:
+            break
+        data, size_block = member
+        start = (
+            (offset_virtual_start & 0xffff) if (offset == offset_start) else 0
+        )
+        end = (
+            (offset_virtual_end & 0xffff) if (offset == offset_end)
+            else len(data)
+        )
+        pieces.append(data[start:end])
+        offset += size_block
+        pass
+    return b"".join(pieces)
+
+
+##########
+# 2. Build positional index.
+
+
+def calculate_bin_region(
+    start=None,
+    end=None,
+):
+    """
+    Calculates the bin of the UCSC scheme for a region.
+
+    arguments:
+        start (int): zero-based start of region, inclusive
+        end (int): zero-based end of region, exclusive
+
+    raises:
+
+    returns:
+        (int): bin
+
+    """
+
+    end -= 1
+    if (start >> 14) == (end >> 14):
+        return (((1 << 15) - 1) // 7) + (start >> 14)
+    if (start >> 17) == (end >> 17):
+        return (((1 << 12) - 1) // 7) + (start >> 17)
+    if (start >> 20) == (end >> 20):
+        return (((1 << 9) - 1) // 7) + (start >> 20)
+    if (start >> 23) == (end >> 23):
+        return (((1 << 6) - 1) // 7) + (start >> 23)
+    if (start >> 26) == (end >> 26):
+        return (((1 << 3) - 1) // 7) + (start >> 26)
+    return 0
+
+
+def calculate_bins_overlap_region(
+    start=None,
+    end=None,
+):
+    """
+    Calculates all bins of the UCSC scheme that overlap a region.
+
+    arguments:
+        start (int): zero-based start of region, inclusive
+        end (int): zero-based end of region, exclusive
+
+    raises:
+
+    returns:
+        (list<int>): bins
+
+    """
+
+    end -= 1
+    bins = [0,]
+    for shift, base in [(26, 1), (23, 9), (20, 73), (17, 585), (14, 4681),]:
+        bins.extend(
+            range((base + (start >> shift)), (base + 1 + (end >> shift)))
+        )
+        pass
+    return bins
+
+
+def read_bgzf_line_positions(
+    path_file=None,
+    column_chromosome=None,
+    column_position=None,
+    character_meta=None,
+    count_skip=None,
+    count_members=None,
+):
+    """
+    Reads chromosomes, positions, and virtual offsets of all lines of a file
+    in BGZF, in groups of members.
+
+    arguments:
+        path_file (str): path to file in BGZF
+        column_chromosome (int): zero-based index of column for chromosome
+        column_position (int): zero-based index of column for position
+        character_meta (str): first character of lines to skip
+        count_skip (int): count of lines to skip at start of file
+        count_members (int): count of members in each group
+
+    raises:
+
+    returns:
+        (iterator<dict>): chromosomes, positions, and virtual offsets of start
+            and end of lines for each group of members
+
+    """
+
+    code_meta = ord(character_meta)
+    carry = b""
+    carry_offset_virtual = 0
+    count_lines = 0
+    offset = 0
+    end = False
+    with open(path_file, "rb") as handle:
+        while not end:
+            # Read a group of members.
+            datas = list()
+            offsets = list()
+            for index in range(count_members):
+                member = read_bgzf_member(handle=handle)
+                if member is None:
+                    end = True
+                    break
+                datas.append(member[0])
+                offsets.append(offset)
+                offset += member[1]
+                pass
+            buffer = carry + b"".join(datas)
+            if end and (len(buffer) > 0) and (not buffer.endswith(b"\n")):
+                buffer += b"\n"
+                datas.append(b"\n")
+                offsets.append(offset)
+            offsets.append(offset)
+            # Determine virtual offsets of lines.
+            starts_member = numpy.cumsum(
+                [len(carry),] + [len(data) for data in datas]
+            )
+            array = numpy.frombuffer(buffer, dtype=numpy.uint8)
+            newlines = numpy.flatnonzero(array == 10)
+            if (newlines.size == 0):
+                if (len(carry) == 0) and (len(offsets) > 1):
+                    carry_offset_virtual = (offsets[0] << 16)
+                carry = buffer
+                continue
+            starts_line = numpy.concatenate([[0,], (newlines + 1)])
+            indices_member = numpy.clip(
+                (numpy.searchsorted(starts_member, starts_line, "right") - 1),
+                0, (len(offsets) - 1),
+            )
+            offsets_member = numpy.array(offsets, dtype=numpy.uint64)
+            offsets_virtual = (
+                (offsets_member[indices_member] << numpy.uint64(16)) |
+                (starts_line - starts_member[indices_member]).astype(
+                    numpy.uint64
+                )
+            )
+            if (len(carry) > 0):
+                offsets_virtual[0] = carry_offset_virtual
+            # Read columns of complete lines.
+            table = pandas.read_csv(
+                io.BytesIO(buffer[:(newlines[-1] + 1)]),
+                sep="\t",
+                header=None,
+                usecols=[column_chromosome, column_position,],
+                dtype="string",
+                quoting=csv.QUOTE_NONE,
+                skip_blank_lines=False,
+                keep_default_na=False,
+            )
+            indicator_keep = (
+                (numpy.arange(count_lines, (count_lines + newlines.size))
+                    >= count_skip) &
+                (array[starts_line[:-1]] != code_meta)
+            )
+            count_lines += newlines.size
+            carry = buffer[(newlines[-1] + 1):]
+            carry_offset_virtual = offsets_virtual[-1]
+            # Collect information.
+            pail = dict()
+            pail["chromosomes"] = (
+                table[column_chromosome].to_numpy(dtype="str")[indicator_keep]
+            )
+            pail["positions"] = pandas.to_numeric(
+                table[column_position], errors="coerce",
+            ).to_numpy(dtype="float64")[indicator_keep]
+            pail["starts"] = offsets_virtual[:-1][indicator_keep]
+            pail["ends"] = offsets_virtual[1:][indicator_keep]
+            yield pail
+    pass
+
+
+def build_tabix_index(
+    path_file=None,
+    column_chromosome=None,
+    column_position=None,
+    character_meta=None,
+    count_skip=None,
+):
+    """
+    Builds the positional index of a file in BGZF in the format of Tabix and
+    writes it to a file with suffix ".tbi".
+
+    arguments:
+        path_file (str): path to file in BGZF
+        column_chromosome (int): one-based index of column for chromosome
+        column_position (int): one-based index of column for position
+        character_meta (str): first character of lines to skip
+        count_skip (int): count of lines to skip at start of file
+
+    raises:
+        ValueError: if the file is not in sort order by position within
+            chromosomes or a position is missing
+
+    returns:
+        (dict<int>): counts of lines and chromosomes in the index
+
+    """
+
+    chromosomes = list()
+    bins = dict()
+    windows = dict()
+    chromosome_previous = None
+    position_previous = 0
+    run_previous = None
+    count_lines = 0
+    for pail in read_bgzf_line_positions(
+        path_file=path_file,
+        column_chromosome=(column_chromosome - 1),
+        column_position=(column_position - 1),
+        character_meta=character_meta,
+        count_skip=count_skip,
+        count_members=256,
+    ):
+        if (pail["positions"].size == 0):
+            continue
+        if not numpy.all(numpy.isfinite(pail["positions"])):
+            raise ValueError("position is missing in file: " + path_file)
+        starts_region = (pail["positions"].astype(numpy.int64) - 1)
+        codes_bin = (4681 + (starts_region >> 14))
+        codes_window = (starts_region >> 14)
+        # Check sort order.
+        names = pail["chromosomes"]
+        change = numpy.concatenate([
+            [names[0] != chromosome_previous,], (names[1:] != names[:-1]),
+        ])
+        decrease = numpy.concatenate([
+            [starts_region[0] < (position_previous - 1),],
+            (starts_region[1:] < starts_region[:-1]),
+        ])
+        if numpy.any(decrease & ~change):
+            raise ValueError("positions are not in sort order: " + path_file)
+        for name in names[change]:
+            if name in bins.keys():
+                raise ValueError(
+                    "chromosomes are not together in file: " + path_file
+                )
+            chromosomes.append(str(name))
+            bins[str(name)] = dict()
+            windows[str(name)] = dict()
+            run_previous = None
+            pass
+        # Collect chunks of bins, merging runs of the same bin.
+        change_run = change | numpy.concatenate([
+            [True,], (codes_bin[1:] != codes_bin[:-1]),
+        ])
+        indices_run = numpy.flatnonzero(change_run)
+        ends_run = numpy.concatenate([indices_run[1:], [names.size,]]) - 1
+        for index_start, index_end in zip(indices_run, ends_run):
+            name = str(names[index_start])
+            code = int(codes_bin[index_start])
+            start = int(pail["starts"][index_start])
+            end = int(pail["ends"][index_end])
+            if (run_previous is not None) and (run_previous[0] == name) and (
+                run_previous[1] == code
+            ):
+                bins[name][code][-1][1] = end
+            else:
+                bins[name].setdefault(code, list()).append([start, end,])
+            run_previous = (name, code,)
+            pass
+        # Collect least virtual offsets of windows.
+        change_window = change | numpy.concatenate([
+            [True,], (codes_window[1:] != codes_window[:-1]),
+        ])
+        for index in numpy.flatnonzero(change_window):
+            name = str(names[index])
+            code = int(codes_window[index])
+            if code not in windows[name].keys():
+                windows[name][code] = int(pail["starts"][index])
+            pass
+        chromosome_previous = names[-1]
+        position_previous = int(pail["positions"][-1])
+        count_lines += names.size
+        pass
+    # Organize index.
+    names_bytes = b"".join(
+        [str(name).encode("utf-8") + b"\x00" for name in chromosomes]
+    )
+    pieces = [
+        b"TBI\x01",
+        struct.pack(
+            "<iiiiiiii",
+            len(chromosomes), 0, column_chromosome, column_position,
+            column_position, ord(character_meta), count_skip,
+            len(names_bytes),
+        ),
+        names_bytes,
+    ]
+    for name in chromosomes:
+        pieces.append(struct.pack("<i", len(bins[name])))
+        for code in sorted(bins[name].keys()):
+            chunks = bins[name][code]
+            pieces.append(struct.pack("<Ii", code, len(chunks)))
+            for chunk in chunks:
+                pieces.append(struct.pack("<QQ", chunk[0], chunk[1]))
+            pass
+        count_windows = (max(windows[name].keys()) + 1)
+        offsets = numpy.zeros(count_windows, dtype=numpy.uint64)
+        offset_previous = windows[name][min(windows[name].keys())]
+        for code in range(count_windows):
+            offset_previous = windows[name].get(code, offset_previous)
+            offsets[code] = offset_previous
+            pass
+        pieces.append(struct.pack("<i", count_windows))
+        pieces.append(offsets.astype("<u8").tobytes())
+        pass
+    write_bgzf_data(
+        data=b"".join(pieces),
+        path_file=str(path_file + ".tbi"),
+        mode="w",
+        level=6,
+        threads=1,
+    )
+    # Collect information.
+    counts = dict()
+    counts["lines"] = count_lines
+    counts["chromosomes"] = len(chromosomes)
+    # Return information.
+    return counts
+
+
+##########
+# 3. Read regions with positional index.
+
+
+def read_tabix_index(
+    path_file_index=None,
+):
+    """
+    Reads a positional index in the format of Tabix.
+
+    arguments:
+        path_file_index (str): path to file of index (".tbi")
+
+    raises:
+        ValueError: if the file is not an index in the format of Tabix
+
+    returns:
+        (dict): parameters of index and, for each chromosome, chunks of bins
+            and least virtual offsets of windows
+
+    """
+
+    with gzip.open(path_file_index, "rb") as handle:
+        data = handle.read()
+    if (data[0:4] != b"TBI\x01"):
+        raise ValueError("file is not an index of Tabix: " + path_file_index)
+    (
+        count_references, format_index, column_chromosome, column_start,
+        column_end, code_meta, count_skip, length_names,
+    ) = struct.unpack("<iiiiiiii", data[4:36])
+    position = 36
+    names = data[position:(position + length_names)].split(b"\x00")[:-1]
+    position += length_names
+    index = dict()
+    index["column_chromosome"] = column_chromosome
+    index["column_position"] = column_start
+    index["character_meta"] = chr(code_meta)
+    index["count_skip"] = count_skip
+    index["chromosomes"] = [name.decode("utf-8") for name in names]
+    index["references"] = dict()
+    for name in index["chromosomes"]:
+        count_bins = struct.unpack("<i", data[position:(position + 4)])[0]
+        position += 4
+        bins = dict()
+        for index_bin in range(count_bins):
+            code, count_chunks = struct.unpack(
+                "<Ii", data[position:(position + 8)]
+            )
+            position += 8
+            chunks = numpy.frombuffer(
+                data, dtype="<u8", count=(2 * count_chunks), offset=position,
+            ).reshape((count_chunks, 2))
+            position += (16 * count_chunks)
+            bins[code] = chunks
+            pass
+        count_windows = struct.unpack("<i", data[position:(position + 4)])[0]
+        position += 4
+        windows = numpy.frombuffer(
+            data, dtype="<u8", count=count_windows, offset=position,
+        )
+        position += (8 * count_windows)
+        index["references"][name] = {"bins": bins, "windows": windows,}
+        pass
+    return index
+
+
+def read_bgzf_region_data(
+    path_file=None,
+    index=None,
+    chromosome=None,
+    position_start=None,
+    position_end=None,
+):
+    """
+    Reads from a file in BGZF the data of all lines in the chunks of the
+    positional index that overlap a region.
+
+    Lines in these chunks can fall outside the region, so the caller filters
+    lines by chromosome and position.
+
+    arguments:
+        path_file (str): path to file in BGZF
+        index (dict): positional index from "read_tabix_index", or None to
+            read the index from the file with suffix ".tbi"
+        chromosome (str): name of chromosome
+        position_start (int): one-based start of region, inclusive
+        position_end (int): one-based end of region, inclusive
+
+    raises:
+
+    returns:
+        (bytes): data of lines
+
+    """
+
+    if index is None:
+        index = read_tabix_index(path_file_index=str(path_file + ".tbi"))
+    chromosome = str(chromosome)
+    if chromosome not in index["references"].keys():
+        return b""
+    reference = index["references"][chromosome]
+    start = max(0, (int(position_start) - 1))
+    end = min((1 << 29), int(position_end))
+    if (end <= start):
+        return b""
+    # Determine chunks that overlap region.
+    window = (start >> 14)
+    if (window >= reference["windows"].size):
+        return b""
+    offset_least = int(reference["windows"][window])
+    chunks = list()
+    for code in calculate_bins_overlap_region(start=start, end=end):
+        if code in reference["bins"].keys():
+            for chunk in reference["bins"][code]:
+                if (int(chunk[1]) > offset_least):
+                    chunks.append(
+                        [max(int(chunk[0]), offset_least), int(chunk[1]),]
+                    )
+            pass
+        pass
+    chunks.sort()
+    chunks_merge = list()
+    for chunk in chunks:
+        if (len(chunks_merge) > 0) and (chunk[0] <= chunks_merge[-1][1]):
+            chunks_merge[-1][1] = max(chunks_merge[-1][1], chunk[1])
+        else:
+            chunks_merge.append(chunk)
+        pass
+    # Read data of chunks.
+    with open(path_file, "rb") as handle:
+        pieces = [
+            read_bgzf_data_range(
+                handle=handle,
+                offset_virtual_start=chunk[0],
+                offset_virtual_end=chunk[1],
+            )
+            for chunk in chunks_merge
+        ]
+    return b"".join(pieces)
+
+
+###############################################################################
+# End
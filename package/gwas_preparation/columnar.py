@@ -0,0 +1,797 @@
+"""
+Supply functionality for a binary, columnar store of GWAS summary statistics
+with partitions by chromosome.
+
+This module 'columnar' is part of the 'gwas_preparation' package within the
+'psychiatry_biomarkers' package.
+
+Author:
+
+    T. Cameron Waller, Ph.D.
+    tcameronwaller@gmail.com
+    Rochester, Minnesota 55902
+    United States of America
+
+License:
+
+    This file is part of the project package directory 'psychiatry_biomarkers'
+    (https://github.com/tcameronwaller/psychiatry_biomarkers/).
+
+    Project 'psychiatry_biomarkers' supports data analysis with team in
+    psychiatry and pharmacogenomics.
+    Copyright (C) 2024 Thomas Cameron Waller
+
+    The code within project 'psychiatry_biomarkers' is free software: you can
+    redistribute it and/or modify it under the terms of the GNU General Public
+    License as published by the Free Software Foundation, either version 3 of
+    the GNU General Public License, or (at your option) any later version.
+
+    The code within project 'psychiatry_biomarkers' is distributed in the hope
+    that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+    warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with project 'psychiatry_biomarkers'. If not, see
+    <http://www.gnu.org/licenses/>.
+"""
+
+###############################################################################
+# Notes
+
+# Stages of preparation, LDSC munge, SBayesR, and polygenic scores pass GWAS
+# summary statistics as tab-delimited text, so each stage parses strings to
+# numbers again. The columnar store keeps the same columns as the standard
+# format (module "standard_format") in files of Parquet, with a directory for
+# each study and a partition for each chromosome.
+# <study>.parquet/chromosome=<CHR>/part.parquet
+
+# Types of columns.
+# key: packed integer key of variant (module "variant_key"), -1 if invalid
+# SNP: string
+# CHR, A1, A2: strings with dictionary encoding
+# BP: 32-bit integer
+# BETA, SE, Z, A1AF, INFO, N, NCASE, NCONT: 32-bit floating point
+# P: 64-bit floating point, since probabilities down to 1E-308 (module
+# "constraint") are below the range of 32-bit floating point
+
+# Records without chromosome go to the partition "chromosome=unknown".
+
+# Readers select columns and apply predicates on columns and partitions
+# within Parquet, so a read of a few columns for a few chromosomes does not
+# touch the rest of the store. Readers return Pandas data-frame tables with
+# the types of the standard format, plus the column "key".
+
+# The package "pyarrow" is optional for the rest of the package and only
+# necessary for the functions in this module.
+
+###############################################################################
+# Installation and importation
+
+# Standard
+
+import os
+
+# Relevant
+
+import numpy
+import pandas
+pandas.options.mode.chained_assignment = None # default = "warn"
+try:
+    import pyarrow
+    import pyarrow.parquet
+    import pyarrow.dataset
+except ImportError:
+    pyarrow = None
+
+# Custom
+import partner.utility as putly
+import partner.parallelization as prall
+import psychiatry_biomarkers.gwas_preparation.standard_format as pbstd
+import psychiatry_biomarkers.gwas_preparation.variant_key as pbkey
+import psychiatry_biomarkers.gwas_preparation.position_index as pbpos
+
+###############################################################################
+# Functionality
+
+
+##########
+# 1. Define schema of store.
+
+
+def check_pyarrow():
+    """
+    Checks that the optional package "pyarrow" is available.
+
+    arguments:
+
+    raises:
+        ImportError: if package "pyarrow" is not available
+
+    returns:
+
+    """
+
+    if pyarrow is None:
+        raise ImportError(
+            "package 'pyarrow' is necessary for the columnar store of GWAS " +
+            "summary statistics"
+        )
+    pass
+
+
+def define_columnar_schema():
+    """
+    Defines the schema of files in the columnar store of GWAS summary
+    statistics.
+
+    arguments:
+
+    raises:
+        ImportError: if package "pyarrow" is not available
+
+    returns:
+        (object): schema of PyArrow
+
+    """
+
+    check_pyarrow()
+    type_dictionary = pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+    schema = pyarrow.schema([
+        ("key", pyarrow.int64()),
+        ("SNP", pyarrow.string()),
+        ("CHR", type_dictionary),
+        ("BP", pyarrow.int32()),
+        ("A1", type_dictionary),
+        ("A2", type_dictionary),
+        ("A1AF", pyarrow.float32()),
+        ("BETA", pyarrow.float32()),
+        ("SE", pyarrow.float32()),
+        ("P", pyarrow.float64()),
+        ("N", pyarrow.float32()),
+        ("Z", pyarrow.float32()),
+        ("INFO", pyarrow.float32()),
+        ("NCASE", pyarrow.float32()),
+        ("NCONT", pyarrow.float32()),
+    ])
+    return schema
+
+
+def define_columnar_partitioning():
+    """
+    Defines the partitions by chromosome of the columnar store of GWAS
+    summary statistics.
+
+    arguments:
+
+    raises:
+        ImportError: if package "pyarrow" is not available
+
+    returns:
+        (object): partitioning of PyArrow
+
+    """
+
+    check_pyarrow()
+    return pyarrow.dataset.partitioning(
+        pyarrow.schema([("chromosome", pyarrow.string()),]),
+        flavor="hive",
+    )
+
+
+def convert_gwas_chunk_columnar(
+    table=None,
+):
+    """
+    Converts a chunk of GWAS summary statistics from the standard format to a
+    table of PyArrow in the schema of the columnar store.
+
+    arguments:
+        table (object): Pandas data-frame table of GWAS summary statistics in
+            standard format
+
+    raises:
+        ImportError: if package "pyarrow" is not available
+
+    returns:
+        (object): table of PyArrow
+
+    """
+
+    schema = define_columnar_schema()
+    table = table.reindex(
+        columns=pbstd.define_standard_format_column_sequence()
+    )
+    arrays = dict()
+    arrays["key"] = pyarrow.array(
+        pbkey.pack_variant_keys(
+            chromosomes=table["CHR"],
+            positions=table["BP"],
+            alleles_first=table["A1"],
+            alleles_second=table["A2"],
+        ),
+        type=pyarrow.int64(),
+    )
+    for field in schema:
+        if (field.name == "key"):
+            continue
+        values = table[field.name]
+        if pyarrow.types.is_dictionary(field.type):
+            arrays[field.name] = pyarrow.array(
+                values.astype("string"), type=pyarrow.string(),
+            ).dictionary_encode()
+        elif pyarrow.types.is_integer(field.type):
+            arrays[field.name] = pyarrow.array(
+                pandas.to_numeric(values, errors="coerce").astype("Int64"),
+                type=pyarrow.int64(),
+            ).cast(field.type)
+        elif pyarrow.types.is_string(field.type):
+            arrays[field.name] = pyarrow.array(
+                values.astype("string"), type=pyarrow.string(),
+            )
+        else:
+            arrays[field.name] = pyarrow.array(
+                pandas.to_numeric(values, errors="coerce").to_numpy(
+                    dtype="float64", na_value=numpy.nan,
+                ),
+                type=pyarrow.float64(),
+                from_pandas=True,
+            ).cast(field.type)
+        pass
+    return pyarrow.Table.from_arrays(
+        [arrays[field.name] for field in schema],
+        schema=schema,
+    )
+
+
+##########
+# 2. Write and read store.
+
+
+def write_gwas_columnar_store(
+    path_file_source=None,
+    path_directory_store=None,
+    size_chunk=None,
+):
+    """
+    Writes GWAS summary statistics from a file in the standard format to the
+    columnar store, with a file of Parquet for each chromosome and a group of
+    rows within each file for each chunk.
+
+    arguments:
+        path_file_source (str): path to source file in standard format
+        path_directory_store (str): path to directory of store for study
+        size_chunk (int): count of rows in each chunk
+
+    raises:
+        ImportError: if package "pyarrow" is not available
+
+    returns:
+        (dict<int>): counts of rows and chromosomes
+
+    """
+
+    schema = define_columnar_schema()
+    putly.remove_directory(path=path_directory_store) # caution
+    putly.create_directories(path=path_directory_store)
+    writers = dict()
+    counts = {"rows": 0, "key_invalid": 0, "chromosomes": 0,}
+    try:
+        for table in pbstd.read_gwas_standard_format_chunks(
+            path_file=path_file_source,
+            columns=None,
+            size_chunk=size_chunk,
+        ):
+            table_arrow = convert_gwas_chunk_columnar(table=table)
+            counts["rows"] += table_arrow.num_rows
+            counts["key_invalid"] += int(
+                (table_arrow.column("key").to_numpy() < 0).sum()
+            )
+            chromosomes = (
+                table["CHR"].astype("string").fillna("unknown")
+                .to_numpy(dtype="str")
+            )
+            for chromosome in pandas.unique(chromosomes):
+                if chromosome not in writers.keys():
+                    path_directory_partition = os.path.join(
+                        path_directory_store,
+                        str("chromosome=" + chromosome),
+                    )
+                    putly.create_directories(path=path_directory_partition)
+                    writers[chromosome] = pyarrow.parquet.ParquetWriter(
+                        os.path.join(path_directory_partition, "part.parquet"),
+                        schema,
+                        compression="zstd",
+                    )
+                writers[chromosome].write_table(
+                    table_arrow.filter(
+                        pyarrow.array(chromosomes == chromosome)
+                    )
+                )
+                pass
+            pass
+    finally:
+        for writer in writers.values():
+            writer.close()
+    counts["chromosomes"] = len(writers)
+    return counts
+
+
+def define_columnar_dataset(
+    path_directory_store=None,
+):
+    """
+    Defines the dataset of PyArrow for the columnar store of a study.
+
+    arguments:
+        path_directory_store (str): path to directory of store for study
+
+    raises:
+        ImportError: if package "pyarrow" is not available
+
+    returns:
+        (object): dataset of PyArrow
+
+    """
+
+    return pyarrow.dataset.dataset(
+        path_directory_store,
+        format="parquet",
+        partitioning=define_columnar_partitioning(),
+    )
+
+
+def define_columnar_filter(
+    chromosomes=None,
+    filters=None,
+):
+    """
+    Defines the expression of PyArrow to filter the columnar store by
+    chromosomes and by predicates on columns.
+
+    arguments:
+        chromosomes (list<str>): names of chromosomes, or None for all
+        filters (list<tuple>): predicates on columns, each as a tuple of name
+            of column, operator, and value, such as ("P", "<", 5E-8), all of
+            which must be true, or None for no predicates
+
+    raises:
+        ImportError: if package "pyarrow" is not available
+
+    returns:
+        (object): expression of PyArrow, or None
+
+    """
+
+    check_pyarrow()
+    expressions = list()
+    if chromosomes is not None:
+        expressions.append(
+            pyarrow.dataset.field("chromosome").isin(
+                [str(chromosome) for chromosome in chromosomes]
+            )
+        )
+    if (filters is not None) and (len(filters) > 0):
+        expressions.append(
+            pyarrow.parquet.filters_to_expression(list(filters))
+        )
+    if (len(expressions) == 0):
+        return None
+    expression = expressions[0]
+    for expression_next in expressions[1:]:
+        expression = (expression & expression_next)
+    return expression
+
+
+def organize_columnar_table(
+    table_arrow=None,
+):
+    """
+    Organizes a table of PyArrow from the columnar store as a Pandas
+    data-frame table with the types of the standard format.
+
+    arguments:
+        table_arrow (object): table or batch of PyArrow
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table
+
+    """
+
+    table = table_arrow.to_pandas()
+    if "chromosome" in table.columns:
+        table.drop(columns=["chromosome",], inplace=True)
+    types_columns = pbstd.define_standard_format_column_types()
+    types_columns["key"] = "int64"
+    for column in table.columns:
+        if column in types_columns.keys():
+            if types_columns[column] in ["string", "Int64",]:
+                table[column] = table[column].astype("object").astype(
+                    types_columns[column]
+                )
+            else:
+                table[column] = table[column].astype(types_columns[column])
+        pass
+    return table
+
+
+def read_gwas_columnar_store(
+    path_directory_store=None,
+    columns=None,
+    chromosomes=None,
+    filters=None,
+):
+    """
+    Reads GWAS summary statistics from the columnar store, with selection of
+    columns, chromosomes, and predicates on columns.
+
+    arguments:
+        path_directory_store (str): path to directory of store for study
+        columns (list<str>): names of columns to read, or None for all columns
+        chromosomes (list<str>): names of chromosomes, or None for all
+        filters (list<tuple>): predicates on columns, each as a tuple of name
+            of column, operator, and value, such as ("P", "<", 5E-8), all of
+            which must be true, or None for no predicates
+
+    raises:
+        ImportError: if package "pyarrow" is not available
+
+    returns:
+        (object): Pandas data-frame table of GWAS summary statistics
+
+    """
+
+    dataset = define_columnar_dataset(
+        path_directory_store=path_directory_store,
+    )
+    if columns is None:
+        columns = [field.name for field in define_columnar_schema()]
+    table_arrow = dataset.to_table(
+        columns=list(columns),
+        filter=define_columnar_filter(
+            chromosomes=chromosomes,
+            filters=filters,
+        ),
+    )
+    return organize_columnar_table(table_arrow=table_arrow)
+
+
+def read_gwas_columnar_store_chunks(
+    path_directory_store=None,
+    columns=None,
+    chromosomes=None,
+    filters=None,
+    size_chunk=None,
+):
+    """
+    Reads GWAS summary statistics from the columnar store in chunks of rows,
+    with selection of columns, chromosomes, and predicates on columns.
+
+    arguments:
+        path_directory_store (str): path to directory of store for study
+        columns (list<str>): names of columns to read, or None for all columns
+        chromosomes (list<str>): names of chromosomes, or None for all
+        filters (list<tuple>): predicates on columns, each as a tuple of name
+            of column, operator, and value, or None for no predicates
+        size_chunk (int): maximal count of rows in each chunk
+
+    raises:
+        ImportError: if package "pyarrow" is not available
+
+    returns:
+        (iterator<object>): Pandas data-frame tables
+
+    """
+
+    dataset = define_columnar_dataset(
+        path_directory_store=path_directory_store,
+    )
+    if columns is None:
+        columns = [field.name for field in define_columnar_schema()]
+    for batch in dataset.to_batches(
+        columns=list(columns),
+        filter=define_columnar_filter(
+            chromosomes=chromosomes,
+            filters=filters,
+        ),
+        batch_size=size_chunk,
+    ):
+        if (batch.num_rows > 0):
+            yield organize_columnar_table(table_arrow=batch)
+        pass
+    pass
+
+
+def write_gwas_columnar_store_text(
+    path_directory_store=None,
+    path_file_product=None,
+    size_chunk=None,
+):
+    """
+    Writes GWAS summary statistics from the columnar store to a file in the
+    standard format, with chromosomes in sort order.
+
+    arguments:
+        path_directory_store (str): path to directory of store for study
+        path_file_product (str): path to product file in standard format
+        size_chunk (int): count of rows in each chunk
+
+    raises:
+        ImportError: if package "pyarrow" is not available
+
+    returns:
+        (int): count of rows
+
+    """
+
+    names = list(filter(
+        lambda name: name.startswith("chromosome="),
+        os.listdir(path_directory_store),
+    ))
+    chromosomes = pbpos.sort_chromosome_names(
+        chromosomes=[name.replace("chromosome=", "", 1) for name in names]
+    )
+    count_rows = 0
+    first = True
+    for chromosome in chromosomes:
+        for table in read_gwas_columnar_store_chunks(
+            path_directory_store=path_directory_store,
+            columns=pbstd.define_standard_format_column_sequence(),
+            chromosomes=[chromosome,],
+            filters=None,
+            size_chunk=size_chunk,
+        ):
+            pbstd.write_gwas_standard_format_chunk(
+                table=table,
+                path_file=path_file_product,
+                header=first,
+                mode=("w" if first else "a"),
+            )
+            first = False
+            count_rows += table.shape[0]
+            pass
+        pass
+    if first:
+        pbstd.write_gwas_standard_format_chunk(
+            table=pandas.DataFrame(
+                columns=pbstd.define_standard_format_column_sequence()
+            ),
+            path_file=path_file_product,
+            header=True,
+            mode="w",
+        )
+    return count_rows
+
+
+##########
+# 3. Drive conversion across studies.
+
+
+def control_write_study_columnar_store(
+    instance=None,
+    parameters=None,
+):
+    """
+    Control procedure to write GWAS summary statistics for a single study to
+    the columnar store and to write counts of rows to file.
+
+    arguments:
+        instance (dict): parameters specific to current instance
+            study (str): identifier of study
+            path_file_source (str): path to source file
+            path_directory_store (str): path to directory of store for study
+        parameters (dict): parameters common to all instances
+            size_chunk (int): count of rows in each chunk
+            path_directory_batch (str): path to directory for records of
+                individual studies
+            report (bool): whether to print reports
+
+    raises:
+
+    returns:
+
+    """
+
+    counts = write_gwas_columnar_store(
+        path_file_source=instance["path_file_source"],
+        path_directory_store=instance["path_directory_store"],
+        size_chunk=parameters["size_chunk"],
+    )
+    # Collect information.
+    record = dict()
+    record["study"] = instance["study"]
+    record.update(counts)
+    # Write product information to file.
+    pandas.DataFrame(data=[record,]).to_pickle(
+        os.path.join(
+            parameters["path_directory_batch"],
+            str(instance["study"] + ".pickle"),
+        )
+    )
+    # Report.
+    if parameters["report"]:
+        print(str(
+            "study: " + instance["study"] + "; rows: " +
+            str(counts["rows"]) + "; chromosomes: " +
+            str(counts["chromosomes"])
+        ))
+        pass
+    pass
+
+
+def control_write_studies_columnar_store(
+    path_directory_source=None,
+    path_directory_product=None,
+    size_chunk=None,
+    cores=None,
+    report=None,
+):
+    """
+    Control procedure to write GWAS summary statistics for all studies in a
+    directory to the columnar store.
+
+    arguments:
+        path_directory_source (str): path to directory of source files in
+            standard format ("*.txt.gz")
+        path_directory_product (str): path to directory of stores
+        size_chunk (int): count of rows in each chunk
+        cores (int): count of processing cores for parallel processes
+        report (bool): whether to print reports
+
+    raises:
+        ImportError: if package "pyarrow" is not available
+
+    returns:
+        (object): Pandas data-frame table of counts of rows
+
+    """
+
+    check_pyarrow()
+    # Initialize directories.
+    path_directory_batch = os.path.join(path_directory_product, "batch",)
+    putly.remove_directory(path=path_directory_batch) # caution
+    putly.create_directories(path=path_directory_batch)
+    # Collect parameters specific to each instance.
+    names_source = sorted(list(filter(
+        lambda name: name.endswith(".txt.gz"),
+        os.listdir(path_directory_source),
+    )))
+    instances = list()
+    for name_file in names_source:
+        instance = dict()
+        instance["study"] = pbstd.define_study_identifier_from_file_name(
+            path_file=name_file,
+            suffix=".txt.gz",
+        )
+        instance["path_file_source"] = os.path.join(
+            path_directory_source, name_file,
+        )
+        instance["path_directory_store"] = os.path.join(
+            path_directory_product, str(instance["study"] + ".parquet"),
+        )
+        instances.append(instance)
+        pass
+    # Collect parameters common across all instances.
+    parameters = dict()
+    parameters["size_chunk"] = size_chunk
+    parameters["path_directory_batch"] = path_directory_batch
+    parameters["report"] = report
+    # Execute procedure iteratively with parallelization across instances.
+    if (len(instances) > 0):
+        prall.drive_procedure_parallel(
+            function_control=control_write_study_columnar_store,
+            instances=instances,
+            parameters=parameters,
+            cores=cores,
+            report=report,
+        )
+    # Collect records from all studies.
+    tables = list()
+    for instance in instances:
+        path_file_record = os.path.join(
+            path_directory_batch, str(instance["study"] + ".pickle"),
+        )
+        if os.path.exists(path_file_record):
+            tables.append(pandas.read_pickle(path_file_record))
+        pass
+    if (len(tables) > 0):
+        table = pandas.concat(
+            tables,
+            axis="index",
+            join="outer",
+            ignore_index=True,
+            copy=True,
+        )
+    else:
+        table = pandas.DataFrame(
+            columns=["study", "rows", "key_invalid", "chromosomes",]
+        )
+    # Write product information to file.
+    putly.write_tables_to_file(
+        pail_write={"table_columnar_store_counts": table,},
+        path_directory=path_directory_product,
+        reset_index_rows=False,
+        write_index_rows=False,
+        write_index_columns=True,
+        type="text",
+        delimiter="\t",
+        suffix=".tsv",
+    )
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=4)
+        print("count of studies: " + str(table.shape[0]))
+        print("count of rows: " + str(int(table["rows"].sum())))
+        putly.print_terminal_partition(level=4)
+        pass
+    # Return information.
+    return table
+
+
+###############################################################################
+# Procedure
+
+
+def execute_procedure(
+    path_directory_dock=None,
+):
+    """
+    Function to execute module's main behavior.
+
+    arguments:
+        path_directory_dock (str): path to dock directory for source and product
+            directories and files
+
+    raises:
+
+    returns:
+
+    """
+
+    ##########
+    # Parameters.
+    identifier_preparation = "gwas_preparation_2023-12-30"
+    size_chunk = 1000000
+    cores = 8
+    report = True
+
+    ##########
+    # Paths.
+    path_directory_source = os.path.join(
+        path_directory_dock, identifier_preparation,
+        "8_gwas_effective_observations",
+    )
+    path_directory_product = os.path.join(
+        path_directory_dock, identifier_preparation,
+        "10_gwas_columnar_store",
+    )
+    putly.remove_directory(path=path_directory_product) # caution
+    putly.create_directories(path=path_directory_product)
+
+    ##########
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=3)
+        print("module: psychiatry_biomarkers.gwas_preparation.columnar.py")
+        print("function: execute_procedure()")
+        putly.print_terminal_partition(level=5)
+        print("preparation: " + str(identifier_preparation))
+        putly.print_terminal_partition(level=5)
+        pass
+
+    ##########
+    # Write columnar store for all studies.
+    control_write_studies_columnar_store(
+        path_directory_source=path_directory_source,
+        path_directory_product=path_directory_product,
+        size_chunk=size_chunk,
+        cores=cores,
+        report=report,
+    )
+    pass
+
+
+###############################################################################
+# End
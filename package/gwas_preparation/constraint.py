@@ -0,0 +1,479 @@
+"""
+Supply functionality for checks, filters, and constraints on the values of GWAS
+summary statistics in the standard format.
+
+This module 'constraint' is part of the 'gwas_preparation' package within the
+'psychiatry_biomarkers' package.
+
+Author:
+
+    T. Cameron Waller, Ph.D.
+    tcameronwaller@gmail.com
+    Rochester, Minnesota 55902
+    United States of America
+
+License:
+
+    This file is part of the project package directory 'psychiatry_biomarkers'
+    (https://github.com/tcameronwaller/psychiatry_biomarkers/).
+
+    Project 'psychiatry_biomarkers' supports data analysis with team in
+    psychiatry and pharmacogenomics.
+    Copyright (C) 2024 Thomas Cameron Waller
+
+    The code within project 'psychiatry_biomarkers' is free software: you can
+    redistribute it and/or modify it under the terms of the GNU General Public
+    License as published by the Free Software Foundation, either version 3 of
+    the GNU General Public License, or (at your option) any later version.
+
+    The code within project 'psychiatry_biomarkers' is distributed in the hope
+    that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+    warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with project 'psychiatry_biomarkers'. If not, see
+    <http://www.gnu.org/licenses/>.
+"""
+
+###############################################################################
+# Notes
+
+# The driver scripts "4_check_filter_constrain_gwas_values.sh" and
+# "7_check_filter_constrain_gwas_values.sh" run the script
+# "filter_constrain_gwas_summary_values.sh" over each study, which is a full
+# pass through the text of each file. This module applies all filters and
+# constraints within a single pass through each file in chunks of rows, with
+# parallelization across studies.
+
+# Filters remove records (rows) that would raise errors in LDSC, LDpred2, or
+# SBayesR.
+# 1. missing identifier of variant or either allele
+# 2. missing, non-finite, or negative probability (p-value)
+# 3. missing or non-finite coefficient (beta)
+# 4. missing, non-finite, or non-positive standard error
+# 5. allele frequency outside the range 0 to 1, while missing frequency is
+#    acceptable
+# 6. missing, non-finite, or non-positive count of observations
+
+# Constraints replace values that are out of range but informative.
+# 1. probabilities less than 1E-308, including zero from underflow, become
+#    1E-308 to fit within double-float precision
+# 2. probabilities greater than 1.0 become 1.0
+
+# As in the scripts from 29 November 2023, all filters and constraints apply
+# independently to each record, so counts for each rule include records that
+# also fail other rules. The counts of constraints only include records that
+# pass all filters.
+
+# Records without chromosome or position remain, since LDSC does not need
+# these coordinates.
+
+###############################################################################
+# Installation and importation
+
+# Standard
+
+import os
+
+# Relevant
+
+import numpy
+import pandas
+pandas.options.mode.chained_assignment = None # default = "warn"
+
+# Custom
+import partner.utility as putly
+import partner.parallelization as prall
+import psychiatry_biomarkers.gwas_preparation.standard_format as pbstd
+import psychiatry_biomarkers.profiling as pbprf
+
+###############################################################################
+# Functionality
+
+
+##########
+# 1. Filter and constrain values.
+
+
+def define_constraint_rule_counts():
+    """
+    Defines counts of rows for each rule of filters and constraints.
+
+    arguments:
+
+    raises:
+
+    returns:
+        (dict<int>): counts of rows
+
+    """
+
+    counts = dict()
+    counts["rows_source"] = 0
+    counts["rows_product"] = 0
+    counts["drop_identifier_allele_missing"] = 0
+    counts["drop_probability_invalid"] = 0
+    counts["drop_beta_invalid"] = 0
+    counts["drop_error_invalid"] = 0
+    counts["drop_frequency_invalid"] = 0
+    counts["drop_count_invalid"] = 0
+    counts["clamp_probability_low"] = 0
+    counts["clamp_probability_high"] = 0
+    return counts
+
+
+def filter_constrain_gwas_chunk_values(
+    table=None,
+    counts=None,
+):
+    """
+    Filters and constrains values within a chunk of GWAS summary statistics in
+    the standard format.
+
+    arguments:
+        table (object): Pandas data-frame table of GWAS summary statistics in
+            standard format
+        counts (dict<int>): counts of rows for each rule, to increment
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table of GWAS summary statistics in
+            standard format
+
+    """
+
+    # Organize values.
+    probability = table["P"].to_numpy(dtype="float64", na_value=numpy.nan)
+    beta = table["BETA"].to_numpy(dtype="float64", na_value=numpy.nan)
+    error = table["SE"].to_numpy(dtype="float64", na_value=numpy.nan)
+    frequency = table["A1AF"].to_numpy(dtype="float64", na_value=numpy.nan)
+    count = table["N"].to_numpy(dtype="float64", na_value=numpy.nan)
+    # Determine records that fail each filter.
+    with numpy.errstate(invalid="ignore"):
+        drops = dict()
+        drops["drop_identifier_allele_missing"] = (
+            table["SNP"].isna() | table["A1"].isna() | table["A2"].isna() |
+            (table["SNP"].str.strip().str.len() == 0) |
+            (table["A1"].str.strip().str.len() == 0) |
+            (table["A2"].str.strip().str.len() == 0)
+        ).to_numpy(dtype="bool", na_value=True)
+        drops["drop_probability_invalid"] = ~(
+            numpy.isfinite(probability) & (probability >= 0)
+        )
+        drops["drop_beta_invalid"] = ~numpy.isfinite(beta)
+        drops["drop_error_invalid"] = ~(numpy.isfinite(error) & (error > 0))
+        drops["drop_frequency_invalid"] = (
+            ~numpy.isnan(frequency) &
+            ~((frequency >= 0) & (frequency <= 1))
+        )
+        drops["drop_count_invalid"] = ~(numpy.isfinite(count) & (count > 0))
+        pass
+    indicator_keep = numpy.ones(table.shape[0], dtype="bool")
+    for rule in drops.keys():
+        counts[rule] += int(drops[rule].sum())
+        indicator_keep &= ~drops[rule]
+        pass
+    # Constrain probabilities.
+    indicator_low = indicator_keep & (probability < 1E-308)
+    indicator_high = indicator_keep & (probability > 1.0)
+    counts["clamp_probability_low"] += int(indicator_low.sum())
+    counts["clamp_probability_high"] += int(indicator_high.sum())
+    table["P"] = numpy.clip(probability, 1E-308, 1.0)
+    # Filter records.
+    table = table.loc[indicator_keep, :]
+    counts["rows_source"] += indicator_keep.shape[0]
+    counts["rows_product"] += int(indicator_keep.sum())
+    # Return information.
+    return table
+
+
+def filter_constrain_gwas_values(
+    path_file_source=None,
+    path_file_product=None,
+    size_chunk=None,
+):
+    """
+    Filters and constrains values of GWAS summary statistics in the standard
+    format within a single pass through the file in chunks of rows.
+
+    arguments:
+        path_file_source (str): path to source file in standard format
+        path_file_product (str): path to product file in standard format
+        size_chunk (int): count of rows in each chunk
+
+    raises:
+
+    returns:
+        (dict<int>): counts of rows for each rule
+
+    """
+
+    counts = define_constraint_rule_counts()
+    reader = pbstd.read_gwas_standard_format_chunks(
+        path_file=path_file_source,
+        columns=None,
+        size_chunk=size_chunk,
+    )
+    first = True
+    for table in reader:
+        table = filter_constrain_gwas_chunk_values(
+            table=table,
+            counts=counts,
+        )
+        # Write product information to file.
+        pbstd.write_gwas_standard_format_chunk(
+            table=table,
+            path_file=path_file_product,
+            header=first,
+            mode=("w" if first else "a"),
+        )
+        first = False
+        pass
+    # Return information.
+    return counts
+
+
+@pbprf.profile_procedure(category="study", keys_arguments=["study",])
+def control_filter_constrain_study_values(
+    instance=None,
+    parameters=None,
+):
+    """
+    Control procedure to filter and constrain values of GWAS summary
+    statistics for a single study and to write the product and counts of rows
+    to file.
+
+    arguments:
+        instance (dict): parameters specific to current instance
+            study (str): identifier of study
+            path_file_source (str): path to source file
+            path_file_product (str): path to product file
+        parameters (dict): parameters common to all instances
+            size_chunk (int): count of rows in each chunk
+            path_directory_batch (str): path to directory for records of
+                individual studies
+            report (bool): whether to print reports
+
+    raises:
+
+    returns:
+
+    """
+
+    counts = filter_constrain_gwas_values(
+        path_file_source=instance["path_file_source"],
+        path_file_product=instance["path_file_product"],
+        size_chunk=parameters["size_chunk"],
+    )
+    # Collect information.
+    record = dict()
+    record["study"] = instance["study"]
+    record.update(counts)
+    # Write product information to file.
+    pandas.DataFrame(data=[record,]).to_pickle(
+        os.path.join(
+            parameters["path_directory_batch"],
+            str(instance["study"] + ".pickle"),
+        )
+    )
+    # Report.
+    if parameters["report"]:
+        print(str(
+            "study: " + instance["study"] + "; source: " +
+            str(counts["rows_source"]) + "; product: " +
+            str(counts["rows_product"])
+        ))
+        pass
+    pass
+
+
+##########
+# 2. Drive filters and constraints across studies.
+
+
+def control_filter_constrain_studies_values(
+    path_directory_source=None,
+    path_directory_product=None,
+    size_chunk=None,
+    cores=None,
+    report=None,
+):
+    """
+    Control procedure to filter and constrain values of GWAS summary
+    statistics for all studies in a directory.
+
+    arguments:
+        path_directory_source (str): path to directory of source files in
+            standard format ("*.txt.gz")
+        path_directory_product (str): path to directory of product files
+        size_chunk (int): count of rows in each chunk
+        cores (int): count of processing cores for parallel processes
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table of counts of rows for each rule
+
+    """
+
+    # Initialize directories.
+    path_directory_batch = os.path.join(path_directory_product, "batch",)
+    putly.remove_directory(path=path_directory_batch) # caution
+    putly.create_directories(path=path_directory_batch)
+    # Collect parameters specific to each instance.
+    names_source = sorted(list(filter(
+        lambda name: name.endswith(".txt.gz"),
+        os.listdir(path_directory_source),
+    )))
+    instances = list()
+    for name_file in names_source:
+        instance = dict()
+        instance["study"] = pbstd.define_study_identifier_from_file_name(
+            path_file=name_file,
+            suffix=".txt.gz",
+        )
+        instance["path_file_source"] = os.path.join(
+            path_directory_source, name_file,
+        )
+        instance["path_file_product"] = os.path.join(
+            path_directory_product, name_file,
+        )
+        instances.append(instance)
+        pass
+    # Collect parameters common across all instances.
+    parameters = dict()
+    parameters["size_chunk"] = size_chunk
+    parameters["path_directory_batch"] = path_directory_batch
+    parameters["report"] = report
+    # Execute procedure iteratively with parallelization across instances.
+    if (len(instances) > 0):
+        prall.drive_procedure_parallel(
+            function_control=control_filter_constrain_study_values,
+            instances=instances,
+            parameters=parameters,
+            cores=cores,
+            report=report,
+        )
+    # Collect records from all studies.
+    tables = list()
+    for instance in instances:
+        path_file_record = os.path.join(
+            path_directory_batch, str(instance["study"] + ".pickle"),
+        )
+        if os.path.exists(path_file_record):
+            tables.append(pandas.read_pickle(path_file_record))
+        pass
+    if (len(tables) > 0):
+        table = pandas.concat(
+            tables,
+            axis="index",
+            join="outer",
+            ignore_index=True,
+            copy=True,
+        )
+    else:
+        table = pandas.DataFrame(
+            columns=(["study",] + list(define_constraint_rule_counts().keys()))
+        )
+    # Calculate proportion of rows that remain.
+    table["proportion_product"] = numpy.where(
+        (table["rows_source"].astype("float64") > 0),
+        (
+            table["rows_product"].astype("float64") /
+            table["rows_source"].astype("float64").replace(0, numpy.nan)
+        ),
+        numpy.nan,
+    )
+    # Write product information to file.
+    putly.write_tables_to_file(
+        pail_write={"table_filter_constrain_counts": table,},
+        path_directory=path_directory_product,
+        reset_index_rows=False,
+        write_index_rows=False,
+        write_index_columns=True,
+        type="text",
+        delimiter="\t",
+        suffix=".tsv",
+    )
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=4)
+        print("count of studies: " + str(table.shape[0]))
+        print(
+            "count of studies that lost 0.1% or more of rows: " +
+            str(int((table["proportion_product"] < 0.999).sum()))
+        )
+        putly.print_terminal_partition(level=4)
+        pass
+    # Return information.
+    return table
+
+
+###############################################################################
+# Procedure
+
+
+def execute_procedure(
+    path_directory_dock=None,
+):
+    """
+    Function to execute module's main behavior.
+
+    arguments:
+        path_directory_dock (str): path to dock directory for source and product
+            directories and files
+
+    raises:
+
+    returns:
+
+    """
+
+    ##########
+    # Parameters.
+    identifier_preparation = "gwas_preparation_2023-12-30"
+    size_chunk = 1000000
+    cores = 8
+    report = True
+
+    ##########
+    # Paths.
+    path_directory_source = os.path.join(
+        path_directory_dock, identifier_preparation,
+        "3_gwas_fill_nonsense_allele_frequency",
+    )
+    path_directory_product = os.path.join(
+        path_directory_dock, identifier_preparation,
+        "4_filter_constrain_gwas_values",
+    )
+    putly.remove_directory(path=path_directory_product) # caution
+    putly.create_directories(path=path_directory_product)
+
+    ##########
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=3)
+        print("module: psychiatry_biomarkers.gwas_preparation.constraint.py")
+        print("function: execute_procedure()")
+        putly.print_terminal_partition(level=5)
+        print("preparation: " + str(identifier_preparation))
+        putly.print_terminal_partition(level=5)
+        pass
+
+    ##########
+    # Filter and constrain values for all studies.
+    control_filter_constrain_studies_values(
+        path_directory_source=path_directory_source,
+        path_directory_product=path_directory_product,
+        size_chunk=size_chunk,
+        cores=cores,
+        report=report,
+    )
+    pass
+
+
+###############################################################################
+# End
@@ -0,0 +1,892 @@
+"""
+Supply functionality for an index of reference SNP cluster identifiers (rsIDs)
+from dbSNP and for filling these identifiers in GWAS summary statistics.
+
+This module 'dbsnp' is part of the 'gwas_preparation' package within the
+'psychiatry_biomarkers' package.
+
+Author:
+
+    T. Cameron Waller, Ph.D.
+    tcameronwaller@gmail.com
+    Rochester, Minnesota 55902
+    United States of America
+
+License:
+
+    This file is part of the project package directory 'psychiatry_biomarkers'
+    (https://github.com/tcameronwaller/psychiatry_biomarkers/).
+
+    Project 'psychiatry_biomarkers' supports data analysis with team in
+    psychiatry and pharmacogenomics.
+    Copyright (C) 2024 Thomas Cameron Waller
+
+    The code within project 'psychiatry_biomarkers' is free software: you can
+    redistribute it and/or modify it under the terms of the GNU General Public
+    License as published by the Free Software Foundation, either version 3 of
+    the GNU General Public License, or (at your option) any later version.
+
+    The code within project 'psychiatry_biomarkers' is distributed in the hope
+    that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+    warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with project 'psychiatry_biomarkers'. If not, see
+    <http://www.gnu.org/licenses/>.
+"""
+
+###############################################################################
+# Notes
+
+# The driver script "5_1_fill_dbsnp_rs_identifiers.sh" submits a job to the
+# cluster for each of a list of studies to run "fill_dbsnp_rsid.sh" against
+# dbSNP. This module instead builds once an index from the VCF file of dbSNP
+# for assembly GRCh37 and then fills identifiers for many studies in parallel
+# processes on a single server.
+
+# The index is a pair of binary arrays in NumPy's format ("*.npy"), "keys.npy"
+# of packed integer keys for chromosome, position, and unordered pair of
+# alleles (see module "variant_key") in sort order, and "identifiers.npy" of
+# the integer part of the corresponding rsIDs. The table
+# "table_chromosomes.tsv" records the offsets of each chromosome within the
+# arrays and signifies a complete build. Lookups map the arrays into memory
+# and find keys by binary search.
+
+# The build splits the VCF file by chromosome in a single pass, and then it
+# sorts the variants of each chromosome in parallel processes. For keys with
+# more than one rsID, the index keeps the smallest, which is usually the
+# identifier into which dbSNP merged the others.
+
+# The fill looks up the key of each variant with its alleles as given and then
+# with the complements of its alleles. Without strict mode, the fill keeps
+# identifiers that already are rsIDs and replaces other or missing
+# identifiers with matches from dbSNP. In strict mode, the fill replaces all
+# identifiers with matches from dbSNP and removes variants without a match.
+
+###############################################################################
+# Installation and importation
+
+# Standard
+
+import os
+import gzip
+import shutil
+
+# Relevant
+
+import numpy
+import pandas
+pandas.options.mode.chained_assignment = None # default = "warn"
+
+# Custom
+import partner.utility as putly
+import partner.parallelization as prall
+import psychiatry_biomarkers.gwas_preparation.standard_format as pbstd
+import psychiatry_biomarkers.gwas_preparation.variant_key as pbkey
+import psychiatry_biomarkers.parameter_table as pbpar
+import psychiatry_biomarkers.profiling as pbprf
+
+###############################################################################
+# Functionality
+
+
+##########
+# 1. Build index from dbSNP.
+
+
+def count_vcf_header_lines(
+    path_file_vcf=None,
+):
+    """
+    Counts lines of meta information and header at the beginning of a file in
+    Variant Call Format (VCF).
+
+    arguments:
+        path_file_vcf (str): path to file in VCF format, optionally with
+            compression by GZip or BGZip
+
+    raises:
+
+    returns:
+        (int): count of lines before the first record
+
+    """
+
+    if path_file_vcf.endswith(".gz"):
+        file_vcf = gzip.open(path_file_vcf, "rt")
+    else:
+        file_vcf = open(path_file_vcf, "r")
+    count = 0
+    with file_vcf:
+        for line in file_vcf:
+            if not line.startswith("#"):
+                break
+            count += 1
+            pass
+        pass
+    return count
+
+
+def organize_dbsnp_chunk_keys(
+    table=None,
+):
+    """
+    Organizes packed keys and integer identifiers for a chunk of records from
+    the VCF file of dbSNP, with a separate entry for each alternate allele.
+
+    arguments:
+        table (object): Pandas data-frame table with columns "CHROM", "POS",
+            "ID", "REF", and "ALT"
+
+    raises:
+
+    returns:
+        (object): NumPy array of two rows, keys and identifiers
+
+    """
+
+    # Separate alternate alleles.
+    table["ALT"] = table["ALT"].astype("string").str.split(",")
+    table = table.explode("ALT", ignore_index=True)
+    # Extract integer identifiers.
+    identifiers = pandas.to_numeric(
+        table["ID"].astype("string").str.extract(
+            r"^rs(\d+)$", expand=False
+        ),
+        errors="coerce",
+    ).fillna(-1).to_numpy(dtype="int64")
+    # Pack keys.
+    keys = pbkey.pack_variant_keys(
+        chromosomes=table["CHROM"],
+        positions=table["POS"],
+        alleles_first=table["REF"],
+        alleles_second=table["ALT"],
+    )
+    indicator_valid = ((keys >= 0) & (identifiers >= 0))
+    return numpy.vstack(
+        [keys[indicator_valid], identifiers[indicator_valid],]
+    )
+
+
+def split_dbsnp_by_chromosome(
+    path_file_dbsnp=None,
+    path_directory_batch=None,
+    size_chunk=None,
+    report=None,
+):
+    """
+    Reads the VCF file of dbSNP in chunks and writes keys and identifiers to
+    separate parts for each chromosome.
+
+    arguments:
+        path_file_dbsnp (str): path to VCF file of dbSNP
+        path_directory_batch (str): path to directory for temporary files
+        size_chunk (int): count of rows in each chunk
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (dict<list>): paths to files of parts for each code of chromosome
+
+    """
+
+    count_header = count_vcf_header_lines(path_file_vcf=path_file_dbsnp)
+    reader = pandas.read_csv(
+        path_file_dbsnp,
+        sep="\t",
+        header=None,
+        skiprows=count_header,
+        usecols=[0, 1, 2, 3, 4,],
+        names=["CHROM", "POS", "ID", "REF", "ALT",],
+        dtype={
+            "CHROM": "string", "POS": "int64", "ID": "string",
+            "REF": "string", "ALT": "string",
+        },
+        compression="infer",
+        chunksize=size_chunk,
+    )
+    parts = dict()
+    count_records = 0
+    for index_chunk, table_chunk in enumerate(reader):
+        count_records += table_chunk.shape[0]
+        pairs = organize_dbsnp_chunk_keys(table=table_chunk)
+        codes = (pairs[0] >> 58)
+        for code in numpy.unique(codes):
+            path_file = os.path.join(
+                path_directory_batch,
+                str(
+                    "chromosome_" + str(int(code)) + "_part_" +
+                    str(index_chunk) + ".npy"
+                ),
+            )
+            numpy.save(path_file, pairs[:, (codes == code)], allow_pickle=False)
+            parts.setdefault(int(code), list()).append(path_file)
+            pass
+        if report:
+            print("records of dbSNP: " + str(count_records))
+        pass
+    return parts
+
+
+def control_sort_dbsnp_chromosome(
+    instance=None,
+    parameters=None,
+):
+    """
+    Control procedure to sort keys and identifiers for a single chromosome and
+    to keep a single identifier for each key.
+
+    arguments:
+        instance (dict): parameters specific to current instance
+            code (int): code of chromosome
+            paths_part (list<str>): paths to files of parts
+        parameters (dict): parameters common to all instances
+            path_directory_batch (str): path to directory for temporary files
+
+    raises:
+
+    returns:
+
+    """
+
+    # Read parts.
+    pairs = numpy.hstack(list(map(
+        lambda path_file: numpy.load(path_file, allow_pickle=False),
+        instance["paths_part"],
+    )))
+    # Sort by key and then by identifier.
+    order = numpy.lexsort((pairs[1], pairs[0],))
+    keys = pairs[0][order]
+    identifiers = pairs[1][order]
+    # Keep the first, smallest identifier for each key.
+    indicator_first = numpy.ones(keys.shape[0], dtype="bool")
+    indicator_first[1:] = (keys[1:] != keys[:-1])
+    indicator_same = numpy.zeros(keys.shape[0], dtype="bool")
+    indicator_same[1:] = (
+        (keys[1:] == keys[:-1]) & (identifiers[1:] != identifiers[:-1])
+    )
+    # Write product information to file.
+    prefix = str("chromosome_" + str(instance["code"]))
+    numpy.save(
+        os.path.join(
+            parameters["path_directory_batch"], str(prefix + "_keys.npy"),
+        ),
+        keys[indicator_first],
+        allow_pickle=False,
+    )
+    numpy.save(
+        os.path.join(
+            parameters["path_directory_batch"],
+            str(prefix + "_identifiers.npy"),
+        ),
+        identifiers[indicator_first],
+        allow_pickle=False,
+    )
+    pandas.to_pickle(
+        {
+            "code": instance["code"],
+            "count_keys": int(indicator_first.sum()),
+            "count_ambiguous": int(
+                numpy.unique(keys[indicator_same]).shape[0]
+            ),
+        },
+        os.path.join(
+            parameters["path_directory_batch"], str(prefix + ".pickle"),
+        ),
+    )
+    pass
+
+
+def build_dbsnp_index(
+    path_file_dbsnp=None,
+    path_directory_index=None,
+    size_chunk=None,
+    cores=None,
+    report=None,
+):
+    """
+    Builds a binary index of rsIDs from dbSNP by packed integer keys.
+
+    arguments:
+        path_file_dbsnp (str): path to VCF file of dbSNP
+        path_directory_index (str): path to directory for files of index
+        size_chunk (int): count of rows in each chunk
+        cores (int): count of processing cores for parallel processes
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+
+    """
+
+    # Initialize directories.
+    putly.create_directories(path=path_directory_index)
+    path_directory_batch = os.path.join(path_directory_index, "batch",)
+    putly.remove_directory(path=path_directory_batch) # caution
+    putly.create_directories(path=path_directory_batch)
+    # Split by chromosome.
+    parts = split_dbsnp_by_chromosome(
+        path_file_dbsnp=path_file_dbsnp,
+        path_directory_batch=path_directory_batch,
+        size_chunk=size_chunk,
+        report=report,
+    )
+    codes = sorted(parts.keys())
+    # Sort chromosomes with parallelization.
+    instances = list(map(
+        lambda code: {"code": code, "paths_part": parts[code],}, codes
+    ))
+    prall.drive_procedure_parallel(
+        function_control=control_sort_dbsnp_chromosome,
+        instances=instances,
+        parameters={"path_directory_batch": path_directory_batch,},
+        cores=cores,
+        report=report,
+    )
+    # Collect records of chromosomes.
+    records = list(map(
+        lambda code: pandas.read_pickle(os.path.join(
+            path_directory_batch, str("chromosome_" + str(code) + ".pickle"),
+        )),
+        codes,
+    ))
+    table_chromosomes = pandas.DataFrame(data=records)
+    table_chromosomes["offset_end"] = table_chromosomes["count_keys"].cumsum()
+    table_chromosomes["offset_start"] = (
+        table_chromosomes["offset_end"] - table_chromosomes["count_keys"]
+    )
+    count_total = int(table_chromosomes["count_keys"].sum())
+    # Write arrays in sequence of chromosomes, one chromosome at a time.
+    for name in ["keys", "identifiers",]:
+        array = numpy.lib.format.open_memmap(
+            os.path.join(path_directory_index, str(name + ".npy")),
+            mode="w+",
+            dtype="int64",
+            shape=(count_total,),
+        )
+        for index, row in table_chromosomes.iterrows():
+            array[row["offset_start"]:row["offset_end"]] = numpy.load(
+                os.path.join(
+                    path_directory_batch,
+                    str(
+                        "chromosome_" + str(int(row["code"])) + "_" + name +
+                        ".npy"
+                    ),
+                ),
+                allow_pickle=False,
+            )
+            pass
+        array.flush()
+        del array
+        pass
+    # Write table of chromosomes last, as it signifies a complete build.
+    putly.write_tables_to_file(
+        pail_write={"table_chromosomes": table_chromosomes,},
+        path_directory=path_directory_index,
+        reset_index_rows=False,
+        write_index_rows=False,
+        write_index_columns=True,
+        type="text",
+        delimiter="\t",
+        suffix=".tsv",
+    )
+    putly.remove_directory(path=path_directory_batch)
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=3)
+        print("module: psychiatry_biomarkers.gwas_preparation.dbsnp.py")
+        print("function: build_dbsnp_index()")
+        putly.print_terminal_partition(level=5)
+        print("count of keys in index: " + str(count_total))
+        print(
+            "count of keys with more than one rsID: " +
+            str(int(table_chromosomes["count_ambiguous"].sum()))
+        )
+        putly.print_terminal_partition(level=5)
+        pass
+    pass
+
+
+##########
+# 2. Look up identifiers.
+
+
+def load_dbsnp_index(
+    path_directory_index=None,
+):
+    """
+    Loads the binary index of rsIDs from dbSNP with memory mapping.
+
+    arguments:
+        path_directory_index (str): path to directory of files of index
+
+    raises:
+
+    returns:
+        (dict<object>): collection of information
+
+    """
+
+    pail = dict()
+    for name in ["keys", "identifiers",]:
+        pail[name] = numpy.load(
+            os.path.join(path_directory_index, str(name + ".npy")),
+            mmap_mode="r",
+            allow_pickle=False,
+        )
+        pass
+    pail["table_chromosomes"] = pandas.read_csv(
+        os.path.join(path_directory_index, "table_chromosomes.tsv"),
+        sep="\t",
+        header=0,
+    )
+    return pail
+
+
+def lookup_dbsnp_identifiers(
+    index=None,
+    keys=None,
+):
+    """
+    Looks up integer parts of rsIDs for packed keys by binary search.
+
+    arguments:
+        index (dict<object>): index from "load_dbsnp_index"
+        keys (object): NumPy array of packed keys
+
+    raises:
+
+    returns:
+        (object): NumPy array of integer parts of rsIDs, or -1 if no match
+
+    """
+
+    keys_index = index["keys"]
+    if (keys_index.shape[0] == 0):
+        return numpy.full(keys.shape[0], -1, dtype="int64")
+    positions = numpy.searchsorted(keys_index, keys, side="left")
+    positions_clip = numpy.minimum(positions, (keys_index.shape[0] - 1))
+    indicator_match = (
+        (keys >= 0) &
+        (positions < keys_index.shape[0]) &
+        (keys_index[positions_clip] == keys)
+    )
+    return numpy.where(
+        indicator_match, index["identifiers"][positions_clip], -1,
+    ).astype("int64")
+
+
+def fill_gwas_chunk_dbsnp_rsid(
+    table=None,
+    index=None,
+    strict=None,
+    counts=None,
+):
+    """
+    Fills rsIDs from dbSNP in a chunk of GWAS summary statistics in the
+    standard format.
+
+    arguments:
+        table (object): Pandas data-frame table of GWAS summary statistics in
+            standard format
+        index (dict<object>): index from "load_dbsnp_index"
+        strict (bool): whether to replace all identifiers and to remove
+            variants without a match
+        counts (dict<int>): counts of variants to update
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table
+
+    """
+
+    counts["source"] += table.shape[0]
+    # Look up alleles as given.
+    identifiers = lookup_dbsnp_identifiers(
+        index=index,
+        keys=pbkey.pack_variant_keys(
+            chromosomes=table["CHR"],
+            positions=table["BP"],
+            alleles_first=table["A1"],
+            alleles_second=table["A2"],
+        ),
+    )
+    indicator_direct = (identifiers >= 0)
+    # Look up complements of alleles.
+    identifiers_complement = lookup_dbsnp_identifiers(
+        index=index,
+        keys=pbkey.pack_variant_keys(
+            chromosomes=table["CHR"],
+            positions=table["BP"],
+            alleles_first=pbstd.complement_alleles(
+                series=table["A1"].astype("string")
+            ),
+            alleles_second=pbstd.complement_alleles(
+                series=table["A2"].astype("string")
+            ),
+        ),
+    )
+    identifiers = numpy.where(
+        indicator_direct, identifiers, identifiers_complement,
+    )
+    indicator_match = (identifiers >= 0)
+    # Fill identifiers.
+    identifiers_text = pandas.Series(
+        identifiers, index=table.index,
+    ).astype("string")
+    identifiers_text = ("rs" + identifiers_text).where(indicator_match)
+    indicator_rsid = table["SNP"].astype("string").str.match(
+        r"^rs\d+$"
+    ).fillna(False).to_numpy(dtype="bool")
+    if strict:
+        indicator_fill = indicator_match
+    else:
+        indicator_fill = (indicator_match & ~indicator_rsid)
+    table["SNP"] = table["SNP"].astype("string").where(
+        ~indicator_fill, identifiers_text,
+    )
+    # Update counts.
+    counts["match"] += int(indicator_match.sum())
+    counts["match_complement"] += int(
+        (indicator_match & ~indicator_direct).sum()
+    )
+    counts["fill"] += int(indicator_fill.sum())
+    counts["change"] += int(
+        (indicator_fill & indicator_rsid).sum()
+    )
+    if strict:
+        counts["remove"] += int((~indicator_match).sum())
+        table = table.loc[indicator_match, :]
+    # Return information.
+    return table
+
+
+@pbprf.profile_procedure(category="study", keys_arguments=["study",])
+def control_fill_study_dbsnp_rsid(
+    instance=None,
+    parameters=None,
+):
+    """
+    Control procedure to fill rsIDs from dbSNP in GWAS summary statistics for
+    a single study in chunks of rows and to write the product and counts of
+    variants to file.
+
+    arguments:
+        instance (dict): parameters specific to current instance
+            study (str): identifier of study
+            path_file_source (str): path to source file
+            path_file_product (str): path to product file
+        parameters (dict): parameters common to all instances
+            path_directory_index (str): path to directory of files of index
+            strict (bool): whether to replace all identifiers and to remove
+                variants without a match
+            size_chunk (int): count of rows in each chunk
+            path_directory_batch (str): path to directory for records of
+                individual studies
+            report (bool): whether to print reports
+
+    raises:
+
+    returns:
+
+    """
+
+    # Map index into memory, which does not copy the arrays.
+    index = load_dbsnp_index(
+        path_directory_index=parameters["path_directory_index"],
+    )
+    # Fill, and write in chunks.
+    counts = {
+        "source": 0, "match": 0, "match_complement": 0, "fill": 0,
+        "change": 0, "remove": 0,
+    }
+    reader = pbstd.read_gwas_standard_format_chunks(
+        path_file=instance["path_file_source"],
+        columns=None,
+        size_chunk=parameters["size_chunk"],
+    )
+    first = True
+    for table_chunk in reader:
+        table_product = fill_gwas_chunk_dbsnp_rsid(
+            table=table_chunk,
+            index=index,
+            strict=parameters["strict"],
+            counts=counts,
+        )
+        pbstd.write_gwas_standard_format_chunk(
+            table=table_product,
+            path_file=instance["path_file_product"],
+            header=first,
+            mode=("w" if first else "a"),
+        )
+        first = False
+        pass
+    # Collect information.
+    record = dict()
+    record["study"] = instance["study"]
+    record.update(counts)
+    # Write product information to file.
+    pandas.DataFrame(data=[record,]).to_pickle(
+        os.path.join(
+            parameters["path_directory_batch"],
+            str(instance["study"] + ".pickle"),
+        )
+    )
+    # Report.
+    if parameters["report"]:
+        print(str(
+            "study: " + instance["study"] + "; variants: " +
+            str(counts["source"]) + "; match: " + str(counts["match"])
+        ))
+        pass
+    pass
+
+
+##########
+# 3. Drive fill across studies.
+
+
+def control_fill_studies_dbsnp_rsid(
+    path_file_table_parameter=None,
+    suffix_study=None,
+    path_file_dbsnp=None,
+    path_directory_index=None,
+    path_directory_source=None,
+    path_directory_product=None,
+    strict=None,
+    size_chunk=None,
+    cores=None,
+    report=None,
+):
+    """
+    Control procedure to fill rsIDs from dbSNP for all studies that the
+    parameter table designates, building the index first if it does not yet
+    exist.
+
+    The parameter table designates studies for fill by the suffix of their
+    identifiers, such as "37872160_williams_2023_dbsnp_rsid", and the source
+    file of each has the identifier without the suffix. The procedure also
+    copies all source files without change, as in
+    "5_3_merge_dbsnp_rsid_gwas_from_storage.sh".
+
+    arguments:
+        path_file_table_parameter (str): path to file for parameter table of
+            studies
+        suffix_study (str): suffix of identifiers of studies for fill
+        path_file_dbsnp (str): path to VCF file of dbSNP
+        path_directory_index (str): path to directory of files of index
+        path_directory_source (str): path to directory of source files in
+            standard format ("*.txt.gz")
+        path_directory_product (str): path to directory of product files
+        strict (bool): whether to replace all identifiers and to remove
+            variants without a match
+        size_chunk (int): count of rows in each chunk
+        cores (int): count of processing cores for parallel processes
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table of counts of variants
+
+    """
+
+    # Initialize directories.
+    path_directory_batch = os.path.join(path_directory_product, "batch",)
+    putly.remove_directory(path=path_directory_batch) # caution
+    putly.create_directories(path=path_directory_batch)
+    # Build index.
+    if not os.path.exists(
+        os.path.join(path_directory_index, "table_chromosomes.tsv")
+    ):
+        build_dbsnp_index(
+            path_file_dbsnp=path_file_dbsnp,
+            path_directory_index=path_directory_index,
+            size_chunk=size_chunk,
+            cores=cores,
+            report=report,
+        )
+    # Copy all source files.
+    names_file = sorted(list(filter(
+        lambda name: name.endswith(".txt.gz"),
+        os.listdir(path_directory_source),
+    )))
+    for name_file in names_file:
+        shutil.copyfile(
+            os.path.join(path_directory_source, name_file),
+            os.path.join(path_directory_product, name_file),
+        )
+        pass
+    # Collect parameters specific to each instance.
+    table_parameter = pbpar.read_parameter_table(
+        path_file_table=path_file_table_parameter,
+        types_columns=None,
+        path_directory_cache=None,
+        report=False,
+    )
+    table_parameter = table_parameter.loc[
+        (table_parameter["availability"] == 1), :
+    ]
+    instances = list()
+    for study in table_parameter["study"].str.strip():
+        if not study.endswith(suffix_study):
+            continue
+        study_source = study[:-len(suffix_study)]
+        instance = dict()
+        instance["study"] = study
+        instance["path_file_source"] = os.path.join(
+            path_directory_source, str(study_source + ".txt.gz"),
+        )
+        instance["path_file_product"] = os.path.join(
+            path_directory_product, str(study + ".txt.gz"),
+        )
+        if os.path.exists(instance["path_file_source"]):
+            instances.append(instance)
+        pass
+    # Collect parameters common across all instances.
+    parameters = dict()
+    parameters["path_directory_index"] = path_directory_index
+    parameters["strict"] = strict
+    parameters["size_chunk"] = size_chunk
+    parameters["path_directory_batch"] = path_directory_batch
+    parameters["report"] = report
+    # Execute procedure iteratively with parallelization across instances.
+    prall.drive_procedure_parallel(
+        function_control=control_fill_study_dbsnp_rsid,
+        instances=instances,
+        parameters=parameters,
+        cores=cores,
+        report=report,
+    )
+    # Collect records from all studies.
+    tables = list()
+    for instance in instances:
+        path_file_record = os.path.join(
+            path_directory_batch, str(instance["study"] + ".pickle"),
+        )
+        if os.path.exists(path_file_record):
+            tables.append(pandas.read_pickle(path_file_record))
+        pass
+    if (len(tables) > 0):
+        table = pandas.concat(
+            tables,
+            axis="index",
+            join="outer",
+            ignore_index=True,
+            copy=True,
+        )
+    else:
+        table = pandas.DataFrame(columns=["study",])
+    # Write product information to file.
+    putly.write_tables_to_file(
+        pail_write={"table_dbsnp_rsid_counts": table,},
+        path_directory=path_directory_product,
+        reset_index_rows=False,
+        write_index_rows=False,
+        write_index_columns=True,
+        type="text",
+        delimiter="\t",
+        suffix=".tsv",
+    )
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=4)
+        print("count of source files: " + str(len(names_file)))
+        print("count of studies with fill: " + str(table.shape[0]))
+        putly.print_terminal_partition(level=4)
+        pass
+    # Return information.
+    return table
+
+
+###############################################################################
+# Procedure
+
+
+def execute_procedure(
+    path_directory_dock=None,
+):
+    """
+    Function to execute module's main behavior.
+
+    arguments:
+        path_directory_dock (str): path to dock directory for source and product
+            directories and files
+
+    raises:
+
+    returns:
+
+    """
+
+    ##########
+    # Parameters.
+    identifier_preparation = "gwas_preparation_2023-12-30"
+    identifier_parameter = "tcw_2023-12-30_dbsnp_rsid"
+    suffix_study = "_dbsnp_rsid"
+    strict = False
+    size_chunk = 1000000
+    cores = 8
+    report = True
+
+    ##########
+    # Paths.
+    path_directory_dbsnp = os.path.join(
+        path_directory_dock, "reference", "dbsnp", "grch37",
+    )
+    path_file_dbsnp = os.path.join(
+        path_directory_dbsnp, "GCF_000001405.25.gz",
+    )
+    path_directory_index = os.path.join(
+        path_directory_dbsnp, "index_variant_key",
+    )
+    path_directory_source = os.path.join(
+        path_directory_dock, identifier_preparation,
+        "4_filter_constrain_gwas_values",
+    )
+    path_directory_product = os.path.join(
+        path_directory_dock, identifier_preparation,
+        "5_fill_dbsnp_rs_identifiers",
+    )
+    path_file_table_parameter = os.path.join(
+        path_directory_dock, "parameters", "psychiatric_metabolism",
+        str("table_gwas_translation_" + identifier_parameter + ".tsv"),
+    )
+    putly.remove_directory(path=path_directory_product) # caution
+    putly.create_directories(path=path_directory_product)
+
+    ##########
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=3)
+        print("module: psychiatry_biomarkers.gwas_preparation.dbsnp.py")
+        print("function: execute_procedure()")
+        putly.print_terminal_partition(level=5)
+        print("preparation: " + str(identifier_preparation))
+        print("parameter: " + str(identifier_parameter))
+        putly.print_terminal_partition(level=5)
+        pass
+
+    ##########
+    # Fill rsIDs for all designated studies.
+    control_fill_studies_dbsnp_rsid(
+        path_file_table_parameter=path_file_table_parameter,
+        suffix_study=suffix_study,
+        path_file_dbsnp=path_file_dbsnp,
+        path_directory_index=path_directory_index,
+        path_directory_source=path_directory_source,
+        path_directory_product=path_directory_product,
+        strict=strict,
+        size_chunk=size_chunk,
+        cores=cores,
+        report=report,
+    )
+    pass
+
+
+###############################################################################
+# End
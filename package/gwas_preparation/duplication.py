@@ -0,0 +1,954 @@
+"""
+Supply functionality to detect and to resolve duplicate variants and
+multi-allelic variants within GWAS summary statistics in the standard format.
+
+This module 'duplication' is part of the 'gwas_preparation' package within
+the 'psychiatry_biomarkers' package.
+
+Author:
+
+    T. Cameron Waller, Ph.D.
+    tcameronwaller@gmail.com
+    Rochester, Minnesota 55902
+    United States of America
+
+License:
+
+    This file is part of the project package directory 'psychiatry_biomarkers'
+    (https://github.com/tcameronwaller/psychiatry_biomarkers/).
+
+    Project 'psychiatry_biomarkers' supports data analysis with team in
+    psychiatry and pharmacogenomics.
+    Copyright (C) 2024 Thomas Cameron Waller
+
+    The code within project 'psychiatry_biomarkers' is free software: you can
+    redistribute it and/or modify it under the terms of the GNU General Public
+    License as published by the Free Software Foundation, either version 3 of
+    the GNU General Public License, or (at your option) any later version.
+
+    The code within project 'psychiatry_biomarkers' is distributed in the hope
+    that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+    warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with project 'psychiatry_biomarkers'. If not, see
+    <http://www.gnu.org/licenses/>.
+"""
+
+###############################################################################
+# Notes
+
+# Duplicate variants are rows with the same chromosome, position, and
+# unordered pair of alleles, as in the keys of module "variant_key".
+# Duplicate rows are exact when their values agree after orientation of the
+# effect to the allele first in sort order, and otherwise they conflict.
+# Multi-allelic variants are rows at positions with more than one pair of
+# alleles, as in records that a split of multi-allelic sites leaves behind.
+
+# The procedure makes two passes through each file in chunks.
+# 1. The first pass keeps only the row, key, probability (p-value), and a
+#    hash of the values of each row, which is 32 bytes for each row, and
+#    appends these to temporary files on disk, one for each chromosome. The
+#    procedure then designates rows by sorts of the arrays for one chromosome
+#    at a time, since duplicate and multi-allelic variants never span
+#    chromosomes, and it keeps in memory only the designations of the
+#    duplicate and multi-allelic rows. Memory is therefore proportional to
+#    the rows of the largest chromosome (about 8% of rows for chromosome 1)
+#    and to the count of duplicate and multi-allelic rows, rather than to all
+#    rows of the study.
+# 2. The second pass writes the rows to keep to the product in their original
+#    sequence, and it writes all duplicate and multi-allelic rows to a report
+#    with their designations.
+
+# Policies for duplicate variants.
+# "minimum_p": keep the row with the smallest probability (p-value), or the
+#   first row if there is a tie
+# "first": keep the first row
+# "drop": drop all rows of the variant
+
+# Policies for multi-allelic variants.
+# "keep": keep all variants at the position as separate variants
+# "drop": drop all variants at the position
+
+# Rows without a valid key, such as rows with missing position or alleles,
+# pass to the product without designation.
+
+# Keys of insertions and deletions include a hash of their alleles, so there
+# is a small chance that different insertions or deletions at the same
+# position appear as duplicates.
+
+###############################################################################
+# Installation and importation
+
+# Standard
+
+import os
+
+# Relevant
+
+import numpy
+import pandas
+pandas.options.mode.chained_assignment = None # default = "warn"
+
+# Custom
+import partner.utility as putly
+import partner.parallelization as prall
+import psychiatry_biomarkers.gwas_preparation.standard_format as pbstd
+import psychiatry_biomarkers.gwas_preparation.variant_key as pbkey
+
+###############################################################################
+# Functionality
+
+
+##########
+# 1. Collect keys and designate rows.
+
+
+def calculate_row_content_hashes(
+    table=None,
+):
+    """
+    Calculates hashes of the values of rows after orientation of the effect
+    to the allele first in sort order, so that rows for the same variant with
+    the same values have the same hash regardless of their effect allele.
+
+    arguments:
+        table (object): Pandas data-frame table of GWAS summary statistics in
+            standard format
+
+    raises:
+
+    returns:
+        (object): NumPy array of hashes
+
+    """
+
+    first = table["A1"].astype("string").str.strip().str.upper()
+    second = table["A2"].astype("string").str.strip().str.upper()
+    indicator_swap = (first > second).fillna(False).to_numpy(dtype="bool")
+    table_content = pandas.DataFrame(data={
+        "allele_low": numpy.where(indicator_swap, second, first),
+        "allele_high": numpy.where(indicator_swap, first, second),
+        "BETA": numpy.where(
+            indicator_swap,
+            -1 * table["BETA"].to_numpy(dtype="float64", na_value=numpy.nan),
+            table["BETA"].to_numpy(dtype="float64", na_value=numpy.nan),
+        ),
+        "SE": table["SE"].to_numpy(dtype="float64", na_value=numpy.nan),
+        "P": table["P"].to_numpy(dtype="float64", na_value=numpy.nan),
+    })
+    hashes = pandas.util.hash_pandas_object(table_content, index=False)
+    return hashes.to_numpy(dtype="uint64")
+
+
+def define_partition_record_type():
+    """
+    Defines the type of records in the temporary files of partitions by
+    chromosome.
+
+    arguments:
+
+    raises:
+
+    returns:
+        (object): NumPy type of structured records
+
+    """
+
+    return numpy.dtype([
+        ("row", "int64"),
+        ("key", "int64"),
+        ("probability", "float64"),
+        ("hash", "uint64"),
+    ])
+
+
+def define_path_file_partition(
+    path_directory_partition=None,
+    code=None,
+):
+    """
+    Defines the path to the temporary file of the partition for a chromosome.
+
+    arguments:
+        path_directory_partition (str): path to directory for temporary files
+            of partitions
+        code (int): code of chromosome
+
+    raises:
+
+    returns:
+        (str): path to file
+
+    """
+
+    return os.path.join(
+        path_directory_partition,
+        str("chromosome_" + str(int(code)).zfill(2) + ".bin"),
+    )
+
+
+def collect_duplication_keys(
+    path_file_source=None,
+    path_directory_partition=None,
+    size_chunk=None,
+):
+    """
+    Collects rows, keys, probabilities (p-values), and hashes of values for
+    all rows of GWAS summary statistics in a single pass through the file in
+    chunks, and appends them to temporary files on disk with a partition for
+    each chromosome.
+
+    Rows without a valid key do not enter any partition.
+
+    arguments:
+        path_file_source (str): path to source file in standard format
+        path_directory_partition (str): path to directory for temporary files
+            of partitions
+        size_chunk (int): count of rows in each chunk
+
+    raises:
+
+    returns:
+        (dict<object>): collection of information
+            count_rows (int): count of rows in source file
+            count_key_invalid (int): count of rows without a valid key
+            codes (list<int>): codes of chromosomes with partitions
+
+    """
+
+    putly.create_directories(path=path_directory_partition)
+    type_record = define_partition_record_type()
+    codes = set()
+    offset = 0
+    count_key_invalid = 0
+    for table in pbstd.read_gwas_standard_format_chunks(
+        path_file=path_file_source,
+        columns=["CHR", "BP", "A1", "A2", "BETA", "SE", "P",],
+        size_chunk=size_chunk,
+    ):
+        count = table.shape[0]
+        records = numpy.zeros(count, dtype=type_record)
+        records["row"] = numpy.arange(offset, (offset + count), dtype="int64")
+        records["key"] = pbkey.pack_variant_keys(
+            chromosomes=table["CHR"],
+            positions=table["BP"],
+            alleles_first=table["A1"],
+            alleles_second=table["A2"],
+        )
+        records["probability"] = table["P"].to_numpy(
+            dtype="float64", na_value=numpy.nan,
+        )
+        records["hash"] = calculate_row_content_hashes(table=table)
+        indicator_valid = (records["key"] >= 0)
+        count_key_invalid += int(numpy.sum(~indicator_valid))
+        records = records[indicator_valid]
+        # Append records to the partition of each chromosome, in the
+        # sequence of rows.
+        codes_chunk = (records["key"] >> 58)
+        for code in numpy.unique(codes_chunk):
+            with open(define_path_file_partition(
+                path_directory_partition=path_directory_partition,
+                code=code,
+            ), "ab") as file_partition:
+                file_partition.write(records[codes_chunk == code].tobytes())
+            codes.add(int(code))
+            pass
+        offset += count
+        pass
+    # Collect information.
+    pail = dict()
+    pail["count_rows"] = int(offset)
+    pail["count_key_invalid"] = int(count_key_invalid)
+    pail["codes"] = sorted(codes)
+    # Return information.
+    return pail
+
+
+def define_group_starts(
+    values=None,
+):
+    """
+    Defines indicators of the first element in each group of equal values
+    within a sorted array.
+
+    arguments:
+        values (object): NumPy array in sort order
+
+    raises:
+
+    returns:
+        (object): NumPy array of indicators
+
+    """
+
+    starts = numpy.ones(values.size, dtype="bool")
+    starts[1:] = (values[1:] != values[:-1])
+    return starts
+
+
+def designate_duplication_rows(
+    keys=None,
+    probabilities=None,
+    hashes=None,
+    policy_duplicate=None,
+    policy_multiallelic=None,
+):
+    """
+    Designates duplicate, conflicting, and multi-allelic rows and the rows to
+    keep under the policies of resolution.
+
+    arguments:
+        keys (object): NumPy array of keys of variants, or -1 if invalid
+        probabilities (object): NumPy array of probabilities (p-values)
+        hashes (object): NumPy array of hashes of values of rows
+        policy_duplicate (str): policy for duplicate variants, "minimum_p",
+            "first", or "drop"
+        policy_multiallelic (str): policy for multi-allelic variants, "keep"
+            or "drop"
+
+    raises:
+        ValueError: if a policy is not valid
+
+    returns:
+        (dict<object>): collection of information
+            duplicate (object): NumPy array of indicators of duplicate rows
+            conflict (object): NumPy array of indicators of duplicate rows
+                whose values conflict
+            multiallelic (object): NumPy array of indicators of rows at
+                multi-allelic positions
+            keep (object): NumPy array of indicators of rows to keep
+            counts (dict<int>): counts of variants, positions, and rows
+
+    """
+
+    if (policy_duplicate not in ["minimum_p", "first", "drop",]):
+        raise ValueError(
+            "invalid policy for duplicate variants: " + str(policy_duplicate)
+        )
+    if (policy_multiallelic not in ["keep", "drop",]):
+        raise ValueError(
+            "invalid policy for multi-allelic variants: " +
+            str(policy_multiallelic)
+        )
+    count = keys.size
+    rows = numpy.arange(count, dtype="int64")
+    indicator_valid = (keys >= 0)
+    # Sort rows by key and then by preference within each key.
+    if (policy_duplicate == "minimum_p"):
+        probabilities_sort = numpy.where(
+            numpy.isnan(probabilities), numpy.inf, probabilities,
+        )
+        order = numpy.lexsort((rows, probabilities_sort, keys,))
+    else:
+        order = numpy.lexsort((rows, keys,))
+    keys_order = keys[order]
+    starts = define_group_starts(values=keys_order)
+    groups = (numpy.cumsum(starts) - 1)
+    sizes = numpy.bincount(groups, minlength=1)
+    indicator_duplicate_order = (
+        (sizes[groups] > 1) & (keys_order >= 0)
+    )
+    duplicate = numpy.zeros(count, dtype="bool")
+    duplicate[order] = indicator_duplicate_order
+    # Designate conflicts by counts of distinct hashes within each key.
+    order_hash = numpy.lexsort((hashes, keys,))
+    keys_hash = keys[order_hash]
+    hashes_hash = hashes[order_hash]
+    starts_key = define_group_starts(values=keys_hash)
+    starts_pair = (starts_key | define_group_starts(values=hashes_hash))
+    groups_key = (numpy.cumsum(starts_key) - 1)
+    counts_distinct = numpy.bincount(
+        groups_key, weights=starts_pair, minlength=1,
+    )
+    conflict = numpy.zeros(count, dtype="bool")
+    conflict[order_hash] = (
+        (counts_distinct[groups_key] > 1) & (keys_hash >= 0)
+    )
+    # Designate multi-allelic positions.
+    keys_unique = numpy.unique(keys[indicator_valid])
+    positions_unique, counts_position = numpy.unique(
+        (keys_unique >> 30), return_counts=True,
+    )
+    positions_multiallelic = positions_unique[counts_position > 1]
+    multiallelic = (
+        indicator_valid &
+        numpy.isin((keys >> 30), positions_multiallelic)
+    )
+    # Designate rows to keep.
+    if (policy_duplicate == "drop"):
+        keep_duplicate = numpy.logical_not(duplicate)
+    else:
+        keep_duplicate = numpy.zeros(count, dtype="bool")
+        keep_duplicate[order] = (
+            numpy.logical_not(indicator_duplicate_order) | starts
+        )
+    if (policy_multiallelic == "drop"):
+        keep = (keep_duplicate & numpy.logical_not(multiallelic))
+    else:
+        keep = keep_duplicate
+    # Collect counts.
+    indicator_group_duplicate = (
+        (sizes > 1) & (keys_order[starts] >= 0)
+    )
+    counts = dict()
+    counts["rows_source"] = int(count)
+    counts["rows_key_invalid"] = int(numpy.sum(~indicator_valid))
+    counts["variants_duplicate"] = int(numpy.sum(indicator_group_duplicate))
+    counts["rows_duplicate"] = int(numpy.sum(duplicate))
+    counts["variants_conflict"] = int(numpy.sum(
+        (counts_distinct > 1) & (keys_hash[starts_key] >= 0)
+    ))
+    counts["rows_conflict"] = int(numpy.sum(conflict))
+    counts["positions_multiallelic"] = int(positions_multiallelic.size)
+    counts["rows_multiallelic"] = int(numpy.sum(multiallelic))
+    counts["remove_duplicate"] = int(numpy.sum(~keep_duplicate))
+    counts["remove_multiallelic"] = int(numpy.sum(keep_duplicate & ~keep))
+    counts["rows_product"] = int(numpy.sum(keep))
+    # Collect information.
+    pail = dict()
+    pail["duplicate"] = duplicate
+    pail["conflict"] = conflict
+    pail["multiallelic"] = multiallelic
+    pail["keep"] = keep
+    pail["counts"] = counts
+    # Return information.
+    return pail
+
+
+def designate_duplication_partitions(
+    path_directory_partition=None,
+    codes=None,
+    count_rows=None,
+    count_key_invalid=None,
+    policy_duplicate=None,
+    policy_multiallelic=None,
+):
+    """
+    Designates duplicate, conflicting, and multi-allelic rows and the rows to
+    keep for the partition of each chromosome in turn, and collects the
+    designations of only the duplicate and multi-allelic rows.
+
+    Rows without designations are neither duplicate nor multi-allelic, and
+    the procedure keeps them.
+
+    arguments:
+        path_directory_partition (str): path to directory for temporary files
+            of partitions
+        codes (list<int>): codes of chromosomes with partitions
+        count_rows (int): count of rows in source file
+        count_key_invalid (int): count of rows without a valid key
+        policy_duplicate (str): policy for duplicate variants, "minimum_p",
+            "first", or "drop"
+        policy_multiallelic (str): policy for multi-allelic variants, "keep"
+            or "drop"
+
+    raises:
+
+    returns:
+        (dict<object>): collection of information
+            rows (object): NumPy array of indices of duplicate and
+                multi-allelic rows in sort order
+            duplicate (object): NumPy array of indicators of duplicate rows
+            conflict (object): NumPy array of indicators of duplicate rows
+                whose values conflict
+            multiallelic (object): NumPy array of indicators of rows at
+                multi-allelic positions
+            keep (object): NumPy array of indicators of rows to keep
+            counts (dict<int>): counts of variants, positions, and rows
+
+    """
+
+    type_record = define_partition_record_type()
+    names = ["duplicate", "conflict", "multiallelic", "keep",]
+    collections = {name: list() for name in (["rows",] + names)}
+    counts = dict()
+    counts["rows_source"] = int(count_rows)
+    counts["rows_key_invalid"] = int(count_key_invalid)
+    for code in codes:
+        path_file_partition = define_path_file_partition(
+            path_directory_partition=path_directory_partition,
+            code=code,
+        )
+        records = numpy.fromfile(path_file_partition, dtype=type_record)
+        os.remove(path_file_partition)
+        designations = designate_duplication_rows(
+            keys=records["key"],
+            probabilities=records["probability"],
+            hashes=records["hash"],
+            policy_duplicate=policy_duplicate,
+            policy_multiallelic=policy_multiallelic,
+        )
+        indicator_report = (
+            designations["duplicate"] | designations["multiallelic"]
+        )
+        collections["rows"].append(records["row"][indicator_report])
+        for name in names:
+            collections[name].append(designations[name][indicator_report])
+        for name, value in designations["counts"].items():
+            if (name not in ["rows_source", "rows_key_invalid",]):
+                counts[name] = (counts.get(name, 0) + value)
+            pass
+        del records, designations
+        pass
+    # Rows without a valid key pass to the product.
+    counts["rows_product"] = (
+        counts.get("rows_product", 0) + int(count_key_invalid)
+    )
+    for name in [
+        "variants_duplicate", "rows_duplicate", "variants_conflict",
+        "rows_conflict", "positions_multiallelic", "rows_multiallelic",
+        "remove_duplicate", "remove_multiallelic",
+    ]:
+        counts[name] = counts.get(name, 0)
+    # Organize designations in the sequence of rows.
+    pail = dict()
+    if (len(collections["rows"]) > 0):
+        rows = numpy.concatenate(collections["rows"])
+    else:
+        rows = numpy.zeros(0, dtype="int64")
+    order = numpy.argsort(rows, kind="stable")
+    pail["rows"] = rows[order]
+    for name in names:
+        if (len(collections[name]) > 0):
+            pail[name] = numpy.concatenate(collections[name])[order]
+        else:
+            pail[name] = numpy.zeros(0, dtype="bool")
+    pail["counts"] = counts
+    # Return information.
+    return pail
+
+
+##########
+# 2. Resolve duplicates for a study.
+
+
+def write_duplication_resolution(
+    path_file_source=None,
+    path_file_product=None,
+    path_file_rows=None,
+    designations=None,
+    size_chunk=None,
+    threads=None,
+):
+    """
+    Writes the rows to keep to the product file in their original sequence,
+    and writes all duplicate and multi-allelic rows to a report with their
+    designations.
+
+    arguments:
+        path_file_source (str): path to source file in standard format
+        path_file_product (str): path to product file
+        path_file_rows (str): path to file for report of duplicate and
+            multi-allelic rows
+        designations (dict<object>): designations of duplicate and
+            multi-allelic rows from function
+            "designate_duplication_partitions"
+        size_chunk (int): count of rows in each chunk
+        threads (int): count of threads for compression
+
+    raises:
+
+    returns:
+
+    """
+
+    tables_report = list()
+    offset = 0
+    first = True
+    for table in pbstd.read_gwas_standard_format_chunks(
+        path_file=path_file_source,
+        columns=None,
+        size_chunk=size_chunk,
+    ):
+        count = table.shape[0]
+        # Expand designations for the rows of the chunk.
+        start, end = numpy.searchsorted(
+            designations["rows"], [offset, (offset + count),], side="left",
+        )
+        indices = (designations["rows"][start:end] - offset)
+        keep = numpy.ones(count, dtype="bool")
+        keep[indices] = designations["keep"][start:end]
+        duplicate = numpy.zeros(count, dtype="bool")
+        duplicate[indices] = designations["duplicate"][start:end]
+        conflict = numpy.zeros(count, dtype="bool")
+        conflict[indices] = designations["conflict"][start:end]
+        multiallelic = numpy.zeros(count, dtype="bool")
+        multiallelic[indices] = designations["multiallelic"][start:end]
+        # Collect duplicate and multi-allelic rows for report.
+        indicator_report = (duplicate | multiallelic)
+        if numpy.any(indicator_report):
+            table_report = table.loc[indicator_report, :].copy(deep=True)
+            table_report.insert(
+                0, "row", (numpy.flatnonzero(indicator_report) + offset),
+            )
+            table_report["duplicate"] = duplicate[indicator_report].astype(
+                "int32"
+            )
+            table_report["conflict"] = conflict[indicator_report].astype(
+                "int32"
+            )
+            table_report["multiallelic"] = multiallelic[
+                indicator_report
+            ].astype("int32")
+            table_report["keep"] = keep[indicator_report].astype("int32")
+            tables_report.append(table_report)
+            pass
+        # Write product information to file.
+        pbstd.write_gwas_standard_format_chunk(
+            table=table.loc[keep, :],
+            path_file=path_file_product,
+            header=first,
+            mode=("w" if first else "a"),
+            threads=threads,
+        )
+        first = False
+        offset += count
+        pass
+    if first:
+        pbstd.write_gwas_standard_format_chunk(
+            table=pandas.DataFrame(
+                columns=pbstd.define_standard_format_column_sequence()
+            ),
+            path_file=path_file_product,
+            header=True,
+            mode="w",
+            threads=threads,
+        )
+    # Write report information to file.
+    if (len(tables_report) > 0):
+        table_report = pandas.concat(
+            tables_report,
+            axis="index",
+            ignore_index=True,
+        )
+    else:
+        table_report = pandas.DataFrame(
+            columns=(
+                ["row",] + pbstd.define_standard_format_column_sequence() +
+                ["duplicate", "conflict", "multiallelic", "keep",]
+            )
+        )
+    table_report.to_csv(
+        path_file_rows,
+        sep="\t",
+        header=True,
+        index=False,
+        na_rep="NA",
+    )
+    pass
+
+
+def control_duplication_study(
+    instance=None,
+    parameters=None,
+):
+    """
+    Control procedure to detect and to resolve duplicate and multi-allelic
+    variants for a single study and to write counts of rows to file.
+
+    arguments:
+        instance (dict): parameters specific to current instance
+            study (str): identifier of study
+            path_file_source (str): path to source file
+            path_file_product (str): path to product file
+        parameters (dict): parameters common to all instances
+            policy_duplicate (str): policy for duplicate variants
+            policy_multiallelic (str): policy for multi-allelic variants
+            size_chunk (int): count of rows in each chunk
+            threads (int): count of threads for compression
+            path_directory_rows (str): path to directory for reports of
+                duplicate and multi-allelic rows
+            path_directory_partition (str): path to directory for temporary
+                files of partitions by chromosome
+            path_directory_batch (str): path to directory for records of
+                individual studies
+            report (bool): whether to print reports
+
+    raises:
+
+    returns:
+
+    """
+
+    # Collect keys within partitions by chromosome.
+    path_directory_partition = os.path.join(
+        parameters["path_directory_partition"], instance["study"],
+    )
+    putly.remove_directory(path=path_directory_partition) # caution
+    pail_keys = collect_duplication_keys(
+        path_file_source=instance["path_file_source"],
+        path_directory_partition=path_directory_partition,
+        size_chunk=parameters["size_chunk"],
+    )
+    # Designate rows one chromosome at a time.
+    designations = designate_duplication_partitions(
+        path_directory_partition=path_directory_partition,
+        codes=pail_keys["codes"],
+        count_rows=pail_keys["count_rows"],
+        count_key_invalid=pail_keys["count_key_invalid"],
+        policy_duplicate=parameters["policy_duplicate"],
+        policy_multiallelic=parameters["policy_multiallelic"],
+    )
+    putly.remove_directory(path=path_directory_partition) # caution
+    # Write product information to file.
+    write_duplication_resolution(
+        path_file_source=instance["path_file_source"],
+        path_file_product=instance["path_file_product"],
+        path_file_rows=os.path.join(
+            parameters["path_directory_rows"],
+            str(instance["study"] + ".tsv.gz"),
+        ),
+        designations=designations,
+        size_chunk=parameters["size_chunk"],
+        threads=parameters["threads"],
+    )
+    # Collect information.
+    record = dict()
+    record["study"] = instance["study"]
+    record.update(designations["counts"])
+    # Write product information to file.
+    pandas.DataFrame(data=[record,]).to_pickle(
+        os.path.join(
+            parameters["path_directory_batch"],
+            str(instance["study"] + ".pickle"),
+        )
+    )
+    # Report.
+    if parameters["report"]:
+        print(str(
+            "study: " + instance["study"] + "; duplicate variants: " +
+            str(record["variants_duplicate"]) + "; conflicts: " +
+            str(record["variants_conflict"]) + "; multi-allelic positions: " +
+            str(record["positions_multiallelic"])
+        ))
+        pass
+    pass
+
+
+##########
+# 3. Drive across studies.
+
+
+def control_duplication_studies(
+    path_directory_source=None,
+    path_directory_product=None,
+    policy_duplicate=None,
+    policy_multiallelic=None,
+    size_chunk=None,
+    threads=None,
+    cores=None,
+    report=None,
+):
+    """
+    Control procedure to detect and to resolve duplicate and multi-allelic
+    variants for all studies in a directory.
+
+    arguments:
+        path_directory_source (str): path to directory of source files in
+            standard format ("*.txt.gz")
+        path_directory_product (str): path to directory of product files
+        policy_duplicate (str): policy for duplicate variants, "minimum_p",
+            "first", or "drop"
+        policy_multiallelic (str): policy for multi-allelic variants, "keep"
+            or "drop"
+        size_chunk (int): count of rows in each chunk
+        threads (int): count of threads for compression within each process
+        cores (int): count of processing cores for parallel processes
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table of counts of rows
+
+    """
+
+    # Initialize directories.
+    path_directory_batch = os.path.join(path_directory_product, "batch",)
+    path_directory_rows = os.path.join(path_directory_product, "rows",)
+    path_directory_partition = os.path.join(
+        path_directory_product, "partition",
+    )
+    putly.remove_directory(path=path_directory_batch) # caution
+    putly.create_directories(path=path_directory_batch)
+    putly.create_directories(path=path_directory_rows)
+    # Collect parameters specific to each instance.
+    names_source = sorted(list(filter(
+        lambda name: name.endswith(".txt.gz"),
+        os.listdir(path_directory_source),
+    )))
+    instances = list()
+    for name_file in names_source:
+        instance = dict()
+        instance["study"] = pbstd.define_study_identifier_from_file_name(
+            path_file=name_file,
+            suffix=".txt.gz",
+        )
+        instance["path_file_source"] = os.path.join(
+            path_directory_source, name_file,
+        )
+        instance["path_file_product"] = os.path.join(
+            path_directory_product, name_file,
+        )
+        instances.append(instance)
+        pass
+    # Collect parameters common across all instances.
+    parameters = dict()
+    parameters["policy_duplicate"] = policy_duplicate
+    parameters["policy_multiallelic"] = policy_multiallelic
+    parameters["size_chunk"] = size_chunk
+    parameters["threads"] = threads
+    parameters["path_directory_rows"] = path_directory_rows
+    parameters["path_directory_partition"] = path_directory_partition
+    parameters["path_directory_batch"] = path_directory_batch
+    parameters["report"] = report
+    # Execute procedure iteratively with parallelization across instances.
+    if (len(instances) > 0):
+        prall.drive_procedure_parallel(
+            function_control=control_duplication_study,
+            instances=instances,
+            parameters=parameters,
+            cores=cores,
+            report=report,
+        )
+    putly.remove_directory(path=path_directory_partition) # caution
+    # Collect records from all studies.
+    tables = list()
+    for instance in instances:
+        path_file_record = os.path.join(
+            path_directory_batch, str(instance["study"] + ".pickle"),
+        )
+        if os.path.exists(path_file_record):
+            tables.append(pandas.read_pickle(path_file_record))
+        pass
+    if (len(tables) > 0):
+        table = pandas.concat(
+            tables,
+            axis="index",
+            join="outer",
+            ignore_index=True,
+            copy=True,
+        )
+    else:
+        table = pandas.DataFrame(
+            columns=[
+                "study", "rows_source", "rows_key_invalid",
+                "variants_duplicate", "rows_duplicate", "variants_conflict",
+                "rows_conflict", "positions_multiallelic",
+                "rows_multiallelic", "remove_duplicate",
+                "remove_multiallelic", "rows_product",
+            ]
+        )
+    # Write product information to file.
+    putly.write_tables_to_file(
+        pail_write={"table_duplication_counts": table,},
+        path_directory=path_directory_product,
+        reset_index_rows=False,
+        write_index_rows=False,
+        write_index_columns=True,
+        type="text",
+        delimiter="\t",
+        suffix=".tsv",
+    )
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=4)
+        print("count of studies: " + str(table.shape[0]))
+        print(
+            "count of studies with duplicate variants: " +
+            str(int((table["variants_duplicate"] > 0).sum()))
+        )
+        print(
+            "count of studies with conflicting duplicate variants: " +
+            str(int((table["variants_conflict"] > 0).sum()))
+        )
+        print(
+            "count of studies with multi-allelic variants: " +
+            str(int((table["positions_multiallelic"] > 0).sum()))
+        )
+        putly.print_terminal_partition(level=4)
+        pass
+    # Return information.
+    return table
+
+
+###############################################################################
+# Procedure
+
+
+def execute_procedure(
+    path_directory_dock=None,
+):
+    """
+    Function to execute module's main behavior.
+
+    arguments:
+        path_directory_dock (str): path to dock directory for source and product
+            directories and files
+
+    raises:
+
+    returns:
+
+    """
+
+    ##########
+    # Parameters.
+    identifier_preparation = "gwas_preparation_2023-12-30"
+    policy_duplicate = "minimum_p"
+    policy_multiallelic = "keep"
+    size_chunk = 1000000
+    threads = 2
+    cores = 4
+    report = True
+
+    ##########
+    # Paths.
+    path_directory_source = os.path.join(
+        path_directory_dock, identifier_preparation,
+        "8_gwas_effective_observations",
+    )
+    path_directory_product = os.path.join(
+        path_directory_dock, identifier_preparation,
+        "9_gwas_duplication_resolution",
+    )
+    putly.remove_directory(path=path_directory_product) # caution
+    putly.create_directories(path=path_directory_product)
+
+    ##########
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=3)
+        print(
+            "module: psychiatry_biomarkers.gwas_preparation." +
+            "duplication.py"
+        )
+        print("function: execute_procedure()")
+        putly.print_terminal_partition(level=5)
+        print("preparation: " + str(identifier_preparation))
+        print("policy for duplicate variants: " + str(policy_duplicate))
+        print(
+            "policy for multi-allelic variants: " + str(policy_multiallelic)
+        )
+        putly.print_terminal_partition(level=5)
+        pass
+
+    ##########
+    # Detect and resolve duplicates for all studies.
+    control_duplication_studies(
+        path_directory_source=path_directory_source,
+        path_directory_product=path_directory_product,
+        policy_duplicate=policy_duplicate,
+        policy_multiallelic=policy_multiallelic,
+        size_chunk=size_chunk,
+        threads=threads,
+        cores=cores,
+        report=report,
+    )
+    pass
+
+
+###############################################################################
+# End
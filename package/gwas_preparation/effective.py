@@ -0,0 +1,578 @@
+"""
+Supply functionality for calculation of effective counts of observations for
+GWAS summary statistics from logistic regression.
+
+This module 'effective' is part of the 'gwas_preparation' package within the
+'psychiatry_biomarkers' package.
+
+Author:
+
+    T. Cameron Waller, Ph.D.
+    tcameronwaller@gmail.com
+    Rochester, Minnesota 55902
+    United States of America
+
+License:
+
+    This file is part of the project package directory 'psychiatry_biomarkers'
+    (https://github.com/tcameronwaller/psychiatry_biomarkers/).
+
+    Project 'psychiatry_biomarkers' supports data analysis with team in
+    psychiatry and pharmacogenomics.
+    Copyright (C) 2024 Thomas Cameron Waller
+
+    The code within project 'psychiatry_biomarkers' is free software: you can
+    redistribute it and/or modify it under the terms of the GNU General Public
+    License as published by the Free Software Foundation, either version 3 of
+    the GNU General Public License, or (at your option) any later version.
+
+    The code within project 'psychiatry_biomarkers' is distributed in the hope
+    that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+    warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with project 'psychiatry_biomarkers'. If not, see
+    <http://www.gnu.org/licenses/>.
+"""
+
+###############################################################################
+# Notes
+
+# The driver script "8_calculate_effective_observations_logistic_gwas.sh"
+# runs the script "calculate_effective_observations_logistic_gwas.sh" over
+# each study with logistic regression in the parameter table. This module
+# instead calculates effective counts of observations for all of these
+# studies in chunks of rows, with parallelization across studies.
+
+# The effective count of observations for a variant is
+# N_effective = 4 / ((1 / N_cases) + (1 / N_controls)).
+# The calculation uses counts of cases and controls for each variant
+# (columns "NCASE" and "NCONT") where available. For other variants, the
+# calculation uses counts of cases and controls for the study from the
+# parameter table, or the effective count of observations for the study
+# from the parameter table ("observations_effective"). Variants without any
+# of these keep their current count of observations ("N").
+
+# It is important not to calculate the effective observations repetitively.
+# The product files carry the effective count of observations in column "N",
+# so the procedure reads source files from a directory prior to this step and
+# writes to a separate directory.
+
+# The table of summaries for each study ("table_observations_effective.tsv")
+# carries the mean of effective counts of observations across variants. The
+# procedures for SNP heritability use the effective counts of observations of
+# each variant from column "N" of the product files.
+
+###############################################################################
+# Installation and importation
+
+# Standard
+
+import os
+import shutil
+
+# Relevant
+
+import numpy
+import pandas
+pandas.options.mode.chained_assignment = None # default = "warn"
+
+# Custom
+import partner.utility as putly
+import partner.parallelization as prall
+import psychiatry_biomarkers.gwas_preparation.standard_format as pbstd
+import psychiatry_biomarkers.parameter_table as pbpar
+import psychiatry_biomarkers.profiling as pbprf
+
+###############################################################################
+# Functionality
+
+
+##########
+# 1. Calculate effective observations.
+
+
+def define_studies_exclusion_observations_effective():
+    """
+    Defines studies to exclude from calculation of effective observations.
+
+    Alternates of study "30482948_walters_2018" either have filled total
+    observations or preserve the original effective observations, so avoid
+    redundant calculation.
+
+    arguments:
+
+    raises:
+
+    returns:
+        (list<str>): identifiers of studies
+
+    """
+
+    return [
+        "30482948_walters_2018_eur_all_alt_1",
+        "30482948_walters_2018_eur_all_alt_2",
+        "30482948_walters_2018_eur_unrel_meta_alt_1",
+        "30482948_walters_2018_eur_unrel_meta_alt_2",
+        "30482948_walters_2018_eur_unrel_genotype_alt_1",
+        "30482948_walters_2018_eur_unrel_genotype_alt_2",
+        "30482948_walters_2018_female_alt_1",
+        "30482948_walters_2018_female_alt_2",
+        "30482948_walters_2018_male_alt_1",
+        "30482948_walters_2018_male_alt_2",
+    ]
+
+
+def calculate_observations_effective(
+    cases=None,
+    controls=None,
+):
+    """
+    Calculates effective counts of observations from counts of cases and
+    controls.
+
+    arguments:
+        cases (object): NumPy array of counts of cases
+        controls (object): NumPy array of counts of controls
+
+    raises:
+
+    returns:
+        (object): NumPy array of effective counts of observations, or missing
+            if either count is missing or not positive
+
+    """
+
+    cases = numpy.asarray(cases, dtype="float64")
+    controls = numpy.asarray(controls, dtype="float64")
+    indicator_valid = (
+        numpy.isfinite(cases) & numpy.isfinite(controls) &
+        (cases > 0) & (controls > 0)
+    )
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        values = (4 / ((1 / cases) + (1 / controls)))
+    return numpy.where(indicator_valid, values, numpy.nan)
+
+
+def define_observations_effective_counts():
+    """
+    Defines counts and summaries for calculation of effective observations.
+
+    arguments:
+
+    raises:
+
+    returns:
+        (dict): counts and summaries
+
+    """
+
+    counts = dict()
+    counts["source"] = 0
+    counts["fill_variant"] = 0
+    counts["fill_study"] = 0
+    counts["unchange"] = 0
+    counts["observations_effective_count"] = 0
+    counts["observations_effective_sum"] = 0.0
+    counts["observations_effective_min"] = numpy.nan
+    counts["observations_effective_max"] = numpy.nan
+    return counts
+
+
+def calculate_gwas_chunk_observations_effective(
+    table=None,
+    observations_effective_study=None,
+    counts=None,
+):
+    """
+    Calculates effective counts of observations for each variant within a
+    chunk of GWAS summary statistics in the standard format.
+
+    arguments:
+        table (object): Pandas data-frame table of GWAS summary statistics in
+            standard format
+        observations_effective_study (float): effective count of observations
+            for the study from the parameter table, or missing
+        counts (dict): counts and summaries to update
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table
+
+    """
+
+    # Calculate from counts for each variant.
+    values_variant = calculate_observations_effective(
+        cases=table["NCASE"].to_numpy(dtype="float64", na_value=numpy.nan),
+        controls=table["NCONT"].to_numpy(dtype="float64", na_value=numpy.nan),
+    )
+    indicator_variant = ~numpy.isnan(values_variant)
+    # Fall back to value for study.
+    indicator_study = (
+        ~indicator_variant & numpy.isfinite(observations_effective_study)
+    )
+    observations = table["N"].to_numpy(dtype="float64", na_value=numpy.nan)
+    observations = numpy.where(
+        indicator_variant, values_variant,
+        numpy.where(
+            indicator_study, observations_effective_study, observations,
+        ),
+    )
+    table["N"] = observations
+    # Update counts and summaries.
+    counts["source"] += table.shape[0]
+    counts["fill_variant"] += int(indicator_variant.sum())
+    counts["fill_study"] += int(indicator_study.sum())
+    counts["unchange"] += int((~indicator_variant & ~indicator_study).sum())
+    observations_finite = observations[numpy.isfinite(observations)]
+    if (observations_finite.shape[0] > 0):
+        counts["observations_effective_count"] += observations_finite.shape[0]
+        counts["observations_effective_sum"] += float(
+            numpy.sum(observations_finite)
+        )
+        counts["observations_effective_min"] = numpy.nanmin([
+            counts["observations_effective_min"],
+            numpy.min(observations_finite),
+        ])
+        counts["observations_effective_max"] = numpy.nanmax([
+            counts["observations_effective_max"],
+            numpy.max(observations_finite),
+        ])
+    # Return information.
+    return table
+
+
+@pbprf.profile_procedure(category="study", keys_arguments=["study",])
+def control_calculate_study_observations_effective(
+    instance=None,
+    parameters=None,
+):
+    """
+    Control procedure to calculate effective counts of observations in GWAS
+    summary statistics for a single study in chunks of rows and to write the
+    product and summaries to file.
+
+    arguments:
+        instance (dict): parameters specific to current instance
+            study (str): identifier of study
+            observations_effective_study (float): effective count of
+                observations for the study from the parameter table
+            path_file_source (str): path to source file
+            path_file_product (str): path to product file
+        parameters (dict): parameters common to all instances
+            size_chunk (int): count of rows in each chunk
+            path_directory_batch (str): path to directory for records of
+                individual studies
+            report (bool): whether to print reports
+
+    raises:
+
+    returns:
+
+    """
+
+    counts = define_observations_effective_counts()
+    reader = pbstd.read_gwas_standard_format_chunks(
+        path_file=instance["path_file_source"],
+        columns=None,
+        size_chunk=parameters["size_chunk"],
+    )
+    first = True
+    for table_chunk in reader:
+        table_product = calculate_gwas_chunk_observations_effective(
+            table=table_chunk,
+            observations_effective_study=(
+                instance["observations_effective_study"]
+            ),
+            counts=counts,
+        )
+        pbstd.write_gwas_standard_format_chunk(
+            table=table_product,
+            path_file=instance["path_file_product"],
+            header=first,
+            mode=("w" if first else "a"),
+        )
+        first = False
+        pass
+    # Collect information.
+    record = dict()
+    record["study"] = instance["study"]
+    record.update(counts)
+    record["observations_effective_mean"] = (
+        (
+            counts["observations_effective_sum"] /
+            counts["observations_effective_count"]
+        )
+        if (counts["observations_effective_count"] > 0) else numpy.nan
+    )
+    del record["observations_effective_count"]
+    del record["observations_effective_sum"]
+    record["observations_effective_table"] = (
+        instance["observations_effective_study"]
+    )
+    # Write product information to file.
+    pandas.DataFrame(data=[record,]).to_pickle(
+        os.path.join(
+            parameters["path_directory_batch"],
+            str(instance["study"] + ".pickle"),
+        )
+    )
+    # Report.
+    if parameters["report"]:
+        print(str(
+            "study: " + instance["study"] + "; variants: " +
+            str(counts["source"]) + "; from variant counts: " +
+            str(counts["fill_variant"]) + "; from table: " +
+            str(counts["fill_study"])
+        ))
+        pass
+    pass
+
+
+##########
+# 2. Drive calculation across studies.
+
+
+def define_observations_effective_study(
+    row=None,
+):
+    """
+    Defines the effective count of observations for a study from its
+    parameters, preferring counts of cases and controls.
+
+    arguments:
+        row (object): Pandas series of parameters for a study
+
+    raises:
+
+    returns:
+        (float): effective count of observations, or missing
+
+    """
+
+    value = calculate_observations_effective(
+        cases=[row["cases"],],
+        controls=[row["controls"],],
+    )[0]
+    if not numpy.isfinite(value):
+        value = float(row["observations_effective"])
+    return value
+
+
+def control_calculate_studies_observations_effective(
+    path_file_table_parameter=None,
+    studies_exclusion=None,
+    path_directory_source=None,
+    path_directory_product=None,
+    size_chunk=None,
+    cores=None,
+    report=None,
+):
+    """
+    Control procedure to calculate effective counts of observations for all
+    studies with logistic regression and inclusion in the parameter table.
+
+    The procedure copies all source files first, and the products for
+    studies with logistic regression replace their copies.
+
+    arguments:
+        path_file_table_parameter (str): path to file for parameter table of
+            studies
+        studies_exclusion (list<str>): identifiers of studies to copy without
+            calculation, such as those that already have effective counts of
+            observations
+        path_directory_source (str): path to directory of source files in
+            standard format ("*.txt.gz")
+        path_directory_product (str): path to directory of product files
+        size_chunk (int): count of rows in each chunk
+        cores (int): count of processing cores for parallel processes
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table of counts and summaries
+
+    """
+
+    # Initialize directories.
+    path_directory_batch = os.path.join(path_directory_product, "batch",)
+    putly.remove_directory(path=path_directory_batch) # caution
+    putly.create_directories(path=path_directory_batch)
+    # Copy all source files.
+    names_file = sorted(list(filter(
+        lambda name: name.endswith(".txt.gz"),
+        os.listdir(path_directory_source),
+    )))
+    for name_file in names_file:
+        shutil.copyfile(
+            os.path.join(path_directory_source, name_file),
+            os.path.join(path_directory_product, name_file),
+        )
+        pass
+    # Read source information from file.
+    table_parameter = pbpar.read_parameter_table(
+        path_file_table=path_file_table_parameter,
+        types_columns=None,
+        path_directory_cache=None,
+        report=False,
+    )
+    table_parameter = table_parameter.loc[
+        (
+            (table_parameter["inclusion"] == 1) &
+            (table_parameter["type"].str.strip() == "logistic")
+        ), :
+    ]
+    # Collect parameters specific to each instance.
+    instances = list()
+    for index, row in table_parameter.iterrows():
+        study = str(row["study"]).strip()
+        if (study in studies_exclusion):
+            continue
+        instance = dict()
+        instance["study"] = study
+        instance["observations_effective_study"] = (
+            define_observations_effective_study(row=row)
+        )
+        instance["path_file_source"] = os.path.join(
+            path_directory_source, str(study + ".txt.gz"),
+        )
+        instance["path_file_product"] = os.path.join(
+            path_directory_product, str(study + ".txt.gz"),
+        )
+        if os.path.exists(instance["path_file_source"]):
+            instances.append(instance)
+        pass
+    # Collect parameters common across all instances.
+    parameters = dict()
+    parameters["size_chunk"] = size_chunk
+    parameters["path_directory_batch"] = path_directory_batch
+    parameters["report"] = report
+    # Execute procedure iteratively with parallelization across instances.
+    if (len(instances) > 0):
+        prall.drive_procedure_parallel(
+            function_control=control_calculate_study_observations_effective,
+            instances=instances,
+            parameters=parameters,
+            cores=cores,
+            report=report,
+        )
+    # Collect records from all studies.
+    tables = list()
+    for instance in instances:
+        path_file_record = os.path.join(
+            path_directory_batch, str(instance["study"] + ".pickle"),
+        )
+        if os.path.exists(path_file_record):
+            tables.append(pandas.read_pickle(path_file_record))
+        pass
+    if (len(tables) > 0):
+        table = pandas.concat(
+            tables,
+            axis="index",
+            join="outer",
+            ignore_index=True,
+            copy=True,
+        )
+    else:
+        table = pandas.DataFrame(
+            columns=["study", "observations_effective_mean",]
+        )
+    # Write product information to file.
+    putly.write_tables_to_file(
+        pail_write={"table_observations_effective": table,},
+        path_directory=path_directory_product,
+        reset_index_rows=False,
+        write_index_rows=False,
+        write_index_columns=True,
+        type="text",
+        delimiter="\t",
+        suffix=".tsv",
+    )
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=4)
+        print("count of source files: " + str(len(names_file)))
+        print("count of studies with calculation: " + str(table.shape[0]))
+        putly.print_terminal_partition(level=4)
+        pass
+    # Return information.
+    return table
+
+
+###############################################################################
+# Procedure
+
+
+def execute_procedure(
+    path_directory_dock=None,
+):
+    """
+    Function to execute module's main behavior.
+
+    arguments:
+        path_directory_dock (str): path to dock directory for source and product
+            directories and files
+
+    raises:
+
+    returns:
+
+    """
+
+    ##########
+    # Parameters.
+    identifier_preparation = "gwas_preparation_2023-12-30"
+    identifier_parameter = "tcw_2023-12-30_dbsnp_rsid"
+    studies_exclusion = define_studies_exclusion_observations_effective()
+    size_chunk = 1000000
+    cores = 8
+    report = True
+
+    ##########
+    # Paths.
+    path_directory_source = os.path.join(
+        path_directory_dock, identifier_preparation,
+        "7_filter_constrain_gwas_values",
+    )
+    path_directory_product = os.path.join(
+        path_directory_dock, identifier_preparation,
+        "8_gwas_effective_observations",
+    )
+    path_file_table_parameter = os.path.join(
+        path_directory_dock, "parameters", "psychiatric_metabolism",
+        str("table_gwas_translation_" + identifier_parameter + ".tsv"),
+    )
+    putly.remove_directory(path=path_directory_product) # caution
+    putly.create_directories(path=path_directory_product)
+
+    ##########
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=3)
+        print("module: psychiatry_biomarkers.gwas_preparation.effective.py")
+        print("function: execute_procedure()")
+        putly.print_terminal_partition(level=5)
+        print("preparation: " + str(identifier_preparation))
+        print("parameter: " + str(identifier_parameter))
+        putly.print_terminal_partition(level=5)
+        pass
+
+    ##########
+    # Calculate effective observations for all logistic studies.
+    control_calculate_studies_observations_effective(
+        path_file_table_parameter=path_file_table_parameter,
+        studies_exclusion=studies_exclusion,
+        path_directory_source=path_directory_source,
+        path_directory_product=path_directory_product,
+        size_chunk=size_chunk,
+        cores=cores,
+        report=report,
+    )
+    pass
+
+
+###############################################################################
+# End
@@ -0,0 +1,765 @@
+"""
+Supply functionality for fill of missing allele frequencies in GWAS summary
+statistics from an indexed reference panel.
+
+This module 'frequency' is part of the 'gwas_preparation' package within the
+'psychiatry_biomarkers' package.
+
+Author:
+
+    T. Cameron Waller, Ph.D.
+    tcameronwaller@gmail.com
+    Rochester, Minnesota 55902
+    United States of America
+
+License:
+
+    This file is part of the project package directory 'psychiatry_biomarkers'
+    (https://github.com/tcameronwaller/psychiatry_biomarkers/).
+
+    Project 'psychiatry_biomarkers' supports data analysis with team in
+    psychiatry and pharmacogenomics.
+    Copyright (C) 2024 Thomas Cameron Waller
+
+    The code within project 'psychiatry_biomarkers' is free software: you can
+    redistribute it and/or modify it under the terms of the GNU General Public
+    License as published by the Free Software Foundation, either version 3 of
+    the GNU General Public License, or (at your option) any later version.
+
+    The code within project 'psychiatry_biomarkers' is distributed in the hope
+    that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+    warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with project 'psychiatry_biomarkers'. If not, see
+    <http://www.gnu.org/licenses/>.
+"""
+
+###############################################################################
+# Notes
+
+# The driver script "3_fill_nonsense_allele_frequency.sh" runs the script
+# "fill_nonsense_allele_frequency.sh" over each study to fill missing allele
+# frequencies with the nonsense value 0.5, so that GWAS2VCF keeps the variants.
+# This module instead fills frequencies from a reference panel of the
+# appropriate ancestry, such as European ancestry in 1000 Genomes, and only
+# uses a default value for variants without a match in the reference.
+
+# The index of the reference is a pair of binary arrays in NumPy's format
+# ("*.npy"), "keys.npy" of packed integer keys for chromosome, position, and
+# unordered pair of alleles (see module "variant_key") in sort order, and
+# "frequencies.npy" of the frequency of the allele that comes first in sort
+# order of the pair. The table "table_chromosomes.tsv" records the offsets of
+# each chromosome within the arrays and signifies a complete build. The build
+# happens once for each ancestry, and the fill maps the arrays into memory and
+# finds keys by binary search.
+
+# The source of the reference is a text table of frequencies, such as from
+# PLINK2 "--freq cols=+pos" ("*.afreq"), with columns for chromosome,
+# position, effect and other alleles, and frequency of the effect allele. The
+# build excludes variants with more than one alternate allele and keys that
+# occur more than once.
+
+# Since keys do not depend on which allele is the effect allele, the fill
+# orients the frequency from the reference to allele "A1" of each variant. The
+# fill looks up keys with alleles as given and then with the complements of
+# alleles, except for palindromic variants (A/T or C/G), for which the strand
+# is unknown.
+
+###############################################################################
+# Installation and importation
+
+# Standard
+
+import os
+
+# Relevant
+
+import numpy
+import pandas
+pandas.options.mode.chained_assignment = None # default = "warn"
+
+# Custom
+import partner.utility as putly
+import partner.parallelization as prall
+import psychiatry_biomarkers.gwas_preparation.standard_format as pbstd
+import psychiatry_biomarkers.gwas_preparation.variant_key as pbkey
+import psychiatry_biomarkers.profiling as pbprf
+
+###############################################################################
+# Functionality
+
+
+##########
+# 1. Build index of reference frequencies.
+
+
+def define_reference_frequency_columns():
+    """
+    Defines names of columns in the text table of reference allele
+    frequencies, which match PLINK2 "--freq cols=+pos".
+
+    arguments:
+
+    raises:
+
+    returns:
+        (dict<str>): names of columns
+
+    """
+
+    columns = dict()
+    columns["chromosome"] = "#CHROM"
+    columns["position"] = "POS"
+    columns["allele_effect"] = "ALT"
+    columns["allele_other"] = "REF"
+    columns["frequency"] = "ALT_FREQS"
+    return columns
+
+
+def determine_allele_first_order(
+    alleles_first=None,
+    alleles_second=None,
+):
+    """
+    Determines whether the first allele of each pair comes first in sort
+    order, consistent with the code of alleles in packed keys.
+
+    arguments:
+        alleles_first (object): Pandas series of first alleles
+        alleles_second (object): Pandas series of second alleles
+
+    raises:
+
+    returns:
+        (object): NumPy array of logical indicators
+
+    """
+
+    first = pandas.Series(
+        alleles_first
+    ).astype("string").str.strip().str.upper().fillna("")
+    second = pandas.Series(
+        alleles_second
+    ).astype("string").str.strip().str.upper().fillna("")
+    second.index = first.index
+    return (first <= second).to_numpy(dtype="bool")
+
+
+def build_reference_frequency_index(
+    path_file_reference=None,
+    columns_reference=None,
+    path_directory_index=None,
+    size_chunk=None,
+    report=None,
+):
+    """
+    Builds a binary index of reference allele frequencies by packed integer
+    keys.
+
+    arguments:
+        path_file_reference (str): path to text table of reference allele
+            frequencies
+        columns_reference (dict<str>): names of columns in reference table
+        path_directory_index (str): path to directory for files of index
+        size_chunk (int): count of rows in each chunk
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+
+    """
+
+    # Initialize directories.
+    putly.create_directories(path=path_directory_index)
+    # Read reference in chunks and collect compact arrays.
+    reader = pandas.read_csv(
+        path_file_reference,
+        sep="\t",
+        header=0,
+        usecols=list(columns_reference.values()),
+        dtype={
+            columns_reference["chromosome"]: "string",
+            columns_reference["allele_effect"]: "string",
+            columns_reference["allele_other"]: "string",
+        },
+        na_values=pbstd.define_missing_value_strings(),
+        keep_default_na=True,
+        compression="infer",
+        chunksize=size_chunk,
+    )
+    keys_chunks = list()
+    frequencies_chunks = list()
+    count_source = 0
+    for table in reader:
+        count_source += table.shape[0]
+        alleles_effect = table[columns_reference["allele_effect"]]
+        alleles_other = table[columns_reference["allele_other"]]
+        keys = pbkey.pack_variant_keys(
+            chromosomes=table[columns_reference["chromosome"]],
+            positions=table[columns_reference["position"]],
+            alleles_first=alleles_effect,
+            alleles_second=alleles_other,
+        )
+        frequencies = pandas.to_numeric(
+            table[columns_reference["frequency"]], errors="coerce",
+        ).to_numpy(dtype="float64", na_value=numpy.nan)
+        # Orient frequencies to the allele that comes first in sort order.
+        frequencies = numpy.where(
+            determine_allele_first_order(
+                alleles_first=alleles_effect,
+                alleles_second=alleles_other,
+            ),
+            frequencies, (1.0 - frequencies),
+        )
+        indicator_valid = (
+            (keys >= 0) &
+            numpy.isfinite(frequencies) &
+            (frequencies >= 0) & (frequencies <= 1) &
+            ~(
+                alleles_effect.str.contains(",", regex=False) |
+                alleles_other.str.contains(",", regex=False)
+            ).to_numpy(dtype="bool", na_value=True)
+        )
+        keys_chunks.append(keys[indicator_valid])
+        frequencies_chunks.append(
+            frequencies[indicator_valid].astype("float32")
+        )
+        pass
+    keys = numpy.concatenate(keys_chunks + [numpy.array([], dtype="int64"),])
+    frequencies = numpy.concatenate(
+        frequencies_chunks + [numpy.array([], dtype="float32"),]
+    )
+    del keys_chunks, frequencies_chunks
+    # Sort keys and exclude keys that occur more than once.
+    order = numpy.argsort(keys, kind="stable")
+    keys = keys[order]
+    frequencies = frequencies[order]
+    indicator_duplicate = numpy.zeros(keys.shape[0], dtype="bool")
+    if (keys.shape[0] > 1):
+        indicator_same = (keys[1:] == keys[:-1])
+        indicator_duplicate[1:] |= indicator_same
+        indicator_duplicate[:-1] |= indicator_same
+    keys = keys[~indicator_duplicate]
+    frequencies = frequencies[~indicator_duplicate]
+    # Determine offsets of chromosomes.
+    codes = pbkey.unpack_variant_keys(keys=keys)["chromosome"]
+    codes_unique = numpy.unique(codes)
+    table_chromosomes = pandas.DataFrame(data={
+        "code": codes_unique.astype("int64"),
+        "offset_start": numpy.searchsorted(codes, codes_unique, side="left"),
+        "offset_end": numpy.searchsorted(codes, codes_unique, side="right"),
+    })
+    table_chromosomes["count_keys"] = (
+        table_chromosomes["offset_end"] - table_chromosomes["offset_start"]
+    )
+    # Write arrays.
+    numpy.save(
+        os.path.join(path_directory_index, "keys.npy"), keys,
+        allow_pickle=False,
+    )
+    numpy.save(
+        os.path.join(path_directory_index, "frequencies.npy"), frequencies,
+        allow_pickle=False,
+    )
+    # Write table of chromosomes last, as it signifies a complete build.
+    putly.write_tables_to_file(
+        pail_write={"table_chromosomes": table_chromosomes,},
+        path_directory=path_directory_index,
+        reset_index_rows=False,
+        write_index_rows=False,
+        write_index_columns=True,
+        type="text",
+        delimiter="\t",
+        suffix=".tsv",
+    )
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=3)
+        print("module: psychiatry_biomarkers.gwas_preparation.frequency.py")
+        print("function: build_reference_frequency_index()")
+        putly.print_terminal_partition(level=5)
+        print("count of rows in reference: " + str(count_source))
+        print("count of keys in index: " + str(keys.shape[0]))
+        print(
+            "count of rows with duplicate keys: " +
+            str(int(indicator_duplicate.sum()))
+        )
+        putly.print_terminal_partition(level=5)
+        pass
+    pass
+
+
+##########
+# 2. Look up frequencies.
+
+
+def load_reference_frequency_index(
+    path_directory_index=None,
+):
+    """
+    Loads the binary index of reference allele frequencies with memory
+    mapping.
+
+    arguments:
+        path_directory_index (str): path to directory of files of index
+
+    raises:
+
+    returns:
+        (dict<object>): collection of information
+
+    """
+
+    pail = dict()
+    for name in ["keys", "frequencies",]:
+        pail[name] = numpy.load(
+            os.path.join(path_directory_index, str(name + ".npy")),
+            mmap_mode="r",
+            allow_pickle=False,
+        )
+        pass
+    pail["table_chromosomes"] = pandas.read_csv(
+        os.path.join(path_directory_index, "table_chromosomes.tsv"),
+        sep="\t",
+        header=0,
+    )
+    return pail
+
+
+def lookup_reference_frequencies(
+    index=None,
+    keys=None,
+):
+    """
+    Looks up reference frequencies of the alleles that come first in sort
+    order for packed keys by binary search.
+
+    arguments:
+        index (dict<object>): index from "load_reference_frequency_index"
+        keys (object): NumPy array of packed keys
+
+    raises:
+
+    returns:
+        (object): NumPy array of frequencies, or missing if no match
+
+    """
+
+    keys_index = index["keys"]
+    if (keys_index.shape[0] == 0):
+        return numpy.full(keys.shape[0], numpy.nan, dtype="float64")
+    positions = numpy.searchsorted(keys_index, keys, side="left")
+    positions_clip = numpy.minimum(positions, (keys_index.shape[0] - 1))
+    indicator_match = (
+        (keys >= 0) &
+        (positions < keys_index.shape[0]) &
+        (keys_index[positions_clip] == keys)
+    )
+    return numpy.where(
+        indicator_match,
+        index["frequencies"][positions_clip].astype("float64"),
+        numpy.nan,
+    )
+
+
+def fill_gwas_chunk_allele_frequency(
+    table=None,
+    index=None,
+    value_default=None,
+    counts=None,
+):
+    """
+    Fills missing or invalid frequencies of allele "A1" from the reference in
+    a chunk of GWAS summary statistics in the standard format.
+
+    arguments:
+        table (object): Pandas data-frame table of GWAS summary statistics in
+            standard format
+        index (dict<object>): index from "load_reference_frequency_index"
+        value_default (float): frequency for variants without a match in the
+            reference, or None to leave these missing
+        counts (dict<int>): counts of variants to update
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table
+
+    """
+
+    counts["source"] += table.shape[0]
+    frequencies = table["A1AF"].to_numpy(dtype="float64", na_value=numpy.nan)
+    indicator_fill = ~(
+        numpy.isfinite(frequencies) & (frequencies >= 0) & (frequencies <= 1)
+    )
+    counts["missing"] += int(indicator_fill.sum())
+    if (int(indicator_fill.sum()) == 0):
+        return table
+    # Look up alleles as given.
+    alleles_first = table["A1"].astype("string").str.strip().str.upper()
+    alleles_second = table["A2"].astype("string").str.strip().str.upper()
+    frequencies_direct = lookup_reference_frequencies(
+        index=index,
+        keys=pbkey.pack_variant_keys(
+            chromosomes=table["CHR"],
+            positions=table["BP"],
+            alleles_first=alleles_first,
+            alleles_second=alleles_second,
+        ),
+    )
+    frequencies_direct = numpy.where(
+        determine_allele_first_order(
+            alleles_first=alleles_first,
+            alleles_second=alleles_second,
+        ),
+        frequencies_direct, (1.0 - frequencies_direct),
+    )
+    # Look up complements of alleles for variants that are not palindromic.
+    complements_first = pbstd.complement_alleles(series=alleles_first)
+    complements_second = pbstd.complement_alleles(series=alleles_second)
+    indicator_palindrome = (
+        complements_first == alleles_second
+    ).to_numpy(dtype="bool", na_value=False)
+    frequencies_complement = lookup_reference_frequencies(
+        index=index,
+        keys=pbkey.pack_variant_keys(
+            chromosomes=table["CHR"],
+            positions=table["BP"],
+            alleles_first=complements_first,
+            alleles_second=complements_second,
+        ),
+    )
+    frequencies_complement = numpy.where(
+        determine_allele_first_order(
+            alleles_first=complements_first,
+            alleles_second=complements_second,
+        ),
+        frequencies_complement, (1.0 - frequencies_complement),
+    )
+    frequencies_complement = numpy.where(
+        indicator_palindrome, numpy.nan, frequencies_complement,
+    )
+    # Fill frequencies.
+    indicator_direct = ~numpy.isnan(frequencies_direct)
+    frequencies_reference = numpy.where(
+        indicator_direct, frequencies_direct, frequencies_complement,
+    )
+    indicator_match = ~numpy.isnan(frequencies_reference)
+    frequencies = numpy.where(
+        (indicator_fill & indicator_match), frequencies_reference, frequencies,
+    )
+    indicator_default = (indicator_fill & ~indicator_match)
+    if value_default is not None:
+        frequencies = numpy.where(
+            indicator_default, value_default, frequencies,
+        )
+    table["A1AF"] = frequencies
+    # Update counts.
+    counts["fill"] += int((indicator_fill & indicator_match).sum())
+    counts["fill_complement"] += int(
+        (indicator_fill & indicator_match & ~indicator_direct).sum()
+    )
+    counts["default"] += int(indicator_default.sum())
+    # Return information.
+    return table
+
+
+@pbprf.profile_procedure(category="study", keys_arguments=["study",])
+def control_fill_study_allele_frequency(
+    instance=None,
+    parameters=None,
+):
+    """
+    Control procedure to fill allele frequencies from the reference in GWAS
+    summary statistics for a single study in chunks of rows and to write the
+    product and counts of variants to file.
+
+    arguments:
+        instance (dict): parameters specific to current instance
+            study (str): identifier of study
+            path_file_source (str): path to source file
+            path_file_product (str): path to product file
+        parameters (dict): parameters common to all instances
+            path_directory_index (str): path to directory of files of index
+            value_default (float): frequency for variants without a match in
+                the reference, or None to leave these missing
+            size_chunk (int): count of rows in each chunk
+            path_directory_batch (str): path to directory for records of
+                individual studies
+            report (bool): whether to print reports
+
+    raises:
+
+    returns:
+
+    """
+
+    # Map index into memory, which does not copy the arrays.
+    index = load_reference_frequency_index(
+        path_directory_index=parameters["path_directory_index"],
+    )
+    # Fill, and write in chunks.
+    counts = {
+        "source": 0, "missing": 0, "fill": 0, "fill_complement": 0,
+        "default": 0,
+    }
+    reader = pbstd.read_gwas_standard_format_chunks(
+        path_file=instance["path_file_source"],
+        columns=None,
+        size_chunk=parameters["size_chunk"],
+    )
+    first = True
+    for table_chunk in reader:
+        table_product = fill_gwas_chunk_allele_frequency(
+            table=table_chunk,
+            index=index,
+            value_default=parameters["value_default"],
+            counts=counts,
+        )
+        pbstd.write_gwas_standard_format_chunk(
+            table=table_product,
+            path_file=instance["path_file_product"],
+            header=first,
+            mode=("w" if first else "a"),
+        )
+        first = False
+        pass
+    # Collect information.
+    record = dict()
+    record["study"] = instance["study"]
+    record.update(counts)
+    # Write product information to file.
+    pandas.DataFrame(data=[record,]).to_pickle(
+        os.path.join(
+            parameters["path_directory_batch"],
+            str(instance["study"] + ".pickle"),
+        )
+    )
+    # Report.
+    if parameters["report"]:
+        print(str(
+            "study: " + instance["study"] + "; missing: " +
+            str(counts["missing"]) + "; fill: " + str(counts["fill"])
+        ))
+        pass
+    pass
+
+
+##########
+# 3. Drive fill across studies.
+
+
+def control_fill_studies_allele_frequency(
+    path_file_reference=None,
+    columns_reference=None,
+    path_directory_index=None,
+    path_directory_source=None,
+    path_directory_product=None,
+    value_default=None,
+    size_chunk=None,
+    cores=None,
+    report=None,
+):
+    """
+    Control procedure to fill allele frequencies from the reference for all
+    studies in a directory, building the index first if it does not yet
+    exist.
+
+    arguments:
+        path_file_reference (str): path to text table of reference allele
+            frequencies
+        columns_reference (dict<str>): names of columns in reference table
+        path_directory_index (str): path to directory of files of index
+        path_directory_source (str): path to directory of source files in
+            standard format ("*.txt.gz")
+        path_directory_product (str): path to directory of product files
+        value_default (float): frequency for variants without a match in the
+            reference, or None to leave these missing
+        size_chunk (int): count of rows in each chunk
+        cores (int): count of processing cores for parallel processes
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table of counts of variants
+
+    """
+
+    # Initialize directories.
+    path_directory_batch = os.path.join(path_directory_product, "batch",)
+    putly.remove_directory(path=path_directory_batch) # caution
+    putly.create_directories(path=path_directory_batch)
+    # Build index.
+    if not os.path.exists(
+        os.path.join(path_directory_index, "table_chromosomes.tsv")
+    ):
+        build_reference_frequency_index(
+            path_file_reference=path_file_reference,
+            columns_reference=columns_reference,
+            path_directory_index=path_directory_index,
+            size_chunk=size_chunk,
+            report=report,
+        )
+    # Collect parameters specific to each instance.
+    names_source = sorted(list(filter(
+        lambda name: name.endswith(".txt.gz"),
+        os.listdir(path_directory_source),
+    )))
+    instances = list()
+    for name_file in names_source:
+        instance = dict()
+        instance["study"] = pbstd.define_study_identifier_from_file_name(
+            path_file=name_file,
+            suffix=".txt.gz",
+        )
+        instance["path_file_source"] = os.path.join(
+            path_directory_source, name_file,
+        )
+        instance["path_file_product"] = os.path.join(
+            path_directory_product, name_file,
+        )
+        instances.append(instance)
+        pass
+    # Collect parameters common across all instances.
+    parameters = dict()
+    parameters["path_directory_index"] = path_directory_index
+    parameters["value_default"] = value_default
+    parameters["size_chunk"] = size_chunk
+    parameters["path_directory_batch"] = path_directory_batch
+    parameters["report"] = report
+    # Execute procedure iteratively with parallelization across instances.
+    if (len(instances) > 0):
+        prall.drive_procedure_parallel(
+            function_control=control_fill_study_allele_frequency,
+            instances=instances,
+            parameters=parameters,
+            cores=cores,
+            report=report,
+        )
+    # Collect records from all studies.
+    tables = list()
+    for instance in instances:
+        path_file_record = os.path.join(
+            path_directory_batch, str(instance["study"] + ".pickle"),
+        )
+        if os.path.exists(path_file_record):
+            tables.append(pandas.read_pickle(path_file_record))
+        pass
+    if (len(tables) > 0):
+        table = pandas.concat(
+            tables,
+            axis="index",
+            join="outer",
+            ignore_index=True,
+            copy=True,
+        )
+    else:
+        table = pandas.DataFrame(columns=["study",])
+    # Write product information to file.
+    putly.write_tables_to_file(
+        pail_write={"table_allele_frequency_counts": table,},
+        path_directory=path_directory_product,
+        reset_index_rows=False,
+        write_index_rows=False,
+        write_index_columns=True,
+        type="text",
+        delimiter="\t",
+        suffix=".tsv",
+    )
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=4)
+        print("count of source files: " + str(len(names_source)))
+        print("count of studies with fill: " + str(table.shape[0]))
+        putly.print_terminal_partition(level=4)
+        pass
+    # Return information.
+    return table
+
+
+###############################################################################
+# Procedure
+
+
+def execute_procedure(
+    path_directory_dock=None,
+):
+    """
+    Function to execute module's main behavior.
+
+    arguments:
+        path_directory_dock (str): path to dock directory for source and product
+            directories and files
+
+    raises:
+
+    returns:
+
+    """
+
+    ##########
+    # Parameters.
+    identifier_preparation = "gwas_preparation_2023-12-30"
+    ancestry = "eur"
+    value_default = 0.5
+    size_chunk = 1000000
+    cores = 8
+    report = True
+
+    ##########
+    # Paths.
+    path_directory_reference = os.path.join(
+        path_directory_dock, "reference", "allele_frequency", "grch37",
+        ancestry,
+    )
+    path_file_reference = os.path.join(
+        path_directory_reference, "allele_frequency.afreq.gz",
+    )
+    path_directory_index = os.path.join(
+        path_directory_reference, "index_variant_key",
+    )
+    path_directory_source = os.path.join(
+        path_directory_dock, identifier_preparation,
+        "2_gwas_assembly_grch37",
+    )
+    path_directory_product = os.path.join(
+        path_directory_dock, identifier_preparation,
+        "3_gwas_fill_nonsense_allele_frequency",
+    )
+    putly.remove_directory(path=path_directory_product) # caution
+    putly.create_directories(path=path_directory_product)
+
+    ##########
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=3)
+        print("module: psychiatry_biomarkers.gwas_preparation.frequency.py")
+        print("function: execute_procedure()")
+        putly.print_terminal_partition(level=5)
+        print("preparation: " + str(identifier_preparation))
+        print("ancestry: " + str(ancestry))
+        putly.print_terminal_partition(level=5)
+        pass
+
+    ##########
+    # Fill allele frequencies for all studies.
+    control_fill_studies_allele_frequency(
+        path_file_reference=path_file_reference,
+        columns_reference=define_reference_frequency_columns(),
+        path_directory_index=path_directory_index,
+        path_directory_source=path_directory_source,
+        path_directory_product=path_directory_product,
+        value_default=value_default,
+        size_chunk=size_chunk,
+        cores=cores,
+        report=report,
+    )
+    pass
+
+
+###############################################################################
+# End
@@ -0,0 +1,970 @@
+"""
+Supply functionality for harmonization of alleles in GWAS summary statistics
+against the sequence of the reference genome.
+
+This module 'harmonization' is part of the 'gwas_preparation' package within
+the 'psychiatry_biomarkers' package.
+
+Author:
+
+    T. Cameron Waller, Ph.D.
+    tcameronwaller@gmail.com
+    Rochester, Minnesota 55902
+    United States of America
+
+License:
+
+    This file is part of the project package directory 'psychiatry_biomarkers'
+    (https://github.com/tcameronwaller/psychiatry_biomarkers/).
+
+    Project 'psychiatry_biomarkers' supports data analysis with team in
+    psychiatry and pharmacogenomics.
+    Copyright (C) 2024 Thomas Cameron Waller
+
+    The code within project 'psychiatry_biomarkers' is free software: you can
+    redistribute it and/or modify it under the terms of the GNU General Public
+    License as published by the Free Software Foundation, either version 3 of
+    the GNU General Public License, or (at your option) any later version.
+
+    The code within project 'psychiatry_biomarkers' is distributed in the hope
+    that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+    warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with project 'psychiatry_biomarkers'. If not, see
+    <http://www.gnu.org/licenses/>.
+"""
+
+###############################################################################
+# Notes
+
+# The driver script "6_clean_gwas_gwas2vcf.sh" submits a job for each study to
+# run GWAS2VCF, which checks alleles against the reference genome, harmonizes
+# them, and writes a VCF file that another step translates back to the
+# standard format. This module checks and harmonizes alleles directly in the
+# standard format, in chunks of rows with parallelization across studies.
+# GWAS2VCF remains useful as an optional validator of the products.
+
+# The reference genome for assembly GRCh37 (such as "human_g1k_v37.fasta")
+# converts once to a binary format in NumPy's format ("*.npy"), with
+# "sequence.npy" of nucleotides in two bits each (A = 0, C = 1, G = 2, T = 3),
+# four to a byte, and "intervals_start.npy" and "intervals_end.npy" of the
+# intervals of other characters, such as "N", in each chromosome. The table
+# "table_chromosomes.tsv" records lengths and offsets of each chromosome and
+# signifies a complete build. Lookups map the arrays into memory.
+
+# After harmonization, allele "A2" matches the reference and allele "A1",
+# the effect allele, is the alternate, as in the VCF files from GWAS2VCF.
+# 1. If "A2" matches the reference, the variant does not change.
+# 2. If "A1" matches the reference, the alleles swap, and the signs of "BETA"
+#    and "Z" and the frequency "A1AF" change to match.
+# 3. For variants that are not palindromic, if the complement of either
+#    allele matches the reference, the alleles change to their complements
+#    on the forward strand, and they swap if necessary.
+# 4. For palindromic variants (A/T or C/G), the strand is unknown. These
+#    variants are ambiguous if their allele frequency is missing or within a
+#    window around 0.5, and otherwise they follow the forward strand.
+# 5. Insertions and deletions follow the same rules without complements,
+#    by comparison of the alleles to the reference sequence from the
+#    position of the variant. The shorter allele is a prefix of the
+#    reference, so the longer allele matches first if it equals the full
+#    span of the reference (deletion), and only otherwise the shorter allele
+#    (insertion).
+# 6. Variants for which both alleles match the reference are ambiguous.
+# Variants without a match to the reference, without valid coordinates, or
+# at positions without a known nucleotide in the reference are dropped, as are
+# ambiguous variants unless the procedure keeps them.
+
+###############################################################################
+# Installation and importation
+
+# Standard
+
+import os
+import gzip
+
+# Relevant
+
+import numpy
+import pandas
+pandas.options.mode.chained_assignment = None # default = "warn"
+
+# Custom
+import partner.utility as putly
+import partner.parallelization as prall
+import psychiatry_biomarkers.gwas_preparation.standard_format as pbstd
+import psychiatry_biomarkers.gwas_preparation.variant_key as pbkey
+import psychiatry_biomarkers.profiling as pbprf
+
+###############################################################################
+# Functionality
+
+
+##########
+# 1. Build packed reference genome.
+
+
+def define_nucleotide_translation():
+    """
+    Defines a table to translate bytes of characters for nucleotides to codes
+    of two bits, or 4 for other characters.
+
+    arguments:
+
+    raises:
+
+    returns:
+        (object): NumPy array of codes for each of 256 bytes
+
+    """
+
+    translation = numpy.full(256, 4, dtype="uint8")
+    for character, code in zip("ACGT", range(4)):
+        translation[ord(character)] = code
+        translation[ord(character.lower())] = code
+        pass
+    return translation
+
+
+def pack_reference_chromosome_sequence(
+    sequence=None,
+):
+    """
+    Packs the sequence of a chromosome in codes of two bits, four to a byte,
+    and determines intervals of other characters.
+
+    arguments:
+        sequence (bytes): sequence of nucleotides
+
+    raises:
+
+    returns:
+        (dict<object>): NumPy arrays of packed sequence and of starts and ends
+            (0-based, end exclusive) of intervals of other characters
+
+    """
+
+    codes = define_nucleotide_translation()[
+        numpy.frombuffer(sequence, dtype="uint8")
+    ]
+    length = codes.shape[0]
+    # Determine intervals of other characters.
+    indicator_other = numpy.concatenate(
+        [[False,], (codes == 4), [False,],]
+    ).astype("int8")
+    changes = numpy.diff(indicator_other)
+    starts = numpy.flatnonzero(changes == 1).astype("int64")
+    ends = numpy.flatnonzero(changes == -1).astype("int64")
+    # Pack four codes to a byte.
+    codes = numpy.where((codes == 4), 0, codes).astype("uint8")
+    codes = numpy.concatenate(
+        [codes, numpy.zeros(((-length) % 4), dtype="uint8"),]
+    ).reshape((-1, 4))
+    packed = (
+        (codes[:, 0] << 6) | (codes[:, 1] << 4) | (codes[:, 2] << 2) |
+        codes[:, 3]
+    ).astype("uint8")
+    # Collect information.
+    pail = dict()
+    pail["length"] = length
+    pail["sequence"] = packed
+    pail["starts"] = starts
+    pail["ends"] = ends
+    # Return information.
+    return pail
+
+
+def read_fasta_records(
+    path_file_fasta=None,
+):
+    """
+    Reads records of sequences from a file in FASTA format one at a time.
+
+    arguments:
+        path_file_fasta (str): path to file in FASTA format, optionally with
+            compression by GZip
+
+    raises:
+
+    returns:
+        (object): iterator of tuples of name and sequence (bytes)
+
+    """
+
+    if path_file_fasta.endswith(".gz"):
+        handle = gzip.open(path_file_fasta, "rb")
+    else:
+        handle = open(path_file_fasta, "rb")
+    with handle:
+        name = None
+        lines = list()
+        for line in handle:
+            if line.startswith(b">"):
+                if name is not None:
+                    yield (name, b"".join(lines))
+                name = line[1:].split()[0].decode("ascii")
+                lines = list()
+            else:
+                lines.append(line.rstrip())
+            pass
+        if name is not None:
+            yield (name, b"".join(lines))
+    pass
+
+
+def build_reference_genome_binary(
+    path_file_fasta=None,
+    path_directory_binary=None,
+    report=None,
+):
+    """
+    Builds the packed binary format of the reference genome from a file in
+    FASTA format, for chromosomes 1-22, X, Y, and MT.
+
+    arguments:
+        path_file_fasta (str): path to file of reference genome in FASTA format
+        path_directory_binary (str): path to directory for binary files
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+
+    """
+
+    # Initialize directories.
+    putly.create_directories(path=path_directory_binary)
+    # Pack sequences of chromosomes.
+    records = list()
+    sequences = list()
+    starts = list()
+    ends = list()
+    offset_byte = 0
+    offset_interval = 0
+    for name, sequence in read_fasta_records(path_file_fasta=path_file_fasta):
+        code = int(pbkey.encode_chromosomes(chromosomes=[name,])[0])
+        if (code == 0):
+            continue
+        pail = pack_reference_chromosome_sequence(sequence=sequence)
+        del sequence
+        record = dict()
+        record["code"] = code
+        record["name"] = name
+        record["length"] = pail["length"]
+        record["offset_byte"] = offset_byte
+        record["offset_interval"] = offset_interval
+        record["count_interval"] = pail["starts"].shape[0]
+        records.append(record)
+        sequences.append(pail["sequence"])
+        starts.append(pail["starts"])
+        ends.append(pail["ends"])
+        offset_byte += pail["sequence"].shape[0]
+        offset_interval += pail["starts"].shape[0]
+        pass
+    table_chromosomes = pandas.DataFrame(data=records)
+    # Write arrays.
+    numpy.save(
+        os.path.join(path_directory_binary, "sequence.npy"),
+        numpy.concatenate(sequences + [numpy.array([], dtype="uint8"),]),
+        allow_pickle=False,
+    )
+    numpy.save(
+        os.path.join(path_directory_binary, "intervals_start.npy"),
+        numpy.concatenate(starts + [numpy.array([], dtype="int64"),]),
+        allow_pickle=False,
+    )
+    numpy.save(
+        os.path.join(path_directory_binary, "intervals_end.npy"),
+        numpy.concatenate(ends + [numpy.array([], dtype="int64"),]),
+        allow_pickle=False,
+    )
+    # Write table of chromosomes last, as it signifies a complete build.
+    putly.write_tables_to_file(
+        pail_write={"table_chromosomes": table_chromosomes,},
+        path_directory=path_directory_binary,
+        reset_index_rows=False,
+        write_index_rows=False,
+        write_index_columns=True,
+        type="text",
+        delimiter="\t",
+        suffix=".tsv",
+    )
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=3)
+        print("module: psychiatry_biomarkers.gwas_preparation.harmonization.py")
+        print("function: build_reference_genome_binary()")
+        putly.print_terminal_partition(level=5)
+        print("count of chromosomes: " + str(table_chromosomes.shape[0]))
+        print("count of nucleotides: " + str(int(
+            table_chromosomes["length"].sum()
+        )))
+        putly.print_terminal_partition(level=5)
+        pass
+    pass
+
+
+##########
+# 2. Look up reference sequence.
+
+
+def load_reference_genome_binary(
+    path_directory_binary=None,
+):
+    """
+    Loads the packed binary format of the reference genome with memory
+    mapping.
+
+    arguments:
+        path_directory_binary (str): path to directory of binary files
+
+    raises:
+
+    returns:
+        (dict<object>): collection of information
+
+    """
+
+    pail = dict()
+    for name in ["sequence", "intervals_start", "intervals_end",]:
+        pail[name] = numpy.load(
+            os.path.join(path_directory_binary, str(name + ".npy")),
+            mmap_mode="r",
+            allow_pickle=False,
+        )
+        pass
+    table_chromosomes = pandas.read_csv(
+        os.path.join(path_directory_binary, "table_chromosomes.tsv"),
+        sep="\t",
+        header=0,
+    )
+    pail["table_chromosomes"] = table_chromosomes
+    # Organize arrays by code of chromosome for vectorized lookup.
+    size = max(26, (int(table_chromosomes["code"].max()) + 1))
+    for name in [
+        "length", "offset_byte", "offset_interval", "count_interval",
+    ]:
+        values = numpy.zeros(size, dtype="int64")
+        values[table_chromosomes["code"].to_numpy(dtype="int64")] = (
+            table_chromosomes[name].to_numpy(dtype="int64")
+        )
+        pail[name] = values
+        pass
+    return pail
+
+
+def fetch_reference_sequences(
+    reference=None,
+    codes=None,
+    positions=None,
+    length=None,
+):
+    """
+    Fetches sequences of the reference genome of the same length from
+    positions on chromosomes.
+
+    arguments:
+        reference (dict<object>): reference from
+            "load_reference_genome_binary"
+        codes (object): NumPy array of codes of chromosomes
+        positions (object): NumPy array of positions (1-based)
+        length (int): length of sequences
+
+    raises:
+
+    returns:
+        (object): NumPy array of sequences, or None where unknown
+
+    """
+
+    codes = numpy.asarray(codes, dtype="int64")
+    positions = numpy.asarray(positions, dtype="int64")
+    codes_clip = numpy.clip(codes, 0, (reference["length"].shape[0] - 1))
+    starts = positions - 1
+    ends = starts + length
+    indicator_valid = (
+        (codes > 0) & (codes < reference["length"].shape[0]) &
+        (starts >= 0) & (ends <= reference["length"][codes_clip])
+    )
+    # Exclude sequences that overlap intervals of other characters.
+    intervals_start = reference["intervals_start"]
+    intervals_end = reference["intervals_end"]
+    for code in numpy.unique(codes_clip[indicator_valid]):
+        indicator_code = (indicator_valid & (codes_clip == code))
+        start = int(reference["offset_interval"][code])
+        count = int(reference["count_interval"][code])
+        if (count == 0):
+            continue
+        starts_code = numpy.asarray(intervals_start[start:(start + count)])
+        ends_code = numpy.asarray(intervals_end[start:(start + count)])
+        # Intervals do not overlap, so the last interval that starts before
+        # the end of the sequence is the only candidate for overlap.
+        index_interval = numpy.searchsorted(
+            starts_code, ends[indicator_code], side="left",
+        ) - 1
+        indicator_overlap = (
+            (index_interval >= 0) &
+            (ends_code[numpy.maximum(index_interval, 0)] > starts[
+                indicator_code
+            ])
+        )
+        indicator_valid[numpy.flatnonzero(indicator_code)[
+            indicator_overlap
+        ]] = False
+        pass
+    # Decode nucleotides.
+    nucleotides = numpy.array(list("ACGT"), dtype="<U1")
+    sequences = numpy.full(codes.shape[0], "", dtype=str("<U" + str(length)))
+    index_valid = numpy.flatnonzero(indicator_valid)
+    offsets_byte = reference["offset_byte"][codes_clip[index_valid]]
+    sequence = reference["sequence"]
+    for step in range(length):
+        positions_step = starts[index_valid] + step
+        bytes_step = numpy.asarray(
+            sequence[offsets_byte + (positions_step // 4)]
+        ).astype("int64")
+        shifts = (6 - (2 * (positions_step % 4)))
+        sequences[index_valid] = numpy.char.add(
+            sequences[index_valid],
+            nucleotides[(bytes_step >> shifts) & 3],
+        )
+        pass
+    sequences = sequences.astype("object")
+    sequences[~indicator_valid] = None
+    return sequences
+
+
+def fetch_reference_alleles(
+    reference=None,
+    codes=None,
+    positions=None,
+    lengths=None,
+):
+    """
+    Fetches sequences of the reference genome of various lengths from
+    positions on chromosomes, in groups of the same length.
+
+    arguments:
+        reference (dict<object>): reference from
+            "load_reference_genome_binary"
+        codes (object): NumPy array of codes of chromosomes
+        positions (object): NumPy array of positions (1-based)
+        lengths (object): NumPy array of lengths of sequences
+
+    raises:
+
+    returns:
+        (object): NumPy array of sequences, or None where unknown
+
+    """
+
+    lengths = numpy.asarray(lengths, dtype="int64")
+    sequences = numpy.full(lengths.shape[0], None, dtype="object")
+    for length in numpy.unique(lengths[lengths > 0]):
+        indicator_length = (lengths == length)
+        sequences[indicator_length] = fetch_reference_sequences(
+            reference=reference,
+            codes=numpy.asarray(codes)[indicator_length],
+            positions=numpy.asarray(positions)[indicator_length],
+            length=int(length),
+        )
+        pass
+    return sequences
+
+
+##########
+# 3. Harmonize alleles.
+
+
+def define_harmonization_counts():
+    """
+    Defines counts of variants for harmonization of alleles.
+
+    arguments:
+
+    raises:
+
+    returns:
+        (dict<int>): counts of variants
+
+    """
+
+    counts = dict()
+    counts["source"] = 0
+    counts["product"] = 0
+    counts["match"] = 0
+    counts["swap"] = 0
+    counts["strand"] = 0
+    counts["strand_swap"] = 0
+    counts["palindrome"] = 0
+    counts["ambiguous"] = 0
+    counts["mismatch"] = 0
+    counts["unknown"] = 0
+    counts["drop"] = 0
+    return counts
+
+
+def harmonize_gwas_chunk_alleles(
+    table=None,
+    reference=None,
+    threshold_palindrome=None,
+    keep_ambiguous=None,
+    counts=None,
+):
+    """
+    Harmonizes alleles against the reference genome within a chunk of GWAS
+    summary statistics in the standard format.
+
+    arguments:
+        table (object): Pandas data-frame table of GWAS summary statistics in
+            standard format
+        reference (dict<object>): reference from
+            "load_reference_genome_binary"
+        threshold_palindrome (float): half width of window around allele
+            frequency 0.5 within which palindromic variants are ambiguous
+        keep_ambiguous (bool): whether to keep ambiguous variants without
+            change
+        counts (dict<int>): counts of variants to update
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table
+
+    """
+
+    table.reset_index(level=None, inplace=True, drop=True,)
+    counts["source"] += table.shape[0]
+    # Organize alleles and coordinates.
+    first = table["A1"].astype("string").str.strip().str.upper()
+    second = table["A2"].astype("string").str.strip().str.upper()
+    complement_first = pbstd.complement_alleles(series=first)
+    complement_second = pbstd.complement_alleles(series=second)
+    codes = pbkey.encode_chromosomes(chromosomes=table["CHR"])
+    positions = pandas.to_numeric(
+        table["BP"], errors="coerce",
+    ).fillna(-1).to_numpy(dtype="int64")
+    lengths_first = first.str.len().fillna(0).to_numpy(dtype="int64")
+    lengths_second = second.str.len().fillna(0).to_numpy(dtype="int64")
+    # Fetch reference sequences with the length of each allele.
+    reference_first = pandas.Series(fetch_reference_alleles(
+        reference=reference,
+        codes=codes,
+        positions=positions,
+        lengths=lengths_first,
+    ), dtype="string")
+    reference_second = pandas.Series(fetch_reference_alleles(
+        reference=reference,
+        codes=codes,
+        positions=positions,
+        lengths=lengths_second,
+    ), dtype="string")
+    indicator_unknown = (
+        reference_first.isna() & reference_second.isna()
+    ).to_numpy(dtype="bool")
+    # Compare alleles to reference.
+    def compare(series, sequences):
+        return (series == sequences).to_numpy(dtype="bool", na_value=False)
+    indicator_single = ((lengths_first == 1) & (lengths_second == 1))
+    indicator_palindrome = (
+        indicator_single & compare(complement_first, second)
+    )
+    match_span_second = compare(second, reference_second)
+    match_span_first = compare(first, reference_first)
+    # The shorter allele of an insertion or deletion is a prefix of the
+    # reference whenever the longer allele matches the full span of the
+    # reference, so the longer allele takes priority. The longer allele is
+    # the reference for a deletion, and otherwise the shorter allele is the
+    # reference for an insertion.
+    indicator_indel = (
+        (lengths_first > 0) & (lengths_second > 0) &
+        (lengths_first != lengths_second)
+    )
+    indicator_first_longer = (lengths_first > lengths_second)
+    match_longer = numpy.where(
+        indicator_first_longer, match_span_first, match_span_second,
+    )
+    match_first = numpy.where(
+        indicator_indel,
+        numpy.where(
+            indicator_first_longer,
+            match_longer,
+            (~match_longer & match_span_first),
+        ),
+        match_span_first,
+    )
+    match_second = numpy.where(
+        indicator_indel,
+        numpy.where(
+            ~indicator_first_longer,
+            match_longer,
+            (~match_longer & match_span_second),
+        ),
+        match_span_second,
+    )
+    # Variants for which both alleles match the reference are ambiguous.
+    indicator_both = (match_first & match_second)
+    match_complement_second = (
+        indicator_single & ~indicator_palindrome &
+        compare(complement_second, reference_second)
+    )
+    match_complement_first = (
+        indicator_single & ~indicator_palindrome &
+        compare(complement_first, reference_first)
+    )
+    # Determine categories in sequence of priority.
+    indicator_match = match_second & ~indicator_both
+    indicator_swap = match_first & ~indicator_both
+    indicator_strand = (
+        ~indicator_both & ~indicator_match & ~indicator_swap &
+        match_complement_second
+    )
+    indicator_strand_swap = (
+        ~indicator_both & ~indicator_match & ~indicator_swap &
+        ~indicator_strand & match_complement_first
+    )
+    indicator_mismatch = (
+        ~indicator_unknown & ~indicator_both & ~indicator_match &
+        ~indicator_swap & ~indicator_strand & ~indicator_strand_swap
+    )
+    # Determine ambiguity of palindromic variants.
+    frequency = table["A1AF"].to_numpy(dtype="float64", na_value=numpy.nan)
+    indicator_ambiguous = indicator_both | (indicator_palindrome & (
+        numpy.isnan(frequency) |
+        (numpy.abs(frequency - 0.5) <= threshold_palindrome)
+    ))
+    # Apply complements and swaps.
+    indicator_complement = (indicator_strand | indicator_strand_swap)
+    indicator_exchange = (indicator_swap | indicator_strand_swap)
+    if keep_ambiguous:
+        indicator_exchange = (indicator_exchange & ~indicator_ambiguous)
+    first = first.where(~indicator_complement, complement_first)
+    second = second.where(~indicator_complement, complement_second)
+    table["A1"] = first.where(~indicator_exchange, second)
+    table["A2"] = second.where(~indicator_exchange, first)
+    sign = numpy.where(indicator_exchange, -1.0, 1.0)
+    table["BETA"] = table["BETA"].astype("float64") * sign
+    table["Z"] = table["Z"].astype("float64") * sign
+    table["A1AF"] = numpy.where(
+        indicator_exchange, (1.0 - frequency), frequency,
+    )
+    # Filter variants.
+    indicator_drop = (indicator_unknown | indicator_mismatch)
+    if not keep_ambiguous:
+        indicator_drop = (indicator_drop | indicator_ambiguous)
+    table = table.loc[~indicator_drop, :]
+    # Update counts.
+    counts["match"] += int(indicator_match.sum())
+    counts["swap"] += int(indicator_swap.sum())
+    counts["strand"] += int(indicator_strand.sum())
+    counts["strand_swap"] += int(indicator_strand_swap.sum())
+    counts["palindrome"] += int(indicator_palindrome.sum())
+    counts["ambiguous"] += int(indicator_ambiguous.sum())
+    counts["mismatch"] += int(indicator_mismatch.sum())
+    counts["unknown"] += int(indicator_unknown.sum())
+    counts["drop"] += int(indicator_drop.sum())
+    counts["product"] += table.shape[0]
+    # Return information.
+    return table
+
+
+@pbprf.profile_procedure(category="study", keys_arguments=["study",])
+def control_harmonize_study_alleles(
+    instance=None,
+    parameters=None,
+):
+    """
+    Control procedure to harmonize alleles against the reference genome in
+    GWAS summary statistics for a single study in chunks of rows and to write
+    the product and counts of variants to file.
+
+    arguments:
+        instance (dict): parameters specific to current instance
+            study (str): identifier of study
+            path_file_source (str): path to source file
+            path_file_product (str): path to product file
+        parameters (dict): parameters common to all instances
+            path_directory_binary (str): path to directory of binary files of
+                reference genome
+            threshold_palindrome (float): half width of window around allele
+                frequency 0.5 within which palindromic variants are ambiguous
+            keep_ambiguous (bool): whether to keep ambiguous variants without
+                change
+            size_chunk (int): count of rows in each chunk
+            path_directory_batch (str): path to directory for records of
+                individual studies
+            report (bool): whether to print reports
+
+    raises:
+
+    returns:
+
+    """
+
+    # Map reference into memory, which does not copy the arrays.
+    reference = load_reference_genome_binary(
+        path_directory_binary=parameters["path_directory_binary"],
+    )
+    # Harmonize, and write in chunks.
+    counts = define_harmonization_counts()
+    reader = pbstd.read_gwas_standard_format_chunks(
+        path_file=instance["path_file_source"],
+        columns=None,
+        size_chunk=parameters["size_chunk"],
+    )
+    first = True
+    for table_chunk in reader:
+        table_product = harmonize_gwas_chunk_alleles(
+            table=table_chunk,
+            reference=reference,
+            threshold_palindrome=parameters["threshold_palindrome"],
+            keep_ambiguous=parameters["keep_ambiguous"],
+            counts=counts,
+        )
+        pbstd.write_gwas_standard_format_chunk(
+            table=table_product,
+            path_file=instance["path_file_product"],
+            header=first,
+            mode=("w" if first else "a"),
+        )
+        first = False
+        pass
+    # Collect information.
+    record = dict()
+    record["study"] = instance["study"]
+    record.update(counts)
+    # Write product information to file.
+    pandas.DataFrame(data=[record,]).to_pickle(
+        os.path.join(
+            parameters["path_directory_batch"],
+            str(instance["study"] + ".pickle"),
+        )
+    )
+    # Report.
+    if parameters["report"]:
+        print(str(
+            "study: " + instance["study"] + "; source: " +
+            str(counts["source"]) + "; swap: " + str(counts["swap"]) +
+            "; strand: " + str(counts["strand"] + counts["strand_swap"]) +
+            "; drop: " + str(counts["drop"])
+        ))
+        pass
+    pass
+
+
+##########
+# 4. Drive harmonization across studies.
+
+
+def control_harmonize_studies_alleles(
+    path_file_fasta=None,
+    path_directory_binary=None,
+    path_directory_source=None,
+    path_directory_product=None,
+    threshold_palindrome=None,
+    keep_ambiguous=None,
+    size_chunk=None,
+    cores=None,
+    report=None,
+):
+    """
+    Control procedure to harmonize alleles against the reference genome for
+    all studies in a directory, building the binary reference first if it
+    does not yet exist.
+
+    arguments:
+        path_file_fasta (str): path to file of reference genome in FASTA format
+        path_directory_binary (str): path to directory of binary files of
+            reference genome
+        path_directory_source (str): path to directory of source files in
+            standard format ("*.txt.gz")
+        path_directory_product (str): path to directory of product files
+        threshold_palindrome (float): half width of window around allele
+            frequency 0.5 within which palindromic variants are ambiguous
+        keep_ambiguous (bool): whether to keep ambiguous variants without
+            change
+        size_chunk (int): count of rows in each chunk
+        cores (int): count of processing cores for parallel processes
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table of counts of variants
+
+    """
+
+    # Initialize directories.
+    path_directory_batch = os.path.join(path_directory_product, "batch",)
+    putly.remove_directory(path=path_directory_batch) # caution
+    putly.create_directories(path=path_directory_batch)
+    # Build binary reference.
+    if not os.path.exists(
+        os.path.join(path_directory_binary, "table_chromosomes.tsv")
+    ):
+        build_reference_genome_binary(
+            path_file_fasta=path_file_fasta,
+            path_directory_binary=path_directory_binary,
+            report=report,
+        )
+    # Collect parameters specific to each instance.
+    names_source = sorted(list(filter(
+        lambda name: name.endswith(".txt.gz"),
+        os.listdir(path_directory_source),
+    )))
+    instances = list()
+    for name_file in names_source:
+        instance = dict()
+        instance["study"] = pbstd.define_study_identifier_from_file_name(
+            path_file=name_file,
+            suffix=".txt.gz",
+        )
+        instance["path_file_source"] = os.path.join(
+            path_directory_source, name_file,
+        )
+        instance["path_file_product"] = os.path.join(
+            path_directory_product, name_file,
+        )
+        instances.append(instance)
+        pass
+    # Collect parameters common across all instances.
+    parameters = dict()
+    parameters["path_directory_binary"] = path_directory_binary
+    parameters["threshold_palindrome"] = threshold_palindrome
+    parameters["keep_ambiguous"] = keep_ambiguous
+    parameters["size_chunk"] = size_chunk
+    parameters["path_directory_batch"] = path_directory_batch
+    parameters["report"] = report
+    # Execute procedure iteratively with parallelization across instances.
+    if (len(instances) > 0):
+        prall.drive_procedure_parallel(
+            function_control=control_harmonize_study_alleles,
+            instances=instances,
+            parameters=parameters,
+            cores=cores,
+            report=report,
+        )
+    # Collect records from all studies.
+    tables = list()
+    for instance in instances:
+        path_file_record = os.path.join(
+            path_directory_batch, str(instance["study"] + ".pickle"),
+        )
+        if os.path.exists(path_file_record):
+            tables.append(pandas.read_pickle(path_file_record))
+        pass
+    if (len(tables) > 0):
+        table = pandas.concat(
+            tables,
+            axis="index",
+            join="outer",
+            ignore_index=True,
+            copy=True,
+        )
+    else:
+        table = pandas.DataFrame(
+            columns=(["study",] + list(define_harmonization_counts().keys()))
+        )
+    # Write product information to file.
+    putly.write_tables_to_file(
+        pail_write={"table_harmonization_counts": table,},
+        path_directory=path_directory_product,
+        reset_index_rows=False,
+        write_index_rows=False,
+        write_index_columns=True,
+        type="text",
+        delimiter="\t",
+        suffix=".tsv",
+    )
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=4)
+        print("count of source files: " + str(len(names_source)))
+        print("count of studies with harmonization: " + str(table.shape[0]))
+        putly.print_terminal_partition(level=4)
+        pass
+    # Return information.
+    return table
+
+
+###############################################################################
+# Procedure
+
+
+def execute_procedure(
+    path_directory_dock=None,
+):
+    """
+    Function to execute module's main behavior.
+
+    arguments:
+        path_directory_dock (str): path to dock directory for source and product
+            directories and files
+
+    raises:
+
+    returns:
+
+    """
+
+    ##########
+    # Parameters.
+    identifier_preparation = "gwas_preparation_2023-12-30"
+    threshold_palindrome = 0.08
+    keep_ambiguous = False
+    size_chunk = 1000000
+    cores = 8
+    report = True
+
+    ##########
+    # Paths.
+    path_directory_genome = os.path.join(
+        path_directory_dock, "reference", "genome", "grch37",
+    )
+    path_file_fasta = os.path.join(
+        path_directory_genome, "human_g1k_v37.fasta.gz",
+    )
+    path_directory_binary = os.path.join(
+        path_directory_genome, "binary_packed",
+    )
+    path_directory_source = os.path.join(
+        path_directory_dock, identifier_preparation,
+        "5_fill_dbsnp_rs_identifiers",
+    )
+    path_directory_product = os.path.join(
+        path_directory_dock, identifier_preparation,
+        "6_gwas_clean_harmonization",
+    )
+    putly.remove_directory(path=path_directory_product) # caution
+    putly.create_directories(path=path_directory_product)
+
+    ##########
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=3)
+        print("module: psychiatry_biomarkers.gwas_preparation.harmonization.py")
+        print("function: execute_procedure()")
+        putly.print_terminal_partition(level=5)
+        print("preparation: " + str(identifier_preparation))
+        putly.print_terminal_partition(level=5)
+        pass
+
+    ##########
+    # Harmonize alleles for all studies.
+    control_harmonize_studies_alleles(
+        path_file_fasta=path_file_fasta,
+        path_directory_binary=path_directory_binary,
+        path_directory_source=path_directory_source,
+        path_directory_product=path_directory_product,
+        threshold_palindrome=threshold_palindrome,
+        keep_ambiguous=keep_ambiguous,
+        size_chunk=size_chunk,
+        cores=cores,
+        report=report,
+    )
+    pass
+
+
+###############################################################################
+# End
@@ -0,0 +1,595 @@
+"""
+Supply functionality for merge of identifiers of variants from stored GWAS
+summary statistics into current GWAS summary statistics by a join of sorted
+streams.
+
+This module 'merge' is part of the 'gwas_preparation' package within the
+'psychiatry_biomarkers' package.
+
+Author:
+
+    T. Cameron Waller, Ph.D.
+    tcameronwaller@gmail.com
+    Rochester, Minnesota 55902
+    United States of America
+
+License:
+
+    This file is part of the project package directory 'psychiatry_biomarkers'
+    (https://github.com/tcameronwaller/psychiatry_biomarkers/).
+
+    Project 'psychiatry_biomarkers' supports data analysis with team in
+    psychiatry and pharmacogenomics.
+    Copyright (C) 2024 Thomas Cameron Waller
+
+    The code within project 'psychiatry_biomarkers' is free software: you can
+    redistribute it and/or modify it under the terms of the GNU General Public
+    License as published by the Free Software Foundation, either version 3 of
+    the GNU General Public License, or (at your option) any later version.
+
+    The code within project 'psychiatry_biomarkers' is distributed in the hope
+    that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+    warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with project 'psychiatry_biomarkers'. If not, see
+    <http://www.gnu.org/licenses/>.
+"""
+
+###############################################################################
+# Notes
+
+# The driver script "5_3_merge_dbsnp_rsid_gwas_from_storage.sh" brings the
+# products of a previous batch that filled rsIDs from dbSNP back into the
+# current batch. This module joins each current file ("left") to its stored
+# counterpart with rsIDs ("right") on packed keys of chromosome, position, and
+# alleles (see module "variant_key"), and it writes the current summary
+# statistics with identifiers from storage.
+
+# Both files must be in sort order of chromosome (1-22, X, Y, MT) and then
+# position. The join reads both files in chunks and keeps in memory only the
+# rows of the right file from the last position of the previous chunk of the
+# left file onward, so that use of memory does not depend on the count of
+# variants. A variant of the left file is ambiguous when more than one row of
+# the right file with different identifiers has the same key; such variants
+# keep their current identifiers.
+
+###############################################################################
+# Installation and importation
+
+# Standard
+
+import os
+import shutil
+
+# Relevant
+
+import numpy
+import pandas
+pandas.options.mode.chained_assignment = None # default = "warn"
+
+# Custom
+import partner.utility as putly
+import partner.parallelization as prall
+import psychiatry_biomarkers.gwas_preparation.standard_format as pbstd
+import psychiatry_biomarkers.gwas_preparation.variant_key as pbkey
+
+###############################################################################
+# Functionality
+
+
+##########
+# 1. Join sorted streams.
+
+
+def organize_chunk_keys(
+    table=None,
+    label=None,
+    position_previous=None,
+):
+    """
+    Organizes packed keys of variants and keys of their positions for a chunk
+    of GWAS summary statistics, and checks the sort order of positions.
+
+    arguments:
+        table (object): Pandas data-frame table of GWAS summary statistics in
+            standard format
+        label (str): label of stream for messages
+        position_previous (int): last key of position from previous chunk
+
+    raises:
+        ValueError: if positions are not in sort order
+
+    returns:
+        (dict<object>): NumPy arrays of keys of variants and of positions
+
+    """
+
+    keys_position = pbkey.pack_position_keys(
+        chromosomes=table["CHR"],
+        positions=table["BP"],
+    )
+    keys = pbkey.pack_variant_keys(
+        chromosomes=table["CHR"],
+        positions=table["BP"],
+        alleles_first=table["A1"],
+        alleles_second=table["A2"],
+    )
+    # Check sort order, ignoring variants without valid position.
+    positions_valid = keys_position[keys_position >= 0]
+    if (positions_valid.shape[0] > 0):
+        sequence = numpy.concatenate(
+            [[position_previous,], positions_valid,]
+        )
+        if numpy.any(numpy.diff(sequence) < 0):
+            raise ValueError(str(
+                "Positions in " + label + " stream are not in sort order " +
+                "of chromosome (1-22, X, Y, MT) and position."
+            ))
+        position_last = int(positions_valid[-1])
+    else:
+        position_last = position_previous
+    # Collect information.
+    pail = dict()
+    pail["keys"] = keys
+    pail["keys_position"] = keys_position
+    pail["position_last"] = position_last
+    # Return information.
+    return pail
+
+
+def define_merge_join_counts():
+    """
+    Defines counts of rows for a merge join.
+
+    arguments:
+
+    raises:
+
+    returns:
+        (dict<int>): counts of rows
+
+    """
+
+    counts = dict()
+    counts["left"] = 0
+    counts["right"] = 0
+    counts["match"] = 0
+    counts["ambiguous"] = 0
+    counts["unmatch_left"] = 0
+    counts["unmatch_right"] = 0
+    return counts
+
+
+def merge_join_sorted_streams(
+    path_file_left=None,
+    path_file_right=None,
+    path_file_product=None,
+    size_chunk=None,
+):
+    """
+    Joins two files of GWAS summary statistics in sort order of position, and
+    writes the left file with identifiers of variants from the right file.
+
+    arguments:
+        path_file_left (str): path to file of current summary statistics
+        path_file_right (str): path to file of stored summary statistics with
+            identifiers
+        path_file_product (str): path to product file
+        size_chunk (int): count of rows in each chunk
+
+    raises:
+
+    returns:
+        (dict<int>): counts of rows
+
+    """
+
+    counts = define_merge_join_counts()
+    reader_left = pbstd.read_gwas_standard_format_chunks(
+        path_file=path_file_left,
+        columns=None,
+        size_chunk=size_chunk,
+    )
+    reader_right = pbstd.read_gwas_standard_format_chunks(
+        path_file=path_file_right,
+        columns=["SNP", "CHR", "BP", "A1", "A2",],
+        size_chunk=size_chunk,
+    )
+    # Initialize buffer of right stream, in sort order of keys.
+    buffer_keys = numpy.array([], dtype="int64")
+    buffer_positions = numpy.array([], dtype="int64")
+    buffer_identifiers = numpy.array([], dtype="object")
+    buffer_match = numpy.array([], dtype="bool")
+    exhaust_right = False
+    position_right = -1
+    position_left = -1
+    first = True
+    for table_left in reader_left:
+        table_left.reset_index(level=None, inplace=True, drop=True,)
+        counts["left"] += table_left.shape[0]
+        pail_left = organize_chunk_keys(
+            table=table_left,
+            label="left",
+            position_previous=position_left,
+        )
+        position_left = pail_left["position_last"]
+        # Read right stream until beyond last position of left chunk.
+        while (not exhaust_right) and (position_right <= position_left):
+            try:
+                table_right = next(reader_right)
+            except StopIteration:
+                exhaust_right = True
+                break
+            counts["right"] += table_right.shape[0]
+            pail_right = organize_chunk_keys(
+                table=table_right,
+                label="right",
+                position_previous=position_right,
+            )
+            position_right = pail_right["position_last"]
+            indicator_valid = (pail_right["keys"] >= 0)
+            counts["unmatch_right"] += int((~indicator_valid).sum())
+            buffer_keys = numpy.concatenate(
+                [buffer_keys, pail_right["keys"][indicator_valid],]
+            )
+            buffer_positions = numpy.concatenate(
+                [
+                    buffer_positions,
+                    pail_right["keys_position"][indicator_valid],
+                ]
+            )
+            buffer_identifiers = numpy.concatenate(
+                [
+                    buffer_identifiers,
+                    table_right["SNP"].to_numpy(
+                        dtype="object", na_value=None,
+                    )[indicator_valid],
+                ]
+            )
+            buffer_match = numpy.concatenate(
+                [
+                    buffer_match,
+                    numpy.zeros(indicator_valid.sum(), dtype="bool"),
+                ]
+            )
+            order = numpy.argsort(buffer_keys, kind="stable")
+            buffer_keys = buffer_keys[order]
+            buffer_positions = buffer_positions[order]
+            buffer_identifiers = buffer_identifiers[order]
+            buffer_match = buffer_match[order]
+            pass
+        # Match keys of left chunk within buffer.
+        keys_left = pail_left["keys"]
+        index_low = numpy.searchsorted(buffer_keys, keys_left, side="left")
+        index_high = numpy.searchsorted(buffer_keys, keys_left, side="right")
+        count_candidates = numpy.where(
+            (keys_left >= 0), (index_high - index_low), 0,
+        )
+        index_clip = numpy.minimum(index_low, max(0, buffer_keys.shape[0] - 1))
+        identifiers = numpy.full(keys_left.shape[0], None, dtype="object")
+        if (buffer_keys.shape[0] > 0):
+            identifiers = numpy.where(
+                (count_candidates > 0), buffer_identifiers[index_clip], None,
+            )
+        # Determine ambiguity among candidates with different identifiers.
+        indicator_ambiguous = numpy.zeros(keys_left.shape[0], dtype="bool")
+        for index in numpy.flatnonzero(count_candidates > 1):
+            candidates = buffer_identifiers[index_low[index]:index_high[index]]
+            if (len(set(candidates)) > 1):
+                indicator_ambiguous[index] = True
+            pass
+        indicator_match = (
+            (count_candidates > 0) & ~indicator_ambiguous &
+            pandas.notna(identifiers)
+        )
+        # Record matches within buffer by a difference array over intervals.
+        indicator_candidate = (count_candidates > 0)
+        differences = numpy.zeros((buffer_keys.shape[0] + 1), dtype="int64")
+        numpy.add.at(differences, index_low[indicator_candidate], 1)
+        numpy.add.at(differences, index_high[indicator_candidate], -1)
+        buffer_match |= (numpy.cumsum(differences)[:-1] > 0)
+        # Replace identifiers.
+        table_left["SNP"] = table_left["SNP"].astype("string").where(
+            ~indicator_match,
+            pandas.Series(identifiers, dtype="string"),
+        )
+        counts["match"] += int(indicator_match.sum())
+        counts["ambiguous"] += int(indicator_ambiguous.sum())
+        counts["unmatch_left"] += int((count_candidates == 0).sum())
+        # Write product information to file.
+        pbstd.write_gwas_standard_format_chunk(
+            table=table_left,
+            path_file=path_file_product,
+            header=first,
+            mode=("w" if first else "a"),
+        )
+        first = False
+        # Remove rows of buffer before the last position of left chunk.
+        indicator_keep = (buffer_positions >= position_left)
+        counts["unmatch_right"] += int(
+            (~indicator_keep & ~buffer_match).sum()
+        )
+        buffer_keys = buffer_keys[indicator_keep]
+        buffer_positions = buffer_positions[indicator_keep]
+        buffer_identifiers = buffer_identifiers[indicator_keep]
+        buffer_match = buffer_match[indicator_keep]
+        pass
+    # Count remaining rows of right stream.
+    counts["unmatch_right"] += int((~buffer_match).sum())
+    if not exhaust_right:
+        for table_right in reader_right:
+            counts["right"] += table_right.shape[0]
+            counts["unmatch_right"] += table_right.shape[0]
+            pass
+    # Return information.
+    return counts
+
+
+def control_merge_study_storage(
+    instance=None,
+    parameters=None,
+):
+    """
+    Control procedure to join current and stored GWAS summary statistics for
+    a single study and to write the product and counts of rows to file.
+
+    arguments:
+        instance (dict): parameters specific to current instance
+            study (str): identifier of study
+            path_file_left (str): path to file of current summary statistics
+            path_file_right (str): path to file of stored summary statistics
+            path_file_product (str): path to product file
+        parameters (dict): parameters common to all instances
+            size_chunk (int): count of rows in each chunk
+            path_directory_batch (str): path to directory for records of
+                individual studies
+            report (bool): whether to print reports
+
+    raises:
+
+    returns:
+
+    """
+
+    counts = merge_join_sorted_streams(
+        path_file_left=instance["path_file_left"],
+        path_file_right=instance["path_file_right"],
+        path_file_product=instance["path_file_product"],
+        size_chunk=parameters["size_chunk"],
+    )
+    # Collect information.
+    record = dict()
+    record["study"] = instance["study"]
+    record.update(counts)
+    # Write product information to file.
+    pandas.DataFrame(data=[record,]).to_pickle(
+        os.path.join(
+            parameters["path_directory_batch"],
+            str(instance["study"] + ".pickle"),
+        )
+    )
+    # Report.
+    if parameters["report"]:
+        print(str(
+            "study: " + instance["study"] + "; left: " + str(counts["left"]) +
+            "; match: " + str(counts["match"]) + "; ambiguous: " +
+            str(counts["ambiguous"])
+        ))
+        pass
+    pass
+
+
+##########
+# 2. Drive merge across studies.
+
+
+def control_merge_studies_storage(
+    path_directory_source=None,
+    path_directory_storage=None,
+    path_directory_product=None,
+    suffix_study=None,
+    size_chunk=None,
+    cores=None,
+    report=None,
+):
+    """
+    Control procedure to copy all current GWAS summary statistics and to join
+    each study in storage with its current counterpart.
+
+    The product of each join has the identifier of the study with a suffix,
+    such as "37872160_williams_2023_dbsnp_rsid", to match the parameter table.
+
+    arguments:
+        path_directory_source (str): path to directory of current files in
+            standard format ("*.txt.gz")
+        path_directory_storage (str): path to directory of stored files with
+            identifiers
+        path_directory_product (str): path to directory of product files
+        suffix_study (str): suffix of identifiers of studies from storage
+        size_chunk (int): count of rows in each chunk
+        cores (int): count of processing cores for parallel processes
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table of counts of rows
+
+    """
+
+    # Initialize directories.
+    path_directory_batch = os.path.join(path_directory_product, "batch",)
+    putly.remove_directory(path=path_directory_batch) # caution
+    putly.create_directories(path=path_directory_batch)
+    # Copy all current files.
+    names_source = sorted(list(filter(
+        lambda name: name.endswith(".txt.gz"),
+        os.listdir(path_directory_source),
+    )))
+    for name_file in names_source:
+        shutil.copyfile(
+            os.path.join(path_directory_source, name_file),
+            os.path.join(path_directory_product, name_file),
+        )
+        pass
+    # Collect parameters specific to each instance.
+    names_storage = sorted(list(filter(
+        lambda name: name.endswith(".txt.gz"),
+        os.listdir(path_directory_storage),
+    )))
+    instances = list()
+    for name_file in names_storage:
+        study_source = pbstd.define_study_identifier_from_file_name(
+            path_file=name_file,
+            suffix=".txt.gz",
+        )
+        if name_file not in names_source:
+            continue
+        instance = dict()
+        instance["study"] = str(study_source + suffix_study)
+        instance["path_file_left"] = os.path.join(
+            path_directory_source, name_file,
+        )
+        instance["path_file_right"] = os.path.join(
+            path_directory_storage, name_file,
+        )
+        instance["path_file_product"] = os.path.join(
+            path_directory_product, str(instance["study"] + ".txt.gz"),
+        )
+        instances.append(instance)
+        pass
+    # Collect parameters common across all instances.
+    parameters = dict()
+    parameters["size_chunk"] = size_chunk
+    parameters["path_directory_batch"] = path_directory_batch
+    parameters["report"] = report
+    # Execute procedure iteratively with parallelization across instances.
+    if (len(instances) > 0):
+        prall.drive_procedure_parallel(
+            function_control=control_merge_study_storage,
+            instances=instances,
+            parameters=parameters,
+            cores=cores,
+            report=report,
+        )
+    # Collect records from all studies.
+    tables = list()
+    for instance in instances:
+        path_file_record = os.path.join(
+            path_directory_batch, str(instance["study"] + ".pickle"),
+        )
+        if os.path.exists(path_file_record):
+            tables.append(pandas.read_pickle(path_file_record))
+        pass
+    if (len(tables) > 0):
+        table = pandas.concat(
+            tables,
+            axis="index",
+            join="outer",
+            ignore_index=True,
+            copy=True,
+        )
+    else:
+        table = pandas.DataFrame(
+            columns=(["study",] + list(define_merge_join_counts().keys()))
+        )
+    # Write product information to file.
+    putly.write_tables_to_file(
+        pail_write={"table_merge_storage_counts": table,},
+        path_directory=path_directory_product,
+        reset_index_rows=False,
+        write_index_rows=False,
+        write_index_columns=True,
+        type="text",
+        delimiter="\t",
+        suffix=".tsv",
+    )
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=4)
+        print("count of current files: " + str(len(names_source)))
+        print("count of stored files: " + str(len(names_storage)))
+        print("count of joins: " + str(table.shape[0]))
+        putly.print_terminal_partition(level=4)
+        pass
+    # Return information.
+    return table
+
+
+###############################################################################
+# Procedure
+
+
+def execute_procedure(
+    path_directory_dock=None,
+):
+    """
+    Function to execute module's main behavior.
+
+    arguments:
+        path_directory_dock (str): path to dock directory for source and product
+            directories and files
+
+    raises:
+
+    returns:
+
+    """
+
+    ##########
+    # Parameters.
+    identifier_preparation = "gwas_preparation_2023-12-30"
+    identifier_preparation_dbsnp_rsid = "gwas_2023-12-22_dbsnp_rsid"
+    suffix_study = "_dbsnp_rsid"
+    size_chunk = 1000000
+    cores = 8
+    report = True
+
+    ##########
+    # Paths.
+    path_directory_source = os.path.join(
+        path_directory_dock, identifier_preparation,
+        "4_filter_constrain_gwas_values",
+    )
+    path_directory_storage = os.path.join(
+        path_directory_dock, "gwas_summaries_waller_metabolism",
+        "organization", identifier_preparation_dbsnp_rsid,
+        "5_fill_dbsnp_rs_identifiers",
+    )
+    path_directory_product = os.path.join(
+        path_directory_dock, identifier_preparation,
+        "5_fill_dbsnp_rs_identifiers",
+    )
+    putly.remove_directory(path=path_directory_product) # caution
+    putly.create_directories(path=path_directory_product)
+
+    ##########
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=3)
+        print("module: psychiatry_biomarkers.gwas_preparation.merge.py")
+        print("function: execute_procedure()")
+        putly.print_terminal_partition(level=5)
+        print("preparation: " + str(identifier_preparation))
+        print("storage: " + str(identifier_preparation_dbsnp_rsid))
+        putly.print_terminal_partition(level=5)
+        pass
+
+    ##########
+    # Merge identifiers from storage for all studies.
+    control_merge_studies_storage(
+        path_directory_source=path_directory_source,
+        path_directory_storage=path_directory_storage,
+        path_directory_product=path_directory_product,
+        suffix_study=suffix_study,
+        size_chunk=size_chunk,
+        cores=cores,
+        report=report,
+    )
+    pass
+
+
+###############################################################################
+# End
@@ -0,0 +1,956 @@
+"""
+Supply functionality for preparation of GWAS summary statistics in a single
+streaming pass through stages over chunks of rows.
+
+This module 'pipeline' is part of the 'gwas_preparation' package within the
+'psychiatry_biomarkers' package.
+
+Author:
+
+    T. Cameron Waller, Ph.D.
+    tcameronwaller@gmail.com
+    Rochester, Minnesota 55902
+    United States of America
+
+License:
+
+    This file is part of the project package directory 'psychiatry_biomarkers'
+    (https://github.com/tcameronwaller/psychiatry_biomarkers/).
+
+    Project 'psychiatry_biomarkers' supports data analysis with team in
+    psychiatry and pharmacogenomics.
+    Copyright (C) 2024 Thomas Cameron Waller
+
+    The code within project 'psychiatry_biomarkers' is free software: you can
+    redistribute it and/or modify it under the terms of the GNU General Public
+    License as published by the Free Software Foundation, either version 3 of
+    the GNU General Public License, or (at your option) any later version.
+
+    The code within project 'psychiatry_biomarkers' is distributed in the hope
+    that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+    warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with project 'psychiatry_biomarkers'. If not, see
+    <http://www.gnu.org/licenses/>.
+"""
+
+###############################################################################
+# Notes
+
+# The driver scripts in "1_gwas_preparation" each read a file of GWAS summary
+# statistics with compression by GZip, transform it, and write a new file,
+# so the preparation decompresses and compresses each study about nine times.
+# This module reads each source file once, passes each chunk of rows through
+# the same transformations as the modules for the separate steps, and writes
+# the product once.
+
+# Stages, in the sequence of the driver scripts.
+# translation: translation to standard format (module "translation")
+# assembly: translation of coordinates to GRCh37 (module "assembly")
+# frequency: fill of missing allele frequencies (module "frequency")
+# constraint_1: filters and constraints on values (module "constraint")
+# dbsnp: fill of rsIDs from dbSNP (module "dbsnp")
+# harmonization: harmonization of alleles (module "harmonization")
+# constraint_2: filters and constraints on values (module "constraint")
+# effective: effective observations for logistic studies (module "effective")
+
+# Translation always happens first, since the other stages work on the
+# standard format. The stage "assembly" only applies to studies with a chain
+# in the table of assemblies, "dbsnp" only applies to studies with the suffix
+# for fill of rsIDs, as in "5_1_fill_dbsnp_rs_identifiers.sh", and
+# "effective" only applies to studies with logistic regression. Each stage
+# needs its reference to exist already or to have a source from which to
+# build it.
+
+# Products of intermediate stages are optional checkpoints, written to a
+# subdirectory for each stage in the list of checkpoints.
+
+# The merge of rsIDs from storage (module "merge") joins sorted streams of
+# whole files and does not fit within a pass over independent chunks, so it
+# stays a separate step.
+
+###############################################################################
+# Installation and importation
+
+# Standard
+
+import os
+
+# Relevant
+
+import numpy
+import pandas
+pandas.options.mode.chained_assignment = None # default = "warn"
+
+# Custom
+import partner.utility as putly
+import partner.parallelization as prall
+import psychiatry_biomarkers.gwas_preparation.standard_format as pbstd
+import psychiatry_biomarkers.gwas_preparation.translation as pbtrn
+import psychiatry_biomarkers.gwas_preparation.assembly as pbasm
+import psychiatry_biomarkers.gwas_preparation.frequency as pbfrq
+import psychiatry_biomarkers.gwas_preparation.constraint as pbcon
+import psychiatry_biomarkers.gwas_preparation.dbsnp as pbsnp
+import psychiatry_biomarkers.gwas_preparation.harmonization as pbhrm
+import psychiatry_biomarkers.gwas_preparation.effective as pbeff
+import psychiatry_biomarkers.profiling as pbprf
+
+###############################################################################
+# Functionality
+
+
+##########
+# 1. Organize stages and references.
+
+
+def define_pipeline_stages():
+    """
+    Defines the sequence of stages in the preparation of GWAS summary
+    statistics.
+
+    arguments:
+
+    raises:
+
+    returns:
+        (list<str>): names of stages
+
+    """
+
+    stages = [
+        "translation",
+        "assembly",
+        "frequency",
+        "constraint_1",
+        "dbsnp",
+        "harmonization",
+        "constraint_2",
+        "effective",
+    ]
+    return stages
+
+
+def build_pipeline_references(
+    stages=None,
+    paths_reference=None,
+    size_chunk=None,
+    cores=None,
+    report=None,
+):
+    """
+    Builds the binary references for stages that need them, if they do not
+    yet exist.
+
+    arguments:
+        stages (list<str>): names of stages to apply
+        paths_reference (dict<str>): paths to sources and directories of
+            references, with keys "path_file_frequency",
+            "path_directory_frequency", "path_file_dbsnp",
+            "path_directory_dbsnp", "path_file_fasta", and
+            "path_directory_genome"
+        size_chunk (int): count of rows in each chunk
+        cores (int): count of processing cores for parallel processes
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+
+    """
+
+    def check_build(path_directory):
+        return os.path.exists(
+            os.path.join(path_directory, "table_chromosomes.tsv")
+        )
+    if (
+        ("frequency" in stages) and
+        not check_build(paths_reference["path_directory_frequency"])
+    ):
+        pbfrq.build_reference_frequency_index(
+            path_file_reference=paths_reference["path_file_frequency"],
+            columns_reference=pbfrq.define_reference_frequency_columns(),
+            path_directory_index=paths_reference["path_directory_frequency"],
+            size_chunk=size_chunk,
+            report=report,
+        )
+    if (
+        ("dbsnp" in stages) and
+        not check_build(paths_reference["path_directory_dbsnp"])
+    ):
+        pbsnp.build_dbsnp_index(
+            path_file_dbsnp=paths_reference["path_file_dbsnp"],
+            path_directory_index=paths_reference["path_directory_dbsnp"],
+            size_chunk=size_chunk,
+            cores=cores,
+            report=report,
+        )
+    if (
+        ("harmonization" in stages) and
+        not check_build(paths_reference["path_directory_genome"])
+    ):
+        pbhrm.build_reference_genome_binary(
+            path_file_fasta=paths_reference["path_file_fasta"],
+            path_directory_binary=paths_reference["path_directory_genome"],
+            report=report,
+        )
+    pass
+
+
+def load_pipeline_study_references(
+    instance=None,
+    parameters=None,
+):
+    """
+    Loads the references that the stages need for a single study, mapping
+    binary references into memory.
+
+    arguments:
+        instance (dict): parameters specific to current instance
+        parameters (dict): parameters common to all instances
+
+    raises:
+
+    returns:
+        (dict<object>): references for each stage
+
+    """
+
+    stages = instance["stages"]
+    paths_reference = parameters["paths_reference"]
+    references = dict()
+    if ("assembly" in stages):
+        references["assembly"] = pbasm.read_source_chain_blocks(
+            path_file_chain=parameters["paths_chain"][instance["chain"]],
+            report=False,
+        )
+    if ("frequency" in stages):
+        references["frequency"] = pbfrq.load_reference_frequency_index(
+            path_directory_index=paths_reference["path_directory_frequency"],
+        )
+    if ("dbsnp" in stages):
+        references["dbsnp"] = pbsnp.load_dbsnp_index(
+            path_directory_index=paths_reference["path_directory_dbsnp"],
+        )
+    if ("harmonization" in stages):
+        references["harmonization"] = pbhrm.load_reference_genome_binary(
+            path_directory_binary=paths_reference["path_directory_genome"],
+        )
+    return references
+
+
+##########
+# 2. Apply stages to chunks.
+
+
+def apply_pipeline_stage_chunk(
+    table=None,
+    stage=None,
+    instance=None,
+    references=None,
+    parameters=None,
+    counts=None,
+):
+    """
+    Applies a single stage of preparation to a chunk of GWAS summary
+    statistics in the standard format.
+
+    arguments:
+        table (object): Pandas data-frame table of GWAS summary statistics in
+            standard format
+        stage (str): name of stage
+        instance (dict): parameters specific to current instance
+        references (dict<object>): references for each stage
+        parameters (dict): parameters common to all instances
+        counts (dict): counts of variants to update for the stage
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table
+
+    """
+
+    if (stage == "assembly"):
+        table = pbasm.map_gwas_chunk_assembly(
+            table=table,
+            chains=references["assembly"],
+            counts=counts,
+        )
+    elif (stage == "frequency"):
+        table = pbfrq.fill_gwas_chunk_allele_frequency(
+            table=table,
+            index=references["frequency"],
+            value_default=parameters["value_default_frequency"],
+            counts=counts,
+        )
+    elif (stage in ["constraint_1", "constraint_2",]):
+        table = pbcon.filter_constrain_gwas_chunk_values(
+            table=table,
+            counts=counts,
+        )
+    elif (stage == "dbsnp"):
+        table = pbsnp.fill_gwas_chunk_dbsnp_rsid(
+            table=table,
+            index=references["dbsnp"],
+            strict=parameters["strict_dbsnp"],
+            counts=counts,
+        )
+    elif (stage == "harmonization"):
+        table = pbhrm.harmonize_gwas_chunk_alleles(
+            table=table,
+            reference=references["harmonization"],
+            threshold_palindrome=parameters["threshold_palindrome"],
+            keep_ambiguous=parameters["keep_ambiguous"],
+            counts=counts,
+        )
+    elif (stage == "effective"):
+        table = pbeff.calculate_gwas_chunk_observations_effective(
+            table=table,
+            observations_effective_study=(
+                instance["observations_effective_study"]
+            ),
+            counts=counts,
+        )
+    return table
+
+
+def define_pipeline_stage_counts(
+    stage=None,
+):
+    """
+    Defines counts of variants for a stage of preparation.
+
+    arguments:
+        stage (str): name of stage
+
+    raises:
+
+    returns:
+        (dict): counts of variants
+
+    """
+
+    if (stage == "translation"):
+        counts = {"rows": 0,}
+    elif (stage == "assembly"):
+        counts = {
+            "source": 0, "map": 0, "unmap": 0, "reverse": 0,
+            "reverse_drop": 0, "chromosome_change": 0,
+        }
+    elif (stage == "frequency"):
+        counts = {
+            "source": 0, "missing": 0, "fill": 0, "fill_complement": 0,
+            "default": 0,
+        }
+    elif (stage in ["constraint_1", "constraint_2",]):
+        counts = pbcon.define_constraint_rule_counts()
+    elif (stage == "dbsnp"):
+        counts = {
+            "source": 0, "match": 0, "match_complement": 0, "fill": 0,
+            "change": 0, "remove": 0,
+        }
+    elif (stage == "harmonization"):
+        counts = pbhrm.define_harmonization_counts()
+    elif (stage == "effective"):
+        counts = pbeff.define_observations_effective_counts()
+    else:
+        counts = dict()
+    return counts
+
+
+@pbprf.profile_procedure(category="study", keys_arguments=["study",])
+def control_pipeline_study(
+    instance=None,
+    parameters=None,
+):
+    """
+    Control procedure to prepare GWAS summary statistics for a single study
+    in a single pass through stages over chunks of rows and to write the
+    product and counts of variants to file.
+
+    arguments:
+        instance (dict): parameters specific to current instance, as from
+            "translation.define_translation_instances", with the following
+            extra parameters
+            stages (list<str>): names of stages to apply to study
+            chain (str): name of chain for stage "assembly"
+            observations_effective_study (float): effective count of
+                observations for the study from the parameter table
+        parameters (dict): parameters common to all instances
+            paths_chain (dict<str>): paths to chain files for each name of
+                chain
+            paths_reference (dict<str>): paths to directories of references
+            stages_checkpoint (list<str>): names of stages after which to
+                write intermediate products
+            path_directory_checkpoint (str): path to parent directory of
+                intermediate products
+            value_default_frequency (float): frequency for variants without
+                a match in the reference
+            strict_dbsnp (bool): whether to replace all identifiers and to
+                remove variants without a match in dbSNP
+            threshold_palindrome (float): half width of window around allele
+                frequency 0.5 within which palindromic variants are ambiguous
+            keep_ambiguous (bool): whether to keep ambiguous variants
+            size_chunk (int): count of rows in each chunk
+            path_directory_batch (str): path to directory for records of
+                individual studies
+            report (bool): whether to print reports
+
+    raises:
+
+    returns:
+
+    """
+
+    # Load references.
+    references = load_pipeline_study_references(
+        instance=instance,
+        parameters=parameters,
+    )
+    # Read source in chunks.
+    pail_source = pbtrn.read_source_gwas_chunks(
+        instance=instance,
+        size_chunk=parameters["size_chunk"],
+    )
+    instance = pail_source["instance"]
+    # Prepare and write in chunks.
+    counts = dict(map(
+        lambda stage: (stage, define_pipeline_stage_counts(stage=stage)),
+        instance["stages"],
+    ))
+    stages_write = list()
+    first = True
+    for table_chunk in pbprf.profile_iterator(
+        iterator=pail_source["reader"],
+        name="read_chunk",
+        category="read",
+        arguments={"study": instance["study"],},
+    ):
+        with pbprf.profile_span(
+            name="translation",
+            category="stage",
+            rows_in=table_chunk.shape[0],
+            arguments={"study": instance["study"],},
+        ) as span:
+            table = pbtrn.translate_gwas_chunk(
+                table=table_chunk,
+                instance=instance,
+            )
+            span["rows_out"] = table.shape[0]
+        counts["translation"]["rows"] += table.shape[0]
+        for stage in instance["stages"]:
+            if (stage != "translation"):
+                with pbprf.profile_span(
+                    name=stage,
+                    category="stage",
+                    rows_in=table.shape[0],
+                    arguments={"study": instance["study"],},
+                ) as span:
+                    table = apply_pipeline_stage_chunk(
+                        table=table,
+                        stage=stage,
+                        instance=instance,
+                        references=references,
+                        parameters=parameters,
+                        counts=counts[stage],
+                    )
+                    span["rows_out"] = table.shape[0]
+            # Write checkpoint.
+            if (stage in parameters["stages_checkpoint"]):
+                path_directory_stage = os.path.join(
+                    parameters["path_directory_checkpoint"], stage,
+                )
+                with pbprf.profile_span(
+                    name="write_checkpoint",
+                    category="write",
+                    rows_in=table.shape[0],
+                    arguments={"study": instance["study"], "stage": stage,},
+                ):
+                    pbstd.write_gwas_standard_format_chunk(
+                        table=table,
+                        path_file=os.path.join(
+                            path_directory_stage,
+                            str(instance["study"] + ".txt.gz"),
+                        ),
+                        header=(stage not in stages_write),
+                        mode=("a" if (stage in stages_write) else "w"),
+                    )
+                if (stage not in stages_write):
+                    stages_write.append(stage)
+            pass
+        with pbprf.profile_span(
+            name="write_chunk",
+            category="write",
+            rows_in=table.shape[0],
+            arguments={"study": instance["study"],},
+        ):
+            pbstd.write_gwas_standard_format_chunk(
+                table=table,
+                path_file=instance["path_file_product"],
+                header=first,
+                mode=("w" if first else "a"),
+            )
+        first = False
+        pass
+    # Collect information.
+    record = dict()
+    record["study"] = instance["study"]
+    record["stages"] = ";".join(instance["stages"])
+    record["columns_absent"] = ";".join(pail_source["columns_absent"])
+    for stage in counts.keys():
+        for name in counts[stage].keys():
+            record[str(stage + "_" + name)] = counts[stage][name]
+        pass
+    # Write product information to file.
+    pandas.DataFrame(data=[record,]).to_pickle(
+        os.path.join(
+            parameters["path_directory_batch"],
+            str(instance["study"] + ".pickle"),
+        )
+    )
+    # Report.
+    if parameters["report"]:
+        print(str(
+            "study: " + instance["study"] + "; stages: " +
+            str(len(instance["stages"])) + "; rows: " +
+            str(counts["translation"]["rows"])
+        ))
+        pass
+    pass
+
+
+##########
+# 3. Drive pipeline across studies.
+
+
+def define_pipeline_instances(
+    table_parameter=None,
+    mappings=None,
+    chains_study=None,
+    stages=None,
+    suffix_dbsnp=None,
+    studies_exclusion_effective=None,
+    path_directory_source=None,
+    path_directory_product=None,
+):
+    """
+    Defines instances of studies for the pipeline from the rows of the
+    parameter table with availability and with a column mapping, with the
+    stages that apply to each study.
+
+    arguments:
+        table_parameter (object): Pandas data-frame table of parameters for
+            studies
+        mappings (dict<dict>): column mappings for each value of "script"
+        chains_study (dict<str>): names of chains for studies that need
+            translation of coordinates, by identifiers of source studies
+            without the suffix for fill of rsIDs
+        stages (list<str>): names of stages to apply
+        suffix_dbsnp (str): suffix of identifiers of studies for fill of rsIDs
+        studies_exclusion_effective (list<str>): identifiers of studies for
+            which not to calculate effective observations
+        path_directory_source (str): path to parent directory of source files
+        path_directory_product (str): path to directory of product files
+
+    raises:
+        ValueError: if a study needs translation of coordinates before
+            stages that match positions and stage 'assembly' is absent
+
+    returns:
+        (dict<list>): instances for iteration and studies without mapping
+
+    """
+
+    pail = pbtrn.define_translation_instances(
+        table_parameter=table_parameter,
+        mappings=mappings,
+        path_directory_source=path_directory_source,
+        path_directory_product=path_directory_product,
+    )
+    table_study = table_parameter.copy(deep=True)
+    table_study["study"] = table_study["study"].astype("string").str.strip()
+    if ("observations_effective" not in table_study.columns):
+        table_study["observations_effective"] = numpy.nan
+    table_study = table_study.drop_duplicates(
+        subset=["study",], keep="first",
+    ).set_index("study", drop=False)
+    for instance in pail["instances"]:
+        study = instance["study"]
+        row = table_study.loc[study, :]
+        # The table of chains designates studies by the identifiers of their
+        # sources, without the suffix for fill of rsIDs.
+        if study.endswith(suffix_dbsnp):
+            study_source = study[:(len(study) - len(suffix_dbsnp))]
+        else:
+            study_source = study
+        instance["chain"] = chains_study.get(study_source, None)
+        # Stages after translation of coordinates match positions against
+        # references in the target assembly.
+        if (
+            (instance["chain"] is not None) and
+            ("assembly" not in stages) and
+            any(
+                stage in stages
+                for stage in ["frequency", "dbsnp", "harmonization",]
+            )
+        ):
+            raise ValueError(str(
+                "Study " + study + " needs translation of coordinates by " +
+                "chain " + instance["chain"] + " before stages that match " +
+                "positions, but stage 'assembly' is absent."
+            ))
+        instance["observations_effective_study"] = (
+            pbeff.define_observations_effective_study(row=row)
+        )
+        stages_study = list()
+        for stage in stages:
+            if (stage == "assembly") and (instance["chain"] is None):
+                continue
+            if (stage == "dbsnp") and (not study.endswith(suffix_dbsnp)):
+                continue
+            if (stage == "effective") and (
+                (str(row["type"]).strip() != "logistic") or
+                (int(row["inclusion"]) != 1) or
+                (study in studies_exclusion_effective)
+            ):
+                continue
+            stages_study.append(stage)
+            pass
+        if ("translation" not in stages_study):
+            stages_study.insert(0, "translation")
+        instance["stages"] = stages_study
+        pass
+    return pail
+
+
+def control_pipeline_studies(
+    path_file_table_parameter=None,
+    path_file_table_mapping=None,
+    path_file_table_assembly=None,
+    paths_chain=None,
+    paths_reference=None,
+    stages=None,
+    stages_checkpoint=None,
+    suffix_dbsnp=None,
+    studies_exclusion_effective=None,
+    value_default_frequency=None,
+    strict_dbsnp=None,
+    threshold_palindrome=None,
+    keep_ambiguous=None,
+    path_directory_source=None,
+    path_directory_product=None,
+    size_chunk=None,
+    cores=None,
+    report=None,
+):
+    """
+    Control procedure to prepare GWAS summary statistics in a single pass
+    through stages for all studies with availability in the parameter table
+    and with a column mapping.
+
+    arguments:
+        path_file_table_parameter (str): path to file for parameter table of
+            studies
+        path_file_table_mapping (str): path to file for table of column
+            mappings
+        path_file_table_assembly (str): path to file for table of chains for
+            studies that need translation of coordinates
+        paths_chain (dict<str>): paths to chain files for each name of chain
+        paths_reference (dict<str>): paths to sources and directories of
+            references (see "build_pipeline_references")
+        stages (list<str>): names of stages to apply
+        stages_checkpoint (list<str>): names of stages after which to write
+            intermediate products
+        suffix_dbsnp (str): suffix of identifiers of studies for fill of rsIDs
+        studies_exclusion_effective (list<str>): identifiers of studies for
+            which not to calculate effective observations
+        value_default_frequency (float): frequency for variants without a
+            match in the reference
+        strict_dbsnp (bool): whether to replace all identifiers and to remove
+            variants without a match in dbSNP
+        threshold_palindrome (float): half width of window around allele
+            frequency 0.5 within which palindromic variants are ambiguous
+        keep_ambiguous (bool): whether to keep ambiguous variants
+        path_directory_source (str): path to parent directory of source files
+        path_directory_product (str): path to directory of product files
+        size_chunk (int): count of rows in each chunk
+        cores (int): count of processing cores for parallel processes
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table of counts of variants
+
+    """
+
+    # Initialize directories.
+    path_directory_batch = os.path.join(path_directory_product, "batch",)
+    path_directory_checkpoint = os.path.join(
+        path_directory_product, "checkpoint",
+    )
+    putly.remove_directory(path=path_directory_batch) # caution
+    putly.create_directories(path=path_directory_batch)
+    for stage in stages_checkpoint:
+        putly.create_directories(
+            path=os.path.join(path_directory_checkpoint, stage)
+        )
+    # Build references.
+    build_pipeline_references(
+        stages=stages,
+        paths_reference=paths_reference,
+        size_chunk=size_chunk,
+        cores=cores,
+        report=report,
+    )
+    # Read source information from file.
+    table_parameter = pbtrn.read_source_parameter_table_translation(
+        path_file_table=path_file_table_parameter,
+        report=report,
+    )
+    mappings = pbtrn.read_source_column_mapping_table(
+        path_file_table=path_file_table_mapping,
+        report=report,
+    )
+    table_assembly = pandas.read_csv(
+        path_file_table_assembly,
+        sep="\t",
+        header=0,
+        dtype="string",
+    )
+    chains_study = dict(zip(
+        table_assembly["study"].str.strip(), table_assembly["chain"].str.strip(),
+    ))
+    # Collect parameters specific to each instance.
+    pail_instances = define_pipeline_instances(
+        table_parameter=table_parameter,
+        mappings=mappings,
+        chains_study=chains_study,
+        stages=stages,
+        suffix_dbsnp=suffix_dbsnp,
+        studies_exclusion_effective=studies_exclusion_effective,
+        path_directory_source=path_directory_source,
+        path_directory_product=path_directory_product,
+    )
+    instances = pail_instances["instances"]
+    # Report.
+    if report:
+        studies_assembly = [
+            instance["study"] for instance in instances
+            if ("assembly" in instance["stages"])
+        ]
+        putly.print_terminal_partition(level=5)
+        print(
+            "count of studies with translation of coordinates: " +
+            str(len(studies_assembly))
+        )
+        for study in studies_assembly:
+            print(study)
+        putly.print_terminal_partition(level=5)
+        pass
+    # Collect parameters common across all instances.
+    parameters = dict()
+    parameters["paths_chain"] = paths_chain
+    parameters["paths_reference"] = paths_reference
+    parameters["stages_checkpoint"] = stages_checkpoint
+    parameters["path_directory_checkpoint"] = path_directory_checkpoint
+    parameters["value_default_frequency"] = value_default_frequency
+    parameters["strict_dbsnp"] = strict_dbsnp
+    parameters["threshold_palindrome"] = threshold_palindrome
+    parameters["keep_ambiguous"] = keep_ambiguous
+    parameters["size_chunk"] = size_chunk
+    parameters["path_directory_batch"] = path_directory_batch
+    parameters["report"] = report
+    # Execute procedure iteratively with parallelization across instances.
+    if (len(instances) > 0):
+        prall.drive_procedure_parallel(
+            function_control=control_pipeline_study,
+            instances=instances,
+            parameters=parameters,
+            cores=cores,
+            report=report,
+        )
+    # Collect records from all studies.
+    tables = list()
+    for instance in instances:
+        path_file_record = os.path.join(
+            path_directory_batch, str(instance["study"] + ".pickle"),
+        )
+        if os.path.exists(path_file_record):
+            tables.append(pandas.read_pickle(path_file_record))
+        pass
+    if (len(tables) > 0):
+        table = pandas.concat(
+            tables,
+            axis="index",
+            join="outer",
+            ignore_index=True,
+            copy=True,
+        )
+    else:
+        table = pandas.DataFrame(columns=["study", "stages",])
+    # Write product information to file.
+    putly.write_tables_to_file(
+        pail_write={"table_pipeline_counts": table,},
+        path_directory=path_directory_product,
+        reset_index_rows=False,
+        write_index_rows=False,
+        write_index_columns=True,
+        type="text",
+        delimiter="\t",
+        suffix=".tsv",
+    )
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=4)
+        print("count of studies with preparation: " + str(table.shape[0]))
+        print(
+            "count of studies without column mapping: " +
+            str(len(pail_instances["studies_missing"]))
+        )
+        putly.print_terminal_partition(level=4)
+        pass
+    # Return information.
+    return table
+
+
+###############################################################################
+# Procedure
+
+
+def execute_procedure(
+    path_directory_dock=None,
+):
+    """
+    Function to execute module's main behavior.
+
+    arguments:
+        path_directory_dock (str): path to dock directory for source and product
+            directories and files
+
+    raises:
+
+    returns:
+
+    """
+
+    ##########
+    # Parameters.
+    identifier_preparation = "gwas_preparation_2023-12-30"
+    identifier_parameter = "tcw_2023-12-30_dbsnp_rsid"
+    identifier_assembly = "tcw_2023-12-30"
+    stages = define_pipeline_stages()
+    stages_checkpoint = list()
+    suffix_dbsnp = "_dbsnp_rsid"
+    studies_exclusion_effective = (
+        pbeff.define_studies_exclusion_observations_effective()
+    )
+    value_default_frequency = 0.5
+    strict_dbsnp = False
+    threshold_palindrome = 0.08
+    keep_ambiguous = False
+    size_chunk = 1000000
+    cores = 8
+    report = True
+
+    ##########
+    # Paths.
+    path_directory_source = os.path.join(
+        path_directory_dock, "gwas_summaries_waller_metabolism",
+    )
+    path_directory_product = os.path.join(
+        path_directory_dock, identifier_preparation, "0_gwas_pipeline",
+    )
+    path_directory_parameters = os.path.join(
+        path_directory_dock, "parameters", "psychiatric_metabolism",
+    )
+    path_file_table_parameter = os.path.join(
+        path_directory_parameters,
+        str("table_gwas_translation_" + identifier_parameter + ".tsv"),
+    )
+    path_file_table_mapping = os.path.join(
+        path_directory_parameters,
+        str("table_gwas_column_mapping_" + identifier_assembly + ".tsv"),
+    )
+    path_file_table_assembly = os.path.join(
+        path_directory_parameters,
+        str("table_gwas_assembly_" + identifier_assembly + ".tsv"),
+    )
+    path_directory_chain = os.path.join(
+        path_directory_dock, "reference", "crossmap", "ensembl",
+    )
+    paths_chain = dict()
+    paths_chain["NCBI36_to_GRCh37"] = os.path.join(
+        path_directory_chain, "NCBI36_to_GRCh37.chain.gz",
+    )
+    paths_chain["GRCh38_to_GRCh37"] = os.path.join(
+        path_directory_chain, "GRCh38_to_GRCh37.chain.gz",
+    )
+    path_directory_reference = os.path.join(path_directory_dock, "reference",)
+    paths_reference = dict()
+    paths_reference["path_file_frequency"] = os.path.join(
+        path_directory_reference, "allele_frequency", "grch37", "eur",
+        "allele_frequency.afreq.gz",
+    )
+    paths_reference["path_directory_frequency"] = os.path.join(
+        path_directory_reference, "allele_frequency", "grch37", "eur",
+        "index_variant_key",
+    )
+    paths_reference["path_file_dbsnp"] = os.path.join(
+        path_directory_reference, "dbsnp", "grch37", "GCF_000001405.25.gz",
+    )
+    paths_reference["path_directory_dbsnp"] = os.path.join(
+        path_directory_reference, "dbsnp", "grch37", "index_variant_key",
+    )
+    paths_reference["path_file_fasta"] = os.path.join(
+        path_directory_reference, "genome", "grch37",
+        "human_g1k_v37.fasta.gz",
+    )
+    paths_reference["path_directory_genome"] = os.path.join(
+        path_directory_reference, "genome", "grch37", "binary_packed",
+    )
+    putly.remove_directory(path=path_directory_product) # caution
+    putly.create_directories(path=path_directory_product)
+
+    ##########
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=3)
+        print("module: psychiatry_biomarkers.gwas_preparation.pipeline.py")
+        print("function: execute_procedure()")
+        putly.print_terminal_partition(level=5)
+        print("preparation: " + str(identifier_preparation))
+        print("parameter: " + str(identifier_parameter))
+        print("stages: " + ", ".join(stages))
+        putly.print_terminal_partition(level=5)
+        pass
+
+    ##########
+    # Prepare GWAS summary statistics for all studies.
+    control_pipeline_studies(
+        path_file_table_parameter=path_file_table_parameter,
+        path_file_table_mapping=path_file_table_mapping,
+        path_file_table_assembly=path_file_table_assembly,
+        paths_chain=paths_chain,
+        paths_reference=paths_reference,
+        stages=stages,
+        stages_checkpoint=stages_checkpoint,
+        suffix_dbsnp=suffix_dbsnp,
+        studies_exclusion_effective=studies_exclusion_effective,
+        value_default_frequency=value_default_frequency,
+        strict_dbsnp=strict_dbsnp,
+        threshold_palindrome=threshold_palindrome,
+        keep_ambiguous=keep_ambiguous,
+        path_directory_source=path_directory_source,
+        path_directory_product=path_directory_product,
+        size_chunk=size_chunk,
+        cores=cores,
+        report=report,
+    )
+    pass
+
+
+###############################################################################
+# End
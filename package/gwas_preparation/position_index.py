@@ -0,0 +1,477 @@
+"""
+Supply functionality to sort GWAS summary statistics in the standard format by
+position, to write them in BGZF, and to index them by position.
+
+This module 'position_index' is part of the 'gwas_preparation' package within
+the 'psychiatry_biomarkers' package.
+
+Author:
+
+    T. Cameron Waller, Ph.D.
+    tcameronwaller@gmail.com
+    Rochester, Minnesota 55902
+    United States of America
+
+License:
+
+    This file is part of the project package directory 'psychiatry_biomarkers'
+    (https://github.com/tcameronwaller/psychiatry_biomarkers/).
+
+    Project 'psychiatry_biomarkers' supports data analysis with team in
+    psychiatry and pharmacogenomics.
+    Copyright (C) 2024 Thomas Cameron Waller
+
+    The code within project 'psychiatry_biomarkers' is free software: you can
+    redistribute it and/or modify it under the terms of the GNU General Public
+    License as published by the Free Software Foundation, either version 3 of
+    the GNU General Public License, or (at your option) any later version.
+
+    The code within project 'psychiatry_biomarkers' is distributed in the hope
+    that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+    warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with project 'psychiatry_biomarkers'. If not, see
+    <http://www.gnu.org/licenses/>.
+"""
+
+###############################################################################
+# Notes
+
+# The columns "bgzip" and "gzip" of the parameter table describe the sources,
+# but all products in the standard format are in BGZF (module
+# "standard_format"). A positional index of Tabix also needs the file to be in
+# sort order by position. This module splits the rows of each study by
+# chromosome in chunks, sorts each chromosome by position, writes the product
+# in BGZF with threads for compression, and builds the index (".tbi") with
+# "tabix -s 2 -b 3 -e 3 -S 1".
+
+# With the index, "standard_format.read_gwas_standard_format_region" and
+# "standard_format.read_gwas_standard_format_chromosome" read a locus or a
+# chromosome without a full pass through the file, so later procedures can
+# run in parallel across chromosomes.
+
+# Records without chromosome or position do not have a place in the index,
+# so they do not pass to the product.
+
+###############################################################################
+# Installation and importation
+
+# Standard
+
+import os
+
+# Relevant
+
+import pandas
+pandas.options.mode.chained_assignment = None # default = "warn"
+
+# Custom
+import partner.utility as putly
+import partner.parallelization as prall
+import psychiatry_biomarkers.gwas_preparation.standard_format as pbstd
+import psychiatry_biomarkers.gwas_preparation.bgzf as pbbgz
+
+###############################################################################
+# Functionality
+
+
+##########
+# 1. Sort, compress, and index.
+
+
+def sort_chromosome_names(
+    chromosomes=None,
+):
+    """
+    Sorts names of chromosomes in the order 1 to 22, X, Y, XY, MT, and then
+    any other names in lexicographic order.
+
+    arguments:
+        chromosomes (list<str>): names of chromosomes
+
+    raises:
+
+    returns:
+        (list<str>): names of chromosomes in sort order
+
+    """
+
+    sequence = (
+        [str(number) for number in range(1, 23)] + ["X", "Y", "XY", "MT",]
+    )
+    ranks = dict(zip(sequence, range(len(sequence))))
+    return sorted(
+        chromosomes,
+        key=lambda name: (ranks.get(name, len(sequence)), name,),
+    )
+
+
+def sort_write_index_gwas_study(
+    path_file_source=None,
+    path_file_product=None,
+    path_directory_temporary=None,
+    size_chunk=None,
+    threads=None,
+):
+    """
+    Sorts GWAS summary statistics in the standard format by chromosome and
+    position, writes the product in BGZF, and builds its positional index.
+
+    arguments:
+        path_file_source (str): path to source file in standard format
+        path_file_product (str): path to product file
+        path_directory_temporary (str): path to temporary directory for
+            chunks of each chromosome
+        size_chunk (int): count of rows in each chunk
+        threads (int): count of threads for compression
+
+    raises:
+
+    returns:
+        (dict<int>): counts of rows and chromosomes
+
+    """
+
+    counts = {
+        "rows_source": 0,
+        "rows_product": 0,
+        "remove_position_missing": 0,
+        "chromosomes": 0,
+    }
+    putly.remove_directory(path=path_directory_temporary) # caution
+    putly.create_directories(path=path_directory_temporary)
+    # Split rows by chromosome in chunks.
+    paths_chromosome = dict()
+    for table in pbstd.read_gwas_standard_format_chunks(
+        path_file=path_file_source,
+        columns=None,
+        size_chunk=size_chunk,
+    ):
+        counts["rows_source"] += table.shape[0]
+        indicator_position = (table["CHR"].notna() & table["BP"].notna())
+        counts["remove_position_missing"] += int((~indicator_position).sum())
+        table = table.loc[indicator_position, :]
+        for chromosome, table_chromosome in table.groupby(
+            "CHR", sort=False, observed=True,
+        ):
+            chromosome = str(chromosome)
+            paths_chromosome.setdefault(chromosome, list())
+            path_file_chunk = os.path.join(
+                path_directory_temporary,
+                str(
+                    chromosome + "_" +
+                    str(len(paths_chromosome[chromosome])) + ".pickle"
+                ),
+            )
+            table_chromosome.to_pickle(path_file_chunk)
+            paths_chromosome[chromosome].append(path_file_chunk)
+            pass
+        pass
+    # Sort and write each chromosome.
+    first = True
+    for chromosome in sort_chromosome_names(
+        chromosomes=list(paths_chromosome.keys())
+    ):
+        table = pandas.concat(
+            [pandas.read_pickle(path) for path in paths_chromosome[chromosome]],
+            axis="index",
+            ignore_index=True,
+        )
+        table.sort_values(
+            by=["BP",],
+            axis="index",
+            ascending=True,
+            kind="mergesort",
+            inplace=True,
+        )
+        pbstd.write_gwas_standard_format_chunk(
+            table=table,
+            path_file=path_file_product,
+            header=first,
+            mode=("w" if first else "a"),
+            threads=threads,
+        )
+        first = False
+        counts["rows_product"] += table.shape[0]
+        counts["chromosomes"] += 1
+        pass
+    if first:
+        pbstd.write_gwas_standard_format_chunk(
+            table=pandas.DataFrame(
+                columns=pbstd.define_standard_format_column_sequence()
+            ),
+            path_file=path_file_product,
+            header=True,
+            mode="w",
+            threads=threads,
+        )
+    putly.remove_directory(path=path_directory_temporary) # caution
+    # Build positional index.
+    pbbgz.build_tabix_index(
+        path_file=path_file_product,
+        column_chromosome=2,
+        column_position=3,
+        character_meta="#",
+        count_skip=1,
+    )
+    # Return information.
+    return counts
+
+
+def control_sort_write_index_study_gwas(
+    instance=None,
+    parameters=None,
+):
+    """
+    Control procedure to sort, compress, and index GWAS summary statistics for
+    a single study and to write counts of rows to file.
+
+    arguments:
+        instance (dict): parameters specific to current instance
+            study (str): identifier of study
+            path_file_source (str): path to source file
+            path_file_product (str): path to product file
+        parameters (dict): parameters common to all instances
+            size_chunk (int): count of rows in each chunk
+            threads (int): count of threads for compression
+            path_directory_temporary (str): path to parent directory for
+                temporary directories of individual studies
+            path_directory_batch (str): path to directory for records of
+                individual studies
+            report (bool): whether to print reports
+
+    raises:
+
+    returns:
+
+    """
+
+    counts = sort_write_index_gwas_study(
+        path_file_source=instance["path_file_source"],
+        path_file_product=instance["path_file_product"],
+        path_directory_temporary=os.path.join(
+            parameters["path_directory_temporary"], instance["study"],
+        ),
+        size_chunk=parameters["size_chunk"],
+        threads=parameters["threads"],
+    )
+    # Collect information.
+    record = dict()
+    record["study"] = instance["study"]
+    record.update(counts)
+    # Write product information to file.
+    pandas.DataFrame(data=[record,]).to_pickle(
+        os.path.join(
+            parameters["path_directory_batch"],
+            str(instance["study"] + ".pickle"),
+        )
+    )
+    # Report.
+    if parameters["report"]:
+        print(str(
+            "study: " + instance["study"] + "; rows: " +
+            str(counts["rows_product"]) + "; chromosomes: " +
+            str(counts["chromosomes"])
+        ))
+        pass
+    pass
+
+
+##########
+# 2. Drive across studies.
+
+
+def control_sort_write_index_studies_gwas(
+    path_directory_source=None,
+    path_directory_product=None,
+    size_chunk=None,
+    threads=None,
+    cores=None,
+    report=None,
+):
+    """
+    Control procedure to sort, compress, and index GWAS summary statistics for
+    all studies in a directory.
+
+    arguments:
+        path_directory_source (str): path to directory of source files in
+            standard format ("*.txt.gz")
+        path_directory_product (str): path to directory of product files
+        size_chunk (int): count of rows in each chunk
+        threads (int): count of threads for compression within each process
+        cores (int): count of processing cores for parallel processes
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table of counts of rows
+
+    """
+
+    # Initialize directories.
+    path_directory_batch = os.path.join(path_directory_product, "batch",)
+    path_directory_temporary = os.path.join(
+        path_directory_product, "temporary",
+    )
+    putly.remove_directory(path=path_directory_batch) # caution
+    putly.create_directories(path=path_directory_batch)
+    putly.create_directories(path=path_directory_temporary)
+    # Collect parameters specific to each instance.
+    names_source = sorted(list(filter(
+        lambda name: name.endswith(".txt.gz"),
+        os.listdir(path_directory_source),
+    )))
+    instances = list()
+    for name_file in names_source:
+        instance = dict()
+        instance["study"] = pbstd.define_study_identifier_from_file_name(
+            path_file=name_file,
+            suffix=".txt.gz",
+        )
+        instance["path_file_source"] = os.path.join(
+            path_directory_source, name_file,
+        )
+        instance["path_file_product"] = os.path.join(
+            path_directory_product, name_file,
+        )
+        instances.append(instance)
+        pass
+    # Collect parameters common across all instances.
+    parameters = dict()
+    parameters["size_chunk"] = size_chunk
+    parameters["threads"] = threads
+    parameters["path_directory_temporary"] = path_directory_temporary
+    parameters["path_directory_batch"] = path_directory_batch
+    parameters["report"] = report
+    # Execute procedure iteratively with parallelization across instances.
+    if (len(instances) > 0):
+        prall.drive_procedure_parallel(
+            function_control=control_sort_write_index_study_gwas,
+            instances=instances,
+            parameters=parameters,
+            cores=cores,
+            report=report,
+        )
+    putly.remove_directory(path=path_directory_temporary) # caution
+    # Collect records from all studies.
+    tables = list()
+    for instance in instances:
+        path_file_record = os.path.join(
+            path_directory_batch, str(instance["study"] + ".pickle"),
+        )
+        if os.path.exists(path_file_record):
+            tables.append(pandas.read_pickle(path_file_record))
+        pass
+    if (len(tables) > 0):
+        table = pandas.concat(
+            tables,
+            axis="index",
+            join="outer",
+            ignore_index=True,
+            copy=True,
+        )
+    else:
+        table = pandas.DataFrame(
+            columns=[
+                "study", "rows_source", "rows_product",
+                "remove_position_missing", "chromosomes",
+            ]
+        )
+    # Write product information to file.
+    putly.write_tables_to_file(
+        pail_write={"table_sort_index_counts": table,},
+        path_directory=path_directory_product,
+        reset_index_rows=False,
+        write_index_rows=False,
+        write_index_columns=True,
+        type="text",
+        delimiter="\t",
+        suffix=".tsv",
+    )
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=4)
+        print("count of studies: " + str(table.shape[0]))
+        print(
+            "count of rows without position: " +
+            str(int(table["remove_position_missing"].sum()))
+        )
+        putly.print_terminal_partition(level=4)
+        pass
+    # Return information.
+    return table
+
+
+###############################################################################
+# Procedure
+
+
+def execute_procedure(
+    path_directory_dock=None,
+):
+    """
+    Function to execute module's main behavior.
+
+    arguments:
+        path_directory_dock (str): path to dock directory for source and product
+            directories and files
+
+    raises:
+
+    returns:
+
+    """
+
+    ##########
+    # Parameters.
+    identifier_preparation = "gwas_preparation_2023-12-30"
+    size_chunk = 1000000
+    threads = 2
+    cores = 4
+    report = True
+
+    ##########
+    # Paths.
+    path_directory_source = os.path.join(
+        path_directory_dock, identifier_preparation,
+        "8_gwas_effective_observations",
+    )
+    path_directory_product = os.path.join(
+        path_directory_dock, identifier_preparation,
+        "9_gwas_sort_bgzf_position_index",
+    )
+    putly.remove_directory(path=path_directory_product) # caution
+    putly.create_directories(path=path_directory_product)
+
+    ##########
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=3)
+        print(
+            "module: psychiatry_biomarkers.gwas_preparation." +
+            "position_index.py"
+        )
+        print("function: execute_procedure()")
+        putly.print_terminal_partition(level=5)
+        print("preparation: " + str(identifier_preparation))
+        putly.print_terminal_partition(level=5)
+        pass
+
+    ##########
+    # Sort, compress, and index all studies.
+    control_sort_write_index_studies_gwas(
+        path_directory_source=path_directory_source,
+        path_directory_product=path_directory_product,
+        size_chunk=size_chunk,
+        threads=threads,
+        cores=cores,
+        report=report,
+    )
+    pass
+
+
+###############################################################################
+# End
@@ -0,0 +1,996 @@
+"""
+Supply functionality to index the presence of variants across studies of GWAS
+summary statistics in compressed bitmaps and to query overlap and coverage.
+
+This module 'presence' is part of the 'gwas_preparation' package within
+the 'psychiatry_biomarkers' package.
+
+Author:
+
+    T. Cameron Waller, Ph.D.
+    tcameronwaller@gmail.com
+    Rochester, Minnesota 55902
+    United States of America
+
+License:
+
+    This file is part of the project package directory 'psychiatry_biomarkers'
+    (https://github.com/tcameronwaller/psychiatry_biomarkers/).
+
+    Project 'psychiatry_biomarkers' supports data analysis with team in
+    psychiatry and pharmacogenomics.
+    Copyright (C) 2024 Thomas Cameron Waller
+
+    The code within project 'psychiatry_biomarkers' is free software: you can
+    redistribute it and/or modify it under the terms of the GNU General Public
+    License as published by the Free Software Foundation, either version 3 of
+    the GNU General Public License, or (at your option) any later version.
+
+    The code within project 'psychiatry_biomarkers' is distributed in the hope
+    that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+    warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with project 'psychiatry_biomarkers'. If not, see
+    <http://www.gnu.org/licenses/>.
+"""
+
+###############################################################################
+# Notes
+
+# The index of presence has two parts.
+# 1. A dictionary of variants is the sorted union of the keys of variants
+#    (module "variant_key") from all studies, and the rank of each key within
+#    the dictionary is the index of the variant.
+# 2. A bitmap for each study designates the indices of its variants.
+
+# Bitmaps follow the design of Roaring bitmaps. The high 16 bits of each index
+# designate a container of 65,536 indices, and each container is either a
+# sorted array of its low 16 bits, when it has 4,096 or fewer variants, or a
+# dense bitmap of 1,024 words of 64 bits, when it has more. A study with
+# several million variants has mostly dense containers, and sparse studies
+# stay small. Counts of the intersection of two bitmaps come from a bitwise
+# "and" of the matching dense containers and tests of the elements of sparse
+# containers, without decompression of either bitmap.
+
+# Products.
+# dictionary_variants.npy: sorted keys of all variants
+# bitmaps/<study>.npz: bitmap of each study
+# table_presence_counts.tsv: counts of variants in each study
+# table_pairwise_overlap.tsv: counts of variants in common for all pairs of
+#   studies
+# table_variant_coverage.tsv: counts of variants by the count of studies in
+#   which they are present
+
+# Functions "read_presence_index", "query_variant_coverage", and
+# "count_presence_overlap" query an existing index without any pass through
+# the files of GWAS summary statistics.
+
+###############################################################################
+# Installation and importation
+
+# Standard
+
+import os
+
+# Relevant
+
+import numpy
+import pandas
+pandas.options.mode.chained_assignment = None # default = "warn"
+
+# Custom
+import partner.utility as putly
+import partner.parallelization as prall
+import psychiatry_biomarkers.gwas_preparation.standard_format as pbstd
+import psychiatry_biomarkers.gwas_preparation.variant_key as pbkey
+
+###############################################################################
+# Functionality
+
+
+##########
+# 1. Collect keys and define dictionary of variants.
+
+
+def collect_study_variant_keys(
+    path_file_source=None,
+    size_chunk=None,
+):
+    """
+    Collects the sorted, unique keys of variants from GWAS summary statistics
+    in a single pass through the file in chunks.
+
+    arguments:
+        path_file_source (str): path to source file in standard format
+        size_chunk (int): count of rows in each chunk
+
+    raises:
+
+    returns:
+        (object): NumPy array of keys in sort order
+
+    """
+
+    keys = list()
+    for table in pbstd.read_gwas_standard_format_chunks(
+        path_file=path_file_source,
+        columns=["CHR", "BP", "A1", "A2",],
+        size_chunk=size_chunk,
+    ):
+        keys_chunk = pbkey.pack_variant_keys(
+            chromosomes=table["CHR"],
+            positions=table["BP"],
+            alleles_first=table["A1"],
+            alleles_second=table["A2"],
+        )
+        keys.append(numpy.unique(keys_chunk[keys_chunk >= 0]))
+        pass
+    if (len(keys) > 0):
+        return numpy.unique(numpy.concatenate(keys))
+    else:
+        return numpy.zeros(0, dtype="int64")
+
+
+def control_collect_study_variant_keys(
+    instance=None,
+    parameters=None,
+):
+    """
+    Control procedure to collect the keys of variants for a single study and
+    to write them to file.
+
+    arguments:
+        instance (dict): parameters specific to current instance
+            study (str): identifier of study
+            path_file_source (str): path to source file
+        parameters (dict): parameters common to all instances
+            size_chunk (int): count of rows in each chunk
+            path_directory_temporary (str): path to directory for keys of
+                individual studies
+            report (bool): whether to print reports
+
+    raises:
+
+    returns:
+
+    """
+
+    keys = collect_study_variant_keys(
+        path_file_source=instance["path_file_source"],
+        size_chunk=parameters["size_chunk"],
+    )
+    numpy.save(
+        os.path.join(
+            parameters["path_directory_temporary"],
+            str(instance["study"] + ".npy"),
+        ),
+        keys,
+        allow_pickle=False,
+    )
+    # Report.
+    if parameters["report"]:
+        print(str(
+            "study: " + instance["study"] + "; variants: " + str(keys.size)
+        ))
+        pass
+    pass
+
+
+def define_variant_dictionary(
+    paths_file_keys=None,
+):
+    """
+    Defines the dictionary of variants as the sorted union of keys from all
+    studies, with one study in memory at a time.
+
+    arguments:
+        paths_file_keys (list<str>): paths to files of keys of studies
+
+    raises:
+
+    returns:
+        (object): NumPy array of keys in sort order
+
+    """
+
+    dictionary = numpy.zeros(0, dtype="int64")
+    for path_file in paths_file_keys:
+        dictionary = numpy.union1d(
+            dictionary, numpy.load(path_file, allow_pickle=False),
+        )
+        pass
+    return dictionary.astype("int64")
+
+
+##########
+# 2. Compressed bitmaps.
+
+
+def define_bitmap_constants():
+    """
+    Defines constants of the compressed bitmaps.
+
+    arguments:
+
+    raises:
+
+    returns:
+        (dict<int>): constants
+
+    """
+
+    constants = dict()
+    constants["bits_low"] = 16
+    constants["size_container"] = 65536
+    constants["words_container"] = 1024
+    constants["threshold_dense"] = 4096
+    return constants
+
+
+def count_bits(
+    words=None,
+):
+    """
+    Counts the bits set within an array of words of 64 bits.
+
+    arguments:
+        words (object): NumPy array of words
+
+    raises:
+
+    returns:
+        (int): count of bits
+
+    """
+
+    words = numpy.ascontiguousarray(words, dtype="uint64")
+    if hasattr(numpy, "bitwise_count"):
+        return int(numpy.bitwise_count(words).sum(dtype="int64"))
+    else:
+        return int(numpy.unpackbits(words.view("uint8")).sum(dtype="int64"))
+
+
+def encode_presence_bitmap(
+    indices=None,
+):
+    """
+    Encodes sorted, unique indices of variants in a compressed bitmap.
+
+    arguments:
+        indices (object): NumPy array of indices in sort order
+
+    raises:
+
+    returns:
+        (dict<object>): compressed bitmap
+            highs (object): NumPy array of high bits of dense containers
+            words (object): NumPy array of words of dense containers, one row
+                for each container
+            values (object): NumPy array of indices within sparse containers
+            count (int): count of indices
+
+    """
+
+    constants = define_bitmap_constants()
+    indices = numpy.asarray(indices, dtype="int64")
+    highs = (indices >> constants["bits_low"])
+    highs_unique, counts = numpy.unique(highs, return_counts=True)
+    highs_dense = highs_unique[counts > constants["threshold_dense"]]
+    indicator_dense = numpy.isin(highs, highs_dense)
+    # Encode dense containers.
+    rows = numpy.searchsorted(highs_dense, highs[indicator_dense])
+    lows = (indices[indicator_dense] & (constants["size_container"] - 1))
+    bits = numpy.zeros(
+        (highs_dense.size, constants["size_container"]), dtype="bool",
+    )
+    bits[rows, lows] = True
+    words = numpy.packbits(bits, axis=1, bitorder="little").view("<u8")
+    # Collect information.
+    bitmap = dict()
+    bitmap["highs"] = highs_dense.astype("uint32")
+    bitmap["words"] = numpy.ascontiguousarray(words, dtype="uint64")
+    bitmap["values"] = indices[~indicator_dense].astype("uint32")
+    bitmap["count"] = int(indices.size)
+    # Return information.
+    return bitmap
+
+
+def decode_presence_bitmap(
+    bitmap=None,
+):
+    """
+    Decodes the sorted indices of variants from a compressed bitmap.
+
+    arguments:
+        bitmap (dict<object>): compressed bitmap
+
+    raises:
+
+    returns:
+        (object): NumPy array of indices in sort order
+
+    """
+
+    constants = define_bitmap_constants()
+    bits = numpy.unpackbits(
+        numpy.ascontiguousarray(bitmap["words"], dtype="<u8").view("uint8"),
+        axis=1,
+        bitorder="little",
+    ).reshape((bitmap["highs"].size, constants["size_container"]))
+    rows, lows = numpy.nonzero(bits)
+    indices_dense = (
+        (bitmap["highs"][rows].astype("int64") << constants["bits_low"]) |
+        lows.astype("int64")
+    )
+    indices = numpy.concatenate([
+        indices_dense, bitmap["values"].astype("int64"),
+    ])
+    indices.sort(kind="stable")
+    return indices
+
+
+def test_presence_bitmap_dense(
+    bitmap=None,
+    indices=None,
+):
+    """
+    Tests indices of variants for presence within the dense containers of a
+    compressed bitmap.
+
+    arguments:
+        bitmap (dict<object>): compressed bitmap
+        indices (object): NumPy array of indices
+
+    raises:
+
+    returns:
+        (object): NumPy array of indicators
+
+    """
+
+    constants = define_bitmap_constants()
+    indices = numpy.asarray(indices, dtype="int64")
+    highs = (indices >> constants["bits_low"])
+    presence = numpy.zeros(indices.size, dtype="bool")
+    if (bitmap["highs"].size == 0) or (indices.size == 0):
+        return presence
+    rows = numpy.searchsorted(bitmap["highs"], highs)
+    rows_valid = numpy.minimum(rows, (bitmap["highs"].size - 1))
+    indicator_container = (bitmap["highs"][rows_valid] == highs)
+    lows = (indices[indicator_container] & (constants["size_container"] - 1))
+    words = bitmap["words"][rows_valid[indicator_container], (lows >> 6)]
+    presence[indicator_container] = (
+        (words >> (lows & 63).astype("uint64")) & numpy.uint64(1)
+    ).astype("bool")
+    return presence
+
+
+def test_presence_bitmap(
+    bitmap=None,
+    indices=None,
+):
+    """
+    Tests indices of variants for presence within a compressed bitmap.
+
+    arguments:
+        bitmap (dict<object>): compressed bitmap
+        indices (object): NumPy array of indices
+
+    raises:
+
+    returns:
+        (object): NumPy array of indicators
+
+    """
+
+    indices = numpy.asarray(indices, dtype="int64")
+    presence = test_presence_bitmap_dense(bitmap=bitmap, indices=indices)
+    if (bitmap["values"].size > 0):
+        values = bitmap["values"].astype("int64")
+        positions = numpy.minimum(
+            numpy.searchsorted(values, indices), (values.size - 1),
+        )
+        presence = (presence | (values[positions] == indices))
+    return presence
+
+
+def count_presence_bitmap_intersection(
+    bitmap_first=None,
+    bitmap_second=None,
+):
+    """
+    Counts the indices of variants in common between two compressed bitmaps.
+
+    Dense containers in common contribute by bitwise "and", and indices
+    within sparse containers of either bitmap contribute by tests against the
+    other bitmap.
+
+    arguments:
+        bitmap_first (dict<object>): compressed bitmap
+        bitmap_second (dict<object>): compressed bitmap
+
+    raises:
+
+    returns:
+        (int): count of indices in common
+
+    """
+
+    # Dense containers of both bitmaps.
+    highs, rows_first, rows_second = numpy.intersect1d(
+        bitmap_first["highs"], bitmap_second["highs"],
+        assume_unique=True, return_indices=True,
+    )
+    count = count_bits(
+        bitmap_first["words"][rows_first] &
+        bitmap_second["words"][rows_second]
+    )
+    # Sparse containers of first bitmap against all containers of second.
+    count += int(test_presence_bitmap(
+        bitmap=bitmap_second,
+        indices=bitmap_first["values"],
+    ).sum())
+    # Sparse containers of second bitmap against dense containers of first.
+    count += int(test_presence_bitmap_dense(
+        bitmap=bitmap_first,
+        indices=bitmap_second["values"],
+    ).sum())
+    return count
+
+
+def write_presence_bitmap(
+    bitmap=None,
+    path_file=None,
+):
+    """
+    Writes a compressed bitmap to file.
+
+    arguments:
+        bitmap (dict<object>): compressed bitmap
+        path_file (str): path to file (".npz")
+
+    raises:
+
+    returns:
+
+    """
+
+    numpy.savez(
+        path_file,
+        highs=bitmap["highs"],
+        words=bitmap["words"],
+        values=bitmap["values"],
+        count=numpy.array([bitmap["count"],], dtype="int64"),
+    )
+    pass
+
+
+def read_presence_bitmap(
+    path_file=None,
+):
+    """
+    Reads a compressed bitmap from file.
+
+    arguments:
+        path_file (str): path to file (".npz")
+
+    raises:
+
+    returns:
+        (dict<object>): compressed bitmap
+
+    """
+
+    with numpy.load(path_file, allow_pickle=False) as data:
+        bitmap = dict()
+        bitmap["highs"] = data["highs"]
+        bitmap["words"] = data["words"].reshape(
+            (data["highs"].size, define_bitmap_constants()["words_container"])
+        )
+        bitmap["values"] = data["values"]
+        bitmap["count"] = int(data["count"][0])
+    return bitmap
+
+
+##########
+# 3. Build, read, and query index.
+
+
+def control_build_study_bitmap(
+    instance=None,
+    parameters=None,
+):
+    """
+    Control procedure to encode the variants of a single study as a
+    compressed bitmap over the dictionary of variants and to write it to
+    file.
+
+    arguments:
+        instance (dict): parameters specific to current instance
+            study (str): identifier of study
+        parameters (dict): parameters common to all instances
+            path_file_dictionary (str): path to file of dictionary of variants
+            path_directory_temporary (str): path to directory for keys of
+                individual studies
+            path_directory_bitmaps (str): path to directory for bitmaps
+            report (bool): whether to print reports
+
+    raises:
+
+    returns:
+
+    """
+
+    dictionary = numpy.load(
+        parameters["path_file_dictionary"],
+        mmap_mode="r",
+        allow_pickle=False,
+    )
+    keys = numpy.load(
+        os.path.join(
+            parameters["path_directory_temporary"],
+            str(instance["study"] + ".npy"),
+        ),
+        allow_pickle=False,
+    )
+    bitmap = encode_presence_bitmap(
+        indices=numpy.searchsorted(dictionary, keys),
+    )
+    write_presence_bitmap(
+        bitmap=bitmap,
+        path_file=os.path.join(
+            parameters["path_directory_bitmaps"],
+            str(instance["study"] + ".npz"),
+        ),
+    )
+    pass
+
+
+def read_presence_index(
+    path_directory_index=None,
+):
+    """
+    Reads the dictionary of variants and the compressed bitmaps of all
+    studies from an index of presence.
+
+    arguments:
+        path_directory_index (str): path to directory of index
+
+    raises:
+
+    returns:
+        (dict<object>): collection of information
+            dictionary (object): NumPy array of keys of variants in sort
+                order
+            studies (list<str>): identifiers of studies
+            bitmaps (dict<dict>): compressed bitmaps of studies
+
+    """
+
+    path_directory_bitmaps = os.path.join(path_directory_index, "bitmaps",)
+    studies = sorted(list(map(
+        lambda name: name[:-len(".npz")],
+        filter(
+            lambda name: name.endswith(".npz"),
+            os.listdir(path_directory_bitmaps),
+        ),
+    )))
+    # Collect information.
+    pail = dict()
+    pail["dictionary"] = numpy.load(
+        os.path.join(path_directory_index, "dictionary_variants.npy"),
+        mmap_mode="r",
+        allow_pickle=False,
+    )
+    pail["studies"] = studies
+    pail["bitmaps"] = dict()
+    for study in studies:
+        pail["bitmaps"][study] = read_presence_bitmap(
+            path_file=os.path.join(
+                path_directory_bitmaps, str(study + ".npz"),
+            ),
+        )
+    # Return information.
+    return pail
+
+
+def count_presence_overlap(
+    index=None,
+    study_first=None,
+    study_second=None,
+):
+    """
+    Counts the variants in common between two studies.
+
+    arguments:
+        index (dict<object>): index of presence from function
+            "read_presence_index"
+        study_first (str): identifier of first study
+        study_second (str): identifier of second study
+
+    raises:
+
+    returns:
+        (int): count of variants in common
+
+    """
+
+    return count_presence_bitmap_intersection(
+        bitmap_first=index["bitmaps"][study_first],
+        bitmap_second=index["bitmaps"][study_second],
+    )
+
+
+def query_variant_coverage(
+    index=None,
+    chromosomes=None,
+    positions=None,
+    alleles_first=None,
+    alleles_second=None,
+):
+    """
+    Queries the studies in which each of a set of variants is present.
+
+    arguments:
+        index (dict<object>): index of presence from function
+            "read_presence_index"
+        chromosomes (object): Pandas series of names of chromosomes
+        positions (object): Pandas series of positions on chromosomes
+        alleles_first (object): Pandas series of first alleles
+        alleles_second (object): Pandas series of second alleles
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table with one row for each variant and
+            one column of indicators for each study, along with the count of
+            studies ("coverage")
+
+    """
+
+    keys = pbkey.pack_variant_keys(
+        chromosomes=chromosomes,
+        positions=positions,
+        alleles_first=alleles_first,
+        alleles_second=alleles_second,
+    )
+    dictionary = index["dictionary"]
+    indices = numpy.searchsorted(dictionary, keys)
+    indices_valid = numpy.minimum(indices, max(0, (dictionary.size - 1)))
+    indicator_present = (
+        (keys >= 0) & (dictionary.size > 0) &
+        (numpy.asarray(dictionary[indices_valid]) == keys)
+    )
+    # Collect information.
+    table = pandas.DataFrame(data={
+        "CHR": pandas.Series(chromosomes).astype("string").to_numpy(),
+        "BP": pandas.Series(positions).to_numpy(),
+        "A1": pandas.Series(alleles_first).astype("string").to_numpy(),
+        "A2": pandas.Series(alleles_second).astype("string").to_numpy(),
+    })
+    table["key"] = keys
+    coverage = numpy.zeros(keys.size, dtype="int32")
+    columns_study = dict()
+    for study in index["studies"]:
+        presence = numpy.zeros(keys.size, dtype="bool")
+        presence[indicator_present] = test_presence_bitmap(
+            bitmap=index["bitmaps"][study],
+            indices=indices[indicator_present],
+        )
+        columns_study[study] = presence.astype("int32")
+        coverage += presence
+        pass
+    table["coverage"] = coverage
+    table = pandas.concat(
+        [table, pandas.DataFrame(data=columns_study, index=table.index),],
+        axis="columns",
+    )
+    # Return information.
+    return table
+
+
+def calculate_pairwise_overlaps(
+    index=None,
+):
+    """
+    Calculates counts of variants in common for all pairs of studies.
+
+    arguments:
+        index (dict<object>): index of presence from function
+            "read_presence_index"
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table with one row for each pair
+
+    """
+
+    records = list()
+    studies = index["studies"]
+    for index_first, study_first in enumerate(studies):
+        bitmap_first = index["bitmaps"][study_first]
+        for study_second in studies[(index_first + 1):]:
+            bitmap_second = index["bitmaps"][study_second]
+            count = count_presence_bitmap_intersection(
+                bitmap_first=bitmap_first,
+                bitmap_second=bitmap_second,
+            )
+            count_union = (
+                bitmap_first["count"] + bitmap_second["count"] - count
+            )
+            record = dict()
+            record["study_first"] = study_first
+            record["study_second"] = study_second
+            record["variants_first"] = bitmap_first["count"]
+            record["variants_second"] = bitmap_second["count"]
+            record["variants_overlap"] = count
+            record["proportion_first"] = (
+                (count / bitmap_first["count"])
+                if (bitmap_first["count"] > 0) else float("nan")
+            )
+            record["proportion_second"] = (
+                (count / bitmap_second["count"])
+                if (bitmap_second["count"] > 0) else float("nan")
+            )
+            record["jaccard"] = (
+                (count / count_union) if (count_union > 0) else float("nan")
+            )
+            records.append(record)
+            pass
+        pass
+    return pandas.DataFrame(
+        data=records,
+        columns=[
+            "study_first", "study_second", "variants_first",
+            "variants_second", "variants_overlap", "proportion_first",
+            "proportion_second", "jaccard",
+        ],
+    )
+
+
+def calculate_variant_coverage_distribution(
+    index=None,
+):
+    """
+    Calculates counts of variants by the count of studies in which they are
+    present.
+
+    arguments:
+        index (dict<object>): index of presence from function
+            "read_presence_index"
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table of counts
+
+    """
+
+    coverage = numpy.zeros(index["dictionary"].size, dtype="int32")
+    for study in index["studies"]:
+        coverage[decode_presence_bitmap(bitmap=index["bitmaps"][study])] += 1
+    counts = numpy.bincount(coverage, minlength=(len(index["studies"]) + 1))
+    table = pandas.DataFrame(data={
+        "studies": numpy.arange(counts.size, dtype="int64"),
+        "variants": counts.astype("int64"),
+    })
+    table["variants_cumulative_reverse"] = (
+        table["variants"][::-1].cumsum()[::-1].astype("int64")
+    )
+    return table
+
+
+##########
+# 4. Drive across studies.
+
+
+def control_presence_index_studies(
+    path_directory_source=None,
+    path_directory_product=None,
+    size_chunk=None,
+    cores=None,
+    report=None,
+):
+    """
+    Control procedure to build the index of presence of variants for all
+    studies in a directory and to write counts of overlap and coverage.
+
+    arguments:
+        path_directory_source (str): path to directory of source files in
+            standard format ("*.txt.gz")
+        path_directory_product (str): path to directory of product files
+        size_chunk (int): count of rows in each chunk
+        cores (int): count of processing cores for parallel processes
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (dict<object>): index of presence
+
+    """
+
+    # Initialize directories.
+    path_directory_temporary = os.path.join(
+        path_directory_product, "temporary",
+    )
+    path_directory_bitmaps = os.path.join(path_directory_product, "bitmaps",)
+    putly.remove_directory(path=path_directory_temporary) # caution
+    putly.remove_directory(path=path_directory_bitmaps) # caution
+    putly.create_directories(path=path_directory_temporary)
+    putly.create_directories(path=path_directory_bitmaps)
+    # Collect parameters specific to each instance.
+    names_source = sorted(list(filter(
+        lambda name: name.endswith(".txt.gz"),
+        os.listdir(path_directory_source),
+    )))
+    instances = list()
+    for name_file in names_source:
+        instance = dict()
+        instance["study"] = pbstd.define_study_identifier_from_file_name(
+            path_file=name_file,
+            suffix=".txt.gz",
+        )
+        instance["path_file_source"] = os.path.join(
+            path_directory_source, name_file,
+        )
+        instances.append(instance)
+        pass
+    # Collect parameters common across all instances.
+    path_file_dictionary = os.path.join(
+        path_directory_product, "dictionary_variants.npy",
+    )
+    parameters = dict()
+    parameters["size_chunk"] = size_chunk
+    parameters["path_file_dictionary"] = path_file_dictionary
+    parameters["path_directory_temporary"] = path_directory_temporary
+    parameters["path_directory_bitmaps"] = path_directory_bitmaps
+    parameters["report"] = report
+    # Collect keys of variants with parallelization across instances.
+    if (len(instances) > 0):
+        prall.drive_procedure_parallel(
+            function_control=control_collect_study_variant_keys,
+            instances=instances,
+            parameters=parameters,
+            cores=cores,
+            report=report,
+        )
+    # Define dictionary of variants.
+    dictionary = define_variant_dictionary(
+        paths_file_keys=[
+            os.path.join(
+                path_directory_temporary, str(instance["study"] + ".npy"),
+            )
+            for instance in instances
+        ],
+    )
+    numpy.save(path_file_dictionary, dictionary, allow_pickle=False)
+    del dictionary
+    # Encode bitmaps with parallelization across instances.
+    if (len(instances) > 0):
+        prall.drive_procedure_parallel(
+            function_control=control_build_study_bitmap,
+            instances=instances,
+            parameters=parameters,
+            cores=cores,
+            report=report,
+        )
+    putly.remove_directory(path=path_directory_temporary) # caution
+    # Calculate overlaps and coverage.
+    index = read_presence_index(path_directory_index=path_directory_product)
+    table_counts = pandas.DataFrame(data={
+        "study": index["studies"],
+        "variants": [
+            index["bitmaps"][study]["count"] for study in index["studies"]
+        ],
+        "containers_dense": [
+            index["bitmaps"][study]["highs"].size
+            for study in index["studies"]
+        ],
+        "variants_sparse": [
+            index["bitmaps"][study]["values"].size
+            for study in index["studies"]
+        ],
+    })
+    table_overlap = calculate_pairwise_overlaps(index=index)
+    table_coverage = calculate_variant_coverage_distribution(index=index)
+    # Write product information to file.
+    putly.write_tables_to_file(
+        pail_write={
+            "table_presence_counts": table_counts,
+            "table_pairwise_overlap": table_overlap,
+            "table_variant_coverage": table_coverage,
+        },
+        path_directory=path_directory_product,
+        reset_index_rows=False,
+        write_index_rows=False,
+        write_index_columns=True,
+        type="text",
+        delimiter="\t",
+        suffix=".tsv",
+    )
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=4)
+        print("count of studies: " + str(len(index["studies"])))
+        print("count of variants in dictionary: " + str(
+            index["dictionary"].size
+        ))
+        print("count of pairs of studies: " + str(table_overlap.shape[0]))
+        putly.print_terminal_partition(level=4)
+        pass
+    # Return information.
+    return index
+
+
+###############################################################################
+# Procedure
+
+
+def execute_procedure(
+    path_directory_dock=None,
+):
+    """
+    Function to execute module's main behavior.
+
+    arguments:
+        path_directory_dock (str): path to dock directory for source and product
+            directories and files
+
+    raises:
+
+    returns:
+
+    """
+
+    ##########
+    # Parameters.
+    identifier_preparation = "gwas_preparation_2023-12-30"
+    size_chunk = 1000000
+    cores = 4
+    report = True
+
+    ##########
+    # Paths.
+    path_directory_source = os.path.join(
+        path_directory_dock, identifier_preparation,
+        "8_gwas_effective_observations",
+    )
+    path_directory_product = os.path.join(
+        path_directory_dock, identifier_preparation,
+        "9_gwas_presence_index",
+    )
+    putly.remove_directory(path=path_directory_product) # caution
+    putly.create_directories(path=path_directory_product)
+
+    ##########
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=3)
+        print(
+            "module: psychiatry_biomarkers.gwas_preparation." +
+            "presence.py"
+        )
+        print("function: execute_procedure()")
+        putly.print_terminal_partition(level=5)
+        print("preparation: " + str(identifier_preparation))
+        putly.print_terminal_partition(level=5)
+        pass
+
+    ##########
+    # Build index of presence for all studies.
+    control_presence_index_studies(
+        path_directory_source=path_directory_source,
+        path_directory_product=path_directory_product,
+        size_chunk=size_chunk,
+        cores=cores,
+        report=report,
+    )
+    pass
+
+
+###############################################################################
+# End
@@ -0,0 +1,627 @@
+"""
+Supply functionality for quantile-quantile plots of probabilities and for
+genomic inflation of GWAS summary statistics, from binned quantiles.
+
+This module 'qq_plot' is part of the 'gwas_preparation' package within the
+'psychiatry_biomarkers' package.
+
+Author:
+
+    T. Cameron Waller, Ph.D.
+    tcameronwaller@gmail.com
+    Rochester, Minnesota 55902
+    United States of America
+
+License:
+
+    This file is part of the project package directory 'psychiatry_biomarkers'
+    (https://github.com/tcameronwaller/psychiatry_biomarkers/).
+
+    Project 'psychiatry_biomarkers' supports data analysis with team in
+    psychiatry and pharmacogenomics.
+    Copyright (C) 2024 Thomas Cameron Waller
+
+    The code within project 'psychiatry_biomarkers' is free software: you can
+    redistribute it and/or modify it under the terms of the GNU General Public
+    License as published by the Free Software Foundation, either version 3 of
+    the GNU General Public License, or (at your option) any later version.
+
+    The code within project 'psychiatry_biomarkers' is distributed in the hope
+    that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+    warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with project 'psychiatry_biomarkers'. If not, see
+    <http://www.gnu.org/licenses/>.
+"""
+
+###############################################################################
+# Notes
+
+# The old driver script "9_create_gwas_qq_plots.sh" called a script in R that
+# read and plotted every variant of each study. This module reads only the
+# column of probabilities (p-values) in chunks and counts the values of
+# -log10(p) within fixed bins, so use of memory does not depend on the count
+# of variants.
+
+# Bins have width 0.0001 in -log10(p) from 0 to 10 and width 0.01 from 10 to
+# 330, which covers the least probability of 1E-308 (module "constraint").
+# The sum of values within each bin gives the mean observed value of the bin,
+# and the ranks of variants within each bin give the expected value.
+
+# Genomic inflation (lambda GC) is the median of the chi-square statistics
+# with 1 degree of freedom over the median of that distribution (0.4549).
+# The median of -log10(p) is from linear interpolation within its bin.
+
+# Points of the plot are the bins with variants, thinned to a grid of fixed
+# spacing on both axes, so the plot of tens of millions of variants has a few
+# thousand points, while few points merge in the sparse tail of strong
+# signals.
+
+###############################################################################
+# Installation and importation
+
+# Standard
+
+import os
+
+# Relevant
+
+import numpy
+import pandas
+pandas.options.mode.chained_assignment = None # default = "warn"
+import scipy.stats
+import matplotlib.figure
+import matplotlib.backends.backend_agg
+
+# Custom
+import partner.utility as putly
+import partner.plot as pplot
+import partner.parallelization as prall
+import psychiatry_biomarkers.gwas_preparation.standard_format as pbstd
+
+###############################################################################
+# Functionality
+
+
+##########
+# 1. Count probabilities within bins.
+
+
+def define_qq_bin_edges():
+    """
+    Defines the edges of bins of -log10(p).
+
+    arguments:
+
+    raises:
+
+    returns:
+        (object): NumPy array of edges of bins
+
+    """
+
+    edges = numpy.concatenate([
+        numpy.linspace(0.0, 10.0, num=100000, endpoint=False),
+        numpy.linspace(10.0, 330.0, num=32001, endpoint=True),
+    ])
+    return edges
+
+
+def define_qq_histogram(
+    edges=None,
+):
+    """
+    Defines empty counts of -log10(p) within bins.
+
+    arguments:
+        edges (object): NumPy array of edges of bins
+
+    raises:
+
+    returns:
+        (dict): counts and sums of values within bins, and counts of missing
+            values
+
+    """
+
+    histogram = dict()
+    histogram["counts"] = numpy.zeros((edges.size - 1), dtype="int64")
+    histogram["sums"] = numpy.zeros((edges.size - 1), dtype="float64")
+    histogram["missing"] = 0
+    return histogram
+
+
+def accumulate_qq_chunk_histogram(
+    table=None,
+    edges=None,
+    histogram=None,
+):
+    """
+    Counts values of -log10(p) from a chunk of GWAS summary statistics within
+    bins.
+
+    arguments:
+        table (object): Pandas data-frame table of GWAS summary statistics in
+            standard format, with at least column "P"
+        edges (object): NumPy array of edges of bins
+        histogram (dict): counts within bins to update
+
+    raises:
+
+    returns:
+
+    """
+
+    probabilities = table["P"].to_numpy(dtype="float64", na_value=numpy.nan)
+    indicator_valid = (
+        numpy.isfinite(probabilities) &
+        (probabilities > 0) & (probabilities <= 1)
+    )
+    histogram["missing"] += int((~indicator_valid).sum())
+    values = numpy.clip(
+        (-1 * numpy.log10(probabilities[indicator_valid])),
+        0.0, edges[-1],
+    )
+    indices = numpy.clip(
+        (numpy.searchsorted(edges, values, side="right") - 1),
+        0, (edges.size - 2),
+    )
+    histogram["counts"] += numpy.bincount(
+        indices, minlength=(edges.size - 1),
+    )
+    histogram["sums"] += numpy.bincount(
+        indices, weights=values, minlength=(edges.size - 1),
+    )
+    pass
+
+
+##########
+# 2. Calculate inflation and points of plot.
+
+
+def calculate_genomic_inflation(
+    histogram=None,
+    edges=None,
+):
+    """
+    Calculates genomic inflation (lambda GC) from the median of -log10(p)
+    within bins.
+
+    arguments:
+        histogram (dict): counts within bins
+        edges (object): NumPy array of edges of bins
+
+    raises:
+
+    returns:
+        (dict): median probability and genomic inflation
+
+    """
+
+    counts = histogram["counts"]
+    count_total = int(counts.sum())
+    pail = dict()
+    pail["count_variants"] = count_total
+    if (count_total == 0):
+        pail["probability_median"] = numpy.nan
+        pail["lambda_gc"] = numpy.nan
+        return pail
+    cumulative = numpy.cumsum(counts)
+    half = (count_total / 2)
+    index = int(numpy.searchsorted(cumulative, half, side="left"))
+    count_before = (cumulative[index] - counts[index])
+    fraction = ((half - count_before) / counts[index])
+    value_median = (
+        edges[index] + (fraction * (edges[index + 1] - edges[index]))
+    )
+    probability_median = float(10 ** (-1 * value_median))
+    pail["probability_median"] = probability_median
+    pail["lambda_gc"] = float(
+        scipy.stats.chi2.isf(probability_median, df=1) /
+        scipy.stats.chi2.ppf(0.5, df=1)
+    )
+    return pail
+
+
+def organize_qq_points(
+    histogram=None,
+    spacing=None,
+):
+    """
+    Organizes points of the quantile-quantile plot from counts within bins,
+    thinned to a grid of fixed spacing.
+
+    arguments:
+        histogram (dict): counts within bins
+        spacing (float): spacing of grid on both axes of -log10(p)
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table of points with expected and
+            observed -log10(p) and limits of the 95% interval of expected
+            values
+
+    """
+
+    counts = histogram["counts"][::-1]
+    sums = histogram["sums"][::-1]
+    count_total = int(counts.sum())
+    indicator = (counts > 0)
+    counts = counts[indicator]
+    sums = sums[indicator]
+    # Ranks from the least probability.
+    ranks_end = numpy.cumsum(counts)
+    ranks = (ranks_end - ((counts - 1) / 2))
+    table = pandas.DataFrame()
+    table["count"] = counts
+    table["rank"] = ranks
+    table["expected"] = -1 * numpy.log10((ranks - 0.5) / count_total)
+    table["observed"] = (sums / counts)
+    table["expected_low"] = -1 * numpy.log10(scipy.stats.beta.ppf(
+        0.975, ranks, (count_total - ranks + 1),
+    ))
+    table["expected_high"] = -1 * numpy.log10(scipy.stats.beta.ppf(
+        0.025, ranks, (count_total - ranks + 1),
+    ))
+    # Thin points to grid.
+    if (table.shape[0] > 0):
+        cells = (
+            numpy.floor(table["expected"].to_numpy() / spacing).astype("int64")
+            * 1000000 +
+            numpy.floor(table["observed"].to_numpy() / spacing).astype("int64")
+        )
+        indices = numpy.sort(numpy.unique(cells, return_index=True)[1])
+        table = table.iloc[indices, :]
+    table.reset_index(
+        level=None,
+        inplace=True,
+        drop=True,
+    )
+    return table
+
+
+def plot_qq_figure(
+    table=None,
+    title=None,
+    lambda_gc=None,
+):
+    """
+    Plots the quantile-quantile plot of -log10(p).
+
+    arguments:
+        table (object): Pandas data-frame table of points
+        title (str): title of plot
+        lambda_gc (float): genomic inflation
+
+    raises:
+
+    returns:
+        (object): figure object from MatPlotLib
+
+    """
+
+    # Create the figure with its own canvas for rasterization, without the
+    # global state of the backend or of figures in PyPlot.
+    figure = matplotlib.figure.Figure(figsize=(4.0, 4.0),)
+    matplotlib.backends.backend_agg.FigureCanvasAgg(figure)
+    axes = figure.add_subplot(1, 1, 1)
+    if (table.shape[0] > 0):
+        order = numpy.argsort(table["expected"].to_numpy())
+        axes.fill_between(
+            table["expected"].to_numpy()[order],
+            table["expected_low"].to_numpy()[order],
+            table["expected_high"].to_numpy()[order],
+            color="lightgray",
+            linewidth=0,
+        )
+        limit = float(table["expected"].max())
+        axes.plot(
+            [0, limit,], [0, limit,],
+            color="gray", linewidth=0.8,
+        )
+        axes.scatter(
+            table["expected"], table["observed"],
+            s=2, color="black", linewidths=0, rasterized=True,
+        )
+    axes.set_xlabel("expected -log10(p)", fontsize=8)
+    axes.set_ylabel("observed -log10(p)", fontsize=8)
+    axes.tick_params(axis="both", labelsize=7)
+    axes.set_title(
+        str(title + "\nlambda GC: " + str(round(lambda_gc, 4))),
+        fontsize=7,
+    )
+    figure.tight_layout()
+    return figure
+
+
+##########
+# 3. Drive across studies.
+
+
+def control_qq_study(
+    instance=None,
+    parameters=None,
+):
+    """
+    Control procedure to count probabilities of GWAS summary statistics for a
+    single study within bins, to calculate genomic inflation, and to write the
+    points and plot to file.
+
+    arguments:
+        instance (dict): parameters specific to current instance
+            study (str): identifier of study
+            path_file_source (str): path to source file
+        parameters (dict): parameters common to all instances
+            size_chunk (int): count of rows in each chunk
+            spacing (float): spacing of grid on both axes of -log10(p)
+            path_directory_points (str): path to directory for points
+            path_directory_plots (str): path to directory for plots
+            path_directory_batch (str): path to directory for records of
+                individual studies
+            report (bool): whether to print reports
+
+    raises:
+
+    returns:
+
+    """
+
+    # Count probabilities within bins.
+    edges = define_qq_bin_edges()
+    histogram = define_qq_histogram(edges=edges)
+    for table in pbstd.read_gwas_standard_format_chunks(
+        path_file=instance["path_file_source"],
+        columns=["P",],
+        size_chunk=parameters["size_chunk"],
+    ):
+        accumulate_qq_chunk_histogram(
+            table=table,
+            edges=edges,
+            histogram=histogram,
+        )
+        pass
+    # Calculate inflation and points.
+    pail_inflation = calculate_genomic_inflation(
+        histogram=histogram,
+        edges=edges,
+    )
+    table_points = organize_qq_points(
+        histogram=histogram,
+        spacing=parameters["spacing"],
+    )
+    # Write points and plot to file.
+    putly.write_tables_to_file(
+        pail_write={instance["study"]: table_points,},
+        path_directory=parameters["path_directory_points"],
+        reset_index_rows=False,
+        write_index_rows=False,
+        write_index_columns=True,
+        type="text",
+        delimiter="\t",
+        suffix=".tsv",
+    )
+    figure = plot_qq_figure(
+        table=table_points,
+        title=instance["study"],
+        lambda_gc=pail_inflation["lambda_gc"],
+    )
+    pplot.write_product_plot_figure(
+        figure=figure,
+        format="png", # svg, jpg, png
+        resolution=150,
+        name_file=instance["study"],
+        path_directory=parameters["path_directory_plots"],
+    )
+    # Collect information.
+    record = dict()
+    record["study"] = instance["study"]
+    record.update(pail_inflation)
+    record["count_probability_missing"] = histogram["missing"]
+    record["count_points"] = table_points.shape[0]
+    # Write product information to file.
+    pandas.DataFrame(data=[record,]).to_pickle(
+        os.path.join(
+            parameters["path_directory_batch"],
+            str(instance["study"] + ".pickle"),
+        )
+    )
+    # Report.
+    if parameters["report"]:
+        print(str(
+            "study: " + instance["study"] + "; variants: " +
+            str(pail_inflation["count_variants"]) + "; lambda GC: " +
+            str(round(pail_inflation["lambda_gc"], 4))
+        ))
+        pass
+    pass
+
+
+def control_qq_studies(
+    path_directory_source=None,
+    path_directory_product=None,
+    size_chunk=None,
+    spacing=None,
+    cores=None,
+    report=None,
+):
+    """
+    Control procedure to create quantile-quantile plots and to calculate
+    genomic inflation for all studies in a directory.
+
+    arguments:
+        path_directory_source (str): path to directory of source files in
+            standard format ("*.txt.gz")
+        path_directory_product (str): path to directory of product files
+        size_chunk (int): count of rows in each chunk
+        spacing (float): spacing of grid on both axes of -log10(p)
+        cores (int): count of processing cores for parallel processes
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table of genomic inflation
+
+    """
+
+    # Initialize directories.
+    path_directory_batch = os.path.join(path_directory_product, "batch",)
+    path_directory_points = os.path.join(path_directory_product, "points",)
+    path_directory_plots = os.path.join(path_directory_product, "plots",)
+    putly.remove_directory(path=path_directory_batch) # caution
+    putly.create_directories(path=path_directory_batch)
+    putly.create_directories(path=path_directory_points)
+    putly.create_directories(path=path_directory_plots)
+    # Collect parameters specific to each instance.
+    names_source = sorted(list(filter(
+        lambda name: name.endswith(".txt.gz"),
+        os.listdir(path_directory_source),
+    )))
+    instances = list()
+    for name_file in names_source:
+        instance = dict()
+        instance["study"] = pbstd.define_study_identifier_from_file_name(
+            path_file=name_file,
+            suffix=".txt.gz",
+        )
+        instance["path_file_source"] = os.path.join(
+            path_directory_source, name_file,
+        )
+        instances.append(instance)
+        pass
+    # Collect parameters common across all instances.
+    parameters = dict()
+    parameters["size_chunk"] = size_chunk
+    parameters["spacing"] = spacing
+    parameters["path_directory_points"] = path_directory_points
+    parameters["path_directory_plots"] = path_directory_plots
+    parameters["path_directory_batch"] = path_directory_batch
+    parameters["report"] = report
+    # Execute procedure iteratively with parallelization across instances.
+    if (len(instances) > 0):
+        prall.drive_procedure_parallel(
+            function_control=control_qq_study,
+            instances=instances,
+            parameters=parameters,
+            cores=cores,
+            report=report,
+        )
+    # Collect records from all studies.
+    tables = list()
+    for instance in instances:
+        path_file_record = os.path.join(
+            path_directory_batch, str(instance["study"] + ".pickle"),
+        )
+        if os.path.exists(path_file_record):
+            tables.append(pandas.read_pickle(path_file_record))
+        pass
+    if (len(tables) > 0):
+        table = pandas.concat(
+            tables,
+            axis="index",
+            join="outer",
+            ignore_index=True,
+            copy=True,
+        )
+    else:
+        table = pandas.DataFrame(
+            columns=[
+                "study", "count_variants", "probability_median", "lambda_gc",
+                "count_probability_missing", "count_points",
+            ]
+        )
+    # Write product information to file.
+    putly.write_tables_to_file(
+        pail_write={"table_genomic_inflation": table,},
+        path_directory=path_directory_product,
+        reset_index_rows=False,
+        write_index_rows=False,
+        write_index_columns=True,
+        type="text",
+        delimiter="\t",
+        suffix=".tsv",
+    )
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=4)
+        print("count of studies: " + str(table.shape[0]))
+        print(
+            "count of studies with lambda GC greater than 1.1: " +
+            str(int((table["lambda_gc"].astype("float64") > 1.1).sum()))
+        )
+        putly.print_terminal_partition(level=4)
+        pass
+    # Return information.
+    return table
+
+
+###############################################################################
+# Procedure
+
+
+def execute_procedure(
+    path_directory_dock=None,
+):
+    """
+    Function to execute module's main behavior.
+
+    arguments:
+        path_directory_dock (str): path to dock directory for source and product
+            directories and files
+
+    raises:
+
+    returns:
+
+    """
+
+    ##########
+    # Parameters.
+    identifier_preparation = "gwas_preparation_2023-12-30"
+    size_chunk = 1000000
+    spacing = 0.02
+    cores = 8
+    report = True
+
+    ##########
+    # Paths.
+    path_directory_source = os.path.join(
+        path_directory_dock, identifier_preparation,
+        "8_gwas_effective_observations",
+    )
+    path_directory_product = os.path.join(
+        path_directory_dock, identifier_preparation,
+        "9_gwas_qq_plots",
+    )
+    putly.remove_directory(path=path_directory_product) # caution
+    putly.create_directories(path=path_directory_product)
+
+    ##########
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=3)
+        print("module: psychiatry_biomarkers.gwas_preparation.qq_plot.py")
+        print("function: execute_procedure()")
+        putly.print_terminal_partition(level=5)
+        print("preparation: " + str(identifier_preparation))
+        putly.print_terminal_partition(level=5)
+        pass
+
+    ##########
+    # Create plots and calculate inflation for all studies.
+    control_qq_studies(
+        path_directory_source=path_directory_source,
+        path_directory_product=path_directory_product,
+        size_chunk=size_chunk,
+        spacing=spacing,
+        cores=cores,
+        report=report,
+    )
+    pass
+
+
+###############################################################################
+# End
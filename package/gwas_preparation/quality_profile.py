@@ -0,0 +1,546 @@
+"""
+Supply functionality for profiles of quality of GWAS summary statistics in the
+standard format, from a single pass through each file.
+
+This module 'quality_profile' is part of the 'gwas_preparation' package within
+the 'psychiatry_biomarkers' package.
+
+Author:
+
+    T. Cameron Waller, Ph.D.
+    tcameronwaller@gmail.com
+    Rochester, Minnesota 55902
+    United States of America
+
+License:
+
+    This file is part of the project package directory 'psychiatry_biomarkers'
+    (https://github.com/tcameronwaller/psychiatry_biomarkers/).
+
+    Project 'psychiatry_biomarkers' supports data analysis with team in
+    psychiatry and pharmacogenomics.
+    Copyright (C) 2024 Thomas Cameron Waller
+
+    The code within project 'psychiatry_biomarkers' is free software: you can
+    redistribute it and/or modify it under the terms of the GNU General Public
+    License as published by the Free Software Foundation, either version 3 of
+    the GNU General Public License, or (at your option) any later version.
+
+    The code within project 'psychiatry_biomarkers' is distributed in the hope
+    that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+    warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with project 'psychiatry_biomarkers'. If not, see
+    <http://www.gnu.org/licenses/>.
+"""
+
+###############################################################################
+# Notes
+
+# The profile of each study comes from one pass through its file in chunks.
+# 1. count of rows
+# 2. count of missing values in each column
+# 3. count, minimum, maximum, mean, and variance of values in each numeric
+#    column, with combination of chunks by the algorithm of Welford, as
+#    generalized by Chan, Golub, and LeVeque, which avoids the loss of
+#    precision from sums of squares
+# 4. counts within 20 bins of equal width from 0 to 1 for allele frequencies
+#    and for probabilities (p-values)
+# 5. counts of rows on each chromosome
+
+# Products.
+# table_quality_profile.tsv: scalar values for all studies, one row each
+# quality_profiles.json: complete profiles for all studies, including
+#   histograms and counts on each chromosome
+
+###############################################################################
+# Installation and importation
+
+# Standard
+
+import os
+import json
+
+# Relevant
+
+import numpy
+import pandas
+pandas.options.mode.chained_assignment = None # default = "warn"
+
+# Custom
+import partner.utility as putly
+import partner.parallelization as prall
+import psychiatry_biomarkers.gwas_preparation.standard_format as pbstd
+import psychiatry_biomarkers.gwas_preparation.position_index as pbpos
+
+###############################################################################
+# Functionality
+
+
+##########
+# 1. Accumulate profile in chunks.
+
+
+def define_quality_profile():
+    """
+    Defines an empty profile of quality of GWAS summary statistics.
+
+    arguments:
+
+    raises:
+
+    returns:
+        (dict): profile of quality
+
+    """
+
+    columns_numeric = [
+        "BP", "A1AF", "BETA", "SE", "P", "N", "Z", "INFO", "NCASE", "NCONT",
+    ]
+    profile = dict()
+    profile["rows"] = 0
+    profile["missing"] = dict(map(
+        lambda column: (column, 0),
+        pbstd.define_standard_format_column_sequence(),
+    ))
+    profile["moments"] = dict(map(
+        lambda column: (column, {
+            "count": 0, "mean": 0.0, "m2": 0.0,
+            "minimum": numpy.nan, "maximum": numpy.nan,
+        }),
+        columns_numeric,
+    ))
+    profile["edges"] = numpy.linspace(0.0, 1.0, num=21).tolist()
+    profile["histograms"] = {
+        "A1AF": [0,] * 20,
+        "P": [0,] * 20,
+    }
+    profile["chromosomes"] = dict()
+    return profile
+
+
+def combine_moments(
+    moments=None,
+    values=None,
+):
+    """
+    Combines the moments of a chunk of values with existing moments.
+
+    arguments:
+        moments (dict): count, mean, sum of squares of differences from the
+            mean, minimum, and maximum to update
+        values (object): NumPy array of finite values of chunk
+
+    raises:
+
+    returns:
+
+    """
+
+    count_chunk = values.size
+    if (count_chunk == 0):
+        return
+    mean_chunk = float(values.mean())
+    m2_chunk = float(numpy.square(values - mean_chunk).sum())
+    count = (moments["count"] + count_chunk)
+    delta = (mean_chunk - moments["mean"])
+    moments["mean"] += (delta * count_chunk / count)
+    moments["m2"] += (
+        m2_chunk + (delta * delta * moments["count"] * count_chunk / count)
+    )
+    moments["count"] = count
+    moments["minimum"] = float(numpy.nanmin(
+        [moments["minimum"], values.min(),]
+    ))
+    moments["maximum"] = float(numpy.nanmax(
+        [moments["maximum"], values.max(),]
+    ))
+    pass
+
+
+def update_quality_profile_chunk(
+    table=None,
+    profile=None,
+):
+    """
+    Updates the profile of quality with a chunk of GWAS summary statistics.
+
+    arguments:
+        table (object): Pandas data-frame table of GWAS summary statistics in
+            standard format
+        profile (dict): profile of quality to update
+
+    raises:
+
+    returns:
+
+    """
+
+    profile["rows"] += table.shape[0]
+    for column in profile["missing"].keys():
+        profile["missing"][column] += int(table[column].isna().sum())
+        pass
+    for column in profile["moments"].keys():
+        values = table[column].to_numpy(dtype="float64", na_value=numpy.nan)
+        values = values[numpy.isfinite(values)]
+        combine_moments(
+            moments=profile["moments"][column],
+            values=values,
+        )
+        if column in profile["histograms"].keys():
+            values = values[(values >= 0) & (values <= 1)]
+            counts = numpy.histogram(values, bins=profile["edges"])[0]
+            profile["histograms"][column] = (
+                numpy.array(profile["histograms"][column]) + counts
+            ).tolist()
+        pass
+    counts_chromosome = table["CHR"].fillna("NA").value_counts(sort=False)
+    for chromosome, count in counts_chromosome.items():
+        profile["chromosomes"][str(chromosome)] = (
+            profile["chromosomes"].get(str(chromosome), 0) + int(count)
+        )
+        pass
+    pass
+
+
+def organize_quality_profile_record(
+    profile=None,
+):
+    """
+    Organizes scalar values of the profile of quality within a flat record.
+
+    arguments:
+        profile (dict): profile of quality
+
+    raises:
+
+    returns:
+        (dict): record of scalar values
+
+    """
+
+    record = dict()
+    record["rows"] = profile["rows"]
+    record["chromosomes"] = len(profile["chromosomes"])
+    for column in profile["missing"].keys():
+        record[str("missing_" + column)] = profile["missing"][column]
+        pass
+    for column in profile["moments"].keys():
+        moments = profile["moments"][column]
+        record[str("mean_" + column)] = (
+            moments["mean"] if (moments["count"] > 0) else numpy.nan
+        )
+        record[str("variance_" + column)] = (
+            (moments["m2"] / (moments["count"] - 1))
+            if (moments["count"] > 1) else numpy.nan
+        )
+        record[str("minimum_" + column)] = moments["minimum"]
+        record[str("maximum_" + column)] = moments["maximum"]
+        pass
+    return record
+
+
+def organize_quality_profile_json(
+    profile=None,
+):
+    """
+    Organizes the complete profile of quality for notation in JSON.
+
+    arguments:
+        profile (dict): profile of quality
+
+    raises:
+
+    returns:
+        (dict): profile of quality with variances and chromosomes in sort
+            order
+
+    """
+
+    pail = dict()
+    pail["rows"] = profile["rows"]
+    pail["missing"] = dict(profile["missing"])
+    pail["moments"] = dict()
+    for column in profile["moments"].keys():
+        moments = profile["moments"][column]
+        pail["moments"][column] = {
+            "count": moments["count"],
+            "mean": (moments["mean"] if (moments["count"] > 0) else None),
+            "variance": (
+                (moments["m2"] / (moments["count"] - 1))
+                if (moments["count"] > 1) else None
+            ),
+            "minimum": (
+                moments["minimum"] if (moments["count"] > 0) else None
+            ),
+            "maximum": (
+                moments["maximum"] if (moments["count"] > 0) else None
+            ),
+        }
+        pass
+    pail["edges"] = profile["edges"]
+    pail["histograms"] = profile["histograms"]
+    pail["chromosomes"] = dict(map(
+        lambda chromosome: (chromosome, profile["chromosomes"][chromosome]),
+        pbpos.sort_chromosome_names(
+            chromosomes=list(profile["chromosomes"].keys())
+        ),
+    ))
+    return pail
+
+
+##########
+# 2. Drive across studies.
+
+
+def control_quality_profile_study(
+    instance=None,
+    parameters=None,
+):
+    """
+    Control procedure to profile the quality of GWAS summary statistics for a
+    single study and to write the profile to file.
+
+    arguments:
+        instance (dict): parameters specific to current instance
+            study (str): identifier of study
+            path_file_source (str): path to source file
+        parameters (dict): parameters common to all instances
+            size_chunk (int): count of rows in each chunk
+            path_directory_batch (str): path to directory for records of
+                individual studies
+            report (bool): whether to print reports
+
+    raises:
+
+    returns:
+
+    """
+
+    profile = define_quality_profile()
+    for table in pbstd.read_gwas_standard_format_chunks(
+        path_file=instance["path_file_source"],
+        columns=None,
+        size_chunk=parameters["size_chunk"],
+    ):
+        update_quality_profile_chunk(
+            table=table,
+            profile=profile,
+        )
+        pass
+    # Collect information.
+    record = dict()
+    record["study"] = instance["study"]
+    record.update(organize_quality_profile_record(profile=profile))
+    # Write product information to file.
+    pandas.DataFrame(data=[record,]).to_pickle(
+        os.path.join(
+            parameters["path_directory_batch"],
+            str(instance["study"] + ".pickle"),
+        )
+    )
+    with open(
+        os.path.join(
+            parameters["path_directory_batch"],
+            str(instance["study"] + ".json"),
+        ), "w",
+    ) as file_json:
+        json.dump(organize_quality_profile_json(profile=profile), file_json)
+    # Report.
+    if parameters["report"]:
+        print(str(
+            "study: " + instance["study"] + "; rows: " +
+            str(profile["rows"]) + "; chromosomes: " +
+            str(len(profile["chromosomes"]))
+        ))
+        pass
+    pass
+
+
+def control_quality_profile_studies(
+    path_directory_source=None,
+    path_directory_product=None,
+    size_chunk=None,
+    cores=None,
+    report=None,
+):
+    """
+    Control procedure to profile the quality of GWAS summary statistics for
+    all studies in a directory.
+
+    arguments:
+        path_directory_source (str): path to directory of source files in
+            standard format ("*.txt.gz")
+        path_directory_product (str): path to directory of product files
+        size_chunk (int): count of rows in each chunk
+        cores (int): count of processing cores for parallel processes
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table of scalar values of profiles
+
+    """
+
+    # Initialize directories.
+    path_directory_batch = os.path.join(path_directory_product, "batch",)
+    putly.remove_directory(path=path_directory_batch) # caution
+    putly.create_directories(path=path_directory_batch)
+    # Collect parameters specific to each instance.
+    names_source = sorted(list(filter(
+        lambda name: name.endswith(".txt.gz"),
+        os.listdir(path_directory_source),
+    )))
+    instances = list()
+    for name_file in names_source:
+        instance = dict()
+        instance["study"] = pbstd.define_study_identifier_from_file_name(
+            path_file=name_file,
+            suffix=".txt.gz",
+        )
+        instance["path_file_source"] = os.path.join(
+            path_directory_source, name_file,
+        )
+        instances.append(instance)
+        pass
+    # Collect parameters common across all instances.
+    parameters = dict()
+    parameters["size_chunk"] = size_chunk
+    parameters["path_directory_batch"] = path_directory_batch
+    parameters["report"] = report
+    # Execute procedure iteratively with parallelization across instances.
+    if (len(instances) > 0):
+        prall.drive_procedure_parallel(
+            function_control=control_quality_profile_study,
+            instances=instances,
+            parameters=parameters,
+            cores=cores,
+            report=report,
+        )
+    # Collect records from all studies.
+    tables = list()
+    profiles = dict()
+    for instance in instances:
+        path_file_record = os.path.join(
+            path_directory_batch, str(instance["study"] + ".pickle"),
+        )
+        path_file_json = os.path.join(
+            path_directory_batch, str(instance["study"] + ".json"),
+        )
+        if os.path.exists(path_file_record):
+            tables.append(pandas.read_pickle(path_file_record))
+            with open(path_file_json, "r") as file_json:
+                profiles[instance["study"]] = json.load(file_json)
+        pass
+    if (len(tables) > 0):
+        table = pandas.concat(
+            tables,
+            axis="index",
+            join="outer",
+            ignore_index=True,
+            copy=True,
+        )
+    else:
+        table = pandas.DataFrame(
+            columns=["study", "rows", "chromosomes", "missing_P",]
+        )
+    # Write product information to file.
+    putly.write_tables_to_file(
+        pail_write={"table_quality_profile": table,},
+        path_directory=path_directory_product,
+        reset_index_rows=False,
+        write_index_rows=False,
+        write_index_columns=True,
+        type="text",
+        delimiter="\t",
+        suffix=".tsv",
+    )
+    with open(
+        os.path.join(path_directory_product, "quality_profiles.json"), "w",
+    ) as file_json:
+        json.dump(profiles, file_json, indent=1)
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=4)
+        print("count of studies: " + str(table.shape[0]))
+        print(
+            "count of studies with missing values of probability: " +
+            str(int((table["missing_P"].astype("float64") > 0).sum()))
+        )
+        putly.print_terminal_partition(level=4)
+        pass
+    # Return information.
+    return table
+
+
+###############################################################################
+# Procedure
+
+
+def execute_procedure(
+    path_directory_dock=None,
+):
+    """
+    Function to execute module's main behavior.
+
+    arguments:
+        path_directory_dock (str): path to dock directory for source and product
+            directories and files
+
+    raises:
+
+    returns:
+
+    """
+
+    ##########
+    # Parameters.
+    identifier_preparation = "gwas_preparation_2023-12-30"
+    size_chunk = 1000000
+    cores = 8
+    report = True
+
+    ##########
+    # Paths.
+    path_directory_source = os.path.join(
+        path_directory_dock, identifier_preparation,
+        "8_gwas_effective_observations",
+    )
+    path_directory_product = os.path.join(
+        path_directory_dock, identifier_preparation,
+        "9_gwas_quality_profile",
+    )
+    putly.remove_directory(path=path_directory_product) # caution
+    putly.create_directories(path=path_directory_product)
+
+    ##########
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=3)
+        print(
+            "module: psychiatry_biomarkers.gwas_preparation." +
+            "quality_profile.py"
+        )
+        print("function: execute_procedure()")
+        putly.print_terminal_partition(level=5)
+        print("preparation: " + str(identifier_preparation))
+        putly.print_terminal_partition(level=5)
+        pass
+
+    ##########
+    # Profile quality for all studies.
+    control_quality_profile_studies(
+        path_directory_source=path_directory_source,
+        path_directory_product=path_directory_product,
+        size_chunk=size_chunk,
+        cores=cores,
+        report=report,
+    )
+    pass
+
+
+###############################################################################
+# End
@@ -0,0 +1,400 @@
+"""
+Supply functionality for read and write of GWAS summary statistics in the
+team's standard format.
+
+This module 'standard_format' is part of the 'gwas_preparation' package within
+the 'psychiatry_biomarkers' package.
+
+Author:
+
+    T. Cameron Waller, Ph.D.
+    tcameronwaller@gmail.com
+    Rochester, Minnesota 55902
+    United States of America
+
+License:
+
+    This file is part of the project package directory 'psychiatry_biomarkers'
+    (https://github.com/tcameronwaller/psychiatry_biomarkers/).
+
+    Project 'psychiatry_biomarkers' supports data analysis with team in
+    psychiatry and pharmacogenomics.
+    Copyright (C) 2024 Thomas Cameron Waller
+
+    The code within project 'psychiatry_biomarkers' is free software: you can
+    redistribute it and/or modify it under the terms of the GNU General Public
+    License as published by the Free Software Foundation, either version 3 of
+    the GNU General Public License, or (at your option) any later version.
+
+    The code within project 'psychiatry_biomarkers' is distributed in the hope
+    that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+    warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with project 'psychiatry_biomarkers'. If not, see
+    <http://www.gnu.org/licenses/>.
+"""
+
+###############################################################################
+# Notes
+
+# The standard format of GWAS summary statistics is a tab-delimited text file,
+# usually with compression by GZip, with the following columns.
+# SNP CHR BP A1 A2 A1AF BETA SE P N Z INFO NCASE NCONT
+# Allele "A1" is the effect allele, and "A1AF" is the frequency of allele
+# "A1".
+
+# Files with suffix ".gz" are in BGZF, which is also valid GZip, so that files
+# in sort order by position can have a positional index of Tabix (module
+# "bgzf").
+
+###############################################################################
+# Installation and importation
+
+# Standard
+
+import os
+import io
+
+# Relevant
+
+import pandas
+pandas.options.mode.chained_assignment = None # default = "warn"
+
+# Custom
+import psychiatry_biomarkers.gwas_preparation.bgzf as pbbgz
+
+###############################################################################
+# Functionality
+
+
+def define_standard_format_column_sequence():
+    """
+    Defines the sequence of columns within the standard format of GWAS summary
+    statistics.
+
+    arguments:
+
+    raises:
+
+    returns:
+        (list<str>): names of columns
+
+    """
+
+    columns_sequence = [
+        "SNP", "CHR", "BP", "A1", "A2", "A1AF", "BETA", "SE", "P", "N", "Z",
+        "INFO", "NCASE", "NCONT",
+    ]
+    return columns_sequence
+
+
+def define_standard_format_column_types():
+    """
+    Defines the variable types of columns within the standard format of GWAS
+    summary statistics.
+
+    Chromosomes are strings to accommodate "X", "Y", and "MT". Positions are
+    nullable integers, and counts of observations are floating-point, to
+    accommodate missing values.
+
+    arguments:
+
+    raises:
+
+    returns:
+        (dict<str>): variable types of columns
+
+    """
+
+    types_columns = dict()
+    types_columns["SNP"] = "string"
+    types_columns["CHR"] = "string"
+    types_columns["BP"] = "Int64"
+    types_columns["A1"] = "string"
+    types_columns["A2"] = "string"
+    types_columns["A1AF"] = "float64"
+    types_columns["BETA"] = "float64"
+    types_columns["SE"] = "float64"
+    types_columns["P"] = "float64"
+    types_columns["N"] = "float64"
+    types_columns["Z"] = "float64"
+    types_columns["INFO"] = "float64"
+    types_columns["NCASE"] = "float64"
+    types_columns["NCONT"] = "float64"
+    return types_columns
+
+
+def define_missing_value_strings():
+    """
+    Defines strings that designate missing values in text files.
+
+    arguments:
+
+    raises:
+
+    returns:
+        (list<str>): strings for missing values
+
+    """
+
+    return [
+        "nan", "na", "NAN", "NA", "<nan>", "<na>", "<NAN>", "<NA>", ".", "",
+    ]
+
+
+def read_gwas_standard_format_chunks(
+    path_file=None,
+    columns=None,
+    size_chunk=None,
+):
+    """
+    Reads GWAS summary statistics in the standard format from file in chunks of
+    rows so that use of memory does not depend on the count of variants.
+
+    arguments:
+        path_file (str): path to file of GWAS summary statistics in standard
+            format
+        columns (list<str>): names of columns to read, or None for all columns
+        size_chunk (int): count of rows in each chunk
+
+    raises:
+
+    returns:
+        (object): iterator of Pandas data-frame tables
+
+    """
+
+    types_columns = define_standard_format_column_types()
+    if columns is not None:
+        types_columns = {
+            key: types_columns[key] for key in columns
+            if key in types_columns.keys()
+        }
+    reader = pandas.read_csv(
+        path_file,
+        sep="\t",
+        header=0,
+        usecols=columns,
+        dtype=types_columns,
+        na_values=define_missing_value_strings(),
+        keep_default_na=True,
+        compression="infer",
+        chunksize=size_chunk,
+    )
+    return reader
+
+
+def write_gwas_standard_format_chunk(
+    table=None,
+    path_file=None,
+    header=None,
+    mode=None,
+    threads=None,
+):
+    """
+    Writes a chunk of GWAS summary statistics in the standard format to file.
+
+    Files with suffix ".gz" or ".bgz" are in BGZF, and each call in append
+    mode writes new members of BGZF.
+
+    arguments:
+        table (object): Pandas data-frame table of GWAS summary statistics
+        path_file (str): path to file
+        header (bool): whether to write header line of column names
+        mode (str): mode of write, either 'w' to write new or 'a' to append
+        threads (int): count of threads for compression, or None for 1
+
+    raises:
+
+    returns:
+
+    """
+
+    columns_sequence = define_standard_format_column_sequence()
+    table = table.reindex(columns=columns_sequence)
+    if (path_file.endswith(".gz") or path_file.endswith(".bgz")):
+        text = table.to_csv(
+            None,
+            sep="\t",
+            header=header,
+            index=False,
+            na_rep="NA",
+        )
+        pbbgz.write_bgzf_data(
+            data=text.encode("utf-8"),
+            path_file=path_file,
+            mode=mode,
+            level=None,
+            threads=threads,
+        )
+    else:
+        table.to_csv(
+            path_file,
+            sep="\t",
+            header=header,
+            index=False,
+            na_rep="NA",
+            mode=mode,
+        )
+    pass
+
+
+def read_gwas_standard_format_region(
+    path_file=None,
+    chromosome=None,
+    position_start=None,
+    position_end=None,
+    index=None,
+):
+    """
+    Reads GWAS summary statistics in the standard format for variants within a
+    region of a chromosome, from a file in BGZF with a positional index of
+    Tabix, without a full pass through the file.
+
+    arguments:
+        path_file (str): path to file of GWAS summary statistics in standard
+            format, in BGZF and in sort order by position
+        chromosome (str): name of chromosome
+        position_start (int): one-based start of region, inclusive
+        position_end (int): one-based end of region, inclusive
+        index (dict): positional index from "bgzf.read_tabix_index", or None
+            to read the index from the file with suffix ".tbi"
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table of GWAS summary statistics
+
+    """
+
+    columns_sequence = define_standard_format_column_sequence()
+    data = pbbgz.read_bgzf_region_data(
+        path_file=path_file,
+        index=index,
+        chromosome=chromosome,
+        position_start=position_start,
+        position_end=position_end,
+    )
+    table = pandas.read_csv(
+        io.BytesIO(data),
+        sep="\t",
+        header=None,
+        names=columns_sequence,
+        dtype=define_standard_format_column_types(),
+        na_values=define_missing_value_strings(),
+        keep_default_na=True,
+    )
+    table = table.loc[
+        (
+            (table["CHR"] == str(chromosome)) &
+            (table["BP"] >= int(position_start)) &
+            (table["BP"] <= int(position_end))
+        ), :
+    ]
+    table.reset_index(
+        level=None,
+        inplace=True,
+        drop=True,
+    )
+    return table
+
+
+def read_gwas_standard_format_chromosome(
+    path_file=None,
+    chromosome=None,
+    index=None,
+):
+    """
+    Reads GWAS summary statistics in the standard format for all variants on
+    a chromosome, from a file in BGZF with a positional index of Tabix.
+
+    arguments:
+        path_file (str): path to file of GWAS summary statistics in standard
+            format, in BGZF and in sort order by position
+        chromosome (str): name of chromosome
+        index (dict): positional index from "bgzf.read_tabix_index", or None
+            to read the index from the file with suffix ".tbi"
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table of GWAS summary statistics
+
+    """
+
+    return read_gwas_standard_format_region(
+        path_file=path_file,
+        chromosome=chromosome,
+        position_start=1,
+        position_end=((1 << 29) - 1),
+        index=index,
+    )
+
+
+def complement_alleles(
+    series=None,
+):
+    """
+    Translates nucleotides in alleles to their complements on the other strand.
+
+    arguments:
+        series (object): Pandas series of strings for alleles
+
+    raises:
+
+    returns:
+        (object): Pandas series of strings for alleles
+
+    """
+
+    return series.str.translate(str.maketrans("ACGT", "TGCA"))
+
+
+def reverse_complement_alleles(
+    series=None,
+):
+    """
+    Translates alleles to their reverse complements on the other strand, in
+    which the sequence of nucleotides reverses as well as their complements.
+
+    arguments:
+        series (object): Pandas series of strings for alleles
+
+    raises:
+
+    returns:
+        (object): Pandas series of strings for alleles
+
+    """
+
+    return complement_alleles(series=series).str[::-1]
+
+
+def define_study_identifier_from_file_name(
+    path_file=None,
+    suffix=None,
+):
+    """
+    Defines the identifier of a study from the name of its file.
+
+    arguments:
+        path_file (str): path to file
+        suffix (str): suffix of file name to remove, such as ".txt.gz"
+
+    raises:
+
+    returns:
+        (str): identifier of study
+
+    """
+
+    name_file = os.path.basename(path_file)
+    if name_file.endswith(suffix):
+        name_file = name_file[:-len(suffix)]
+    return name_file
+
+
+###############################################################################
+# End
@@ -0,0 +1,748 @@
+"""
+Supply functionality for translation of GWAS summary statistics from the
+formats of their sources to the team's standard format.
+
+This module 'translation' is part of the 'gwas_preparation' package within
+the 'psychiatry_biomarkers' package.
+
+Author:
+
+    T. Cameron Waller, Ph.D.
+    tcameronwaller@gmail.com
+    Rochester, Minnesota 55902
+    United States of America
+
+License:
+
+    This file is part of the project package directory 'psychiatry_biomarkers'
+    (https://github.com/tcameronwaller/psychiatry_biomarkers/).
+
+    Project 'psychiatry_biomarkers' supports data analysis with team in
+    psychiatry and pharmacogenomics.
+    Copyright (C) 2024 Thomas Cameron Waller
+
+    The code within project 'psychiatry_biomarkers' is free software: you can
+    redistribute it and/or modify it under the terms of the GNU General Public
+    License as published by the Free Software Foundation, either version 3 of
+    the GNU General Public License, or (at your option) any later version.
+
+    The code within project 'psychiatry_biomarkers' is distributed in the hope
+    that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+    warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with project 'psychiatry_biomarkers'. If not, see
+    <http://www.gnu.org/licenses/>.
+"""
+
+###############################################################################
+# Notes
+
+# The driver script "1_translate_gwas_to_standard_format.sh" calls a separate
+# script for each study, which the column "script" of the parameter table
+# designates, such as "translate_gwas_37872160_williams_2023.sh".
+
+# This module replaces those scripts with a single procedure that a table of
+# column mappings specifies, such as
+# "table_gwas_column_mapping_tcw_2023-12-30.tsv". Each row of the table of
+# column mappings has the same value of "script" as the studies in the
+# parameter table to which it applies, and it has the following columns.
+# script: key that matches the column "script" of the parameter table
+# delimiter: delimiter of the source file, either "tab", "space", or "comma"
+# skip_rows: count of lines to skip before the header line
+# effect: type of effect in source, either "beta", "odds_ratio", or "z"
+# SNP ... NCONT: name of the column in the source file for each column of the
+#   standard format, or "NA" if the source does not have the column
+
+# Observations from the parameter table fill the columns "N", "NCASE", and
+# "NCONT" either in all rows, when "fill_observations" or "fill_case_control"
+# is 1, or otherwise only in rows with missing values.
+
+# Studies without a row in the table of column mappings still require their
+# separate script.
+
+###############################################################################
+# Installation and importation
+
+# Standard
+
+import os
+
+# Relevant
+
+import numpy
+import pandas
+pandas.options.mode.chained_assignment = None # default = "warn"
+
+# Custom
+import partner.utility as putly
+import partner.parallelization as prall
+import psychiatry_biomarkers.parameter_table as pbpar
+import psychiatry_biomarkers.gwas_preparation.standard_format as pbstd
+import psychiatry_biomarkers.profiling as pbprf
+
+###############################################################################
+# Functionality
+
+
+##########
+# 1. Read parameters.
+
+
+def read_source_parameter_table_translation(
+    path_file_table=None,
+    report=None,
+):
+    """
+    Reads and organizes source information from file.
+
+    Notice that Pandas does not accommodate missing values within series of
+    integer variable types.
+
+    arguments:
+        path_file_table (str): path to file for parameter table of studies,
+            such as "table_gwas_translation_tcw_2023-12-30.tsv"
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table
+
+    """
+
+    # Read information from file.
+    # The procedure validates the table against its schema.
+    table = pbpar.read_parameter_table(
+        path_file_table=path_file_table,
+        types_columns=None,
+        path_directory_cache=None,
+        report=False,
+    )
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=5)
+        print("count of studies in parameter table: " + str(table.shape[0]))
+        putly.print_terminal_partition(level=5)
+        pass
+    # Return information.
+    return table
+
+
+def read_source_column_mapping_table(
+    path_file_table=None,
+    report=None,
+):
+    """
+    Reads and organizes from file the table of column mappings for
+    translation of GWAS summary statistics to the standard format.
+
+    arguments:
+        path_file_table (str): path to file for table of column mappings
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (dict<dict>): column mappings for each value of "script"
+
+    """
+
+    # Read information from file.
+    table = pandas.read_csv(
+        path_file_table,
+        sep="\t",
+        header=0,
+        dtype="string",
+        keep_default_na=False,
+    )
+    # Organize information.
+    columns_standard = pbstd.define_standard_format_column_sequence()
+    mappings = dict()
+    for index, row in table.iterrows():
+        mapping = dict()
+        mapping["delimiter"] = str(row["delimiter"]).strip()
+        mapping["skip_rows"] = int(row["skip_rows"])
+        mapping["effect"] = str(row["effect"]).strip()
+        mapping["columns"] = dict()
+        for column in columns_standard:
+            source = str(row[column]).strip()
+            if (len(source) > 0) and (source != "NA"):
+                mapping["columns"][column] = source
+            pass
+        mappings[str(row["script"]).strip()] = mapping
+        pass
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=5)
+        print("count of column mappings: " + str(len(mappings)))
+        putly.print_terminal_partition(level=5)
+        pass
+    # Return information.
+    return mappings
+
+
+def define_delimiter_separator(
+    delimiter=None,
+):
+    """
+    Defines the separator for Pandas from the name of a delimiter.
+
+    arguments:
+        delimiter (str): name of delimiter, either "tab", "space", or "comma"
+
+    raises:
+
+    returns:
+        (str): separator
+
+    """
+
+    separators = {
+        "tab": "\t",
+        "space": r"\s+",
+        "comma": ",",
+    }
+    return separators[delimiter]
+
+
+def define_translation_instances(
+    table_parameter=None,
+    mappings=None,
+    path_directory_source=None,
+    path_directory_product=None,
+):
+    """
+    Defines instances of studies for translation from the rows of the
+    parameter table with availability and with a column mapping.
+
+    arguments:
+        table_parameter (object): Pandas data-frame table of parameters for
+            studies
+        mappings (dict<dict>): column mappings for each value of "script"
+        path_directory_source (str): path to parent directory of source files
+        path_directory_product (str): path to directory of product files
+
+    raises:
+
+    returns:
+        (dict<list>): instances for iteration and studies without mapping
+
+    """
+
+    table_availability = table_parameter.loc[
+        (table_parameter["availability"] == 1), :
+    ]
+    instances = list()
+    studies_missing = list()
+    for index, row in table_availability.iterrows():
+        study = str(row["study"]).strip()
+        script = str(row["script"]).strip()
+        if script not in mappings.keys():
+            studies_missing.append(study)
+            continue
+        name_file = str(row["file"]).strip()
+        instance = dict()
+        instance["study"] = study
+        instance["mapping"] = mappings[script]
+        instance["path_file_source"] = os.path.join(
+            path_directory_source, str(row["directory"]).strip(), name_file,
+        )
+        instance["path_file_product"] = os.path.join(
+            path_directory_product, str(study + ".txt.gz"),
+        )
+        if (name_file.endswith(".gz") or name_file.endswith(".bgz")):
+            instance["compression"] = "gzip"
+        else:
+            instance["compression"] = None
+        instance["fill_observations"] = (row["fill_observations"] == 1)
+        instance["observations_total"] = row["observations_total"]
+        instance["fill_case_control"] = (row["fill_case_control"] == 1)
+        instance["cases"] = row["cases"]
+        instance["controls"] = row["controls"]
+        instances.append(instance)
+        pass
+    # Collect information.
+    pail = dict()
+    pail["instances"] = instances
+    pail["studies_missing"] = studies_missing
+    # Return information.
+    return pail
+
+
+##########
+# 2. Translate summary statistics.
+
+
+def fill_column_values(
+    table=None,
+    column=None,
+    value=None,
+    fill_all=None,
+):
+    """
+    Fills a column with a constant value, either in all rows or only in rows
+    with missing values.
+
+    arguments:
+        table (object): Pandas data-frame table
+        column (str): name of column
+        value (float): value for fill
+        fill_all (bool): whether to fill all rows
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table
+
+    """
+
+    if pandas.isna(value):
+        return table
+    if fill_all:
+        table[column] = float(value)
+    else:
+        table[column] = table[column].fillna(float(value))
+    return table
+
+
+def read_source_gwas_chunks(
+    instance=None,
+    size_chunk=None,
+):
+    """
+    Reads GWAS summary statistics in the format of their source from file in
+    chunks of rows, with all values as strings.
+
+    The column mapping of the product instance only includes the columns that
+    are present in the source.
+
+    arguments:
+        instance (dict): parameters of study, including the column mapping,
+            the path to the source file, and the type of compression
+        size_chunk (int): count of rows in each chunk
+
+    raises:
+
+    returns:
+        (dict): iterator of Pandas data-frame tables, copy of instance with
+            column mapping for columns in source, and names of columns absent
+            from source
+
+    """
+
+    # Extract parameters.
+    mapping = instance["mapping"]
+    separator = define_delimiter_separator(delimiter=mapping["delimiter"])
+    # Determine columns in source.
+    table_header = pandas.read_csv(
+        instance["path_file_source"],
+        sep=separator,
+        header=0,
+        skiprows=mapping["skip_rows"],
+        nrows=0,
+        compression=instance["compression"],
+    )
+    columns_source = list(filter(
+        lambda column: (column in table_header.columns),
+        mapping["columns"].values(),
+    ))
+    columns_absent = list(filter(
+        lambda column: (column not in table_header.columns),
+        mapping["columns"].values(),
+    ))
+    instance = dict(instance)
+    instance["mapping"] = dict(mapping)
+    instance["mapping"]["columns"] = {
+        key: value for key, value in mapping["columns"].items()
+        if value in columns_source
+    }
+    # Read in chunks.
+    reader = pandas.read_csv(
+        instance["path_file_source"],
+        sep=separator,
+        header=0,
+        skiprows=mapping["skip_rows"],
+        usecols=columns_source,
+        dtype="string",
+        na_values=pbstd.define_missing_value_strings(),
+        keep_default_na=True,
+        compression=instance["compression"],
+        chunksize=size_chunk,
+    )
+    # Collect information.
+    pail = dict()
+    pail["reader"] = reader
+    pail["instance"] = instance
+    pail["columns_absent"] = columns_absent
+    # Return information.
+    return pail
+
+
+def translate_gwas_chunk(
+    table=None,
+    instance=None,
+):
+    """
+    Translates a chunk of GWAS summary statistics from the format of its
+    source to the standard format.
+
+    arguments:
+        table (object): Pandas data-frame table of summary statistics in format
+            of source with all values as strings
+        instance (dict): parameters of study, including the column mapping
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table in standard format
+
+    """
+
+    # Extract parameters.
+    mapping = instance["mapping"]
+    types_columns = pbstd.define_standard_format_column_types()
+    # Map columns.
+    table_product = pandas.DataFrame(index=table.index)
+    for column in pbstd.define_standard_format_column_sequence():
+        if column in mapping["columns"].keys():
+            table_product[column] = table[mapping["columns"][column]]
+        else:
+            table_product[column] = pandas.NA
+        pass
+    # Organize identifiers and alleles.
+    table_product["SNP"] = table_product["SNP"].astype("string").str.strip()
+    table_product["CHR"] = (
+        table_product["CHR"].astype("string").str.strip().str.replace(
+            r"^(?i:chr)", "", regex=True,
+        )
+    )
+    for column in ["A1", "A2",]:
+        table_product[column] = (
+            table_product[column].astype("string").str.strip().str.upper()
+        )
+    # Cast numeric values, designating invalid values as missing.
+    for column in types_columns.keys():
+        if types_columns[column] not in ["string",]:
+            table_product[column] = pandas.to_numeric(
+                table_product[column], errors="coerce",
+            )
+        pass
+    table_product["BP"] = table_product["BP"].round()
+    # Convert effects.
+    if (mapping["effect"] == "odds_ratio"):
+        odds = table_product["BETA"].to_numpy(dtype="float64")
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            table_product["BETA"] = numpy.where(
+                (odds > 0), numpy.log(odds), numpy.nan,
+            )
+    elif (mapping["effect"] == "z"):
+        table_product["Z"] = table_product["Z"].fillna(table_product["BETA"])
+        table_product["BETA"] = numpy.nan
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        table_product["Z"] = table_product["Z"].fillna(
+            table_product["BETA"] / table_product["SE"]
+        )
+    # Fill observations.
+    table_product = fill_column_values(
+        table=table_product,
+        column="NCASE",
+        value=instance["cases"],
+        fill_all=instance["fill_case_control"],
+    )
+    table_product = fill_column_values(
+        table=table_product,
+        column="NCONT",
+        value=instance["controls"],
+        fill_all=instance["fill_case_control"],
+    )
+    table_product["N"] = table_product["N"].fillna(
+        table_product["NCASE"] + table_product["NCONT"]
+    )
+    table_product = fill_column_values(
+        table=table_product,
+        column="N",
+        value=instance["observations_total"],
+        fill_all=instance["fill_observations"],
+    )
+    # Cast to types of standard format.
+    table_product = table_product.astype(types_columns)
+    # Return information.
+    return table_product
+
+
+@pbprf.profile_procedure(category="study", keys_arguments=["study",])
+def control_translate_study_gwas(
+    instance=None,
+    parameters=None,
+):
+    """
+    Control procedure to translate GWAS summary statistics for a single study
+    in chunks of rows and to write the product and counts of rows to file.
+
+    arguments:
+        instance (dict): parameters specific to current instance
+            study (str): identifier of study
+            mapping (dict): column mapping
+            path_file_source (str): path to source file
+            path_file_product (str): path to product file
+            compression (str): type of compression of source file
+            fill_observations (bool): whether to fill observations in all rows
+            observations_total (float): count of observations
+            fill_case_control (bool): whether to fill cases and controls in all
+                rows
+            cases (float): count of cases
+            controls (float): count of controls
+        parameters (dict): parameters common to all instances
+            size_chunk (int): count of rows in each chunk
+            path_directory_batch (str): path to directory for records of
+                individual studies
+            report (bool): whether to print reports
+
+    raises:
+
+    returns:
+
+    """
+
+    # Read source in chunks.
+    pail_source = read_source_gwas_chunks(
+        instance=instance,
+        size_chunk=parameters["size_chunk"],
+    )
+    instance = pail_source["instance"]
+    reader = pail_source["reader"]
+    columns_absent = pail_source["columns_absent"]
+    # Translate and write in chunks.
+    count_rows = 0
+    first = True
+    for table_chunk in reader:
+        table_product = translate_gwas_chunk(
+            table=table_chunk,
+            instance=instance,
+        )
+        pbstd.write_gwas_standard_format_chunk(
+            table=table_product,
+            path_file=instance["path_file_product"],
+            header=first,
+            mode=("w" if first else "a"),
+        )
+        count_rows += table_product.shape[0]
+        first = False
+        pass
+    # Collect information.
+    record = dict()
+    record["study"] = instance["study"]
+    record["rows"] = count_rows
+    record["columns_absent"] = ";".join(columns_absent)
+    # Write product information to file.
+    pandas.DataFrame(data=[record,]).to_pickle(
+        os.path.join(
+            parameters["path_directory_batch"],
+            str(instance["study"] + ".pickle"),
+        )
+    )
+    # Report.
+    if parameters["report"]:
+        print(str(
+            "study: " + instance["study"] + "; rows: " + str(count_rows)
+        ))
+        if (len(columns_absent) > 0):
+            print("columns absent from source: " + record["columns_absent"])
+        pass
+    pass
+
+
+##########
+# 3. Drive translation across studies.
+
+
+def control_translate_studies_gwas(
+    path_file_table_parameter=None,
+    path_file_table_mapping=None,
+    path_directory_source=None,
+    path_directory_product=None,
+    size_chunk=None,
+    cores=None,
+    report=None,
+):
+    """
+    Control procedure to translate GWAS summary statistics to the standard
+    format for all studies with availability in the parameter table and with
+    a column mapping.
+
+    arguments:
+        path_file_table_parameter (str): path to file for parameter table of
+            studies
+        path_file_table_mapping (str): path to file for table of column
+            mappings
+        path_directory_source (str): path to parent directory of source files
+        path_directory_product (str): path to directory of product files
+        size_chunk (int): count of rows in each chunk
+        cores (int): count of processing cores for parallel processes
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table of counts of rows
+
+    """
+
+    # Initialize directories.
+    path_directory_batch = os.path.join(path_directory_product, "batch",)
+    putly.remove_directory(path=path_directory_batch) # caution
+    putly.create_directories(path=path_directory_batch)
+    # Read source information from file.
+    table_parameter = read_source_parameter_table_translation(
+        path_file_table=path_file_table_parameter,
+        report=report,
+    )
+    mappings = read_source_column_mapping_table(
+        path_file_table=path_file_table_mapping,
+        report=report,
+    )
+    # Collect parameters specific to each instance.
+    pail_instances = define_translation_instances(
+        table_parameter=table_parameter,
+        mappings=mappings,
+        path_directory_source=path_directory_source,
+        path_directory_product=path_directory_product,
+    )
+    instances = pail_instances["instances"]
+    # Collect parameters common across all instances.
+    parameters = dict()
+    parameters["size_chunk"] = size_chunk
+    parameters["path_directory_batch"] = path_directory_batch
+    parameters["report"] = report
+    # Execute procedure iteratively with parallelization across instances.
+    if (len(instances) > 0):
+        prall.drive_procedure_parallel(
+            function_control=control_translate_study_gwas,
+            instances=instances,
+            parameters=parameters,
+            cores=cores,
+            report=report,
+        )
+    # Collect records from all studies.
+    tables = list()
+    for instance in instances:
+        path_file_record = os.path.join(
+            path_directory_batch, str(instance["study"] + ".pickle"),
+        )
+        if os.path.exists(path_file_record):
+            tables.append(pandas.read_pickle(path_file_record))
+        pass
+    if (len(tables) > 0):
+        table = pandas.concat(
+            tables,
+            axis="index",
+            join="outer",
+            ignore_index=True,
+            copy=True,
+        )
+    else:
+        table = pandas.DataFrame(columns=["study", "rows", "columns_absent",])
+    # Write product information to file.
+    putly.write_tables_to_file(
+        pail_write={"table_translation_counts": table,},
+        path_directory=path_directory_product,
+        reset_index_rows=False,
+        write_index_rows=False,
+        write_index_columns=True,
+        type="text",
+        delimiter="\t",
+        suffix=".tsv",
+    )
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=4)
+        print("count of studies with translation: " + str(table.shape[0]))
+        print(
+            "count of studies without column mapping: " +
+            str(len(pail_instances["studies_missing"]))
+        )
+        putly.print_terminal_partition(level=4)
+        pass
+    # Return information.
+    return table
+
+
+###############################################################################
+# Procedure
+
+
+def execute_procedure(
+    path_directory_dock=None,
+):
+    """
+    Function to execute module's main behavior.
+
+    arguments:
+        path_directory_dock (str): path to dock directory for source and product
+            directories and files
+
+    raises:
+
+    returns:
+
+    """
+
+    ##########
+    # Parameters.
+    identifier_preparation = "gwas_preparation_2023-12-30"
+    identifier_parameter = "tcw_2023-12-30"
+    size_chunk = 1000000
+    cores = 8
+    report = True
+
+    ##########
+    # Paths.
+    path_directory_source = os.path.join(
+        path_directory_dock, "gwas_summaries_waller_metabolism",
+    )
+    path_directory_product = os.path.join(
+        path_directory_dock, identifier_preparation, "1_gwas_format_standard",
+    )
+    path_directory_parameters = os.path.join(
+        path_directory_dock, "parameters", "psychiatric_metabolism",
+    )
+    path_file_table_parameter = os.path.join(
+        path_directory_parameters,
+        str("table_gwas_translation_" + identifier_parameter + ".tsv"),
+    )
+    path_file_table_mapping = os.path.join(
+        path_directory_parameters,
+        str("table_gwas_column_mapping_" + identifier_parameter + ".tsv"),
+    )
+    putly.create_directories(path=path_directory_product)
+
+    ##########
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=3)
+        print("module: psychiatry_biomarkers.gwas_preparation.translation.py")
+        print("function: execute_procedure()")
+        putly.print_terminal_partition(level=5)
+        print("preparation: " + str(identifier_preparation))
+        print("parameter: " + str(identifier_parameter))
+        putly.print_terminal_partition(level=5)
+        pass
+
+    ##########
+    # Translate GWAS summary statistics for all studies.
+    control_translate_studies_gwas(
+        path_file_table_parameter=path_file_table_parameter,
+        path_file_table_mapping=path_file_table_mapping,
+        path_directory_source=path_directory_source,
+        path_directory_product=path_directory_product,
+        size_chunk=size_chunk,
+        cores=cores,
+        report=report,
+    )
+    pass
+
+
+###############################################################################
+# End
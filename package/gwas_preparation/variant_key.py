@@ -0,0 +1,298 @@
+"""
+Supply functionality for packing the genomic coordinates and alleles of
+variants within single integer keys.
+
+This module 'variant_key' is part of the 'gwas_preparation' package within
+the 'psychiatry_biomarkers' package.
+
+Author:
+
+    T. Cameron Waller, Ph.D.
+    tcameronwaller@gmail.com
+    Rochester, Minnesota 55902
+    United States of America
+
+License:
+
+    This file is part of the project package directory 'psychiatry_biomarkers'
+    (https://github.com/tcameronwaller/psychiatry_biomarkers/).
+
+    Project 'psychiatry_biomarkers' supports data analysis with team in
+    psychiatry and pharmacogenomics.
+    Copyright (C) 2024 Thomas Cameron Waller
+
+    The code within project 'psychiatry_biomarkers' is free software: you can
+    redistribute it and/or modify it under the terms of the GNU General Public
+    License as published by the Free Software Foundation, either version 3 of
+    the GNU General Public License, or (at your option) any later version.
+
+    The code within project 'psychiatry_biomarkers' is distributed in the hope
+    that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+    warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with project 'psychiatry_biomarkers'. If not, see
+    <http://www.gnu.org/licenses/>.
+"""
+
+###############################################################################
+# Notes
+
+# A key packs a variant within a signed 64-bit integer with the following
+# layout of bits, from most to least significant.
+# bit 63: zero, so that keys are positive
+# bits 58-62: code of chromosome (1-22, X = 23, Y = 24, MT = 25, XY = 26)
+# bits 30-57: position on chromosome (maximum 268,435,455)
+# bits 0-29: code of the unordered pair of alleles
+
+# For single nucleotide variants, the code of alleles is the two nucleotides
+# in sort order, each in two bits. For other variants, the code of alleles has
+# bit 29 set and carries 29 bits of a hash of the two alleles in sort order,
+# which leaves a small chance of collision between different insertions or
+# deletions at the same position.
+
+# Keys do not depend on which allele is the effect allele, so the same variant
+# from different sources has the same key. Keys sort in genomic sequence, so
+# arrays of keys support binary search and merge of sorted streams.
+
+# Variants with an unknown chromosome, a missing or invalid position, or
+# missing alleles have key -1.
+
+###############################################################################
+# Installation and importation
+
+# Standard
+
+# Relevant
+
+import numpy
+import pandas
+pandas.options.mode.chained_assignment = None # default = "warn"
+
+# Custom
+
+###############################################################################
+# Functionality
+
+
+def define_chromosome_codes():
+    """
+    Defines integer codes for names of chromosomes.
+
+    arguments:
+
+    raises:
+
+    returns:
+        (dict<int>): codes for names of chromosomes
+
+    """
+
+    codes = dict()
+    for chromosome in range(1, 23):
+        codes[str(chromosome)] = chromosome
+    codes["X"] = 23
+    codes["23"] = 23
+    codes["Y"] = 24
+    codes["24"] = 24
+    codes["MT"] = 25
+    codes["M"] = 25
+    # PLINK designates the pseudo-autosomal region of X as "25" or "XY" and
+    # the mitochondrial chromosome as "26". The pseudo-autosomal region takes
+    # the code after MT, so that keys of MT stay the same as before.
+    codes["26"] = 25
+    codes["XY"] = 26
+    codes["25"] = 26
+    return codes
+
+
+def encode_chromosomes(
+    chromosomes=None,
+):
+    """
+    Encodes names of chromosomes as integers.
+
+    Names of chromosomes can have the prefix "chr" or can be RefSeq accessions
+    for the assembly, such as "NC_000001.10".
+
+    arguments:
+        chromosomes (object): Pandas series of names of chromosomes
+
+    raises:
+
+    returns:
+        (object): NumPy array of codes of chromosomes, or 0 if unknown
+
+    """
+
+    names = pandas.Series(chromosomes).astype("string").str.strip()
+    names = names.str.replace(r"^(?i:chr)", "", regex=True).str.upper()
+    # Translate RefSeq accessions.
+    accessions = names.str.extract(r"^NC_0+(\d+)\.\d+$", expand=False)
+    names = names.where(accessions.isna(), accessions)
+    names = names.replace({"12920": "MT",})
+    codes = names.map(define_chromosome_codes())
+    return codes.fillna(0).to_numpy(dtype="int64")
+
+
+def encode_allele_pairs(
+    alleles_first=None,
+    alleles_second=None,
+):
+    """
+    Encodes unordered pairs of alleles as integers.
+
+    arguments:
+        alleles_first (object): Pandas series of first alleles
+        alleles_second (object): Pandas series of second alleles
+
+    raises:
+
+    returns:
+        (object): NumPy array of codes of pairs of alleles, or -1 if missing
+
+    """
+
+    first = pandas.Series(alleles_first).astype("string").str.strip().str.upper()
+    second = pandas.Series(
+        alleles_second
+    ).astype("string").str.strip().str.upper()
+    first.index = second.index
+    indicator_missing = (
+        first.isna() | second.isna() |
+        (first.str.len() == 0) | (second.str.len() == 0)
+    ).to_numpy(dtype="bool")
+    first = first.fillna("")
+    second = second.fillna("")
+    # Order alleles.
+    indicator_order = (first <= second).to_numpy(dtype="bool")
+    low = pandas.Series(
+        numpy.where(indicator_order, first, second), index=first.index,
+        dtype="string",
+    )
+    high = pandas.Series(
+        numpy.where(indicator_order, second, first), index=first.index,
+        dtype="string",
+    )
+    # Encode single nucleotide variants.
+    nucleotides = {"A": 0, "C": 1, "G": 2, "T": 3,}
+    code_low = low.map(nucleotides)
+    code_high = high.map(nucleotides)
+    indicator_single = (
+        code_low.notna() & code_high.notna()
+    ).to_numpy(dtype="bool")
+    code_single = (
+        code_low.fillna(0).to_numpy(dtype="int64") * 4 +
+        code_high.fillna(0).to_numpy(dtype="int64")
+    )
+    # Encode other variants by hash.
+    hashes = pandas.util.hash_array(
+        (low + ":" + high).to_numpy(dtype="object")
+    )
+    code_other = (
+        (1 << 29) |
+        (hashes & numpy.uint64((1 << 29) - 1)).astype("int64")
+    )
+    codes = numpy.where(indicator_single, code_single, code_other)
+    codes = numpy.where(indicator_missing, -1, codes)
+    return codes.astype("int64")
+
+
+def pack_position_keys(
+    chromosomes=None,
+    positions=None,
+):
+    """
+    Packs chromosomes and positions of variants within integer keys with a
+    code of zero for alleles.
+
+    arguments:
+        chromosomes (object): Pandas series of names of chromosomes
+        positions (object): Pandas series of positions on chromosomes
+
+    raises:
+
+    returns:
+        (object): NumPy array of keys, or -1 if invalid
+
+    """
+
+    codes_chromosome = encode_chromosomes(chromosomes=chromosomes)
+    positions = pandas.to_numeric(
+        pandas.Series(positions), errors="coerce",
+    ).fillna(-1).to_numpy(dtype="int64")
+    indicator_valid = (
+        (codes_chromosome > 0) &
+        (positions >= 0) & (positions < (1 << 28))
+    )
+    keys = (
+        (codes_chromosome << 58) |
+        (numpy.clip(positions, 0, ((1 << 28) - 1)) << 30)
+    )
+    return numpy.where(indicator_valid, keys, -1).astype("int64")
+
+
+def pack_variant_keys(
+    chromosomes=None,
+    positions=None,
+    alleles_first=None,
+    alleles_second=None,
+):
+    """
+    Packs chromosomes, positions, and unordered pairs of alleles of variants
+    within integer keys.
+
+    arguments:
+        chromosomes (object): Pandas series of names of chromosomes
+        positions (object): Pandas series of positions on chromosomes
+        alleles_first (object): Pandas series of first alleles
+        alleles_second (object): Pandas series of second alleles
+
+    raises:
+
+    returns:
+        (object): NumPy array of keys, or -1 if invalid
+
+    """
+
+    keys_position = pack_position_keys(
+        chromosomes=chromosomes,
+        positions=positions,
+    )
+    codes_allele = encode_allele_pairs(
+        alleles_first=alleles_first,
+        alleles_second=alleles_second,
+    )
+    keys = (keys_position | numpy.maximum(codes_allele, 0))
+    indicator_valid = ((keys_position >= 0) & (codes_allele >= 0))
+    return numpy.where(indicator_valid, keys, -1).astype("int64")
+
+
+def unpack_variant_keys(
+    keys=None,
+):
+    """
+    Unpacks codes of chromosomes and positions from integer keys.
+
+    arguments:
+        keys (object): NumPy array of keys
+
+    raises:
+
+    returns:
+        (dict<object>): NumPy arrays of codes of chromosomes, positions, and
+            codes of pairs of alleles
+
+    """
+
+    keys = numpy.asarray(keys, dtype="int64")
+    pail = dict()
+    pail["chromosome"] = (keys >> 58) & ((1 << 5) - 1)
+    pail["position"] = (keys >> 30) & ((1 << 28) - 1)
+    pail["alleles"] = keys & ((1 << 30) - 1)
+    return pail
+
+
+###############################################################################
+# End
@@ -41,6 +41,7 @@ License:
 # Installation and importation
 
 # Standard.
+import os
 import argparse
 import textwrap
 
@@ -48,7 +49,29 @@ import textwrap
 
 # Custom.
 
+import psychiatry_biomarkers.batch_execution
+import psychiatry_biomarkers.parameter_table
+import psychiatry_biomarkers.storage
+import psychiatry_biomarkers.profiling
+import psychiatry_biomarkers.reporting
 import psychiatry_biomarkers.genetic_correlation.thyroid_organization
+import psychiatry_biomarkers.gwas_preparation.translation
+import psychiatry_biomarkers.gwas_preparation.assembly
+import psychiatry_biomarkers.gwas_preparation.dbsnp
+import psychiatry_biomarkers.gwas_preparation.merge
+import psychiatry_biomarkers.gwas_preparation.constraint
+import psychiatry_biomarkers.gwas_preparation.frequency
+import psychiatry_biomarkers.gwas_preparation.effective
+import psychiatry_biomarkers.gwas_preparation.harmonization
+import psychiatry_biomarkers.gwas_preparation.pipeline
+import psychiatry_biomarkers.gwas_preparation.position_index
+import psychiatry_biomarkers.gwas_preparation.columnar
+import psychiatry_biomarkers.gwas_preparation.qq_plot
+import psychiatry_biomarkers.gwas_preparation.quality_profile
+import psychiatry_biomarkers.gwas_preparation.duplication
+import psychiatry_biomarkers.gwas_preparation.presence
+import psychiatry_biomarkers.ldsc.heritability
+import psychiatry_biomarkers.ldsc.munge
 #import psychiatry_biomarkers_polygenic_score.thyroid_organization
 
 #dir()
@@ -83,6 +106,10 @@ def define_interface_parsers():
     )
     subparsers = parser.add_subparsers(title="procedures")
     parser_main = define_main_subparser(subparsers=subparsers)
+    parser_batch = define_batch_subparser(subparsers=subparsers)
+    parser_parameter = define_parameter_subparser(subparsers=subparsers)
+    parser_storage = define_storage_subparser(subparsers=subparsers)
+    parser_trace = define_trace_subparser(subparsers=subparsers)
     # TODO: add other subparsers here...
     # Parse arguments.
     return parser.parse_args()
@@ -170,6 +197,24 @@ def define_main_subparser(subparsers=None):
             "directories and files."
         )
     )
+    parser_main.add_argument(
+        "-path_file_trace", "--path_file_trace",
+        dest="path_file_trace", type=str, default=None,
+        help=(
+            "Path to file in which to record a trace of time, memory, and " +
+            "counts of rows for procedures; no trace by default."
+        )
+    )
+    parser_main.add_argument(
+        "-verbosity", "--verbosity",
+        dest="verbosity", type=int, default=None,
+        choices=[0, 1, 2, 3,],
+        help=(
+            "Level of verbosity for reports of tables: 0, silent; 1, counts " +
+            "of rows and durations; 2, also types of columns; 3, also first " +
+            "rows of tables; 1 by default."
+        )
+    )
     parser_main.add_argument(
         "-rg_thyroid_organization",
         "--rg_thyroid_organization",
@@ -179,6 +224,173 @@ def define_main_subparser(subparsers=None):
             "Organize information."
         )
     )
+    parser_main.add_argument(
+        "-gwas_translation",
+        "--gwas_translation",
+        dest="gwas_translation",
+        action="store_true",
+        help=(
+            "Translate GWAS summary statistics to standard format for all " +
+            "studies with a column mapping."
+        )
+    )
+    parser_main.add_argument(
+        "-gwas_assembly",
+        "--gwas_assembly",
+        dest="gwas_assembly",
+        action="store_true",
+        help=(
+            "Map genomic coordinates of GWAS summary statistics to GRCh37 " +
+            "by chain files for all studies."
+        )
+    )
+    parser_main.add_argument(
+        "-gwas_dbsnp_rsid",
+        "--gwas_dbsnp_rsid",
+        dest="gwas_dbsnp_rsid",
+        action="store_true",
+        help=(
+            "Fill rsIDs from an index of dbSNP for designated studies."
+        )
+    )
+    parser_main.add_argument(
+        "-gwas_merge_storage",
+        "--gwas_merge_storage",
+        dest="gwas_merge_storage",
+        action="store_true",
+        help=(
+            "Merge rsIDs from stored GWAS summary statistics by a join of " +
+            "sorted streams."
+        )
+    )
+    parser_main.add_argument(
+        "-gwas_filter_constrain",
+        "--gwas_filter_constrain",
+        dest="gwas_filter_constrain",
+        action="store_true",
+        help=(
+            "Filter and constrain values of GWAS summary statistics for all " +
+            "studies in a single pass."
+        )
+    )
+    parser_main.add_argument(
+        "-gwas_allele_frequency",
+        "--gwas_allele_frequency",
+        dest="gwas_allele_frequency",
+        action="store_true",
+        help=(
+            "Fill missing allele frequencies from an index of a reference " +
+            "panel for all studies."
+        )
+    )
+    parser_main.add_argument(
+        "-gwas_harmonization",
+        "--gwas_harmonization",
+        dest="gwas_harmonization",
+        action="store_true",
+        help=(
+            "Harmonize alleles of GWAS summary statistics against the " +
+            "packed reference genome for all studies."
+        )
+    )
+    parser_main.add_argument(
+        "-gwas_effective_observations",
+        "--gwas_effective_observations",
+        dest="gwas_effective_observations",
+        action="store_true",
+        help=(
+            "Calculate effective observations for each variant in GWAS " +
+            "summary statistics for all studies from logistic regression."
+        )
+    )
+    parser_main.add_argument(
+        "-gwas_pipeline",
+        "--gwas_pipeline",
+        dest="gwas_pipeline",
+        action="store_true",
+        help=(
+            "Prepare GWAS summary statistics for all studies in a single " +
+            "streaming pass through the stages of preparation."
+        )
+    )
+    parser_main.add_argument(
+        "-gwas_position_index",
+        "--gwas_position_index",
+        dest="gwas_position_index",
+        action="store_true",
+        help=(
+            "Sort GWAS summary statistics by position, compress in BGZF, " +
+            "and index by position with Tabix for all studies."
+        )
+    )
+    parser_main.add_argument(
+        "-gwas_columnar_store",
+        "--gwas_columnar_store",
+        dest="gwas_columnar_store",
+        action="store_true",
+        help=(
+            "Write GWAS summary statistics for all studies to the columnar " +
+            "store in Parquet with partitions by chromosome."
+        )
+    )
+    parser_main.add_argument(
+        "-gwas_qq_plot",
+        "--gwas_qq_plot",
+        dest="gwas_qq_plot",
+        action="store_true",
+        help=(
+            "Create quantile-quantile plots and calculate genomic inflation " +
+            "of GWAS summary statistics for all studies."
+        )
+    )
+    parser_main.add_argument(
+        "-gwas_quality_profile",
+        "--gwas_quality_profile",
+        dest="gwas_quality_profile",
+        action="store_true",
+        help=(
+            "Profile quality of GWAS summary statistics for all studies in " +
+            "a single pass through each file."
+        )
+    )
+    parser_main.add_argument(
+        "-gwas_duplication",
+        "--gwas_duplication",
+        dest="gwas_duplication",
+        action="store_true",
+        help=(
+            "Detect and resolve duplicate and multi-allelic variants in " +
+            "GWAS summary statistics for all studies."
+        )
+    )
+    parser_main.add_argument(
+        "-gwas_presence_index",
+        "--gwas_presence_index",
+        dest="gwas_presence_index",
+        action="store_true",
+        help=(
+            "Index presence of variants across all studies in compressed " +
+            "bitmaps and count overlaps between pairs of studies."
+        )
+    )
+    parser_main.add_argument(
+        "-ldsc_heritability",
+        "--ldsc_heritability",
+        dest="ldsc_heritability",
+        action="store_true",
+        help=(
+            "Estimate SNP heritability by LDSC for all studies in batch."
+        )
+    )
+    parser_main.add_argument(
+        "-ldsc_munge",
+        "--ldsc_munge",
+        dest="ldsc_munge",
+        action="store_true",
+        help=(
+            "Munge GWAS summary statistics for LDSC in chunks for all studies."
+        )
+    )
 
     # Define behavior.
     parser_main.set_defaults(func=evaluate_main_parameters)
@@ -257,6 +469,16 @@ def evaluate_main_parameters(arguments):
 
     print("--------------------------------------------------")
     print("... call to main routine ...")
+    # Enable profiles.
+    if (arguments.path_file_trace is not None):
+        psychiatry_biomarkers.profiling.enable_profiling(
+            path_file_trace=arguments.path_file_trace,
+        )
+    # Set level of verbosity for reports.
+    if (arguments.verbosity is not None):
+        psychiatry_biomarkers.reporting.set_verbosity(
+            verbosity=arguments.verbosity,
+        )
     # Execute procedure.
     if arguments.rg_thyroid_organization:
         # Report status.
@@ -267,7 +489,656 @@ def evaluate_main_parameters(arguments):
         psychiatry_biomarkers.genetic_correlation.thyroid_organization.execute_procedure(
             path_directory_dock=arguments.path_directory_dock
         )
+    if arguments.gwas_translation:
+        # Report status.
+        print(
+           "... executing psychiatry_biomarkers.gwas_preparation.translation " +
+           "procedure ..."
+          )
+        # Execute procedure.
+        psychiatry_biomarkers.gwas_preparation.translation.execute_procedure(
+            path_directory_dock=arguments.path_directory_dock
+        )
+    if arguments.gwas_assembly:
+        # Report status.
+        print(
+           "... executing psychiatry_biomarkers.gwas_preparation.assembly " +
+           "procedure ..."
+          )
+        # Execute procedure.
+        psychiatry_biomarkers.gwas_preparation.assembly.execute_procedure(
+            path_directory_dock=arguments.path_directory_dock
+        )
+    if arguments.gwas_dbsnp_rsid:
+        # Report status.
+        print(
+           "... executing psychiatry_biomarkers.gwas_preparation.dbsnp " +
+           "procedure ..."
+          )
+        # Execute procedure.
+        psychiatry_biomarkers.gwas_preparation.dbsnp.execute_procedure(
+            path_directory_dock=arguments.path_directory_dock
+        )
+    if arguments.gwas_merge_storage:
+        # Report status.
+        print(
+           "... executing psychiatry_biomarkers.gwas_preparation.merge " +
+           "procedure ..."
+          )
+        # Execute procedure.
+        psychiatry_biomarkers.gwas_preparation.merge.execute_procedure(
+            path_directory_dock=arguments.path_directory_dock
+        )
+    if arguments.gwas_filter_constrain:
+        # Report status.
+        print(
+           "... executing psychiatry_biomarkers.gwas_preparation.constraint " +
+           "procedure ..."
+          )
+        # Execute procedure.
+        psychiatry_biomarkers.gwas_preparation.constraint.execute_procedure(
+            path_directory_dock=arguments.path_directory_dock
+        )
+    if arguments.gwas_allele_frequency:
+        # Report status.
+        print(
+           "... executing psychiatry_biomarkers.gwas_preparation.frequency " +
+           "procedure ..."
+          )
+        # Execute procedure.
+        psychiatry_biomarkers.gwas_preparation.frequency.execute_procedure(
+            path_directory_dock=arguments.path_directory_dock
+        )
+    if arguments.gwas_harmonization:
+        # Report status.
+        print(
+           "... executing psychiatry_biomarkers.gwas_preparation." +
+           "harmonization procedure ..."
+          )
+        # Execute procedure.
+        psychiatry_biomarkers.gwas_preparation.harmonization.execute_procedure(
+            path_directory_dock=arguments.path_directory_dock
+        )
+    if arguments.gwas_effective_observations:
+        # Report status.
+        print(
+           "... executing psychiatry_biomarkers.gwas_preparation.effective " +
+           "procedure ..."
+          )
+        # Execute procedure.
+        psychiatry_biomarkers.gwas_preparation.effective.execute_procedure(
+            path_directory_dock=arguments.path_directory_dock
+        )
+    if arguments.gwas_pipeline:
+        # Report status.
+        print(
+           "... executing psychiatry_biomarkers.gwas_preparation.pipeline " +
+           "procedure ..."
+          )
+        # Execute procedure.
+        psychiatry_biomarkers.gwas_preparation.pipeline.execute_procedure(
+            path_directory_dock=arguments.path_directory_dock
+        )
+    if arguments.gwas_position_index:
+        # Report status.
+        print(
+           "... executing psychiatry_biomarkers.gwas_preparation." +
+           "position_index procedure ..."
+          )
+        # Execute procedure.
+        psychiatry_biomarkers.gwas_preparation.position_index.execute_procedure(
+            path_directory_dock=arguments.path_directory_dock
+        )
+    if arguments.gwas_columnar_store:
+        # Report status.
+        print(
+           "... executing psychiatry_biomarkers.gwas_preparation.columnar " +
+           "procedure ..."
+          )
+        # Execute procedure.
+        psychiatry_biomarkers.gwas_preparation.columnar.execute_procedure(
+            path_directory_dock=arguments.path_directory_dock
+        )
+    if arguments.gwas_qq_plot:
+        # Report status.
+        print(
+           "... executing psychiatry_biomarkers.gwas_preparation.qq_plot " +
+           "procedure ..."
+          )
+        # Execute procedure.
+        psychiatry_biomarkers.gwas_preparation.qq_plot.execute_procedure(
+            path_directory_dock=arguments.path_directory_dock
+        )
+    if arguments.gwas_quality_profile:
+        # Report status.
+        print(
+           "... executing psychiatry_biomarkers.gwas_preparation." +
+           "quality_profile procedure ..."
+          )
+        # Execute procedure.
+        psychiatry_biomarkers.gwas_preparation.quality_profile.execute_procedure(
+            path_directory_dock=arguments.path_directory_dock
+        )
+    if arguments.gwas_duplication:
+        # Report status.
+        print(
+           "... executing psychiatry_biomarkers.gwas_preparation." +
+           "duplication procedure ..."
+          )
+        # Execute procedure.
+        psychiatry_biomarkers.gwas_preparation.duplication.execute_procedure(
+            path_directory_dock=arguments.path_directory_dock
+        )
+    if arguments.gwas_presence_index:
+        # Report status.
+        print(
+           "... executing psychiatry_biomarkers.gwas_preparation." +
+           "presence procedure ..."
+          )
+        # Execute procedure.
+        psychiatry_biomarkers.gwas_preparation.presence.execute_procedure(
+            path_directory_dock=arguments.path_directory_dock
+        )
+    if arguments.ldsc_heritability:
+        # Report status.
+        print(
+           "... executing psychiatry_biomarkers.ldsc.heritability procedure ..."
+          )
+        # Execute procedure.
+        psychiatry_biomarkers.ldsc.heritability.execute_procedure(
+            path_directory_dock=arguments.path_directory_dock
+        )
+    if arguments.ldsc_munge:
+        # Report status.
+        print(
+           "... executing psychiatry_biomarkers.ldsc.munge procedure ..."
+          )
+        # Execute procedure.
+        psychiatry_biomarkers.ldsc.munge.execute_procedure(
+            path_directory_dock=arguments.path_directory_dock
+        )
+
+    pass
+
+
+def define_batch_subparser(subparsers=None):
+    """
+    Defines subparser for execution of batch instances on a local server.
+
+    arguments:
+        subparsers (object): reference to subparsers' container
+
+    raises:
+
+    returns:
+        (object): reference to parser
+
+    """
+
+    # Define parser.
+    parser_batch = subparsers.add_parser(
+        name="batch",
+        description=textwrap.dedent("""\
+            --------------------------------------------------
+            Execute batch instances within a pool of local processes.
+            --------------------------------------------------
+        """),
+        help="Help for local execution of batch instances.",
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    # Define arguments.
+    parser_batch.add_argument(
+        "-path_file_batch_instances", "--path_file_batch_instances",
+        dest="path_file_batch_instances", type=str, required=True,
+        help="Path to file of batch instances, one instance per line."
+    )
+    parser_batch.add_argument(
+        "-path_file_script", "--path_file_script",
+        dest="path_file_script", type=str, required=True,
+        help="Path to script that executes a single instance."
+    )
+    parser_batch.add_argument(
+        "-path_directory_batch", "--path_directory_batch",
+        dest="path_directory_batch", type=str, required=True,
+        help="Path to directory for records of status and logs."
+    )
+    parser_batch.add_argument(
+        "-template_arguments", "--template_arguments",
+        dest="template_arguments", type=str, default=None,
+        help=(
+            "Template of arguments to script, with fields of the instance " +
+            "designated by indices in braces, such as '{1} {2} {0} 2 true'."
+        )
+    )
+    parser_batch.add_argument(
+        "-delimiter", "--delimiter",
+        dest="delimiter", type=str, default=";",
+        help="Delimiter between fields within each instance."
+    )
+    parser_batch.add_argument(
+        "-cores", "--cores",
+        dest="cores", type=int, default=4,
+        help="Count of processing cores available to all instances."
+    )
+    parser_batch.add_argument(
+        "-threads_instance", "--threads_instance",
+        dest="threads_instance", type=int, default=1,
+        help="Count of threads for each instance."
+    )
+    parser_batch.add_argument(
+        "-memory_total_gb", "--memory_total_gb",
+        dest="memory_total_gb", type=float, default=None,
+        help="Memory in gigabytes available to all instances."
+    )
+    parser_batch.add_argument(
+        "-memory_instance_gb", "--memory_instance_gb",
+        dest="memory_instance_gb", type=float, default=None,
+        help="Maximal virtual memory in gigabytes for each instance."
+    )
+    parser_batch.add_argument(
+        "-retries", "--retries",
+        dest="retries", type=int, default=2,
+        help="Count of retries after failure of an instance."
+    )
+    parser_batch.add_argument(
+        "-delay_retry", "--delay_retry",
+        dest="delay_retry", type=float, default=30.0,
+        help="Delay in seconds before first retry, doubling thereafter."
+    )
+    parser_batch.add_argument(
+        "-restart", "--restart",
+        dest="restart", action="store_true",
+        help="Execute all instances instead of resuming after completion."
+    )
+    parser_batch.add_argument(
+        "-path_file_trace", "--path_file_trace",
+        dest="path_file_trace", type=str, default=None,
+        help=(
+            "Path to file in which to record a trace of batch instances; no " +
+            "trace by default."
+        )
+    )
+    # Define behavior.
+    parser_batch.set_defaults(func=evaluate_batch_parameters)
+    # Return parser.
+    return parser_batch
+
+
+def evaluate_batch_parameters(arguments):
+    """
+    Evaluates parameters for local execution of batch instances.
+
+    arguments:
+        arguments (object): arguments from terminal
+
+    raises:
+
+    returns:
+
+    """
+
+    print("--------------------------------------------------")
+    print("... call to batch routine ...")
+    # Organize parameters.
+    bytes_gigabyte = (1024 ** 3)
+    memory_total = None
+    memory_instance = None
+    if arguments.memory_total_gb is not None:
+        memory_total = int(arguments.memory_total_gb * bytes_gigabyte)
+    if arguments.memory_instance_gb is not None:
+        memory_instance = int(arguments.memory_instance_gb * bytes_gigabyte)
+    # Enable profiles.
+    if (arguments.path_file_trace is not None):
+        psychiatry_biomarkers.profiling.enable_profiling(
+            path_file_trace=arguments.path_file_trace,
+        )
+    # Execute procedure.
+    psychiatry_biomarkers.batch_execution.control_execute_batch_instances(
+        path_file_batch_instances=arguments.path_file_batch_instances,
+        path_file_script=arguments.path_file_script,
+        template_arguments=arguments.template_arguments,
+        path_directory_batch=arguments.path_directory_batch,
+        delimiter=arguments.delimiter,
+        cores=arguments.cores,
+        threads_instance=arguments.threads_instance,
+        memory_total=memory_total,
+        memory_instance=memory_instance,
+        retries=arguments.retries,
+        delay_retry=arguments.delay_retry,
+        resume=(not arguments.restart),
+        report=True,
+    )
+    pass
+
+
+def define_parameter_subparser(subparsers=None):
+    """
+    Defines subparser for filters on the parameter table of studies and for
+    definition of batch instances from its rows.
+
+    arguments:
+        subparsers (object): reference to subparsers' container
+
+    raises:
+
+    returns:
+        (object): reference to parser
+
+    """
+
+    # Define parser.
+    parser_parameter = subparsers.add_parser(
+        name="parameter",
+        description=textwrap.dedent("""\
+            --------------------------------------------------
+            Validate and filter the parameter table of studies and write batch
+            instances, one instance per study.
+            --------------------------------------------------
+        """),
+        help="Help for batch instances from the parameter table of studies.",
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    # Define arguments.
+    parser_parameter.add_argument(
+        "-path_file_table", "--path_file_table",
+        dest="path_file_table", type=str, required=True,
+        help="Path to file for parameter table of studies."
+    )
+    parser_parameter.add_argument(
+        "-availability", "--availability",
+        dest="availability", type=int, default=None,
+        help="Value of column 'availability' to keep, 0 or 1."
+    )
+    parser_parameter.add_argument(
+        "-inclusion", "--inclusion",
+        dest="inclusion", type=int, default=None,
+        help="Value of column 'inclusion' to keep, 0 or 1."
+    )
+    parser_parameter.add_argument(
+        "-type", "--type",
+        dest="types", type=str, action="append", default=None,
+        help="Value of column 'type' to keep, such as 'logistic'; repeatable."
+    )
+    parser_parameter.add_argument(
+        "-match", "--match",
+        dest="matches", type=str, action="append", default=None,
+        help=(
+            "Criterion 'column=value' that each study must match, with " +
+            "values separated by commas to match any of several values, " +
+            "such as 'sex=female,male'; repeatable."
+        )
+    )
+    parser_parameter.add_argument(
+        "-fields", "--fields",
+        dest="fields", type=str, default=None,
+        help=(
+            "Names of columns for fields of each instance in their sequence, " +
+            "separated by commas, such as 'study,directory,file'; default " +
+            "is all columns."
+        )
+    )
+    parser_parameter.add_argument(
+        "-delimiter", "--delimiter",
+        dest="delimiter", type=str, default=";",
+        help="Delimiter between fields within each instance."
+    )
+    parser_parameter.add_argument(
+        "-path_file_product", "--path_file_product",
+        dest="path_file_product", type=str, default=None,
+        help="Path to file for batch instances; default is standard output."
+    )
+    parser_parameter.add_argument(
+        "-path_directory_cache", "--path_directory_cache",
+        dest="path_directory_cache", type=str, default=None,
+        help="Path to directory for binary copies of parameter tables."
+    )
+    # Define behavior.
+    parser_parameter.set_defaults(func=evaluate_parameter_parameters)
+    # Return parser.
+    return parser_parameter
+
+
+def evaluate_parameter_parameters(arguments):
+    """
+    Evaluates parameters for batch instances from the parameter table of
+    studies.
+
+    Notice that the procedure only prints reports when it writes batch
+    instances to file, so that standard output only includes batch instances
+    otherwise.
+
+    arguments:
+        arguments (object): arguments from terminal
 
+    raises:
+
+    returns:
+
+    """
+
+    # Organize parameters.
+    report = (arguments.path_file_product is not None)
+    if report:
+        print("--------------------------------------------------")
+        print("... call to parameter routine ...")
+    fields = None
+    if (arguments.fields is not None):
+        fields = [
+            field.strip() for field in arguments.fields.split(",")
+            if (len(field.strip()) > 0)
+        ]
+    # Execute procedure.
+    psychiatry_biomarkers.parameter_table.control_write_batch_instances(
+        path_file_table=arguments.path_file_table,
+        availability=arguments.availability,
+        inclusion=arguments.inclusion,
+        types=arguments.types,
+        matches=arguments.matches,
+        fields=fields,
+        delimiter=arguments.delimiter,
+        path_file_product=arguments.path_file_product,
+        path_directory_cache=arguments.path_directory_cache,
+        report=report,
+    )
+    pass
+
+
+def define_storage_subparser(subparsers=None):
+    """
+    Defines subparser for the storage area that addresses files by the hash
+    of their content.
+
+    arguments:
+        subparsers (object): reference to subparsers' container
+
+    raises:
+
+    returns:
+        (object): reference to parser
+
+    """
+
+    # Define parser.
+    parser_storage = subparsers.add_parser(
+        name="storage",
+        description=textwrap.dedent("""\
+            --------------------------------------------------
+            Store a directory of files in the storage area, verify the
+            objects of a collection, or restore a collection from the storage
+            area.
+            --------------------------------------------------
+        """),
+        help="Help for the storage area of files by hash of content.",
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    # Define arguments.
+    parser_storage.add_argument(
+        "-action", "--action",
+        dest="action", type=str, required=True,
+        choices=["store", "verify", "restore",],
+        help="Action on the storage area."
+    )
+    parser_storage.add_argument(
+        "-path_directory_storage", "--path_directory_storage",
+        dest="path_directory_storage", type=str, required=True,
+        help="Path to directory of storage area."
+    )
+    parser_storage.add_argument(
+        "-identifier", "--identifier",
+        dest="identifier", type=str, required=True,
+        help=(
+            "Identifier of collection of files, such as " +
+            "'gwas_preparation_2023-12-30'."
+        )
+    )
+    parser_storage.add_argument(
+        "-path_directory_source", "--path_directory_source",
+        dest="path_directory_source", type=str, default=None,
+        help="Path to source directory to store."
+    )
+    parser_storage.add_argument(
+        "-path_directory_product", "--path_directory_product",
+        dest="path_directory_product", type=str, default=None,
+        help="Path to product directory for restoration."
+    )
+    parser_storage.add_argument(
+        "-workers", "--workers",
+        dest="workers", type=int, default=4,
+        help="Count of concurrent workers for hashes and transfers."
+    )
+    parser_storage.add_argument(
+        "-retries", "--retries",
+        dest="retries", type=int, default=2,
+        help="Count of retries after a copy with the wrong hash."
+    )
+    parser_storage.add_argument(
+        "-copy", "--copy",
+        dest="copy", action="store_true",
+        help="Restore files by copy instead of by hard link."
+    )
+    # Define behavior.
+    parser_storage.set_defaults(func=evaluate_storage_parameters)
+    # Return parser.
+    return parser_storage
+
+
+def evaluate_storage_parameters(arguments):
+    """
+    Evaluates parameters for the storage area that addresses files by the
+    hash of their content.
+
+    arguments:
+        arguments (object): arguments from terminal
+
+    raises:
+
+    returns:
+
+    """
+
+    print("--------------------------------------------------")
+    print("... call to storage routine ...")
+    # Execute procedure.
+    if (arguments.action == "store"):
+        psychiatry_biomarkers.storage.control_store_directory(
+            path_directory_source=arguments.path_directory_source,
+            path_directory_storage=arguments.path_directory_storage,
+            identifier=arguments.identifier,
+            workers=arguments.workers,
+            retries=arguments.retries,
+            report=True,
+        )
+    elif (arguments.action == "verify"):
+        psychiatry_biomarkers.storage.control_verify_storage(
+            path_directory_storage=arguments.path_directory_storage,
+            identifier=arguments.identifier,
+            workers=arguments.workers,
+            report=True,
+        )
+    elif (arguments.action == "restore"):
+        psychiatry_biomarkers.storage.control_restore_storage(
+            path_directory_storage=arguments.path_directory_storage,
+            identifier=arguments.identifier,
+            path_directory_product=arguments.path_directory_product,
+            link=(not arguments.copy),
+            workers=arguments.workers,
+            report=True,
+        )
+    pass
+
+
+def define_trace_subparser(subparsers=None):
+    """
+    Defines subparser for summaries of traces of procedures.
+
+    arguments:
+        subparsers (object): reference to subparsers' container
+
+    raises:
+
+    returns:
+        (object): reference to parser
+
+    """
+
+    # Define parser.
+    parser_trace = subparsers.add_parser(
+        name="trace",
+        description=textwrap.dedent("""\
+            --------------------------------------------------
+            Summarize time, memory, and counts of rows of procedures within a
+            trace, and export its spans as a timeline in the Trace Event
+            Format of Chrome.
+            --------------------------------------------------
+        """),
+        help="Help for summaries of traces of procedures.",
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    # Define arguments.
+    parser_trace.add_argument(
+        "-path_file_trace", "--path_file_trace",
+        dest="path_file_trace", type=str, required=True,
+        help="Path to file of trace in format of JSON lines."
+    )
+    parser_trace.add_argument(
+        "-path_directory_product", "--path_directory_product",
+        dest="path_directory_product", type=str, required=True,
+        help="Path to directory for product files."
+    )
+    # Define behavior.
+    parser_trace.set_defaults(func=evaluate_trace_parameters)
+    # Return parser.
+    return parser_trace
+
+
+def evaluate_trace_parameters(arguments):
+    """
+    Evaluates parameters for summaries of traces of procedures.
+
+    arguments:
+        arguments (object): arguments from terminal
+
+    raises:
+
+    returns:
+
+    """
+
+    print("--------------------------------------------------")
+    print("... call to trace routine ...")
+    # Execute procedure.
+    psychiatry_biomarkers.profiling.control_summarize_trace(
+        path_file_trace=arguments.path_file_trace,
+        path_directory_product=arguments.path_directory_product,
+        report=True,
+    )
+    psychiatry_biomarkers.profiling.control_export_chrome_trace(
+        path_file_trace=arguments.path_file_trace,
+        path_file_product=os.path.join(
+            arguments.path_directory_product, "trace_timeline.json",
+        ),
+        report=True,
+    )
     pass
 
 
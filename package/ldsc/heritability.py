@@ -0,0 +1,1243 @@
+"""
+Supply functionality for estimation of SNP heritability by LD Score Regression
+(LDSC) in batch across many sets of GWAS summary statistics.
+
+This module 'heritability' is part of the 'ldsc' package within the
+'psychiatry_biomarkers' package.
+
+Author:
+
+    T. Cameron Waller, Ph.D.
+    tcameronwaller@gmail.com
+    Rochester, Minnesota 55902
+    United States of America
+
+License:
+
+    This file is part of the project package directory 'psychiatry_biomarkers'
+    (https://github.com/tcameronwaller/psychiatry_biomarkers/).
+
+    Project 'psychiatry_biomarkers' supports data analysis with team in
+    psychiatry and pharmacogenomics.
+    Copyright (C) 2024 Thomas Cameron Waller
+
+    The code within project 'psychiatry_biomarkers' is free software: you can
+    redistribute it and/or modify it under the terms of the GNU General Public
+    License as published by the Free Software Foundation, either version 3 of
+    the GNU General Public License, or (at your option) any later version.
+
+    The code within project 'psychiatry_biomarkers' is distributed in the hope
+    that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+    warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with project 'psychiatry_biomarkers'. If not, see
+    <http://www.gnu.org/licenses/>.
+"""
+
+###############################################################################
+# Notes
+
+# The driver script "5_estimate_gwas_heritability_ldsc.sh" calls LDSC once for
+# each study in the parameter table, and each call reads again the same LD
+# scores and regression weights for the reference panel. This module converts
+# the reference panel once to a binary format (see module "reference") that
+# each parallel process maps into memory, and then fits the LD Score
+# Regression for all studies within parallel processes.
+
+# The regression follows the implementation in LDSC (Bulik-Sullivan et al,
+# Nature Genetics, 2015; https://github.com/bulik/ldsc), including the
+# iteratively re-weighted least squares, the two-step estimator of the
+# intercept, and the block jackknife for standard errors.
+
+# The regression runs once for each study on the observed scale. Conversion to
+# the liability scale is a vectorized step across all studies afterwards, so
+# there is no need for a second pass as in the driver script
+# "5_estimate_gwas_heritability_ldsc_no_liability.sh".
+
+# For studies with logistic regression, the regression uses the effective
+# counts of observations of each variant from column "N" of the munged GWAS
+# summary statistics, which derive from the products of the calculation of
+# effective observations (see module "gwas_preparation.effective").
+
+###############################################################################
+# Installation and importation
+
+# Standard
+
+import os
+
+# Relevant
+
+import numpy
+import scipy.stats
+import pandas
+pandas.options.mode.chained_assignment = None # default = "warn"
+
+# Custom
+import partner.utility as putly
+import partner.parallelization as prall
+import psychiatry_biomarkers.ldsc.reference as pref
+import psychiatry_biomarkers.parameter_table as pbpar
+
+###############################################################################
+# Functionality
+
+
+##########
+# 1. Read parameters and summary statistics.
+
+
+def read_source_parameter_table_studies(
+    path_file_table=None,
+    report=None,
+):
+    """
+    Reads and organizes source information from file.
+
+    Notice that Pandas does not accommodate missing values within series of
+    integer variable types.
+
+    arguments:
+        path_file_table (str): path to file for parameter table of studies,
+            such as "table_gwas_translation_tcw_2023-12-30.tsv"
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table
+
+    """
+
+    # Read information from file.
+    # The procedure validates the table against its schema.
+    # Specify variable types of columns within table.
+    types_columns = dict()
+    types_columns["observations_total"] = "float32"
+    types_columns["cases"] = "float32"
+    types_columns["controls"] = "float32"
+    types_columns["observations_effective"] = "float32"
+    types_columns["prevalence_sample"] = "float32"
+    types_columns["prevalence_population"] = "float32"
+    table = pbpar.read_parameter_table(
+        path_file_table=path_file_table,
+        types_columns=types_columns,
+        path_directory_cache=None,
+        report=False,
+    )
+    # Return information.
+    return table
+
+
+def read_source_munge_summary_statistics(
+    path_file_source=None,
+    report=None,
+):
+    """
+    Reads and organizes source information from file in the format of
+    "*.sumstats.gz" from LDSC's munge procedure.
+
+    arguments:
+        path_file_source (str): path to file of munged GWAS summary statistics
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table
+
+    """
+
+    # Read information from file.
+    table = pandas.read_csv(
+        path_file_source,
+        sep="\t",
+        header=0,
+        usecols=["SNP", "Z", "N",],
+        dtype={"SNP": "string", "Z": "float64", "N": "float64",},
+        compression="infer",
+    )
+    table.dropna(
+        axis="index",
+        how="any",
+        subset=["SNP", "Z", "N",],
+        inplace=True,
+    )
+    # Return information.
+    return table
+
+
+##########
+# 2. Fit LD Score Regression.
+
+
+def define_jackknife_block_separators(
+    count_variants=None,
+    count_blocks=None,
+):
+    """
+    Defines indices that separate contiguous blocks of variants for the block
+    jackknife.
+
+    arguments:
+        count_variants (int): count of variants in regression
+        count_blocks (int): count of blocks for jackknife
+
+    raises:
+
+    returns:
+        (object): NumPy array of integer indices
+
+    """
+
+    if count_blocks > count_variants:
+        raise ValueError(
+            "Count of jackknife blocks exceeds count of variants."
+        )
+    separators = numpy.floor(
+        numpy.linspace(0, count_variants, (count_blocks + 1))
+    ).astype(int)
+    return separators
+
+
+def update_jackknife_block_separators(
+    separators=None,
+    mask=None,
+):
+    """
+    Translates indices of jackknife block separators from the space of a subset
+    of variants (mask) to the space of all variants.
+
+    arguments:
+        separators (object): NumPy array of integer indices within subset
+        mask (object): NumPy array of boolean indicators of subset
+
+    raises:
+
+    returns:
+        (object): NumPy array of integer indices
+
+    """
+
+    map_indices = numpy.flatnonzero(mask)
+    separators_update = numpy.hstack((
+        [0], map_indices[separators[1:-1]], [mask.size],
+    )).astype(int)
+    return separators_update
+
+
+def calculate_block_jackknife_least_squares(
+    x=None,
+    y=None,
+    separators=None,
+):
+    """
+    Calculates estimates of coefficients by least squares regression together
+    with block jackknife delete values, pseudovalues, and standard errors.
+
+    The jackknife accumulates cross products within each block so that the
+    delete value for each block only requires solution of a small linear
+    system.
+
+    arguments:
+        x (object): NumPy array of weighted predictor variables (n, p)
+        y (object): NumPy array of weighted response variable (n,)
+        separators (object): NumPy array of integer indices of blocks
+
+    raises:
+
+    returns:
+        (dict<object>): collection of information
+
+    """
+
+    # Calculate cross products within blocks.
+    xty_block = numpy.add.reduceat(
+        (x * y[:, numpy.newaxis]), separators[:-1], axis=0,
+    )
+    xtx_block = numpy.add.reduceat(
+        numpy.einsum("ij,ik->ijk", x, x), separators[:-1], axis=0,
+    )
+    xty_total = numpy.sum(xty_block, axis=0)
+    xtx_total = numpy.sum(xtx_block, axis=0)
+    # Calculate estimates from all variants.
+    estimate = numpy.linalg.solve(xtx_total, xty_total)
+    # Calculate delete values from all variants except those in each block.
+    values_delete = numpy.linalg.solve(
+        (xtx_total[numpy.newaxis, :, :] - xtx_block),
+        (xty_total[numpy.newaxis, :] - xty_block)[:, :, numpy.newaxis],
+    )[:, :, 0]
+    # Calculate jackknife.
+    pail = calculate_jackknife_from_delete_values(
+        estimate=estimate,
+        values_delete=values_delete,
+    )
+    # Return information.
+    return pail
+
+
+def calculate_jackknife_from_delete_values(
+    estimate=None,
+    values_delete=None,
+):
+    """
+    Calculates jackknife pseudovalues, covariance, and standard errors from
+    estimates and delete values.
+
+    arguments:
+        estimate (object): NumPy array of estimates from all variants (p,)
+        values_delete (object): NumPy array of delete values (blocks, p)
+
+    raises:
+
+    returns:
+        (dict<object>): collection of information
+
+    """
+
+    count_blocks = values_delete.shape[0]
+    pseudovalues = (
+        (count_blocks * estimate[numpy.newaxis, :]) -
+        ((count_blocks - 1) * values_delete)
+    )
+    covariance = numpy.atleast_2d(
+        numpy.cov(pseudovalues, rowvar=False, ddof=1)
+    ) / count_blocks
+    # Collect information.
+    pail = dict()
+    pail["estimate"] = estimate
+    pail["values_delete"] = values_delete
+    pail["pseudovalues"] = pseudovalues
+    pail["covariance"] = covariance
+    pail["error"] = numpy.sqrt(numpy.diag(covariance))
+    # Return information.
+    return pail
+
+
+def calculate_regression_weights_heritability(
+    ld=None,
+    ld_weight=None,
+    observations=None,
+    count_variants_reference=None,
+    heritability=None,
+    intercept=None,
+):
+    """
+    Calculates weights for LD Score Regression of SNP heritability, which
+    account for heteroskedasticity and over-counting of variants in LD.
+
+    arguments:
+        ld (object): NumPy array of LD scores
+        ld_weight (object): NumPy array of LD scores for regression weights
+        observations (object): NumPy array of counts of observations (N)
+        count_variants_reference (float): count of variants in reference (M)
+        heritability (float): current estimate of SNP heritability
+        intercept (float): current estimate of intercept
+
+    raises:
+
+    returns:
+        (object): NumPy array of weights
+
+    """
+
+    heritability = min(max(heritability, 0.0), 1.0)
+    ld = numpy.fmax(ld, 1.0)
+    ld_weight = numpy.fmax(ld_weight, 1.0)
+    c = heritability * observations / count_variants_reference
+    weights_heteroskedasticity = (
+        1.0 / (2 * numpy.square(intercept + (c * ld)))
+    )
+    weights_over_count = 1.0 / ld_weight
+    return (weights_heteroskedasticity * weights_over_count)
+
+
+def fit_weighted_least_squares(
+    x=None,
+    y=None,
+    weights_root=None,
+):
+    """
+    Fits coefficients by least squares with weights that sum to one.
+
+    arguments:
+        x (object): NumPy array of predictor variables (n, p)
+        y (object): NumPy array of response variable (n,)
+        weights_root (object): NumPy array of square roots of weights (n,)
+
+    raises:
+
+    returns:
+        (object): NumPy array of coefficients (p,)
+
+    """
+
+    weights_norm = weights_root / numpy.sum(weights_root)
+    coefficients = numpy.linalg.lstsq(
+        (x * weights_norm[:, numpy.newaxis]),
+        (y * weights_norm),
+        rcond=None,
+    )[0]
+    return coefficients
+
+
+def fit_iterative_reweighted_least_squares_jackknife(
+    x=None,
+    y=None,
+    weights=None,
+    function_update=None,
+    separators=None,
+    iterations=None,
+):
+    """
+    Fits coefficients by iteratively re-weighted least squares and then
+    estimates standard errors by block jackknife with the final weights.
+
+    arguments:
+        x (object): NumPy array of predictor variables (n, p)
+        y (object): NumPy array of response variable (n,)
+        weights (object): NumPy array of initial weights (n,)
+        function_update (object): function to calculate new weights from
+            current coefficients
+        separators (object): NumPy array of integer indices of blocks
+        iterations (int): count of iterations to update weights
+
+    raises:
+
+    returns:
+        (dict<object>): collection of information
+
+    """
+
+    weights_root = numpy.sqrt(weights)
+    for iteration in range(iterations):
+        coefficients = fit_weighted_least_squares(
+            x=x,
+            y=y,
+            weights_root=weights_root,
+        )
+        weights_root = numpy.sqrt(function_update(coefficients))
+        pass
+    weights_norm = weights_root / numpy.sum(weights_root)
+    pail = calculate_block_jackknife_least_squares(
+        x=(x * weights_norm[:, numpy.newaxis]),
+        y=(y * weights_norm),
+        separators=separators,
+    )
+    return pail
+
+
+def calculate_observed_to_liability_scale_factor(
+    prevalence_sample=None,
+    prevalence_population=None,
+):
+    """
+    Calculates the factor that converts SNP heritability of a dichotomous
+    trait from the observed scale to the liability scale (Lee et al, American
+    Journal of Human Genetics, 2011).
+
+    The calculation is vectorized, and the arguments can be arrays or Pandas
+    series with a value for each study.
+
+    arguments:
+        prevalence_sample (float): proportion of cases in the sample (P)
+        prevalence_population (float): prevalence of trait in population (K)
+
+    raises:
+
+    returns:
+        (float): factor for conversion
+
+    """
+
+    threshold = scipy.stats.norm.isf(prevalence_population)
+    density = scipy.stats.norm.pdf(threshold)
+    factor = (
+        (prevalence_population**2 * (1 - prevalence_population)**2) /
+        (prevalence_sample * (1 - prevalence_sample) * density**2)
+    )
+    return factor
+
+
+def estimate_snp_heritability_ldsc(
+    table=None,
+    count_variants_reference=None,
+    threshold_two_step=None,
+    count_blocks=None,
+    report=None,
+):
+    """
+    Estimates SNP heritability, intercept, and ratio by LD Score Regression.
+
+    The table must have variants in genomic sequence of the reference panel so
+    that jackknife blocks are contiguous segments of the genome.
+
+    arguments:
+        table (object): Pandas data-frame table of variants with columns "Z",
+            "N", "L2", and "W_L2"
+        count_variants_reference (float): count of variants in reference (M)
+        threshold_two_step (float): threshold on chi-square statistic for the
+            first step of the two-step estimator; if None, then estimate
+            intercept and slope together in one step
+        count_blocks (int): count of blocks for jackknife
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (dict): collection of information
+
+    """
+
+    # Extract information.
+    chi_square = numpy.square(table["Z"].to_numpy(dtype="float64"))
+    observations = table["N"].to_numpy(dtype="float64")
+    ld = table["L2"].to_numpy(dtype="float64")
+    ld_weight = table["W_L2"].to_numpy(dtype="float64")
+    # Remove variants with outlying values of chi-square.
+    chi_square_maximum = max((0.001 * numpy.max(observations)), 80.0)
+    mask = (chi_square < chi_square_maximum)
+    chi_square = chi_square[mask]
+    observations = observations[mask]
+    ld = ld[mask]
+    ld_weight = ld_weight[mask]
+    count_variants = int(chi_square.size)
+    M = float(count_variants_reference)
+    observations_mean = numpy.mean(observations)
+
+    # Calculate initial weights from aggregate estimate of heritability.
+    heritability_aggregate = (
+        M * (numpy.mean(chi_square) - 1.0) /
+        numpy.mean(ld * observations)
+    )
+    weights_initial = calculate_regression_weights_heritability(
+        ld=ld,
+        ld_weight=ld_weight,
+        observations=observations,
+        count_variants_reference=M,
+        heritability=heritability_aggregate,
+        intercept=1.0,
+    )
+    # Organize predictor variables.
+    x_slope = ((observations * ld) / observations_mean)
+    x = numpy.column_stack((x_slope, numpy.ones(count_variants)))
+
+    if (threshold_two_step is None):
+        # Estimate slope and intercept together.
+        separators = define_jackknife_block_separators(
+            count_variants=count_variants,
+            count_blocks=count_blocks,
+        )
+        function_update = (
+            lambda coefficients: calculate_regression_weights_heritability(
+                ld=ld,
+                ld_weight=ld_weight,
+                observations=observations,
+                count_variants_reference=M,
+                heritability=(M * coefficients[0] / observations_mean),
+                intercept=coefficients[1],
+        ))
+        jackknife = fit_iterative_reweighted_least_squares_jackknife(
+            x=x,
+            y=chi_square,
+            weights=weights_initial,
+            function_update=function_update,
+            separators=separators,
+            iterations=2,
+        )
+        pass
+    else:
+        # Step 1: estimate intercept from variants without large effects.
+        mask_step = (chi_square < threshold_two_step)
+        count_step = int(numpy.sum(mask_step))
+        separators_step = define_jackknife_block_separators(
+            count_variants=count_step,
+            count_blocks=count_blocks,
+        )
+        function_update_step = (
+            lambda coefficients: calculate_regression_weights_heritability(
+                ld=ld[mask_step],
+                ld_weight=ld_weight[mask_step],
+                observations=observations[mask_step],
+                count_variants_reference=M,
+                heritability=(M * coefficients[0] / observations_mean),
+                intercept=coefficients[1],
+        ))
+        jackknife_step = fit_iterative_reweighted_least_squares_jackknife(
+            x=x[mask_step, :],
+            y=chi_square[mask_step],
+            weights=weights_initial[mask_step],
+            function_update=function_update_step,
+            separators=separators_step,
+            iterations=2,
+        )
+        intercept_step = jackknife_step["estimate"][1]
+        # Step 2: estimate slope from all variants with intercept fixed.
+        separators = update_jackknife_block_separators(
+            separators=separators_step,
+            mask=mask_step,
+        )
+        function_update = (
+            lambda coefficients: calculate_regression_weights_heritability(
+                ld=ld,
+                ld_weight=ld_weight,
+                observations=observations,
+                count_variants_reference=M,
+                heritability=(M * coefficients[0] / observations_mean),
+                intercept=intercept_step,
+        ))
+        jackknife_slope = fit_iterative_reweighted_least_squares_jackknife(
+            x=x[:, 0:1],
+            y=(chi_square - intercept_step),
+            weights=weights_initial,
+            function_update=function_update,
+            separators=separators,
+            iterations=2,
+        )
+        # Combine jackknife delete values from both steps, accounting for the
+        # dependence of the slope on the intercept.
+        c = (
+            numpy.sum(weights_initial * x_slope) /
+            numpy.sum(weights_initial * numpy.square(x_slope))
+        )
+        estimate = numpy.array([
+            jackknife_slope["estimate"][0], intercept_step,
+        ])
+        values_delete = numpy.column_stack((
+            (
+                jackknife_slope["values_delete"][:, 0] -
+                c * (jackknife_step["values_delete"][:, 1] - intercept_step)
+            ),
+            jackknife_step["values_delete"][:, 1],
+        ))
+        jackknife = calculate_jackknife_from_delete_values(
+            estimate=estimate,
+            values_delete=values_delete,
+        )
+        pass
+
+    # Organize estimates.
+    heritability = M * jackknife["estimate"][0] / observations_mean
+    heritability_error = M * jackknife["error"][0] / observations_mean
+    intercept = jackknife["estimate"][1]
+    intercept_error = jackknife["error"][1]
+    chi_square_mean = numpy.mean(chi_square)
+    lambda_gc = (
+        numpy.median(chi_square) / scipy.stats.chi2.ppf(0.5, 1)
+    )
+    if (chi_square_mean > 1):
+        ratio = (intercept - 1) / (chi_square_mean - 1)
+        ratio_error = intercept_error / (chi_square_mean - 1)
+    else:
+        ratio = float("nan")
+        ratio_error = float("nan")
+    # Collect information.
+    pail = dict()
+    pail["variants"] = count_variants
+    pail["heritability"] = float(heritability)
+    pail["heritability_error"] = float(heritability_error)
+    pail["lambda_gc"] = float(lambda_gc)
+    pail["chi_square"] = float(chi_square_mean)
+    pail["intercept"] = float(intercept)
+    pail["intercept_error"] = float(intercept_error)
+    pail["ratio"] = float(ratio)
+    pail["ratio_error"] = float(ratio_error)
+    # Return information.
+    return pail
+
+
+def organize_heritability_table_record(
+    study=None,
+    path_directory=None,
+    estimates=None,
+):
+    """
+    Organizes estimates of SNP heritability on the observed scale within a
+    record with the same columns as the table from extraction of LDSC reports
+    (see "pextr.define_snp_heritability_table_column_sequence").
+
+    The value of "name_file" matches the name of the LDSC log file that the
+    driver script would have written for the study, which the procedures in
+    "thyroid_organization" use to derive the identifier of the study.
+
+    arguments:
+        study (str): identifier of study
+        path_directory (str): path to directory of product files
+        estimates (dict): estimates from LD Score Regression on the observed
+            scale
+
+    raises:
+
+    returns:
+        (dict): record for table
+
+    """
+
+    heritability = estimates["heritability"]
+    error = estimates["heritability_error"]
+    # Calculate confidence intervals.
+    ci95_low = heritability - (1.960 * error)
+    ci95_high = heritability + (1.960 * error)
+    ci99_low = heritability - (2.576 * error)
+    ci99_high = heritability + (2.576 * error)
+    # Collect information.
+    record = dict()
+    record["path_directory"] = path_directory
+    record["name_file"] = str(study + ".log")
+    record["type_analysis"] = "heritability_observed"
+    record["identifier"] = study
+    record["variants"] = estimates["variants"]
+    record["heritability"] = heritability
+    record["heritability_error"] = error
+    record["heritability_ci95_low"] = ci95_low
+    record["heritability_ci95_high"] = ci95_high
+    record["heritability_ci99_low"] = ci99_low
+    record["heritability_ci99_high"] = ci99_high
+    record["lambda_gc"] = estimates["lambda_gc"]
+    record["chi_square"] = estimates["chi_square"]
+    record["intercept"] = estimates["intercept"]
+    record["intercept_error"] = estimates["intercept_error"]
+    record["ratio"] = estimates["ratio"]
+    record["ratio_error"] = estimates["ratio_error"]
+    record["summary_heritability_error"] = str(
+        "{:.4f}".format(heritability) + " (" + "{:.4f}".format(error) + ")"
+    )
+    record["summary_heritability_ci95"] = str(
+        "{:.4f}".format(heritability) + " (95% CI: " +
+        "{:.4f}".format(ci95_low) + " ... " + "{:.4f}".format(ci95_high) + ")"
+    )
+    record["summary_heritability_ci99"] = str(
+        "{:.4f}".format(heritability) + " (99% CI: " +
+        "{:.4f}".format(ci99_low) + " ... " + "{:.4f}".format(ci99_high) + ")"
+    )
+    # Return information.
+    return record
+
+
+##########
+# 3. Convert scale of heritability.
+
+
+def define_heritability_scales(
+    table=None,
+):
+    """
+    Determines for all studies whether to report SNP heritability on the
+    observed or liability scale, matching the logic of the driver script.
+
+    arguments:
+        table (object): Pandas data-frame table with columns "type",
+            "prevalence_sample", and "prevalence_population"
+
+    raises:
+
+    returns:
+        (object): Pandas series of scales, either 'observed' or 'liability'
+
+    """
+
+    indicator_liability = (
+        (table["type"].astype("string").str.strip() == "logistic").fillna(
+            False
+        ) &
+        (table["prevalence_sample"].notna()) &
+        (table["prevalence_population"].notna())
+    )
+    scales = pandas.Series(
+        numpy.where(indicator_liability, "liability", "observed"),
+        index=table.index,
+    )
+    return scales
+
+
+def calculate_heritability_intervals_summaries(
+    table=None,
+    prefix=None,
+):
+    """
+    Calculates confidence intervals and summary text for estimates of SNP
+    heritability in columns of a table.
+
+    arguments:
+        table (object): Pandas data-frame table with columns of estimates and
+            standard errors that begin with prefix
+        prefix (str): prefix of names of columns, such as 'heritability'
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table
+
+    """
+
+    estimate = table[prefix]
+    error = table[str(prefix + "_error")]
+    table[str(prefix + "_ci95_low")] = estimate - (1.960 * error)
+    table[str(prefix + "_ci95_high")] = estimate + (1.960 * error)
+    table[str(prefix + "_ci99_low")] = estimate - (2.576 * error)
+    table[str(prefix + "_ci99_high")] = estimate + (2.576 * error)
+    def format_values(series):
+        return series.map(lambda value: "{:.4f}".format(value))
+    table[str("summary_" + prefix + "_error")] = (
+        format_values(estimate) + " (" + format_values(error) + ")"
+    )
+    table[str("summary_" + prefix + "_ci95")] = (
+        format_values(estimate) + " (95% CI: " +
+        format_values(table[str(prefix + "_ci95_low")]) + " ... " +
+        format_values(table[str(prefix + "_ci95_high")]) + ")"
+    )
+    table[str("summary_" + prefix + "_ci99")] = (
+        format_values(estimate) + " (99% CI: " +
+        format_values(table[str(prefix + "_ci99_low")]) + " ... " +
+        format_values(table[str(prefix + "_ci99_high")]) + ")"
+    )
+    return table
+
+
+def convert_heritability_table_scales(
+    table_heritability=None,
+    table_parameter=None,
+    report=None,
+):
+    """
+    Converts estimates of SNP heritability on the observed scale to the
+    liability scale for all studies in a single vectorized step.
+
+    The product table includes estimates, standard errors, and confidence
+    intervals on both the observed scale (columns "heritability_observed*")
+    and the liability scale (columns "heritability_liability*"), the latter
+    missing for studies without a logistic regression or without values of
+    prevalence. The columns "heritability*" and "type_analysis" carry the
+    estimates on the scale that the driver script would have chosen for each
+    study, so the table keeps the same columns as the table from extraction of
+    LDSC reports.
+
+    arguments:
+        table_heritability (object): Pandas data-frame table of estimates of
+            SNP heritability on the observed scale with column "identifier"
+        table_parameter (object): Pandas data-frame table of parameters for
+            studies with columns "study", "type", "prevalence_sample", and
+            "prevalence_population"
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table
+
+    """
+
+    # Copy information.
+    table = table_heritability.copy(deep=True)
+    # Merge parameters of studies.
+    table_study = table_parameter.loc[
+        :, ["study", "type", "prevalence_sample", "prevalence_population",]
+    ].copy(deep=True)
+    table_study["study"] = table_study["study"].astype("string").str.strip()
+    table_study.drop_duplicates(subset=["study",], keep="first", inplace=True)
+    table_study.rename(columns={"study": "identifier",}, inplace=True)
+    table = table.merge(
+        table_study,
+        how="left",
+        on="identifier",
+        sort=False,
+    )
+    # Determine scales.
+    table["scale"] = define_heritability_scales(table=table)
+    indicator_liability = (table["scale"] == "liability").to_numpy()
+    # Calculate factors for conversion.
+    prevalence_sample = table["prevalence_sample"].to_numpy(dtype="float64")
+    prevalence_population = table["prevalence_population"].to_numpy(
+        dtype="float64"
+    )
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        factor = calculate_observed_to_liability_scale_factor(
+            prevalence_sample=prevalence_sample,
+            prevalence_population=prevalence_population,
+        )
+    factor = numpy.where(indicator_liability, factor, numpy.nan)
+    table["factor_liability"] = factor
+    # Calculate estimates on both scales.
+    heritability = table["heritability"].to_numpy(dtype="float64")
+    error = table["heritability_error"].to_numpy(dtype="float64")
+    table["heritability_observed"] = heritability
+    table["heritability_observed_error"] = error
+    table["heritability_liability"] = heritability * factor
+    table["heritability_liability_error"] = error * factor
+    table = calculate_heritability_intervals_summaries(
+        table=table,
+        prefix="heritability_observed",
+    )
+    table = calculate_heritability_intervals_summaries(
+        table=table,
+        prefix="heritability_liability",
+    )
+    # Select estimates on the scale for each study.
+    table["type_analysis"] = "heritability_" + table["scale"]
+    table["heritability"] = numpy.where(
+        indicator_liability, table["heritability_liability"], heritability,
+    )
+    table["heritability_error"] = numpy.where(
+        indicator_liability, table["heritability_liability_error"], error,
+    )
+    table = calculate_heritability_intervals_summaries(
+        table=table,
+        prefix="heritability",
+    )
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=4)
+        print("count of studies: " + str(table.shape[0]))
+        print(
+            "count of studies on liability scale: " +
+            str(int(indicator_liability.sum()))
+        )
+        putly.print_terminal_partition(level=4)
+        pass
+    # Return information.
+    return table
+
+
+##########
+# 4. Drive estimation across studies.
+
+
+def define_heritability_instances(
+    table_parameter=None,
+    path_directory_source=None,
+):
+    """
+    Defines instances of studies for estimation of SNP heritability from the
+    rows of the parameter table with inclusion.
+
+    arguments:
+        table_parameter (object): Pandas data-frame table of parameters for
+            studies
+        path_directory_source (str): path to directory of munged GWAS summary
+            statistics
+
+    raises:
+
+    returns:
+        (list<dict>): instances for iteration
+
+    """
+
+    table_inclusion = table_parameter.loc[
+        (table_parameter["inclusion"] == 1), :
+    ]
+    instances = list()
+    for index, row in table_inclusion.iterrows():
+        instance = dict()
+        instance["study"] = str(row["study"]).strip()
+        instance["path_file_source"] = os.path.join(
+            path_directory_source,
+            str(instance["study"] + ".sumstats.gz"),
+        )
+        instances.append(instance)
+        pass
+    return instances
+
+
+def control_estimate_study_snp_heritability(
+    instance=None,
+    parameters=None,
+):
+    """
+    Control procedure to estimate SNP heritability for a single study and to
+    write the record of estimates to file.
+
+    arguments:
+        instance (dict): parameters specific to current instance
+            study (str): identifier of study
+            path_file_source (str): path to file of munged GWAS summary
+                statistics
+        parameters (dict): parameters common to all instances
+            path_directory_reference (str): path to directory of reference
+                LD scores and regression weights in binary format
+            chromosomes (list<int>): chromosomes of reference to select
+            threshold_two_step (float): threshold on chi-square statistic for
+                two-step estimator
+            count_blocks (int): count of blocks for jackknife
+            path_directory_batch (str): path to directory for records of
+                individual studies
+            path_directory_product (str): path to directory of product files
+            report (bool): whether to print reports
+
+    raises:
+
+    returns:
+
+    """
+
+    # Extract parameters.
+    study = instance["study"]
+    report = parameters["report"]
+    # Map reference LD scores into memory, which does not copy the arrays.
+    reference = pref.load_reference_ld_scores_binary(
+        path_directory_binary=parameters["path_directory_reference"],
+        chromosomes=parameters["chromosomes"],
+        report=False,
+    )
+    # Read source information from file.
+    table_source = read_source_munge_summary_statistics(
+        path_file_source=instance["path_file_source"],
+        report=report,
+    )
+    # Match summary statistics to reference LD scores, in the genomic
+    # sequence of the reference.
+    table = pref.organize_reference_study_table(
+        reference=reference,
+        table=table_source,
+    )
+    # Estimate SNP heritability.
+    estimates = estimate_snp_heritability_ldsc(
+        table=table,
+        count_variants_reference=reference["count_variants_reference"],
+        threshold_two_step=parameters["threshold_two_step"],
+        count_blocks=parameters["count_blocks"],
+        report=report,
+    )
+    record = organize_heritability_table_record(
+        study=study,
+        path_directory=parameters["path_directory_product"],
+        estimates=estimates,
+    )
+    # Write product information to file.
+    table_record = pandas.DataFrame(data=[record,])
+    table_record.to_pickle(
+        os.path.join(
+            parameters["path_directory_batch"], str(study + ".pickle"),
+        )
+    )
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=5)
+        print("study: " + study)
+        print("heritability: " + record["summary_heritability_error"])
+        putly.print_terminal_partition(level=5)
+        pass
+    pass
+
+
+def control_estimate_studies_snp_heritability(
+    path_file_table_parameter=None,
+    path_directory_source=None,
+    path_directory_disequilibrium=None,
+    path_directory_reference=None,
+    path_directory_product=None,
+    threshold_two_step=None,
+    count_blocks=None,
+    cores=None,
+    report=None,
+):
+    """
+    Control procedure to estimate SNP heritability for all studies with
+    inclusion in the parameter table.
+
+    This procedure converts the reference LD scores and regression weights to
+    binary format once, estimates SNP heritability for each study within parallel
+    processes, and writes tables of estimates on the observed scale and on
+    the scale for each study.
+
+    arguments:
+        path_file_table_parameter (str): path to file for parameter table of
+            studies
+        path_directory_source (str): path to directory of munged GWAS summary
+            statistics
+        path_directory_disequilibrium (str): path to directory of reference LD
+            scores and regression weights
+        path_directory_reference (str): path to directory of reference LD
+            scores and regression weights in binary format
+        path_directory_product (str): path to directory of product files
+        threshold_two_step (float): threshold on chi-square statistic for
+            two-step estimator
+        count_blocks (int): count of blocks for jackknife
+        cores (int): count of processing cores for parallel processes
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table
+
+    """
+
+    # Initialize directories.
+    path_directory_batch = os.path.join(path_directory_product, "batch",)
+    putly.remove_directory(path=path_directory_batch) # caution
+    putly.create_directories(path=path_directory_batch)
+    # Read source information from file.
+    table_parameter = read_source_parameter_table_studies(
+        path_file_table=path_file_table_parameter,
+        report=report,
+    )
+    chromosomes = list(range(1, 23))
+    pref.read_reference_ld_scores(
+        path_directory_disequilibrium=path_directory_disequilibrium,
+        path_directory_weights=path_directory_disequilibrium,
+        path_directory_binary=path_directory_reference,
+        chromosomes=chromosomes,
+        cores=cores,
+        report=report,
+    )
+    # Collect parameters specific to each instance.
+    instances = define_heritability_instances(
+        table_parameter=table_parameter,
+        path_directory_source=path_directory_source,
+    )
+    # Collect parameters common across all instances.
+    parameters = dict()
+    parameters["path_directory_reference"] = path_directory_reference
+    parameters["chromosomes"] = chromosomes
+    parameters["threshold_two_step"] = threshold_two_step
+    parameters["count_blocks"] = count_blocks
+    parameters["path_directory_batch"] = path_directory_batch
+    parameters["path_directory_product"] = path_directory_product
+    parameters["report"] = report
+    # Execute procedure iteratively with parallelization across instances.
+    prall.drive_procedure_parallel(
+        function_control=control_estimate_study_snp_heritability,
+        instances=instances,
+        parameters=parameters,
+        cores=cores,
+        report=report,
+    )
+    # Collect records from all studies.
+    tables = list()
+    for instance in instances:
+        path_file_record = os.path.join(
+            path_directory_batch, str(instance["study"] + ".pickle"),
+        )
+        if os.path.exists(path_file_record):
+            tables.append(pandas.read_pickle(path_file_record))
+        pass
+    table_observed = pandas.concat(
+        tables,
+        axis="index",
+        join="outer",
+        ignore_index=True,
+        copy=True,
+    )
+    # Convert estimates to the liability scale for all studies from the same
+    # regression on the observed scale.
+    table = convert_heritability_table_scales(
+        table_heritability=table_observed,
+        table_parameter=table_parameter,
+        report=report,
+    )
+    ##########
+    # Collect information.
+    # Collections of files.
+    pail_write_tables = dict()
+    pail_write_tables[str("table_heritability")] = table
+    pail_write_tables[str("table_heritability_observed")] = table_observed
+    ##########
+    # Write product information to file.
+    putly.write_tables_to_file(
+        pail_write=pail_write_tables,
+        path_directory=path_directory_product,
+        reset_index_rows=False,
+        write_index_rows=False,
+        write_index_columns=True,
+        type="text",
+        delimiter="\t",
+        suffix=".tsv",
+    )
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=4)
+        print("count of studies: " + str(len(instances)))
+        print("count of estimates: " + str(table.shape[0]))
+        putly.print_terminal_partition(level=4)
+        pass
+    # Return information.
+    return table
+
+
+###############################################################################
+# Procedure
+
+
+def execute_procedure(
+    path_directory_dock=None,
+):
+    """
+    Function to execute module's main behavior.
+
+    arguments:
+        path_directory_dock (str): path to dock directory for source and product
+            directories and files
+
+    raises:
+
+    returns:
+
+    """
+
+    ##########
+    # Parameters.
+    identifier_analysis = "gwas_2023-12-30_ldsc_2024-01-08"
+    identifier_parameter = "tcw_2023-12-30_dbsnp_rsid"
+    threshold_two_step = 30.0 # LDSC default for SNP heritability
+    count_blocks = 200 # LDSC default
+    cores = 8
+    report = True
+
+    ##########
+    # Paths.
+    path_directory_group_parent = os.path.join(
+        path_directory_dock, identifier_analysis,
+    )
+    path_directory_disequilibrium = os.path.join(
+        path_directory_group_parent, "2_reference_ldsc", "disequilibrium",
+        "eur_w_ld_chr",
+    )
+    path_directory_reference = os.path.join(
+        path_directory_group_parent, "2_reference_ldsc", "disequilibrium",
+        "eur_w_ld_chr_binary",
+    )
+    path_directory_source = os.path.join(
+        path_directory_group_parent, "4_gwas_munge_ldsc",
+    )
+    path_directory_product = os.path.join(
+        path_directory_group_parent, "5_gwas_heritability_ldsc",
+    )
+    path_file_table_parameter = os.path.join(
+        path_directory_dock, "parameters", "psychiatric_metabolism",
+        str("table_gwas_translation_" + identifier_parameter + ".tsv"),
+    )
+    putly.create_directories(path=path_directory_product)
+
+    ##########
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=3)
+        print("module: psychiatry_biomarkers.ldsc.heritability.py")
+        print("function: execute_procedure()")
+        putly.print_terminal_partition(level=5)
+        print("analysis: " + str(identifier_analysis))
+        print("parameter: " + str(identifier_parameter))
+        putly.print_terminal_partition(level=5)
+        pass
+
+    ##########
+    # Estimate SNP heritability for all studies.
+    control_estimate_studies_snp_heritability(
+        path_file_table_parameter=path_file_table_parameter,
+        path_directory_source=path_directory_source,
+        path_directory_disequilibrium=path_directory_disequilibrium,
+        path_directory_reference=path_directory_reference,
+        path_directory_product=path_directory_product,
+        threshold_two_step=threshold_two_step,
+        count_blocks=count_blocks,
+        cores=cores,
+        report=report,
+    )
+    pass
+
+
+###############################################################################
+# End
@@ -0,0 +1,605 @@
+"""
+Supply functionality for translation and munge of GWAS summary statistics from
+the team's standard format to the format for LD Score Regression (LDSC).
+
+This module 'munge' is part of the 'ldsc' package within the
+'psychiatry_biomarkers' package.
+
+Author:
+
+    T. Cameron Waller, Ph.D.
+    tcameronwaller@gmail.com
+    Rochester, Minnesota 55902
+    United States of America
+
+License:
+
+    This file is part of the project package directory 'psychiatry_biomarkers'
+    (https://github.com/tcameronwaller/psychiatry_biomarkers/).
+
+    Project 'psychiatry_biomarkers' supports data analysis with team in
+    psychiatry and pharmacogenomics.
+    Copyright (C) 2024 Thomas Cameron Waller
+
+    The code within project 'psychiatry_biomarkers' is free software: you can
+    redistribute it and/or modify it under the terms of the GNU General Public
+    License as published by the Free Software Foundation, either version 3 of
+    the GNU General Public License, or (at your option) any later version.
+
+    The code within project 'psychiatry_biomarkers' is distributed in the hope
+    that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+    warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with project 'psychiatry_biomarkers'. If not, see
+    <http://www.gnu.org/licenses/>.
+"""
+
+###############################################################################
+# Notes
+
+# The driver scripts "3_translate_gwas_to_ldsc_format.sh" and
+# "4_munge_gwas_ldsc.sh" translate each study to LDSC's format and then call
+# LDSC's "munge_sumstats.py". This module replaces both steps with a single
+# pass over chunks of each file in the standard format.
+
+# Each chunk is filtered and restricted to the variants in the list of merge
+# alleles (HapMap3, "w_hm3.snplist") before the next chunk is read, so the
+# memory for each study has a bound in the size of the list of merge alleles
+# rather than in the count of variants in the GWAS.
+
+# Filters follow the defaults of LDSC's munge: INFO >= 0.9, minor allele
+# frequency > 0.01, p-value within (0, 1], single-nucleotide alleles without
+# strand ambiguity, alleles that match the merge alleles up to strand, count of
+# observations >= 90th percentile / 1.5, and unique identifiers of variants.
+# Unlike LDSC, the filters on INFO and frequency do not remove variants with
+# missing values, as many studies do not report these.
+
+###############################################################################
+# Installation and importation
+
+# Standard
+
+import os
+
+# Relevant
+
+import numpy
+import scipy.stats
+import pandas
+pandas.options.mode.chained_assignment = None # default = "warn"
+
+# Custom
+import partner.utility as putly
+import partner.parallelization as prall
+import psychiatry_biomarkers.gwas_preparation.standard_format as pbstd
+
+###############################################################################
+# Functionality
+
+
+##########
+# 1. Read merge alleles.
+
+
+def read_source_merge_alleles(
+    path_file_alleles=None,
+    report=None,
+):
+    """
+    Reads and organizes from file the list of variants and alleles for merge,
+    such as "w_hm3.snplist".
+
+    arguments:
+        path_file_alleles (str): path to file of merge alleles
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table
+
+    """
+
+    # Read information from file.
+    table = pandas.read_csv(
+        path_file_alleles,
+        sep=r"\s+",
+        header=0,
+        usecols=["SNP", "A1", "A2",],
+        dtype={"SNP": "string", "A1": "string", "A2": "string",},
+    )
+    table.rename(
+        columns={"A1": "MA1", "A2": "MA2",},
+        inplace=True,
+    )
+    table["MA1"] = table["MA1"].str.upper()
+    table["MA2"] = table["MA2"].str.upper()
+    table.drop_duplicates(
+        subset=["SNP",],
+        keep="first",
+        inplace=True,
+    )
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=5)
+        print("count of merge alleles: " + str(table.shape[0]))
+        putly.print_terminal_partition(level=5)
+        pass
+    # Return information.
+    return table
+
+
+##########
+# 2. Filter chunks.
+
+
+def define_munge_filter_counts():
+    """
+    Defines counts of variants that each filter removes.
+
+    arguments:
+
+    raises:
+
+    returns:
+        (dict<int>): counts of variants
+
+    """
+
+    counts = dict()
+    counts["variants_source"] = 0
+    counts["missing_values"] = 0
+    counts["p_value_range"] = 0
+    counts["info_low"] = 0
+    counts["frequency_low"] = 0
+    counts["alleles_invalid"] = 0
+    counts["alleles_ambiguous"] = 0
+    counts["merge_absent"] = 0
+    counts["merge_alleles_mismatch"] = 0
+    counts["observations_low"] = 0
+    counts["duplicate"] = 0
+    counts["variants_product"] = 0
+    return counts
+
+
+def filter_munge_chunk(
+    table=None,
+    table_alleles=None,
+    threshold_info=None,
+    threshold_frequency=None,
+    counts=None,
+):
+    """
+    Filters a chunk of GWAS summary statistics and restricts to variants in
+    the list of merge alleles.
+
+    arguments:
+        table (object): Pandas data-frame table of GWAS summary statistics in
+            standard format
+        table_alleles (object): Pandas data-frame table of merge alleles
+        threshold_info (float): minimal value of imputation quality (INFO)
+        threshold_frequency (float): exclusive minimal value of minor allele
+            frequency
+        counts (dict<int>): counts of variants that each filter removes,
+            which this function updates
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table
+
+    """
+
+    counts["variants_source"] += table.shape[0]
+
+    # Remove variants with missing values in required columns.
+    count = table.shape[0]
+    table = table.dropna(
+        axis="index",
+        how="any",
+        subset=["SNP", "A1", "A2", "BETA", "P", "N",],
+    )
+    counts["missing_values"] += (count - table.shape[0])
+
+    # Remove variants with p-values out of range.
+    count = table.shape[0]
+    table = table.loc[((table["P"] > 0) & (table["P"] <= 1)), :]
+    counts["p_value_range"] += (count - table.shape[0])
+
+    # Remove variants with low imputation quality.
+    count = table.shape[0]
+    table = table.loc[
+        (table["INFO"].isna() | (table["INFO"] >= threshold_info)), :
+    ]
+    counts["info_low"] += (count - table.shape[0])
+
+    # Remove variants with low minor allele frequency.
+    count = table.shape[0]
+    frequency_minor = numpy.minimum(table["A1AF"], (1 - table["A1AF"]))
+    table = table.loc[
+        (frequency_minor.isna() | (frequency_minor > threshold_frequency)), :
+    ]
+    counts["frequency_low"] += (count - table.shape[0])
+
+    # Remove variants with alleles other than single nucleotides.
+    count = table.shape[0]
+    table["A1"] = table["A1"].str.upper()
+    table["A2"] = table["A2"].str.upper()
+    nucleotides = ["A", "C", "G", "T",]
+    table = table.loc[
+        (
+            table["A1"].isin(nucleotides) &
+            table["A2"].isin(nucleotides) &
+            (table["A1"] != table["A2"])
+        ), :
+    ]
+    counts["alleles_invalid"] += (count - table.shape[0])
+
+    # Remove variants with strand ambiguity.
+    count = table.shape[0]
+    table = table.loc[
+        (table["A1"] != pbstd.complement_alleles(series=table["A2"])), :
+    ]
+    counts["alleles_ambiguous"] += (count - table.shape[0])
+
+    # Restrict to variants in the list of merge alleles.
+    count = table.shape[0]
+    table = table.merge(
+        table_alleles,
+        how="inner",
+        on="SNP",
+        sort=False,
+    )
+    counts["merge_absent"] += (count - table.shape[0])
+
+    # Remove variants with alleles that do not match the merge alleles on
+    # either strand.
+    count = table.shape[0]
+    alleles = table["A1"] + table["A2"]
+    merge_forward = table["MA1"] + table["MA2"]
+    merge_reverse = table["MA2"] + table["MA1"]
+    merge_forward_complement = pbstd.complement_alleles(series=merge_forward)
+    merge_reverse_complement = pbstd.complement_alleles(series=merge_reverse)
+    table = table.loc[
+        (
+            (alleles == merge_forward) |
+            (alleles == merge_reverse) |
+            (alleles == merge_forward_complement) |
+            (alleles == merge_reverse_complement)
+        ), :
+    ]
+    counts["merge_alleles_mismatch"] += (count - table.shape[0])
+
+    # Return information.
+    return table.loc[:, ["SNP", "A1", "A2", "BETA", "P", "N",]]
+
+
+def finalize_munge_table(
+    table=None,
+    counts=None,
+):
+    """
+    Applies the filters that depend on all variants, and calculates signed
+    Z-scores.
+
+    arguments:
+        table (object): Pandas data-frame table of variants that passed the
+            filters on chunks
+        counts (dict<int>): counts of variants that each filter removes,
+            which this function updates
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table
+
+    """
+
+    # Remove variants with low counts of observations.
+    count = table.shape[0]
+    if (count > 0):
+        threshold_observations = table["N"].quantile(0.9) / 1.5
+        table = table.loc[(table["N"] >= threshold_observations), :]
+    counts["observations_low"] += (count - table.shape[0])
+
+    # Remove variants with redundant identifiers.
+    count = table.shape[0]
+    table = table.drop_duplicates(
+        subset=["SNP",],
+        keep="first",
+    )
+    counts["duplicate"] += (count - table.shape[0])
+
+    # Calculate Z-scores from p-values with the direction of the effect on
+    # allele "A1".
+    sign = numpy.where((table["BETA"].to_numpy() < 0), -1.0, 1.0)
+    table["Z"] = sign * scipy.stats.norm.isf(table["P"].to_numpy() / 2)
+    counts["variants_product"] = table.shape[0]
+    # Return information.
+    return table.loc[:, ["SNP", "A1", "A2", "Z", "N",]]
+
+
+##########
+# 3. Drive munge across studies.
+
+
+def control_munge_study(
+    instance=None,
+    parameters=None,
+):
+    """
+    Control procedure to munge GWAS summary statistics for a single study in
+    chunks and to write the product in LDSC's "sumstats" format.
+
+    arguments:
+        instance (dict): parameters specific to current instance
+            study (str): identifier of study
+            path_file_source (str): path to file of GWAS summary statistics in
+                standard format
+            path_file_product (str): path to file for product
+        parameters (dict): parameters common to all instances
+            table_alleles (object): Pandas data-frame table of merge alleles
+            threshold_info (float): minimal value of imputation quality
+            threshold_frequency (float): exclusive minimal value of minor
+                allele frequency
+            size_chunk (int): count of rows in each chunk
+            path_directory_batch (str): path to directory for records of
+                individual studies
+            report (bool): whether to print reports
+
+    raises:
+
+    returns:
+
+    """
+
+    # Collect information.
+    counts = define_munge_filter_counts()
+    tables = list()
+    # Read, filter, and restrict chunks of summary statistics.
+    reader = pbstd.read_gwas_standard_format_chunks(
+        path_file=instance["path_file_source"],
+        columns=["SNP", "A1", "A2", "A1AF", "BETA", "P", "N", "INFO",],
+        size_chunk=parameters["size_chunk"],
+    )
+    for chunk in reader:
+        tables.append(filter_munge_chunk(
+            table=chunk,
+            table_alleles=parameters["table_alleles"],
+            threshold_info=parameters["threshold_info"],
+            threshold_frequency=parameters["threshold_frequency"],
+            counts=counts,
+        ))
+        pass
+    table = pandas.concat(
+        tables,
+        axis="index",
+        join="outer",
+        ignore_index=True,
+        copy=False,
+    )
+    table = finalize_munge_table(
+        table=table,
+        counts=counts,
+    )
+    # Write product information to file.
+    table.to_csv(
+        instance["path_file_product"],
+        sep="\t",
+        header=True,
+        index=False,
+        na_rep="NA",
+        float_format="%.3f",
+        compression="gzip",
+    )
+    record = dict()
+    record["study"] = instance["study"]
+    record.update(counts)
+    pandas.DataFrame(data=[record,]).to_pickle(
+        os.path.join(
+            parameters["path_directory_batch"],
+            str(instance["study"] + ".pickle"),
+        )
+    )
+    # Report.
+    if parameters["report"]:
+        putly.print_terminal_partition(level=5)
+        print("study: " + instance["study"])
+        print("count of variants in source: " + str(counts["variants_source"]))
+        print(
+            "count of variants in product: " + str(counts["variants_product"])
+        )
+        putly.print_terminal_partition(level=5)
+        pass
+    pass
+
+
+def control_munge_studies(
+    path_directory_source=None,
+    path_file_alleles=None,
+    path_directory_product=None,
+    threshold_info=None,
+    threshold_frequency=None,
+    size_chunk=None,
+    cores=None,
+    report=None,
+):
+    """
+    Control procedure to munge GWAS summary statistics for all studies in the
+    source directory with parallelization across studies.
+
+    arguments:
+        path_directory_source (str): path to directory of files for GWAS
+            summary statistics in standard format ("*.txt.gz")
+        path_file_alleles (str): path to file of merge alleles
+        path_directory_product (str): path to directory for product files
+            ("*.sumstats.gz")
+        threshold_info (float): minimal value of imputation quality
+        threshold_frequency (float): exclusive minimal value of minor allele
+            frequency
+        size_chunk (int): count of rows in each chunk
+        cores (int): count of processing cores for parallel processes
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table of counts of variants that each
+            filter removes for each study
+
+    """
+
+    # Initialize directories.
+    path_directory_batch = os.path.join(path_directory_product, "batch",)
+    putly.remove_directory(path=path_directory_batch) # caution
+    putly.create_directories(path=path_directory_batch)
+    # Read source information from file.
+    table_alleles = read_source_merge_alleles(
+        path_file_alleles=path_file_alleles,
+        report=report,
+    )
+    # Collect parameters specific to each instance.
+    names_files = sorted(list(filter(
+        lambda name: name.endswith(".txt.gz"),
+        os.listdir(path_directory_source),
+    )))
+    instances = list()
+    for name_file in names_files:
+        study = pbstd.define_study_identifier_from_file_name(
+            path_file=name_file,
+            suffix=".txt.gz",
+        )
+        instance = dict()
+        instance["study"] = study
+        instance["path_file_source"] = os.path.join(
+            path_directory_source, name_file,
+        )
+        instance["path_file_product"] = os.path.join(
+            path_directory_product, str(study + ".sumstats.gz"),
+        )
+        instances.append(instance)
+        pass
+    # Collect parameters common across all instances.
+    parameters = dict()
+    parameters["table_alleles"] = table_alleles
+    parameters["threshold_info"] = threshold_info
+    parameters["threshold_frequency"] = threshold_frequency
+    parameters["size_chunk"] = size_chunk
+    parameters["path_directory_batch"] = path_directory_batch
+    parameters["report"] = report
+    # Execute procedure iteratively with parallelization across instances.
+    prall.drive_procedure_parallel(
+        function_control=control_munge_study,
+        instances=instances,
+        parameters=parameters,
+        cores=cores,
+        report=report,
+    )
+    # Collect records from all studies.
+    tables = list()
+    for instance in instances:
+        path_file_record = os.path.join(
+            path_directory_batch, str(instance["study"] + ".pickle"),
+        )
+        if os.path.exists(path_file_record):
+            tables.append(pandas.read_pickle(path_file_record))
+        pass
+    table = pandas.concat(
+        tables,
+        axis="index",
+        join="outer",
+        ignore_index=True,
+        copy=True,
+    )
+    # Write product information to file.
+    putly.write_tables_to_file(
+        pail_write={"table_munge_counts": table,},
+        path_directory=path_directory_product,
+        reset_index_rows=False,
+        write_index_rows=False,
+        write_index_columns=True,
+        type="text",
+        delimiter="\t",
+        suffix=".tsv",
+    )
+    # Return information.
+    return table
+
+
+###############################################################################
+# Procedure
+
+
+def execute_procedure(
+    path_directory_dock=None,
+):
+    """
+    Function to execute module's main behavior.
+
+    arguments:
+        path_directory_dock (str): path to dock directory for source and product
+            directories and files
+
+    raises:
+
+    returns:
+
+    """
+
+    ##########
+    # Parameters.
+    identifier_analysis = "gwas_2023-12-30_ldsc_2024-01-08"
+    threshold_info = 0.9 # LDSC default
+    threshold_frequency = 0.01 # LDSC default
+    size_chunk = 1000000
+    cores = 8
+    report = True
+
+    ##########
+    # Paths.
+    path_directory_group_parent = os.path.join(
+        path_directory_dock, identifier_analysis,
+    )
+    path_directory_source = os.path.join(
+        path_directory_group_parent, "1_gwas_summaries_source",
+    )
+    path_file_alleles = os.path.join(
+        path_directory_group_parent, "2_reference_ldsc", "alleles",
+        "w_hm3.snplist",
+    )
+    path_directory_product = os.path.join(
+        path_directory_group_parent, "4_gwas_munge_ldsc",
+    )
+    putly.remove_directory(path=path_directory_product) # caution
+    putly.create_directories(path=path_directory_product)
+
+    ##########
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=3)
+        print("module: psychiatry_biomarkers.ldsc.munge.py")
+        print("function: execute_procedure()")
+        putly.print_terminal_partition(level=5)
+        print("analysis: " + str(identifier_analysis))
+        putly.print_terminal_partition(level=5)
+        pass
+
+    ##########
+    # Munge GWAS summary statistics for all studies.
+    control_munge_studies(
+        path_directory_source=path_directory_source,
+        path_file_alleles=path_file_alleles,
+        path_directory_product=path_directory_product,
+        threshold_info=threshold_info,
+        threshold_frequency=threshold_frequency,
+        size_chunk=size_chunk,
+        cores=cores,
+        report=report,
+    )
+    pass
+
+
+###############################################################################
+# End
@@ -0,0 +1,616 @@
+"""
+Supply functionality for conversion of the reference panel of LD scores and
+regression weights for LD Score Regression (LDSC) to a binary format that
+supports memory-mapped access.
+
+This module 'reference' is part of the 'ldsc' package within the
+'psychiatry_biomarkers' package.
+
+Author:
+
+    T. Cameron Waller, Ph.D.
+    tcameronwaller@gmail.com
+    Rochester, Minnesota 55902
+    United States of America
+
+License:
+
+    This file is part of the project package directory 'psychiatry_biomarkers'
+    (https://github.com/tcameronwaller/psychiatry_biomarkers/).
+
+    Project 'psychiatry_biomarkers' supports data analysis with team in
+    psychiatry and pharmacogenomics.
+    Copyright (C) 2024 Thomas Cameron Waller
+
+    The code within project 'psychiatry_biomarkers' is free software: you can
+    redistribute it and/or modify it under the terms of the GNU General Public
+    License as published by the Free Software Foundation, either version 3 of
+    the GNU General Public License, or (at your option) any later version.
+
+    The code within project 'psychiatry_biomarkers' is distributed in the hope
+    that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+    warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with project 'psychiatry_biomarkers'. If not, see
+    <http://www.gnu.org/licenses/>.
+"""
+
+###############################################################################
+# Notes
+
+# The reference panel "eur_w_ld_chr" has for each autosome a file
+# "[chromosome].l2.ldscore.gz" of LD scores in text format with compression by
+# GZip and a file "[chromosome].l2.M_5_50" with the count of variants that
+# have minor allele frequency greater than 0.05.
+
+# The conversion reads the text files once, in parallel across chromosomes,
+# and writes each column as a separate binary array in NumPy's format
+# ("*.npy"). The variants of all chromosomes are in genomic sequence within
+# each array, and the table "table_chromosomes.tsv" records the offsets at
+# which each chromosome begins and ends. Subsequent loads map the arrays into
+# memory without reading or copying them, so that many parallel processes
+# share the same pages of the operating system's cache.
+
+# The arrays "snp_sorted.npy" and "snp_order.npy" are the identifiers of
+# variants in sort order and the positions in genomic sequence that correspond
+# to them. These arrays support vectorized matching of identifiers from GWAS
+# summary statistics by binary search instead of a merge on strings.
+
+###############################################################################
+# Installation and importation
+
+# Standard
+
+import os
+
+# Relevant
+
+import numpy
+import pandas
+pandas.options.mode.chained_assignment = None # default = "warn"
+
+# Custom
+import partner.utility as putly
+import partner.parallelization as prall
+
+###############################################################################
+# Functionality
+
+
+##########
+# 1. Read reference panel from text files.
+
+
+def read_source_reference_chromosome(
+    chromosome=None,
+    path_directory_disequilibrium=None,
+    path_directory_weights=None,
+):
+    """
+    Reads and organizes from file the LD scores and regression weights of the
+    reference panel for a single chromosome.
+
+    LDSC documentation recommends use of the same files for LD scores and
+    regression weights.
+
+    arguments:
+        chromosome (int): chromosome
+        path_directory_disequilibrium (str): path to directory of files for LD
+            scores
+        path_directory_weights (str): path to directory of files for regression
+            weights
+
+    raises:
+
+    returns:
+        (dict<object>): collection of information
+
+    """
+
+    # Read LD scores.
+    table_ld = pandas.read_csv(
+        os.path.join(
+            path_directory_disequilibrium,
+            str(str(chromosome) + ".l2.ldscore.gz"),
+        ),
+        sep="\t",
+        header=0,
+        usecols=["CHR", "SNP", "BP", "L2",],
+        dtype={
+            "CHR": "int8", "SNP": "string", "BP": "int64", "L2": "float32",
+        },
+        compression="gzip",
+    )
+    # Read regression weights.
+    table_weight = pandas.read_csv(
+        os.path.join(
+            path_directory_weights,
+            str(str(chromosome) + ".l2.ldscore.gz"),
+        ),
+        sep="\t",
+        header=0,
+        usecols=["SNP", "L2",],
+        dtype={"SNP": "string", "L2": "float32",},
+        compression="gzip",
+    )
+    table_weight.rename(columns={"L2": "W_L2",}, inplace=True,)
+    table = table_ld.merge(
+        table_weight,
+        how="inner",
+        on="SNP",
+        sort=False,
+    )
+    # Read count of variants with minor allele frequency > 0.05.
+    path_file_count = os.path.join(
+        path_directory_disequilibrium,
+        str(str(chromosome) + ".l2.M_5_50"),
+    )
+    with open(path_file_count, "r") as file_count:
+        count_variants = float(file_count.read().split()[0])
+    # Collect information.
+    pail = dict()
+    pail["table"] = table
+    pail["count_variants"] = count_variants
+    # Return information.
+    return pail
+
+
+def control_read_reference_chromosome(
+    instance=None,
+    parameters=None,
+):
+    """
+    Control procedure to read the reference panel for a single chromosome and
+    to write it to a temporary file.
+
+    arguments:
+        instance (dict): parameters specific to current instance
+            chromosome (int): chromosome
+        parameters (dict): parameters common to all instances
+            path_directory_disequilibrium (str): path to directory of files
+                for LD scores
+            path_directory_weights (str): path to directory of files for
+                regression weights
+            path_directory_batch (str): path to directory for temporary files
+
+    raises:
+
+    returns:
+
+    """
+
+    pail = read_source_reference_chromosome(
+        chromosome=instance["chromosome"],
+        path_directory_disequilibrium=(
+            parameters["path_directory_disequilibrium"]
+        ),
+        path_directory_weights=parameters["path_directory_weights"],
+    )
+    pandas.to_pickle(
+        pail,
+        os.path.join(
+            parameters["path_directory_batch"],
+            str("chromosome_" + str(instance["chromosome"]) + ".pickle"),
+        )
+    )
+    pass
+
+
+##########
+# 2. Convert reference panel to binary format.
+
+
+def define_reference_binary_file_names():
+    """
+    Defines names of files for arrays of the reference panel in binary format.
+
+    arguments:
+
+    raises:
+
+    returns:
+        (dict<str>): names of files for arrays
+
+    """
+
+    names = dict()
+    names["snp"] = "snp.npy"
+    names["chromosome"] = "chromosome.npy"
+    names["position"] = "position.npy"
+    names["ld"] = "ld.npy"
+    names["ld_weight"] = "ld_weight.npy"
+    names["snp_sorted"] = "snp_sorted.npy"
+    names["snp_order"] = "snp_order.npy"
+    return names
+
+
+def convert_reference_ld_scores_binary(
+    path_directory_disequilibrium=None,
+    path_directory_weights=None,
+    path_directory_binary=None,
+    chromosomes=None,
+    cores=None,
+    report=None,
+):
+    """
+    Converts the LD scores and regression weights of the reference panel from
+    text files to binary arrays with a table of offsets for chromosomes.
+
+    arguments:
+        path_directory_disequilibrium (str): path to directory of files for LD
+            scores
+        path_directory_weights (str): path to directory of files for regression
+            weights; if None, then use same directory as for LD scores
+        path_directory_binary (str): path to directory for binary files
+        chromosomes (list<int>): chromosomes for which to read LD scores
+        cores (int): count of processing cores for parallel processes
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+
+    """
+
+    # Organize parameters.
+    if path_directory_weights is None:
+        path_directory_weights = path_directory_disequilibrium
+    if chromosomes is None:
+        chromosomes = list(range(1, 23))
+    # Initialize directories.
+    path_directory_batch = os.path.join(path_directory_binary, "batch",)
+    putly.remove_directory(path=path_directory_batch) # caution
+    putly.create_directories(path=path_directory_batch)
+    # Read chromosomes with parallelization.
+    instances = list(map(
+        lambda chromosome: {"chromosome": chromosome,}, chromosomes
+    ))
+    parameters = dict()
+    parameters["path_directory_disequilibrium"] = path_directory_disequilibrium
+    parameters["path_directory_weights"] = path_directory_weights
+    parameters["path_directory_batch"] = path_directory_batch
+    prall.drive_procedure_parallel(
+        function_control=control_read_reference_chromosome,
+        instances=instances,
+        parameters=parameters,
+        cores=cores,
+        report=report,
+    )
+    # Collect chromosomes in genomic sequence.
+    tables = list()
+    records = list()
+    for chromosome in chromosomes:
+        pail_chromosome = pandas.read_pickle(
+            os.path.join(
+                path_directory_batch,
+                str("chromosome_" + str(chromosome) + ".pickle"),
+            )
+        )
+        records.append({
+            "chromosome": chromosome,
+            "count_variants": pail_chromosome["count_variants"],
+        })
+        tables.append(pail_chromosome["table"])
+        pass
+    table = pandas.concat(
+        tables,
+        axis="index",
+        join="outer",
+        ignore_index=True,
+        copy=True,
+    )
+    # Remove redundant variants, keeping the first in genomic sequence.
+    table.drop_duplicates(
+        subset=["SNP",],
+        keep="first",
+        inplace=True,
+    )
+    table.reset_index(
+        level=None,
+        inplace=True,
+        drop=True,
+    )
+    # Organize offsets of chromosomes.
+    table_chromosomes = pandas.DataFrame(data=records)
+    counts_rows = table["CHR"].value_counts(sort=False)
+    table_chromosomes["count_rows"] = table_chromosomes["chromosome"].map(
+        lambda chromosome: int(counts_rows.get(chromosome, 0))
+    )
+    table_chromosomes["offset_end"] = table_chromosomes["count_rows"].cumsum()
+    table_chromosomes["offset_start"] = (
+        table_chromosomes["offset_end"] - table_chromosomes["count_rows"]
+    )
+    table_chromosomes = table_chromosomes.loc[
+        :, [
+            "chromosome", "offset_start", "offset_end", "count_rows",
+            "count_variants",
+        ]
+    ]
+    # Organize arrays.
+    names = define_reference_binary_file_names()
+    snp = table["SNP"].astype(str).to_numpy().astype("S")
+    snp_order = numpy.argsort(snp, kind="stable").astype("int64")
+    arrays = dict()
+    arrays["snp"] = snp
+    arrays["chromosome"] = table["CHR"].to_numpy(dtype="int8")
+    arrays["position"] = table["BP"].to_numpy(dtype="int64")
+    arrays["ld"] = table["L2"].to_numpy(dtype="float32")
+    arrays["ld_weight"] = table["W_L2"].to_numpy(dtype="float32")
+    arrays["snp_sorted"] = snp[snp_order]
+    arrays["snp_order"] = snp_order
+    # Write product information to file.
+    for key in arrays.keys():
+        numpy.save(
+            os.path.join(path_directory_binary, names[key]),
+            arrays[key],
+            allow_pickle=False,
+        )
+        pass
+    # Write table of chromosomes last, as it signifies a complete conversion.
+    putly.write_tables_to_file(
+        pail_write={"table_chromosomes": table_chromosomes,},
+        path_directory=path_directory_binary,
+        reset_index_rows=False,
+        write_index_rows=False,
+        write_index_columns=True,
+        type="text",
+        delimiter="\t",
+        suffix=".tsv",
+    )
+    putly.remove_directory(path=path_directory_batch)
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=3)
+        print("module: psychiatry_biomarkers.ldsc.reference.py")
+        print("function: convert_reference_ld_scores_binary()")
+        putly.print_terminal_partition(level=5)
+        print("count of variants in reference LD scores: " + str(table.shape[0]))
+        print("width of identifiers of variants: " + str(snp.dtype.itemsize))
+        putly.print_terminal_partition(level=5)
+        pass
+    pass
+
+
+##########
+# 3. Load reference panel from binary format.
+
+
+def load_reference_ld_scores_binary(
+    path_directory_binary=None,
+    chromosomes=None,
+    report=None,
+):
+    """
+    Loads the LD scores and regression weights of the reference panel from
+    binary arrays with memory mapping.
+
+    The arrays cover all chromosomes of the conversion. Selection of
+    chromosomes restricts the count of variants in the reference and the
+    variants that match in "match_reference_variants".
+
+    arguments:
+        path_directory_binary (str): path to directory of binary files
+        chromosomes (list<int>): chromosomes to select, or None for all
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (dict<object>): collection of information
+
+    """
+
+    # Read table of chromosomes.
+    table_chromosomes = pandas.read_csv(
+        os.path.join(path_directory_binary, "table_chromosomes.tsv"),
+        sep="\t",
+        header=0,
+        dtype={
+            "chromosome": "int64",
+            "offset_start": "int64",
+            "offset_end": "int64",
+            "count_rows": "int64",
+            "count_variants": "float64",
+        },
+    )
+    if chromosomes is not None:
+        table_chromosomes = table_chromosomes.loc[
+            table_chromosomes["chromosome"].isin(chromosomes), :
+        ]
+        table_chromosomes.reset_index(
+            level=None,
+            inplace=True,
+            drop=True,
+        )
+    # Map arrays into memory.
+    names = define_reference_binary_file_names()
+    pail = dict()
+    for key in names.keys():
+        pail[key] = numpy.load(
+            os.path.join(path_directory_binary, names[key]),
+            mmap_mode="r",
+            allow_pickle=False,
+        )
+        pass
+    pail["table_chromosomes"] = table_chromosomes
+    pail["count_variants_reference"] = float(
+        table_chromosomes["count_variants"].sum()
+    )
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=5)
+        print("function: load_reference_ld_scores_binary()")
+        print(
+            "count of variants in reference LD scores: " +
+            str(int(table_chromosomes["count_rows"].sum()))
+        )
+        print(
+            "count of variants (M_5_50): " +
+            str(int(pail["count_variants_reference"]))
+        )
+        putly.print_terminal_partition(level=5)
+        pass
+    # Return information.
+    return pail
+
+
+def read_reference_ld_scores(
+    path_directory_disequilibrium=None,
+    path_directory_weights=None,
+    path_directory_binary=None,
+    chromosomes=None,
+    cores=None,
+    report=None,
+):
+    """
+    Loads the LD scores and regression weights of the reference panel from
+    binary arrays, first converting from text files if the binary arrays do not
+    yet exist.
+
+    arguments:
+        path_directory_disequilibrium (str): path to directory of files for LD
+            scores
+        path_directory_weights (str): path to directory of files for regression
+            weights; if None, then use same directory as for LD scores
+        path_directory_binary (str): path to directory for binary files
+        chromosomes (list<int>): chromosomes to select, or None for all
+        cores (int): count of processing cores for parallel conversion
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (dict<object>): collection of information
+
+    """
+
+    path_file_table = os.path.join(
+        path_directory_binary, "table_chromosomes.tsv",
+    )
+    if not os.path.exists(path_file_table):
+        putly.create_directories(path=path_directory_binary)
+        convert_reference_ld_scores_binary(
+            path_directory_disequilibrium=path_directory_disequilibrium,
+            path_directory_weights=path_directory_weights,
+            path_directory_binary=path_directory_binary,
+            chromosomes=chromosomes,
+            cores=cores,
+            report=report,
+        )
+    pail = load_reference_ld_scores_binary(
+        path_directory_binary=path_directory_binary,
+        chromosomes=chromosomes,
+        report=report,
+    )
+    return pail
+
+
+##########
+# 4. Match variants to reference panel.
+
+
+def match_reference_variants(
+    reference=None,
+    identifiers=None,
+):
+    """
+    Matches identifiers of variants to their positions in the genomic sequence
+    of the reference panel by binary search on the identifiers in sort order.
+
+    arguments:
+        reference (dict<object>): reference panel from
+            "load_reference_ld_scores_binary"
+        identifiers (object): NumPy array or Pandas series of identifiers of
+            variants
+
+    raises:
+
+    returns:
+        (object): NumPy array of positions in reference, or -1 for variants
+            that do not match or that are on chromosomes not in selection
+
+    """
+
+    snp_sorted = reference["snp_sorted"]
+    width = snp_sorted.dtype.itemsize
+    identifiers = numpy.asarray(identifiers).astype(str)
+    # Identifiers longer than the width of the reference would match after
+    # truncation, so exclude them.
+    indicator_width = (numpy.char.str_len(identifiers) <= width)
+    keys = identifiers.astype(str("S" + str(width)))
+    # Search.
+    indices = numpy.searchsorted(snp_sorted, keys, side="left")
+    indices_clip = numpy.minimum(indices, (snp_sorted.shape[0] - 1))
+    indicator_match = (
+        indicator_width &
+        (indices < snp_sorted.shape[0]) &
+        (snp_sorted[indices_clip] == keys)
+    )
+    positions = numpy.where(
+        indicator_match, reference["snp_order"][indices_clip], -1,
+    ).astype("int64")
+    # Restrict to selection of chromosomes.
+    indicator_selection = numpy.zeros(positions.shape[0], dtype="bool")
+    for index, row in reference["table_chromosomes"].iterrows():
+        indicator_selection |= (
+            (positions >= row["offset_start"]) &
+            (positions < row["offset_end"])
+        )
+        pass
+    positions[~indicator_selection] = -1
+    return positions
+
+
+def organize_reference_study_table(
+    reference=None,
+    table=None,
+):
+    """
+    Organizes a table of GWAS summary statistics with the LD scores and
+    regression weights of the variants that match the reference panel, in the
+    genomic sequence of the reference.
+
+    arguments:
+        reference (dict<object>): reference panel from
+            "load_reference_ld_scores_binary"
+        table (object): Pandas data-frame table of GWAS summary statistics
+            with column "SNP"
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table with columns "CHR", "SNP", "BP",
+            "L2", and "W_L2" in addition to the columns of the source
+
+    """
+
+    # Match variants.
+    positions = match_reference_variants(
+        reference=reference,
+        identifiers=table["SNP"].to_numpy(),
+    )
+    indicator_match = (positions >= 0)
+    table = table.loc[indicator_match, :].copy(deep=True)
+    positions = positions[indicator_match]
+    # Sort in genomic sequence of reference.
+    order = numpy.argsort(positions, kind="stable")
+    positions = positions[order]
+    table = table.iloc[order, :]
+    table.reset_index(
+        level=None,
+        inplace=True,
+        drop=True,
+    )
+    # Collect values from reference.
+    table["CHR"] = reference["chromosome"][positions]
+    table["BP"] = reference["position"][positions]
+    table["L2"] = reference["ld"][positions]
+    table["W_L2"] = reference["ld_weight"][positions]
+    # Return information.
+    return table
+
+
+###############################################################################
+# End
@@ -0,0 +1,654 @@
+"""
+Supply functionality to read, validate, and filter the parameter table of
+studies, and to define batch instances from its rows.
+
+This module 'parameter_table' is part of the 'psychiatry_biomarkers' package.
+
+Author:
+
+    T. Cameron Waller, Ph.D.
+    tcameronwaller@gmail.com
+    Rochester, Minnesota 55902
+    United States of America
+
+License:
+
+    This file is part of the project package directory 'psychiatry_biomarkers'
+    (https://github.com/tcameronwaller/psychiatry_biomarkers/).
+
+    Project 'psychiatry_biomarkers' supports data analysis with team in
+    psychiatry and pharmacogenomics.
+    Copyright (C) 2024 Thomas Cameron Waller
+
+    The code within project 'psychiatry_biomarkers' is free software: you can
+    redistribute it and/or modify it under the terms of the GNU General Public
+    License as published by the Free Software Foundation, either version 3 of
+    the GNU General Public License, or (at your option) any later version.
+
+    The code within project 'psychiatry_biomarkers' is distributed in the hope
+    that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+    warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with project 'psychiatry_biomarkers'. If not, see
+    <http://www.gnu.org/licenses/>.
+"""
+
+###############################################################################
+# Notes
+
+# The parameter table of studies, such as
+# "table_gwas_translation_tcw_2023-12-30.tsv", has 21 columns in a fixed
+# sequence. Driver scripts in Bash read each row with
+# "while IFS=$' \t\n' read -r -a array" and designate fields by their
+# positions, such as "${array[19]}" for "script". As the delimiter in these
+# scripts includes spaces and collapses consecutive delimiters, an empty
+# field or a field with a space before the last column "note" shifts all
+# subsequent fields without any error. The validation here rejects these
+# cases along with columns out of sequence, nonnumeric values in numeric
+# columns, values of indicator columns other than 0 or 1, and redundant
+# names of studies.
+
+# The procedure keeps a binary copy of the parsed and validated table within
+# a cache directory under a name that includes the SHA-256 hash of the
+# file's content, so that any change to the file invalidates the copy. The
+# binary copy includes the original text of all fields, so that batch
+# instances preserve values such as "3301" exactly as the file has them.
+
+# Use the subparser "parameter" of the interface to filter the table and
+# to print batch instances for any stage.
+# python3 -m psychiatry_biomarkers.interface parameter \
+#   -path_file_table table_gwas_translation_tcw_2023-12-30.tsv \
+#   -inclusion 1 -type logistic -fields study,directory,file,script
+
+###############################################################################
+# Installation and importation
+
+# Standard
+
+import os
+import hashlib
+
+# Relevant
+
+import pandas
+pandas.options.mode.chained_assignment = None # default = "warn"
+
+# Custom
+import partner.utility as putly
+
+###############################################################################
+# Functionality
+
+
+##########
+# 1. Define schema of parameter table.
+
+
+def define_parameter_table_schema():
+    """
+    Defines the sequence and variable types of columns within the parameter
+    table of studies.
+
+    arguments:
+
+    raises:
+
+    returns:
+        (dict<str>): variable types of columns in their proper sequence
+
+    """
+
+    types_columns = dict()
+    types_columns["availability"] = "int32"
+    types_columns["inclusion"] = "int32"
+    types_columns["directory"] = "string"
+    types_columns["study"] = "string"
+    types_columns["phenotype"] = "string"
+    types_columns["sex"] = "string"
+    types_columns["file"] = "string"
+    types_columns["suffix"] = "string"
+    types_columns["bgzip"] = "int32"
+    types_columns["gzip"] = "int32"
+    types_columns["type"] = "string"
+    types_columns["fill_observations"] = "int32"
+    types_columns["observations_total"] = "float64"
+    types_columns["fill_case_control"] = "int32"
+    types_columns["cases"] = "float64"
+    types_columns["controls"] = "float64"
+    types_columns["observations_effective"] = "float64"
+    types_columns["prevalence_sample"] = "float64"
+    types_columns["prevalence_population"] = "float64"
+    types_columns["script"] = "string"
+    types_columns["note"] = "string"
+    return types_columns
+
+
+def define_missing_values():
+    """
+    Defines the designations of missing values within the parameter table.
+
+    arguments:
+
+    raises:
+
+    returns:
+        (list<str>): designations of missing values
+
+    """
+
+    return [
+        "nan", "na", "NAN", "NA", "<nan>", "<na>", "<NAN>", "<NA>",
+    ]
+
+
+##########
+# 2. Read, validate, and cache parameter table.
+
+
+def calculate_file_hash(
+    path_file=None,
+):
+    """
+    Calculates the SHA-256 hash of a file's content.
+
+    arguments:
+        path_file (str): path to file
+
+    raises:
+
+    returns:
+        (str): hexadecimal digest of hash
+
+    """
+
+    hash_file = hashlib.sha256()
+    with open(path_file, "rb") as file_source:
+        for block in iter(lambda: file_source.read(1048576), b""):
+            hash_file.update(block)
+    return hash_file.hexdigest()
+
+
+def validate_parameter_table(
+    table_text=None,
+    name_file=None,
+):
+    """
+    Validates the parameter table of studies against its schema.
+
+    arguments:
+        table_text (object): Pandas data-frame table with the original text of
+            all fields
+        name_file (str): name of file for reference in the message of errors
+
+    raises:
+        ValueError: if the table does not match its schema
+
+    returns:
+
+    """
+
+    # Copy information.
+    types_columns = define_parameter_table_schema()
+    columns = list(types_columns.keys())
+    missing = define_missing_values()
+    errors = list()
+    # Validate sequence of columns.
+    if (list(table_text.columns) != columns):
+        errors.append(str(
+            "columns do not match schema; found: " +
+            ", ".join(table_text.columns) + "; expect: " + ", ".join(columns)
+        ))
+        raise ValueError(str(
+            "invalid parameter table " + str(name_file) + ": " + errors[0]
+        ))
+    # Validate fields that driver scripts read by position.
+    for column in columns[0:-1]:
+        values = table_text[column]
+        rows_empty = values.loc[(values.str.strip() == "")].index.tolist()
+        rows_space = values.loc[
+            values.str.contains(r"\s", regex=True)
+        ].index.tolist()
+        if (len(rows_empty) > 0):
+            errors.append(str(
+                "empty field in column '" + column + "' at rows: " +
+                str([(row + 2) for row in rows_empty])
+            ))
+        if (len(rows_space) > 0):
+            errors.append(str(
+                "space within field in column '" + column + "' at rows: " +
+                str([(row + 2) for row in rows_space])
+            ))
+        pass
+    # Validate values of indicator and numeric columns.
+    for column in columns:
+        values = table_text[column]
+        if (types_columns[column] == "int32"):
+            rows_invalid = values.loc[
+                ~values.isin(["0", "1",])
+            ].index.tolist()
+            if (len(rows_invalid) > 0):
+                errors.append(str(
+                    "indicator other than 0 or 1 in column '" + column +
+                    "' at rows: " + str([(row + 2) for row in rows_invalid])
+                ))
+        elif (types_columns[column] == "float64"):
+            values_numeric = pandas.to_numeric(values, errors="coerce")
+            rows_invalid = values.loc[
+                values_numeric.isna() & ~values.isin(missing)
+            ].index.tolist()
+            if (len(rows_invalid) > 0):
+                errors.append(str(
+                    "nonnumeric value in column '" + column +
+                    "' at rows: " + str([(row + 2) for row in rows_invalid])
+                ))
+            pass
+        pass
+    # Validate uniqueness of studies.
+    studies_redundant = table_text.loc[
+        table_text["study"].duplicated(keep=False), "study"
+    ].unique().tolist()
+    if (len(studies_redundant) > 0):
+        errors.append(str(
+            "redundant names of studies: " + ", ".join(studies_redundant)
+        ))
+    # Report errors.
+    if (len(errors) > 0):
+        raise ValueError(str(
+            "invalid parameter table " + str(name_file) + ":\n" +
+            "\n".join(errors)
+        ))
+    pass
+
+
+def parse_parameter_table(
+    path_file_table=None,
+):
+    """
+    Reads, validates, and organizes the parameter table of studies from its
+    text file.
+
+    arguments:
+        path_file_table (str): path to file for parameter table of studies,
+            such as "table_gwas_translation_tcw_2023-12-30.tsv"
+
+    raises:
+        ValueError: if the table does not match its schema
+
+    returns:
+        (dict<object>): collection of information
+            table (object): Pandas data-frame table with variable types from
+                the schema
+            table_text (object): Pandas data-frame table with the original
+                text of all fields
+
+    """
+
+    # Read information from file.
+    table_text = pandas.read_csv(
+        path_file_table,
+        sep="\t",
+        header=0,
+        dtype="string",
+        keep_default_na=False,
+        na_filter=False,
+    )
+    # Validate information.
+    validate_parameter_table(
+        table_text=table_text,
+        name_file=os.path.basename(path_file_table),
+    )
+    # Organize information.
+    types_columns = define_parameter_table_schema()
+    missing = define_missing_values()
+    table = table_text.copy(deep=True)
+    for column in types_columns.keys():
+        values = table[column].mask(table[column].isin(missing))
+        if (types_columns[column] == "string"):
+            table[column] = values.astype("string")
+        else:
+            table[column] = pandas.to_numeric(values).astype(
+                types_columns[column]
+            )
+        pass
+    # Collect information.
+    pail = dict()
+    pail["table"] = table
+    pail["table_text"] = table_text
+    # Return information.
+    return pail
+
+
+def define_path_directory_cache(
+    path_directory_cache=None,
+):
+    """
+    Defines the path to the directory for binary copies of parameter tables.
+
+    arguments:
+        path_directory_cache (str): path to directory for binary copies, or
+            None for the default within the directory of the user
+
+    raises:
+
+    returns:
+        (str): path to directory
+
+    """
+
+    if (path_directory_cache is None):
+        path_directory_cache = os.path.join(
+            os.path.expanduser("~"), ".cache", "psychiatry_biomarkers",
+            "parameter_table",
+        )
+    return path_directory_cache
+
+
+def read_parameter_table_information(
+    path_file_table=None,
+    path_directory_cache=None,
+    report=None,
+):
+    """
+    Reads the parameter table of studies from a binary copy within the cache
+    if the copy matches the hash of the file's content, or otherwise reads and
+    validates the table from its text file and writes a binary copy to the
+    cache.
+
+    arguments:
+        path_file_table (str): path to file for parameter table of studies
+        path_directory_cache (str): path to directory for binary copies, or
+            None for the default
+        report (bool): whether to print reports
+
+    raises:
+        ValueError: if the table does not match its schema
+
+    returns:
+        (dict<object>): collection of information
+            table (object): Pandas data-frame table with variable types from
+                the schema
+            table_text (object): Pandas data-frame table with the original
+                text of all fields
+
+    """
+
+    # Define paths to files.
+    path_directory_cache = define_path_directory_cache(
+        path_directory_cache=path_directory_cache,
+    )
+    hash_file = calculate_file_hash(path_file=path_file_table)
+    name_file = os.path.basename(path_file_table)
+    path_file_cache = os.path.join(
+        path_directory_cache,
+        str(name_file + "." + hash_file[0:16] + ".pickle"),
+    )
+    # Read information from binary copy.
+    pail = None
+    if os.path.exists(path_file_cache):
+        try:
+            pail = pandas.read_pickle(path_file_cache)
+            source = "cache"
+        except Exception:
+            pail = None
+        pass
+    # Read information from text file.
+    if (pail is None):
+        pail = parse_parameter_table(path_file_table=path_file_table)
+        source = "file"
+        # Write binary copy to cache.
+        # Write to a temporary file first, so that simultaneous processes
+        # never read an incomplete copy.
+        try:
+            putly.create_directories(path=path_directory_cache)
+            path_file_temporary = str(
+                path_file_cache + "." + str(os.getpid()) + ".temporary"
+            )
+            pandas.to_pickle(pail, path_file_temporary)
+            os.replace(path_file_temporary, path_file_cache)
+        except OSError:
+            pass
+        pass
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=5)
+        print("parameter table: " + name_file)
+        print("source: " + source)
+        print("count of studies in parameter table: " + str(
+            pail["table"].shape[0]
+        ))
+        putly.print_terminal_partition(level=5)
+        pass
+    # Return information.
+    return pail
+
+
+def read_parameter_table(
+    path_file_table=None,
+    types_columns=None,
+    path_directory_cache=None,
+    report=None,
+):
+    """
+    Reads the parameter table of studies with validation of its schema.
+
+    Notice that Pandas does not accommodate missing values within series of
+    integer variable types.
+
+    arguments:
+        path_file_table (str): path to file for parameter table of studies,
+            such as "table_gwas_translation_tcw_2023-12-30.tsv"
+        types_columns (dict<str>): variable types of columns that differ from
+            those of the schema, or None
+        path_directory_cache (str): path to directory for binary copies, or
+            None for the default
+        report (bool): whether to print reports
+
+    raises:
+        ValueError: if the table does not match its schema
+
+    returns:
+        (object): Pandas data-frame table
+
+    """
+
+    # Read information.
+    pail = read_parameter_table_information(
+        path_file_table=path_file_table,
+        path_directory_cache=path_directory_cache,
+        report=report,
+    )
+    table = pail["table"].copy(deep=True)
+    # Organize information.
+    if (types_columns is not None):
+        table = table.astype(types_columns)
+    # Return information.
+    return table
+
+
+##########
+# 3. Filter parameter table and define batch instances.
+
+
+def filter_parameter_table(
+    table=None,
+    availability=None,
+    inclusion=None,
+    types=None,
+    matches=None,
+):
+    """
+    Filters rows of the parameter table of studies.
+
+    arguments:
+        table (object): Pandas data-frame table of parameters
+        availability (int): value of column "availability" to keep, or None
+        inclusion (int): value of column "inclusion" to keep, or None
+        types (list<str>): values of column "type" to keep, or None
+        matches (list<str>): criteria in the format "column=value" that each
+            row must match, with values separated by commas to match any of
+            several values, such as "sex=female,male" or
+            "study=32581359_saevarsdottir_2020_thyroid_autoimmunity"
+
+    raises:
+        ValueError: if a criterion does not designate a column of the table
+
+    returns:
+        (object): Pandas data-frame table of parameters
+
+    """
+
+    # Copy information.
+    table = table.copy(deep=True)
+    # Filter rows.
+    if (availability is not None):
+        table = table.loc[(table["availability"] == int(availability)), :]
+    if (inclusion is not None):
+        table = table.loc[(table["inclusion"] == int(inclusion)), :]
+    if (types is not None) and (len(types) > 0):
+        table = table.loc[table["type"].isin(types), :]
+    if (matches is not None):
+        for match in matches:
+            column, separator, text_values = match.partition("=")
+            column = column.strip()
+            if (len(separator) == 0) or (column not in table.columns):
+                raise ValueError(str(
+                    "invalid criterion for parameter table: " + match
+                ))
+            values = [value.strip() for value in text_values.split(",")]
+            table = table.loc[
+                table[column].astype("string").isin(values).fillna(False), :
+            ]
+            pass
+        pass
+    # Return information.
+    return table
+
+
+def define_batch_instance_lines(
+    table=None,
+    table_text=None,
+    fields=None,
+    delimiter=None,
+):
+    """
+    Defines batch instances from rows of the parameter table of studies, one
+    instance per row with its fields in a designated sequence.
+
+    arguments:
+        table (object): Pandas data-frame table of parameters after filters
+        table_text (object): Pandas data-frame table with the original text of
+            all fields of the parameter table
+        fields (list<str>): names of columns for fields of each instance in
+            their proper sequence, or None for all columns
+        delimiter (str): delimiter between fields within each instance
+
+    raises:
+        ValueError: if a field does not designate a column of the table
+
+    returns:
+        (list<str>): batch instances
+
+    """
+
+    # Organize information.
+    if (fields is None) or (len(fields) == 0):
+        fields = list(table_text.columns)
+    fields_invalid = list(filter(
+        lambda field: (field not in table_text.columns), fields
+    ))
+    if (len(fields_invalid) > 0):
+        raise ValueError(str(
+            "invalid fields for batch instances: " + ", ".join(fields_invalid)
+        ))
+    table_fields = table_text.loc[table.index, fields]
+    # Define batch instances.
+    instances = list()
+    for row in table_fields.itertuples(index=False, name=None):
+        instances.append(delimiter.join([str(value) for value in row]))
+    # Return information.
+    return instances
+
+
+def control_write_batch_instances(
+    path_file_table=None,
+    availability=None,
+    inclusion=None,
+    types=None,
+    matches=None,
+    fields=None,
+    delimiter=None,
+    path_file_product=None,
+    path_directory_cache=None,
+    report=None,
+):
+    """
+    Control procedure to read the parameter table of studies, to filter its
+    rows, and to write batch instances to file or to print them.
+
+    arguments:
+        path_file_table (str): path to file for parameter table of studies
+        availability (int): value of column "availability" to keep, or None
+        inclusion (int): value of column "inclusion" to keep, or None
+        types (list<str>): values of column "type" to keep, or None
+        matches (list<str>): criteria in the format "column=value"
+        fields (list<str>): names of columns for fields of each instance, or
+            None for all columns
+        delimiter (str): delimiter between fields within each instance
+        path_file_product (str): path to file for batch instances, or None to
+            print batch instances to standard output
+        path_directory_cache (str): path to directory for binary copies, or
+            None for the default
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (list<str>): batch instances
+
+    """
+
+    # Read information.
+    pail = read_parameter_table_information(
+        path_file_table=path_file_table,
+        path_directory_cache=path_directory_cache,
+        report=report,
+    )
+    # Filter rows.
+    table = filter_parameter_table(
+        table=pail["table"],
+        availability=availability,
+        inclusion=inclusion,
+        types=types,
+        matches=matches,
+    )
+    # Define batch instances.
+    instances = define_batch_instance_lines(
+        table=table,
+        table_text=pail["table_text"],
+        fields=fields,
+        delimiter=delimiter,
+    )
+    # Write product information to file.
+    if (path_file_product is not None):
+        with open(path_file_product, "w") as file_product:
+            for instance in instances:
+                file_product.write(str(instance + "\n"))
+        pass
+    else:
+        for instance in instances:
+            print(instance)
+        pass
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=5)
+        print("count of batch instances: " + str(len(instances)))
+        putly.print_terminal_partition(level=5)
+        pass
+    # Return information.
+    return instances
+
+
+###############################################################################
+# End
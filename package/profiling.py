@@ -0,0 +1,780 @@
+"""
+Supply functionality to record the time, memory, and counts of rows of
+procedures within a trace for profiles of performance.
+
+This module 'profiling' is part of the 'psychiatry_biomarkers' package.
+
+Author:
+
+    T. Cameron Waller, Ph.D.
+    tcameronwaller@gmail.com
+    Rochester, Minnesota 55902
+    United States of America
+
+License:
+
+    This file is part of the project package directory 'psychiatry_biomarkers'
+    (https://github.com/tcameronwaller/psychiatry_biomarkers/).
+
+    Project 'psychiatry_biomarkers' supports data analysis with team in
+    psychiatry and pharmacogenomics.
+    Copyright (C) 2024 Thomas Cameron Waller
+
+    The code within project 'psychiatry_biomarkers' is free software: you can
+    redistribute it and/or modify it under the terms of the GNU General Public
+    License as published by the Free Software Foundation, either version 3 of
+    the GNU General Public License, or (at your option) any later version.
+
+    The code within project 'psychiatry_biomarkers' is distributed in the hope
+    that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+    warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with project 'psychiatry_biomarkers'. If not, see
+    <http://www.gnu.org/licenses/>.
+"""
+
+###############################################################################
+# Notes
+
+# A trace is a file in the format of JSON lines with one record for each
+# span of execution of a procedure. Each record has the following entries.
+# name: name of procedure or span
+# category: category of span, such as "control", "stage", "read", or "write"
+# process: identifier of process
+# thread: identifier of thread
+# span: identifier of span, unique within the trace
+# parent: identifier of enclosing span within the same thread, or None
+# depth: count of enclosing spans within the same thread
+# time_start: time at start in seconds since the epoch
+# seconds_wall: duration in seconds of wall time
+# seconds_cpu: duration in seconds of processing time of the process
+# memory_peak: peak resident memory of the process in bytes at the end
+# memory_peak_increase: increase of peak resident memory during the span
+# rows_in: count of rows of Pandas data-frame tables in arguments, or None
+# rows_out: count of rows of Pandas data-frame tables in return, or None
+# status: "complete" or "error"
+# arguments: small collection of labels, such as the study or stage
+
+# Profiles are on when the environment variable
+# "PSYCHIATRY_BIOMARKERS_TRACE" designates the path to the file of the trace,
+# either from the argument "-path_file_trace" of the interface or from the
+# environment directly. Child processes from "prall.drive_procedure_parallel"
+# inherit the variable, and all processes append to the same file. When the
+# variable is absent, the decorator and the context manager only check the
+# variable before they call the procedure, without any measurement.
+
+# Peak resident memory is the maximum across the lifetime of the process, so
+# an increase within a span designates new peak memory due to that span or
+# to concurrent threads.
+
+# Processing time includes all threads of the process.
+
+# Function "control_export_chrome_trace" writes the spans of a trace in the
+# Trace Event Format of Chrome for a timeline with a row for each thread of
+# each process, in which spans nest within their enclosing spans, such as
+# reads, transformations, and writes within the span of each instance. The
+# timeline shows how parallel instances overlap and which instances lag.
+
+# Example.
+# python3 -m psychiatry_biomarkers.interface main \
+#   -path_directory_dock ${path_directory_dock} -gwas_pipeline \
+#   -path_file_trace ${path_directory_dock}/trace_pipeline.jsonl
+# python3 -m psychiatry_biomarkers.interface trace \
+#   -path_file_trace ${path_directory_dock}/trace_pipeline.jsonl \
+#   -path_directory_product ${path_directory_dock}/trace_pipeline
+# The product directory then has "table_trace_summary.tsv" and
+# "trace_timeline.json".
+
+###############################################################################
+# Installation and importation
+
+# Standard
+
+import os
+import sys
+import time
+import json
+import resource
+import threading
+import itertools
+import functools
+import contextlib
+
+# Relevant
+
+import pandas
+pandas.options.mode.chained_assignment = None # default = "warn"
+
+# Custom
+import partner.utility as putly
+
+###############################################################################
+# Functionality
+
+
+##########
+# 1. Enable and disable profiles.
+
+
+def define_trace_variable():
+    """
+    Defines the name of the environment variable that designates the path to
+    the file of the trace.
+
+    arguments:
+
+    raises:
+
+    returns:
+        (str): name of environment variable
+
+    """
+
+    return "PSYCHIATRY_BIOMARKERS_TRACE"
+
+
+def enable_profiling(
+    path_file_trace=None,
+):
+    """
+    Enables profiles for the current process and for its child processes.
+
+    arguments:
+        path_file_trace (str): path to file of trace
+
+    raises:
+
+    returns:
+
+    """
+
+    path_file_trace = os.path.abspath(path_file_trace)
+    putly.create_directories(path=os.path.dirname(path_file_trace))
+    os.environ[define_trace_variable()] = path_file_trace
+    pass
+
+
+def disable_profiling():
+    """
+    Disables profiles for the current process and for its subsequent child
+    processes.
+
+    arguments:
+
+    raises:
+
+    returns:
+
+    """
+
+    os.environ.pop(define_trace_variable(), None)
+    pass
+
+
+##########
+# 2. Record spans.
+
+
+# Identifiers and stacks of spans within each thread.
+counter_spans = itertools.count()
+local_spans = threading.local()
+# Times of spans come from a monotonic counter relative to a single anchor in
+# wall time, so that nested spans within a process nest exactly in time.
+anchor_time = time.time()
+anchor_counter = time.perf_counter()
+
+
+def count_table_rows(
+    value=None,
+):
+    """
+    Counts the rows of Pandas data-frame tables within a value, within the
+    values of a dictionary, or within the elements of a list.
+
+    arguments:
+        value (object): value
+
+    raises:
+
+    returns:
+        (int): count of rows, or None if there are not any tables
+
+    """
+
+    if isinstance(value, pandas.DataFrame):
+        return int(value.shape[0])
+    elif isinstance(value, dict):
+        values = list(value.values())
+    elif isinstance(value, (list, tuple,)):
+        values = list(value)
+    else:
+        return None
+    counts = [
+        int(element.shape[0]) for element in values
+        if isinstance(element, pandas.DataFrame)
+    ]
+    return (sum(counts) if (len(counts) > 0) else None)
+
+
+def measure_memory_peak():
+    """
+    Measures the peak resident memory of the current process.
+
+    arguments:
+
+    raises:
+
+    returns:
+        (int): peak resident memory in bytes
+
+    """
+
+    memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes and macOS reports bytes.
+    if (sys.platform == "darwin"):
+        return int(memory)
+    else:
+        return int(memory * 1024)
+
+
+def begin_trace_span(
+    name=None,
+    category=None,
+    rows_in=None,
+    arguments=None,
+):
+    """
+    Begins the record of a span within the trace.
+
+    arguments:
+        name (str): name of procedure or span
+        category (str): category of span
+        rows_in (int): count of rows in, or None
+        arguments (dict): small collection of labels, or None
+
+    raises:
+
+    returns:
+        (dict): record of span
+
+    """
+
+    stack = getattr(local_spans, "stack", None)
+    if (stack is None):
+        stack = list()
+        local_spans.stack = stack
+    record = dict()
+    record["name"] = name
+    record["category"] = category
+    record["process"] = os.getpid()
+    record["thread"] = threading.get_ident()
+    record["span"] = str(
+        str(os.getpid()) + "_" + str(next(counter_spans))
+    )
+    record["parent"] = (stack[-1]["span"] if (len(stack) > 0) else None)
+    record["depth"] = len(stack)
+    counter_start = time.perf_counter()
+    record["time_start"] = (anchor_time + (counter_start - anchor_counter))
+    record["rows_in"] = rows_in
+    record["rows_out"] = None
+    record["status"] = "complete"
+    record["arguments"] = arguments
+    record["memory_peak_start"] = measure_memory_peak()
+    record["counter_start"] = counter_start
+    record["cpu_start"] = time.process_time()
+    stack.append(record)
+    return record
+
+
+def end_trace_span(
+    record=None,
+    path_file_trace=None,
+):
+    """
+    Ends the record of a span and appends it to the file of the trace.
+
+    arguments:
+        record (dict): record of span from function "begin_trace_span"
+        path_file_trace (str): path to file of trace
+
+    raises:
+
+    returns:
+
+    """
+
+    seconds_wall = (time.perf_counter() - record.pop("counter_start"))
+    seconds_cpu = (time.process_time() - record.pop("cpu_start"))
+    memory_peak_start = record.pop("memory_peak_start")
+    memory_peak = measure_memory_peak()
+    stack = local_spans.stack
+    if (len(stack) > 0) and (stack[-1] is record):
+        stack.pop()
+    record["seconds_wall"] = seconds_wall
+    record["seconds_cpu"] = seconds_cpu
+    record["memory_peak"] = memory_peak
+    record["memory_peak_increase"] = (memory_peak - memory_peak_start)
+    # Write a single line with a single call in mode to append, so that
+    # lines from concurrent processes do not interleave.
+    line = str(json.dumps(record, default=str) + "\n")
+    with open(path_file_trace, "a") as file_trace:
+        file_trace.write(line)
+    pass
+
+
+@contextlib.contextmanager
+def profile_span(
+    name=None,
+    category=None,
+    rows_in=None,
+    arguments=None,
+):
+    """
+    Context manager to record a span within the trace when profiles are on.
+
+    Set the entry "rows_out" of the record to count rows out of the span.
+
+    arguments:
+        name (str): name of span
+        category (str): category of span
+        rows_in (int): count of rows in, or None
+        arguments (dict): small collection of labels, or None
+
+    raises:
+
+    returns:
+        (dict): record of span, or an empty dictionary if profiles are off
+
+    """
+
+    path_file_trace = os.environ.get(define_trace_variable())
+    if (path_file_trace is None):
+        yield dict()
+        return
+    record = begin_trace_span(
+        name=name,
+        category=category,
+        rows_in=rows_in,
+        arguments=arguments,
+    )
+    try:
+        yield record
+    except BaseException:
+        record["status"] = "error"
+        raise
+    finally:
+        end_trace_span(record=record, path_file_trace=path_file_trace)
+    pass
+
+
+def profile_procedure(
+    name=None,
+    category=None,
+    keys_arguments=None,
+):
+    """
+    Defines a decorator to record each call of a procedure as a span within
+    the trace when profiles are on.
+
+    The span counts rows of Pandas data-frame tables within the arguments and
+    within the return of the procedure. For control procedures with
+    arguments "instance" and "parameters", the span also counts rows of
+    tables within these dictionaries.
+
+    arguments:
+        name (str): name of span, or None for the module and name of the
+            procedure
+        category (str): category of span
+        keys_arguments (list<str>): keys of entries from the argument
+            "instance" to keep as labels of the span, such as "study"
+
+    raises:
+
+    returns:
+        (object): decorator
+
+    """
+
+    def decorate(function):
+        label = name
+        if (label is None):
+            label = str(function.__module__ + "." + function.__qualname__)
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            path_file_trace = os.environ.get(define_trace_variable())
+            if (path_file_trace is None):
+                return function(*args, **kwargs)
+            counts = list(filter(
+                lambda count: (count is not None),
+                map(
+                    count_table_rows,
+                    itertools.chain(args, kwargs.values()),
+                ),
+            ))
+            labels = None
+            # Procedures in parallel receive "instance" as the first
+            # positional argument.
+            instance = kwargs.get(
+                "instance", (args[0] if (len(args) > 0) else None),
+            )
+            if (keys_arguments is not None) and isinstance(instance, dict):
+                labels = dict(map(
+                    lambda key: (key, instance.get(key, None)),
+                    keys_arguments,
+                ))
+            record = begin_trace_span(
+                name=label,
+                category=category,
+                rows_in=(sum(counts) if (len(counts) > 0) else None),
+                arguments=labels,
+            )
+            try:
+                value = function(*args, **kwargs)
+                record["rows_out"] = count_table_rows(value)
+                return value
+            except BaseException:
+                record["status"] = "error"
+                raise
+            finally:
+                end_trace_span(record=record, path_file_trace=path_file_trace)
+        return wrapper
+    return decorate
+
+
+def profile_iterator(
+    iterator=None,
+    name=None,
+    category=None,
+    arguments=None,
+):
+    """
+    Records each step of an iterator, such as a reader of chunks of a table,
+    as a span within the trace when profiles are on.
+
+    arguments:
+        iterator (object): iterator
+        name (str): name of spans
+        category (str): category of spans
+        arguments (dict): small collection of labels, or None
+
+    raises:
+
+    returns:
+        (object): iterator
+
+    """
+
+    iterator = iter(iterator)
+    if (os.environ.get(define_trace_variable()) is None):
+        yield from iterator
+        return
+    while True:
+        with profile_span(
+            name=name,
+            category=category,
+            arguments=arguments,
+        ) as span:
+            try:
+                value = next(iterator)
+            except StopIteration:
+                span["rows_out"] = 0
+                break
+            span["rows_out"] = count_table_rows(value)
+        yield value
+    pass
+
+
+##########
+# 3. Read and summarize trace.
+
+
+def read_trace_records(
+    path_file_trace=None,
+):
+    """
+    Reads the records of spans from the file of a trace.
+
+    arguments:
+        path_file_trace (str): path to file of trace
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table of spans
+
+    """
+
+    records = list()
+    with open(path_file_trace, "r") as file_trace:
+        for line in file_trace:
+            line = line.strip()
+            if (len(line) > 0):
+                records.append(json.loads(line))
+        pass
+    table = pandas.DataFrame(data=records)
+    if (table.shape[0] > 0):
+        table.sort_values(
+            by=["time_start",],
+            axis="index",
+            ascending=True,
+            kind="mergesort",
+            inplace=True,
+        )
+        table.reset_index(drop=True, inplace=True)
+    return table
+
+
+def summarize_trace_records(
+    table=None,
+):
+    """
+    Summarizes time, memory, and counts of rows for each name of span within
+    a trace.
+
+    arguments:
+        table (object): Pandas data-frame table of spans
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table of summaries in order of decreasing
+            total wall time
+
+    """
+
+    if (table.shape[0] == 0):
+        return pandas.DataFrame(columns=[
+            "name", "category", "spans", "errors", "seconds_wall_total",
+            "seconds_wall_mean", "seconds_wall_maximum", "seconds_cpu_total",
+            "memory_peak_maximum", "memory_peak_increase_maximum",
+            "rows_in_total", "rows_out_total", "proportion_cpu",
+            "rows_per_second",
+        ])
+    table = table.copy(deep=True)
+    for column in ["rows_in", "rows_out",]:
+        table[column] = pandas.to_numeric(table[column], errors="coerce")
+    table_summary = table.groupby(
+        ["name", "category",], dropna=False, sort=False,
+    ).agg(
+        spans=("span", "size"),
+        errors=("status", lambda values: int((values == "error").sum())),
+        seconds_wall_total=("seconds_wall", "sum"),
+        seconds_wall_mean=("seconds_wall", "mean"),
+        seconds_wall_maximum=("seconds_wall", "max"),
+        seconds_cpu_total=("seconds_cpu", "sum"),
+        memory_peak_maximum=("memory_peak", "max"),
+        memory_peak_increase_maximum=("memory_peak_increase", "max"),
+        rows_in_total=("rows_in", lambda values: values.sum(min_count=1)),
+        rows_out_total=("rows_out", lambda values: values.sum(min_count=1)),
+    ).reset_index()
+    table_summary["proportion_cpu"] = (
+        table_summary["seconds_cpu_total"] /
+        table_summary["seconds_wall_total"].where(
+            table_summary["seconds_wall_total"] > 0
+        )
+    )
+    table_summary["rows_per_second"] = (
+        table_summary["rows_in_total"] /
+        table_summary["seconds_wall_total"].where(
+            table_summary["seconds_wall_total"] > 0
+        )
+    )
+    table_summary.sort_values(
+        by=["seconds_wall_total",],
+        axis="index",
+        ascending=False,
+        inplace=True,
+    )
+    table_summary.reset_index(drop=True, inplace=True)
+    return table_summary
+
+
+def control_summarize_trace(
+    path_file_trace=None,
+    path_directory_product=None,
+    report=None,
+):
+    """
+    Control procedure to read a trace, to summarize its spans, and to write
+    the summary to file.
+
+    arguments:
+        path_file_trace (str): path to file of trace
+        path_directory_product (str): path to directory for product files
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table of summaries
+
+    """
+
+    # Read and summarize information.
+    table = read_trace_records(path_file_trace=path_file_trace)
+    table_summary = summarize_trace_records(table=table)
+    # Write product information to file.
+    putly.create_directories(path=path_directory_product)
+    putly.write_tables_to_file(
+        pail_write={"table_trace_summary": table_summary,},
+        path_directory=path_directory_product,
+        reset_index_rows=False,
+        write_index_rows=False,
+        write_index_columns=True,
+        type="text",
+        delimiter="\t",
+        suffix=".tsv",
+    )
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=4)
+        print("count of spans: " + str(table.shape[0]))
+        if (table.shape[0] > 0):
+            print("count of processes: " + str(table["process"].nunique()))
+        for row in table_summary.head(10).itertuples(index=False):
+            print(str(
+                str(row.name) + ": " + str(row.spans) + " spans; " +
+                str(round(row.seconds_wall_total, 3)) + " seconds wall; " +
+                str(round(row.seconds_cpu_total, 3)) + " seconds cpu"
+            ))
+        putly.print_terminal_partition(level=4)
+        pass
+    # Return information.
+    return table_summary
+
+
+##########
+# 4. Export trace as timeline.
+
+
+def organize_chrome_trace_events(
+    table=None,
+):
+    """
+    Organizes spans of a trace as events in the Trace Event Format of Chrome,
+    which "chrome://tracing" and "https://ui.perfetto.dev" display offline as
+    a timeline with a row for each thread of each process and with nested
+    spans in stacks.
+
+    arguments:
+        table (object): Pandas data-frame table of spans
+
+    raises:
+
+    returns:
+        (dict<list>): collection of events for format in JSON
+
+    """
+
+    events = list()
+    if (table.shape[0] == 0):
+        return {"traceEvents": events, "displayTimeUnit": "ms",}
+    time_origin = float(table["time_start"].min())
+    # Designate processes and threads in order of first appearance.
+    processes = list(pandas.unique(table["process"]))
+    process_first = processes[0]
+    threads = dict()
+    for row in table.itertuples(index=False):
+        threads.setdefault(row.process, list())
+        if (row.thread not in threads[row.process]):
+            threads[row.process].append(row.thread)
+        pass
+    for index_process, process in enumerate(processes):
+        label = (
+            "main" if (process == process_first) else
+            str("worker " + str(index_process))
+        )
+        events.append({
+            "name": "process_name", "ph": "M", "pid": int(process),
+            "args": {"name": str(label + " (pid " + str(process) + ")"),},
+        })
+        events.append({
+            "name": "process_sort_index", "ph": "M", "pid": int(process),
+            "args": {"sort_index": index_process,},
+        })
+        for index_thread, thread in enumerate(threads[process]):
+            events.append({
+                "name": "thread_name", "ph": "M", "pid": int(process),
+                "tid": index_thread,
+                "args": {"name": str("thread " + str(index_thread)),},
+            })
+        pass
+    # Organize spans as complete events.
+    # Entries other than those of the event itself become its arguments.
+    columns_event = [
+        "name", "category", "process", "thread", "span", "parent", "depth",
+        "time_start", "seconds_wall", "arguments",
+    ]
+    for row in table.itertuples(index=False):
+        arguments = dict()
+        if isinstance(row.arguments, dict):
+            arguments.update(row.arguments)
+        for name in filter(
+            lambda column: (column not in columns_event), table.columns,
+        ):
+            value = getattr(row, name)
+            if isinstance(value, float) and (value != value):
+                value = None
+            elif isinstance(value, float) and value.is_integer():
+                value = int(value)
+            if (value is not None):
+                arguments[name] = value
+            pass
+        events.append({
+            "name": str(row.name),
+            "cat": str(row.category),
+            "ph": "X",
+            "ts": round((row.time_start - time_origin) * 1e6, 3),
+            "dur": round(row.seconds_wall * 1e6, 3),
+            "pid": int(row.process),
+            "tid": threads[row.process].index(row.thread),
+            "args": arguments,
+        })
+        pass
+    return {"traceEvents": events, "displayTimeUnit": "ms",}
+
+
+def control_export_chrome_trace(
+    path_file_trace=None,
+    path_file_product=None,
+    report=None,
+):
+    """
+    Control procedure to read a trace and to write its spans to file in the
+    Trace Event Format of Chrome.
+
+    arguments:
+        path_file_trace (str): path to file of trace
+        path_file_product (str): path to product file (".json")
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+
+    """
+
+    # Read and organize information.
+    table = read_trace_records(path_file_trace=path_file_trace)
+    trace = organize_chrome_trace_events(table=table)
+    # Write product information to file.
+    putly.create_directories(path=os.path.dirname(
+        os.path.abspath(path_file_product)
+    ))
+    with open(path_file_product, "w") as file_product:
+        json.dump(trace, file_product, default=str)
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=4)
+        print("count of events: " + str(len(trace["traceEvents"])))
+        print("timeline: " + str(path_file_product))
+        print("view in chrome://tracing or https://ui.perfetto.dev")
+        putly.print_terminal_partition(level=4)
+        pass
+    pass
+
+
+###############################################################################
+# End
@@ -0,0 +1,324 @@
+"""
+Supply functionality to report structured summaries of tables and durations
+of procedures at a configurable level of verbosity.
+
+This module 'reporting' is part of the 'psychiatry_biomarkers' package.
+
+Author:
+
+    T. Cameron Waller, Ph.D.
+    tcameronwaller@gmail.com
+    Rochester, Minnesota 55902
+    United States of America
+
+License:
+
+    This file is part of the project package directory 'psychiatry_biomarkers'
+    (https://github.com/tcameronwaller/psychiatry_biomarkers/).
+
+    Project 'psychiatry_biomarkers' supports data analysis with team in
+    psychiatry and pharmacogenomics.
+    Copyright (C) 2024 Thomas Cameron Waller
+
+    The code within project 'psychiatry_biomarkers' is free software: you can
+    redistribute it and/or modify it under the terms of the GNU General Public
+    License as published by the Free Software Foundation, either version 3 of
+    the GNU General Public License, or (at your option) any later version.
+
+    The code within project 'psychiatry_biomarkers' is distributed in the hope
+    that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+    warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with project 'psychiatry_biomarkers'. If not, see
+    <http://www.gnu.org/licenses/>.
+"""
+
+###############################################################################
+# Notes
+
+# Reports of tables are single lines of labels and values, such as the
+# following.
+# table: table_rg | rows: 1520 | columns: 14 | memory_mb: 0.17
+# Reports never format the full table for the terminal, which takes
+# measurable seconds on large tables and floods the logs of batch jobs.
+
+# Levels of verbosity.
+# 0: silent
+# 1: counts of rows and columns, approximate memory, and durations (default)
+# 2: level 1 and names and types of columns
+# 3: level 2 and the first few rows of the table
+# The environment variable "PSYCHIATRY_BIOMARKERS_VERBOSITY" designates the
+# level of verbosity, either from the argument "-verbosity" of the interface
+# or from the environment directly, and child processes inherit the variable.
+# Reports only occur when the argument "report" of the calling procedure is
+# true, and when it is false, the functions return before they read the
+# environment or inspect the table.
+
+# Example.
+# python3 -m psychiatry_biomarkers.interface main \
+#   -path_directory_dock ${path_directory_dock} \
+#   -rg_thyroid_organization -verbosity 2
+
+###############################################################################
+# Installation and importation
+
+# Standard
+
+import os
+import sys
+import time
+import contextlib
+
+# Relevant
+
+import pandas
+pandas.options.mode.chained_assignment = None # default = "warn"
+
+# Custom
+
+###############################################################################
+# Functionality
+
+
+##########
+# 1. Determine level of verbosity.
+
+
+def define_verbosity_variable():
+    """
+    Defines the name of the environment variable that designates the level of
+    verbosity for reports.
+
+    arguments:
+
+    raises:
+
+    returns:
+        (str): name of environment variable
+
+    """
+
+    return "PSYCHIATRY_BIOMARKERS_VERBOSITY"
+
+
+def set_verbosity(
+    verbosity=None,
+):
+    """
+    Sets the level of verbosity for the current process and for its child
+    processes.
+
+    arguments:
+        verbosity (int): level of verbosity from 0 to 3
+
+    raises:
+        ValueError: if the level of verbosity is not from 0 to 3
+
+    returns:
+
+    """
+
+    verbosity = int(verbosity)
+    if (verbosity < 0) or (verbosity > 3):
+        raise ValueError(str(
+            "Level of verbosity must be from 0 to 3: " + str(verbosity)
+        ))
+    os.environ[define_verbosity_variable()] = str(verbosity)
+    pass
+
+
+def determine_verbosity(
+    report=None,
+):
+    """
+    Determines the level of verbosity for reports.
+
+    arguments:
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (int): level of verbosity from 0 to 3
+
+    """
+
+    if not report:
+        return 0
+    value = os.environ.get(define_verbosity_variable(), "")
+    try:
+        verbosity = int(value)
+    except ValueError:
+        verbosity = 1
+    return max(0, min(3, verbosity))
+
+
+##########
+# 2. Report tables, messages, and durations.
+
+
+def write_report_line(
+    line=None,
+):
+    """
+    Writes a single line of report to standard output.
+
+    arguments:
+        line (str): line of report
+
+    raises:
+
+    returns:
+
+    """
+
+    sys.stdout.write(str(line + "\n"))
+    sys.stdout.flush()
+    pass
+
+
+def describe_table(
+    table=None,
+    name=None,
+    verbosity=None,
+):
+    """
+    Describes a table in lines of labels and values without formatting the
+    values of the full table.
+
+    arguments:
+        table (object): Pandas data-frame table
+        name (str): name of table
+        verbosity (int): level of verbosity from 1 to 3
+
+    raises:
+
+    returns:
+        (list<str>): lines of description
+
+    """
+
+    # Memory without inspection of objects, which would be slow for columns
+    # of text.
+    memory = table.memory_usage(index=True, deep=False).sum()
+    lines = list()
+    lines.append(str(
+        "table: " + str(name) +
+        " | rows: " + str(table.shape[0]) +
+        " | columns: " + str(table.shape[1]) +
+        " | memory_mb: " + str(round(float(memory) / 1048576, 2))
+    ))
+    if (verbosity >= 2):
+        if isinstance(table.index, pandas.MultiIndex):
+            names_index = [str(level) for level in table.index.names]
+        else:
+            names_index = [str(table.index.name)]
+        lines.append(str(
+            "  index: " + ", ".join(names_index)
+        ))
+        for label, type_column in table.dtypes.items():
+            lines.append(str("  column: " + str(label) + " | " + str(
+                type_column
+            )))
+    if (verbosity >= 3):
+        lines.append("  head:")
+        lines.append(table.head(n=5).to_string(max_cols=20))
+    return lines
+
+
+def report_table(
+    table=None,
+    name=None,
+    report=None,
+):
+    """
+    Reports a structured summary of a table.
+
+    arguments:
+        table (object): Pandas data-frame table
+        name (str): name of table
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+
+    """
+
+    if not report:
+        return
+    verbosity = determine_verbosity(report=report)
+    if (verbosity < 1):
+        return
+    for line in describe_table(
+        table=table,
+        name=name,
+        verbosity=verbosity,
+    ):
+        write_report_line(line=line)
+    pass
+
+
+def report_message(
+    message=None,
+    report=None,
+    level=None,
+):
+    """
+    Reports a message at a level of verbosity.
+
+    arguments:
+        message (str): message
+        report (bool): whether to print reports
+        level (int): minimal level of verbosity from 1 to 3 for the message
+
+    raises:
+
+    returns:
+
+    """
+
+    if not report:
+        return
+    if (determine_verbosity(report=report) < (level or 1)):
+        return
+    write_report_line(line=str(message))
+    pass
+
+
+@contextlib.contextmanager
+def report_duration(
+    name=None,
+    report=None,
+):
+    """
+    Reports the duration in wall time of a block of code.
+
+    arguments:
+        name (str): name of block of code
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+
+    """
+
+    if (not report) or (determine_verbosity(report=report) < 1):
+        yield
+        return
+    time_start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = (time.perf_counter() - time_start)
+        write_report_line(line=str(
+            "duration: " + str(name) + " | seconds: " + str(round(seconds, 3))
+        ))
+    pass
+
+
+###############################################################################
+# End
@@ -0,0 +1,602 @@
+"""
+Supply functionality to copy files of GWAS summary statistics to a storage
+area that addresses each file by the hash of its content.
+
+This module 'storage' is part of the 'psychiatry_biomarkers' package.
+
+Author:
+
+    T. Cameron Waller, Ph.D.
+    tcameronwaller@gmail.com
+    Rochester, Minnesota 55902
+    United States of America
+
+License:
+
+    This file is part of the project package directory 'psychiatry_biomarkers'
+    (https://github.com/tcameronwaller/psychiatry_biomarkers/).
+
+    Project 'psychiatry_biomarkers' supports data analysis with team in
+    psychiatry and pharmacogenomics.
+    Copyright (C) 2024 Thomas Cameron Waller
+
+    The code within project 'psychiatry_biomarkers' is free software: you can
+    redistribute it and/or modify it under the terms of the GNU General Public
+    License as published by the Free Software Foundation, either version 3 of
+    the GNU General Public License, or (at your option) any later version.
+
+    The code within project 'psychiatry_biomarkers' is distributed in the hope
+    that it will be useful, but WITHOUT ANY WARRANTY; without even the implied
+    warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with project 'psychiatry_biomarkers'. If not, see
+    <http://www.gnu.org/licenses/>.
+"""
+
+###############################################################################
+# Notes
+
+# Driver scripts such as "9_copy_gwas_to_storage.sh" copy a whole directory
+# of a preparation batch to the storage area on every execution. This module
+# instead keeps a single copy of each distinct content of file within the
+# storage area and a manifest for each collection of files.
+
+# Organization of the storage area.
+# objects/<first two characters of hash>/<hash>: content of file with the
+#   SHA-256 hash of its content as its name, with permission to read only
+# manifests/<identifier>.tsv: one row for each file with its relative path,
+#   size, time of modification, absolute path of source, and hash
+
+# The procedure to store a directory skips any file with content that
+# already exists within the storage area, and it reuses the hash from a
+# previous manifest for any source file with the same path, size, and time of
+# modification. Each transfer writes a temporary file, calculates the hash of
+# the copy, and only then renames the copy to its final name, so that an
+# object always matches its name. A pool of threads with a bounded count of
+# workers calculates hashes and transfers files concurrently.
+
+# The procedure to restore a collection creates its directory tree from the
+# manifest with hard links to the objects, or with copies where the product
+# directory is on another file system.
+
+# Example.
+# python3 -m psychiatry_biomarkers.interface storage -action store \
+#   -path_directory_source ${path_directory_dock}/gwas_preparation_2023-12-30 \
+#   -path_directory_storage ${path_directory_gwas_summaries}/storage \
+#   -identifier gwas_preparation_2023-12-30 -workers 4
+
+###############################################################################
+# Installation and importation
+
+# Standard
+
+import os
+import shutil
+import threading
+import concurrent.futures
+
+# Relevant
+
+import pandas
+pandas.options.mode.chained_assignment = None # default = "warn"
+
+# Custom
+import partner.utility as putly
+import psychiatry_biomarkers.parameter_table as pbpar
+
+###############################################################################
+# Functionality
+
+
+##########
+# 1. Organize manifests and objects.
+
+
+def define_path_file_object(
+    path_directory_storage=None,
+    hash_file=None,
+):
+    """
+    Defines the path to the object for a content of file within the storage
+    area.
+
+    arguments:
+        path_directory_storage (str): path to directory of storage area
+        hash_file (str): hexadecimal digest of SHA-256 hash of content
+
+    raises:
+
+    returns:
+        (str): path to file
+
+    """
+
+    return os.path.join(
+        path_directory_storage, "objects", hash_file[0:2], hash_file,
+    )
+
+
+def read_storage_manifest(
+    path_directory_storage=None,
+    identifier=None,
+):
+    """
+    Reads the manifest of a collection of files from the storage area.
+
+    arguments:
+        path_directory_storage (str): path to directory of storage area
+        identifier (str): identifier of collection of files
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table of manifest
+
+    """
+
+    table = pandas.read_csv(
+        os.path.join(
+            path_directory_storage, "manifests", str(identifier + ".tsv"),
+        ),
+        sep="\t",
+        header=0,
+        dtype={
+            "path": "string",
+            "size": "int64",
+            "mtime_ns": "int64",
+            "path_source": "string",
+            "sha256": "string",
+        },
+        keep_default_na=False,
+    )
+    return table
+
+
+def read_storage_known_hashes(
+    path_directory_storage=None,
+):
+    """
+    Reads the hashes of source files from all manifests within the storage
+    area for reuse in later transfers.
+
+    arguments:
+        path_directory_storage (str): path to directory of storage area
+
+    raises:
+
+    returns:
+        (dict<str>): hashes by absolute path, size, and time of modification
+            of source files
+
+    """
+
+    hashes = dict()
+    path_directory_manifests = os.path.join(
+        path_directory_storage, "manifests",
+    )
+    if not os.path.exists(path_directory_manifests):
+        return hashes
+    for name_file in sorted(os.listdir(path_directory_manifests)):
+        if not name_file.endswith(".tsv"):
+            continue
+        table = read_storage_manifest(
+            path_directory_storage=path_directory_storage,
+            identifier=name_file[:-len(".tsv")],
+        )
+        for row in table.itertuples(index=False):
+            hashes[(str(row.path_source), int(row.size), int(row.mtime_ns))] = (
+                str(row.sha256)
+            )
+        pass
+    return hashes
+
+
+def collect_source_files(
+    path_directory_source=None,
+):
+    """
+    Collects paths, sizes, and times of modification of all files within a
+    directory and its child directories.
+
+    arguments:
+        path_directory_source (str): path to source directory
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table of files
+
+    """
+
+    records = list()
+    path_directory_source = os.path.abspath(path_directory_source)
+    for path_directory, names_directory, names_file in os.walk(
+        path_directory_source
+    ):
+        names_directory.sort()
+        for name_file in sorted(names_file):
+            path_file = os.path.join(path_directory, name_file)
+            if not os.path.isfile(path_file):
+                continue
+            status = os.stat(path_file)
+            record = dict()
+            record["path"] = os.path.relpath(path_file, path_directory_source)
+            record["size"] = int(status.st_size)
+            record["mtime_ns"] = int(status.st_mtime_ns)
+            record["path_source"] = path_file
+            records.append(record)
+            pass
+        pass
+    return pandas.DataFrame(
+        data=records,
+        columns=["path", "size", "mtime_ns", "path_source",],
+    )
+
+
+##########
+# 2. Transfer and verify objects.
+
+
+def transfer_storage_object(
+    path_file_source=None,
+    path_directory_storage=None,
+    hash_file=None,
+    retries=None,
+):
+    """
+    Transfers the content of a file to its object within the storage area
+    unless the object already exists, and verifies the hash of the copy
+    before the copy receives its final name.
+
+    arguments:
+        path_file_source (str): path to source file
+        path_directory_storage (str): path to directory of storage area
+        hash_file (str): hexadecimal digest of SHA-256 hash of source file
+        retries (int): count of retries after a copy with the wrong hash
+
+    raises:
+
+    returns:
+        (dict): record of transfer with its status, "present", "copy", or
+            "failure", and its count of attempts
+
+    """
+
+    path_file_object = define_path_file_object(
+        path_directory_storage=path_directory_storage,
+        hash_file=hash_file,
+    )
+    record = dict()
+    record["sha256"] = hash_file
+    record["attempts"] = 0
+    if os.path.exists(path_file_object):
+        record["status"] = "present"
+        return record
+    putly.create_directories(path=os.path.dirname(path_file_object))
+    path_file_temporary = str(
+        path_file_object + "." + str(os.getpid()) + "_" +
+        str(threading.get_ident()) + ".partial"
+    )
+    record["status"] = "failure"
+    while (record["attempts"] <= retries):
+        record["attempts"] += 1
+        shutil.copyfile(path_file_source, path_file_temporary)
+        hash_copy = pbpar.calculate_file_hash(path_file=path_file_temporary)
+        if (hash_copy == hash_file):
+            os.chmod(path_file_temporary, 0o444)
+            os.replace(path_file_temporary, path_file_object)
+            record["status"] = "copy"
+            break
+        os.remove(path_file_temporary)
+        pass
+    return record
+
+
+def verify_storage_object(
+    path_directory_storage=None,
+    hash_file=None,
+):
+    """
+    Verifies that the object for a content of file exists within the storage
+    area and that its content matches its hash.
+
+    arguments:
+        path_directory_storage (str): path to directory of storage area
+        hash_file (str): hexadecimal digest of SHA-256 hash of content
+
+    raises:
+
+    returns:
+        (str): status of object, "valid", "missing", or "corrupt"
+
+    """
+
+    path_file_object = define_path_file_object(
+        path_directory_storage=path_directory_storage,
+        hash_file=hash_file,
+    )
+    if not os.path.exists(path_file_object):
+        return "missing"
+    elif (pbpar.calculate_file_hash(path_file=path_file_object) != hash_file):
+        return "corrupt"
+    else:
+        return "valid"
+
+
+def restore_storage_file(
+    path_directory_storage=None,
+    hash_file=None,
+    path_file_product=None,
+    link=None,
+):
+    """
+    Restores a file from its object within the storage area by hard link or
+    by copy.
+
+    arguments:
+        path_directory_storage (str): path to directory of storage area
+        hash_file (str): hexadecimal digest of SHA-256 hash of content
+        path_file_product (str): path to product file
+        link (bool): whether to create a hard link instead of a copy where the
+            file system allows
+
+    raises:
+
+    returns:
+        (str): method of restoration, "link" or "copy"
+
+    """
+
+    path_file_object = define_path_file_object(
+        path_directory_storage=path_directory_storage,
+        hash_file=hash_file,
+    )
+    putly.create_directories(path=os.path.dirname(path_file_product))
+    if os.path.lexists(path_file_product):
+        os.remove(path_file_product)
+    if link:
+        try:
+            os.link(path_file_object, path_file_product)
+            return "link"
+        except OSError:
+            pass
+    shutil.copyfile(path_file_object, path_file_product)
+    return "copy"
+
+
+##########
+# 3. Control procedures.
+
+
+def control_store_directory(
+    path_directory_source=None,
+    path_directory_storage=None,
+    identifier=None,
+    workers=None,
+    retries=None,
+    report=None,
+):
+    """
+    Control procedure to store all files within a directory in the storage
+    area and to write their manifest.
+
+    arguments:
+        path_directory_source (str): path to source directory
+        path_directory_storage (str): path to directory of storage area
+        identifier (str): identifier of collection of files for the manifest
+        workers (int): count of concurrent workers for hashes and transfers
+        retries (int): count of retries after a copy with the wrong hash
+        report (bool): whether to print reports
+
+    raises:
+        RuntimeError: if the transfer of any file fails
+
+    returns:
+        (object): Pandas data-frame table of manifest
+
+    """
+
+    # Collect information about source files.
+    table = collect_source_files(path_directory_source=path_directory_source)
+    hashes_known = read_storage_known_hashes(
+        path_directory_storage=path_directory_storage,
+    )
+    keys = [
+        (row.path_source, int(row.size), int(row.mtime_ns))
+        for row in table.itertuples(index=False)
+    ]
+    # Calculate hashes of source files without a known hash.
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=workers,
+    ) as executor:
+        hashes = list(executor.map(
+            lambda key: (
+                hashes_known[key] if (key in hashes_known.keys()) else
+                pbpar.calculate_file_hash(path_file=key[0])
+            ),
+            keys,
+        ))
+        table["sha256"] = hashes
+        # Transfer each distinct content once.
+        table_unique = table.drop_duplicates(
+            subset=["sha256",], keep="first",
+        )
+        records = list(executor.map(
+            lambda row: transfer_storage_object(
+                path_file_source=row[0],
+                path_directory_storage=path_directory_storage,
+                hash_file=row[1],
+                retries=retries,
+            ),
+            zip(table_unique["path_source"], table_unique["sha256"]),
+        ))
+    table_transfer = pandas.DataFrame(
+        data=records,
+        columns=["sha256", "status", "attempts",],
+    )
+    # Report.
+    count_failure = int((table_transfer["status"] == "failure").sum())
+    if report:
+        putly.print_terminal_partition(level=4)
+        print("collection: " + str(identifier))
+        print("count of files: " + str(table.shape[0]))
+        print("count of distinct contents: " + str(table_transfer.shape[0]))
+        print("count of contents present in storage: " + str(
+            int((table_transfer["status"] == "present").sum())
+        ))
+        print("count of contents copied to storage: " + str(
+            int((table_transfer["status"] == "copy").sum())
+        ))
+        print("count of failures: " + str(count_failure))
+        print("size of files (GB): " + str(round(
+            (table["size"].sum() / (1024 ** 3)), 3
+        )))
+        putly.print_terminal_partition(level=4)
+        pass
+    if (count_failure > 0):
+        raise RuntimeError(str(
+            "transfer to storage failed for " + str(count_failure) +
+            " contents in collection " + str(identifier)
+        ))
+    # Write product information to file, only after the transfer of all
+    # contents, so that the manifest never designates absent objects.
+    table_manifest = table.loc[
+        :, ["path", "size", "mtime_ns", "path_source", "sha256",]
+    ]
+    putly.create_directories(
+        path=os.path.join(path_directory_storage, "manifests")
+    )
+    putly.write_tables_to_file(
+        pail_write={identifier: table_manifest,},
+        path_directory=os.path.join(path_directory_storage, "manifests"),
+        reset_index_rows=False,
+        write_index_rows=False,
+        write_index_columns=True,
+        type="text",
+        delimiter="\t",
+        suffix=".tsv",
+    )
+    # Return information.
+    return table_manifest
+
+
+def control_verify_storage(
+    path_directory_storage=None,
+    identifier=None,
+    workers=None,
+    report=None,
+):
+    """
+    Control procedure to verify the hashes of all objects for a collection of
+    files within the storage area.
+
+    arguments:
+        path_directory_storage (str): path to directory of storage area
+        identifier (str): identifier of collection of files
+        workers (int): count of concurrent workers for hashes
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table of manifest with status of each
+            object
+
+    """
+
+    table = read_storage_manifest(
+        path_directory_storage=path_directory_storage,
+        identifier=identifier,
+    )
+    hashes_unique = list(table["sha256"].unique())
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=workers,
+    ) as executor:
+        statuses = list(executor.map(
+            lambda hash_file: verify_storage_object(
+                path_directory_storage=path_directory_storage,
+                hash_file=hash_file,
+            ),
+            hashes_unique,
+        ))
+    table["status"] = table["sha256"].map(dict(zip(hashes_unique, statuses)))
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=4)
+        print("collection: " + str(identifier))
+        for status in ["valid", "missing", "corrupt",]:
+            print(str(
+                "count of files with status '" + status + "': " +
+                str(int((table["status"] == status).sum()))
+            ))
+        putly.print_terminal_partition(level=4)
+        pass
+    # Return information.
+    return table
+
+
+def control_restore_storage(
+    path_directory_storage=None,
+    identifier=None,
+    path_directory_product=None,
+    link=None,
+    workers=None,
+    report=None,
+):
+    """
+    Control procedure to restore the directory tree of a collection of files
+    from the storage area.
+
+    arguments:
+        path_directory_storage (str): path to directory of storage area
+        identifier (str): identifier of collection of files
+        path_directory_product (str): path to product directory
+        link (bool): whether to create hard links instead of copies where the
+            file system allows
+        workers (int): count of concurrent workers for restoration
+        report (bool): whether to print reports
+
+    raises:
+
+    returns:
+        (object): Pandas data-frame table of manifest with method of
+            restoration of each file
+
+    """
+
+    table = read_storage_manifest(
+        path_directory_storage=path_directory_storage,
+        identifier=identifier,
+    )
+    putly.create_directories(path=path_directory_product)
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=workers,
+    ) as executor:
+        methods = list(executor.map(
+            lambda row: restore_storage_file(
+                path_directory_storage=path_directory_storage,
+                hash_file=row[1],
+                path_file_product=os.path.join(path_directory_product, row[0]),
+                link=link,
+            ),
+            zip(table["path"], table["sha256"]),
+        ))
+    table["method"] = methods
+    # Report.
+    if report:
+        putly.print_terminal_partition(level=4)
+        print("collection: " + str(identifier))
+        print("count of files restored: " + str(table.shape[0]))
+        print("count of hard links: " + str(
+            int((table["method"] == "link").sum())
+        ))
+        putly.print_terminal_partition(level=4)
+        pass
+    # Return information.
+    return table
+
+
+###############################################################################
+# End
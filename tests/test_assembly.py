@@ -0,0 +1,93 @@
+"""
+Tests of translation of genomic coordinates between assemblies.
+
+Run from the parent directory of the package directory, which imports as
+'psychiatry_biomarkers'.
+"""
+
+import pandas
+import pytest
+
+import psychiatry_biomarkers.gwas_preparation.assembly as pbasm
+
+
+@pytest.fixture
+def chains(tmp_path):
+    # A single block of 100 positions on chromosome 1 maps to the reverse
+    # strand of chromosome 1 of size 1000, so that one-based position p in
+    # the source maps to position (1001 - p) in the target.
+    path_file_chain = tmp_path / "reverse.chain"
+    path_file_chain.write_text(
+        "chain 1000 1 1000 + 0 100 1 1000 - 0 100 1\n" +
+        "100\n"
+    )
+    return pbasm.read_source_chain_blocks(
+        path_file_chain=str(path_file_chain),
+        report=False,
+    )
+
+
+def define_counts():
+    return {
+        "source": 0, "map": 0, "unmap": 0, "reverse": 0,
+        "reverse_drop": 0, "chromosome_change": 0,
+    }
+
+
+def test_map_reverse_chain_alleles(chains):
+    table = pandas.DataFrame(data=[
+        {"CHR": "1", "BP": 11, "A1": "A", "A2": "G",},
+        {"CHR": "1", "BP": 21, "A1": "ACG", "A2": "TTA",},
+        {"CHR": "1", "BP": 31, "A1": "AT", "A2": "A",},
+    ])
+    counts = define_counts()
+    table = pbasm.map_gwas_chunk_assembly(
+        table=table,
+        chains=chains,
+        counts=counts,
+    )
+    records = table.to_dict(orient="records")
+    assert len(records) == 2
+    # Single nucleotides take their complements.
+    assert (records[0]["BP"], records[0]["A1"], records[0]["A2"]) == (
+        990, "T", "C",
+    )
+    # Alleles of several nucleotides take their reverse complements, and the
+    # position moves to the other end of their span (980 to 978).
+    assert (records[1]["BP"], records[1]["A1"], records[1]["A2"]) == (
+        978, "CGT", "TAA",
+    )
+    # Insertions and deletions on the reverse strand do not map.
+    assert counts["reverse"] == 2
+    assert counts["reverse_drop"] == 1
+    assert counts["map"] == 2
+    assert counts["unmap"] == 1
+
+
+def test_map_overlapping_blocks(tmp_path):
+    # Block [0, 100) maps to 500, and block [50, 60) maps elsewhere.
+    path_file_chain = tmp_path / "overlap.chain"
+    path_file_chain.write_text(
+        "chain 1000 1 1000 + 0 100 1 2000 + 500 600 1\n" +
+        "100\n\n" +
+        "chain 1000 1 1000 + 50 60 1 2000 + 1500 1510 2\n" +
+        "10\n"
+    )
+    chains = pbasm.read_source_chain_blocks(
+        path_file_chain=str(path_file_chain),
+        report=False,
+    )
+    table = pandas.DataFrame(data=[
+        {"CHR": "1", "BP": 76, "A1": "A", "A2": "G",},
+        {"CHR": "1", "BP": 56, "A1": "A", "A2": "G",},
+    ])
+    counts = define_counts()
+    table = pbasm.map_gwas_chunk_assembly(
+        table=table,
+        chains=chains,
+        counts=counts,
+    )
+    # Position 76 lies only within the first block, and position 56 lies
+    # within both blocks.
+    assert table["BP"].tolist() == [576,]
+    assert counts["unmap"] == 1
@@ -0,0 +1,101 @@
+"""
+Tests of the fill of allele frequencies from the reference.
+
+Run from the parent directory of the package directory, which imports as
+'psychiatry_biomarkers'.
+"""
+
+import numpy
+import pandas
+import pytest
+
+import psychiatry_biomarkers.gwas_preparation.frequency as pbfrq
+
+
+@pytest.fixture
+def index(tmp_path):
+    # Frequencies are of allele "ALT".
+    path_file_reference = tmp_path / "reference.afreq"
+    path_file_reference.write_text(
+        "#CHROM\tPOS\tREF\tALT\tALT_FREQS\n" +
+        "1\t100\tA\tG\t0.2\n" +
+        "1\t200\tC\tT\t0.3\n" +
+        "1\t300\tA\tT\t0.4\n"
+    )
+    path_directory_index = str(tmp_path / "index")
+    pbfrq.build_reference_frequency_index(
+        path_file_reference=str(path_file_reference),
+        columns_reference=pbfrq.define_reference_frequency_columns(),
+        path_directory_index=path_directory_index,
+        size_chunk=2,
+        report=False,
+    )
+    return pbfrq.load_reference_frequency_index(
+        path_directory_index=path_directory_index,
+    )
+
+
+def fill(index, records, value_default):
+    table = pandas.DataFrame(
+        data=[
+            {"CHR": "1", "BP": position, "A1": first, "A2": second,
+            "A1AF": frequency,}
+            for position, first, second, frequency in records
+        ],
+    )
+    counts = {
+        "source": 0, "missing": 0, "fill": 0, "fill_complement": 0,
+        "default": 0,
+    }
+    table = pbfrq.fill_gwas_chunk_allele_frequency(
+        table=table,
+        index=index,
+        value_default=value_default,
+        counts=counts,
+    )
+    return table, counts
+
+
+@pytest.mark.parametrize(
+    "position, first, second, frequency, complement",
+    [
+        # Alleles as in the reference.
+        (100, "G", "A", 0.2, False),
+        # Alleles swap relative to the reference.
+        (100, "A", "G", 0.8, False),
+        # Complements of alleles in the reference.
+        (200, "A", "G", 0.3, True),
+        # Complements of alleles that swap relative to the reference.
+        (200, "G", "A", 0.7, True),
+        # Palindromic alleles match only as given.
+        (300, "T", "A", 0.4, False),
+        (300, "A", "T", 0.6, False),
+    ],
+)
+def test_fill_frequency_orientation(
+    index, position, first, second, frequency, complement,
+):
+    table, counts = fill(
+        index, [(position, first, second, numpy.nan),], None,
+    )
+    assert table["A1AF"].iloc[0] == pytest.approx(frequency)
+    assert counts["fill"] == 1
+    assert counts["fill_complement"] == (1 if complement else 0)
+    assert counts["default"] == 0
+
+
+def test_fill_frequency_keep_valid_and_default(index):
+    table, counts = fill(
+        index,
+        [
+            (100, "G", "A", 0.9),
+            (500, "G", "A", numpy.nan),
+            (100, "G", "A", 1.5),
+        ],
+        0.5,
+    )
+    assert table["A1AF"].tolist() == pytest.approx([0.9, 0.5, 0.2,])
+    assert counts == {
+        "source": 3, "missing": 2, "fill": 1, "fill_complement": 0,
+        "default": 1,
+    }
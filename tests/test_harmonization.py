@@ -0,0 +1,83 @@
+"""
+Tests of harmonization of alleles against the reference genome.
+
+Run from the parent directory of the package directory, which imports as
+'psychiatry_biomarkers'.
+"""
+
+import pandas
+import pytest
+
+import psychiatry_biomarkers.gwas_preparation.harmonization as pbharm
+
+
+@pytest.fixture
+def reference(tmp_path):
+    # Chromosome 1 is "GATTACAGTG", with "TT" at positions 3-4 and "AC" at
+    # positions 5-6.
+    path_file_fasta = tmp_path / "reference.fasta"
+    path_file_fasta.write_text(">1\nGATTACAGTG\n")
+    path_directory_binary = str(tmp_path / "binary")
+    pbharm.build_reference_genome_binary(
+        path_file_fasta=str(path_file_fasta),
+        path_directory_binary=path_directory_binary,
+        report=False,
+    )
+    return pbharm.load_reference_genome_binary(
+        path_directory_binary=path_directory_binary,
+    )
+
+
+def harmonize(reference, first, second, position):
+    table = pandas.DataFrame(data=[{
+        "CHR": "1", "BP": position, "A1": first, "A2": second,
+        "A1AF": 0.2, "BETA": 1.0, "Z": 2.0,
+    },])
+    counts = pbharm.define_harmonization_counts()
+    table = pbharm.harmonize_gwas_chunk_alleles(
+        table=table,
+        reference=reference,
+        threshold_palindrome=0.08,
+        keep_ambiguous=False,
+        counts=counts,
+    )
+    return table, counts
+
+
+@pytest.mark.parametrize(
+    "first, second, position, swap",
+    [
+        # Deletion with the reference "TT" as A2.
+        ("T", "TT", 3, False),
+        # Deletion with the reference "TT" as A1.
+        ("TT", "T", 3, True),
+        # Insertion with the reference "A" as A2.
+        ("AG", "A", 5, False),
+        # Insertion with the reference "A" as A1.
+        ("A", "AG", 5, True),
+    ],
+)
+def test_harmonize_indel_orientation(
+    reference, first, second, position, swap,
+):
+    table, counts = harmonize(reference, first, second, position)
+    assert table.shape[0] == 1
+    record = table.iloc[0]
+    if swap:
+        assert (record["A1"], record["A2"]) == (second, first)
+        assert record["BETA"] == -1.0
+        assert record["A1AF"] == pytest.approx(0.8)
+        assert counts["swap"] == 1
+    else:
+        assert (record["A1"], record["A2"]) == (first, second)
+        assert record["BETA"] == 1.0
+        assert counts["match"] == 1
+    assert counts["ambiguous"] == 0
+
+
+def test_harmonize_both_alleles_match_ambiguous(reference):
+    table, counts = harmonize(reference, "A", "A", 5)
+    assert table.shape[0] == 0
+    assert counts["ambiguous"] == 1
+    assert counts["match"] == 0
+    assert counts["drop"] == 1
@@ -0,0 +1,48 @@
+"""
+Tests of the estimation of SNP heritability by LD Score Regression.
+
+Run from the parent directory of the package directory, which imports as
+'psychiatry_biomarkers'.
+"""
+
+import numpy
+import pandas
+import pytest
+
+import psychiatry_biomarkers.ldsc.heritability as pbher
+
+
+@pytest.fixture
+def table():
+    # Expectation of chi-square is (intercept + (N * h2 * L / M)), with
+    # heritability 0.1 and intercept 1.05.
+    generator = numpy.random.default_rng(7)
+    count_variants = 50000
+    ld = generator.uniform(1.0, 200.0, size=count_variants)
+    observations = numpy.full(count_variants, 50000.0)
+    chi_square_expectation = (
+        1.05 + (observations * 0.1 * ld / 200000.0)
+    )
+    z = (
+        numpy.sqrt(chi_square_expectation) *
+        generator.standard_normal(count_variants)
+    )
+    return pandas.DataFrame(data={
+        "Z": z, "N": observations, "L2": ld, "W_L2": ld,
+    })
+
+
+@pytest.mark.parametrize("threshold_two_step", [None, 30.0,])
+def test_estimate_heritability_synthetic(table, threshold_two_step):
+    pail = pbher.estimate_snp_heritability_ldsc(
+        table=table,
+        count_variants_reference=200000.0,
+        threshold_two_step=threshold_two_step,
+        count_blocks=200,
+        report=False,
+    )
+    assert pail["variants"] <= table.shape[0]
+    assert pail["heritability"] == pytest.approx(0.1, abs=0.01)
+    assert pail["intercept"] == pytest.approx(1.05, abs=0.05)
+    assert 0.0 < pail["heritability_error"] < 0.01
+    assert 0.0 < pail["intercept_error"] < 0.05
@@ -0,0 +1,80 @@
+"""
+Tests of the merge join of current summary statistics to stored identifiers.
+
+Run from the parent directory of the package directory, which imports as
+'psychiatry_biomarkers'.
+"""
+
+import pandas
+import pytest
+
+import psychiatry_biomarkers.gwas_preparation.standard_format as pbstd
+import psychiatry_biomarkers.gwas_preparation.merge as pbmrg
+
+
+def write_table(path_file, records):
+    table = pandas.DataFrame(
+        data=[
+            {"SNP": snp, "CHR": chromosome, "BP": position, "A1": first,
+            "A2": second, "BETA": 0.1,}
+            for snp, chromosome, position, first, second in records
+        ],
+    )
+    pbstd.write_gwas_standard_format_chunk(
+        table=table,
+        path_file=str(path_file),
+        header=True,
+        mode="w",
+    )
+    pass
+
+
+@pytest.fixture
+def streams(tmp_path):
+    path_file_left = tmp_path / "left.txt"
+    path_file_right = tmp_path / "right.txt"
+    write_table(path_file_left, [
+        ("left_1", "1", 100, "A", "G"),
+        ("left_2", "1", 100, "C", "T"),
+        ("left_3", "1", 200, "A", "C"),
+        ("left_4", "1", 300, "G", "T"),
+        ("left_5", "2", 50, "A", "G"),
+        ("left_6", "X", 10, "C", "G"),
+    ])
+    write_table(path_file_right, [
+        ("rs1", "1", 100, "A", "G"),
+        ("rs9", "1", 150, "T", "C"),
+        # Different identifiers for the same key are ambiguous.
+        ("rs3a", "1", 200, "A", "C"),
+        ("rs3b", "1", 200, "A", "C"),
+        # Repeat identifiers for the same key are not ambiguous.
+        ("rs4", "1", 300, "G", "T"),
+        ("rs4", "1", 300, "G", "T"),
+        ("rs5", "2", 50, "A", "G"),
+        ("rs10", "2", 60, "A", "G"),
+    ])
+    return tmp_path, str(path_file_left), str(path_file_right)
+
+
+@pytest.mark.parametrize("size_chunk", [1, 2, 3, 100,])
+def test_merge_join_counts_across_chunk_sizes(streams, size_chunk):
+    path_directory, path_file_left, path_file_right = streams
+    path_file_product = str(path_directory / "product.txt")
+    counts = pbmrg.merge_join_sorted_streams(
+        path_file_left=path_file_left,
+        path_file_right=path_file_right,
+        path_file_product=path_file_product,
+        size_chunk=size_chunk,
+    )
+    assert counts == {
+        "left": 6,
+        "right": 8,
+        "match": 3,
+        "ambiguous": 1,
+        "unmatch_left": 2,
+        "unmatch_right": 2,
+    }
+    table = pandas.read_csv(path_file_product, sep="\t", header=0)
+    assert table["SNP"].tolist() == [
+        "rs1", "left_2", "left_3", "rs4", "rs5", "left_6",
+    ]
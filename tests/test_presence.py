@@ -0,0 +1,56 @@
+"""
+Tests of compressed bitmaps of the presence of variants.
+
+Run from the parent directory of the package directory, which imports as
+'psychiatry_biomarkers'.
+"""
+
+import numpy
+import pytest
+
+import psychiatry_biomarkers.gwas_preparation.presence as pbprs
+
+
+def draw_indices(generator, counts_containers):
+    # Draw unique indices with the given count within each container.
+    constants = pbprs.define_bitmap_constants()
+    indices = list()
+    for high, count in enumerate(counts_containers):
+        lows = generator.choice(
+            constants["size_container"], size=count, replace=False,
+        )
+        indices.append((high << constants["bits_low"]) + lows)
+        pass
+    return numpy.sort(numpy.concatenate(indices).astype("int64"))
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3,])
+def test_bitmap_intersection_matches_intersect1d(seed):
+    generator = numpy.random.default_rng(seed)
+    # Containers are dense in both, dense in one and sparse in the other,
+    # sparse in both, and empty in one.
+    indices_first = draw_indices(generator, [30000, 20000, 3000, 0, 4097,])
+    indices_second = draw_indices(generator, [25000, 1000, 4000, 500, 4096,])
+    bitmap_first = pbprs.encode_presence_bitmap(indices=indices_first)
+    bitmap_second = pbprs.encode_presence_bitmap(indices=indices_second)
+    assert bitmap_first["highs"].tolist() == [0, 1, 4,]
+    assert bitmap_second["highs"].tolist() == [0,]
+    count = numpy.intersect1d(indices_first, indices_second).size
+    assert pbprs.count_presence_bitmap_intersection(
+        bitmap_first=bitmap_first,
+        bitmap_second=bitmap_second,
+    ) == count
+    assert pbprs.count_presence_bitmap_intersection(
+        bitmap_first=bitmap_second,
+        bitmap_second=bitmap_first,
+    ) == count
+
+
+def test_bitmap_decode_round_trip():
+    generator = numpy.random.default_rng(0)
+    indices = draw_indices(generator, [5000, 10, 0, 4097,])
+    bitmap = pbprs.encode_presence_bitmap(indices=indices)
+    assert bitmap["count"] == indices.size
+    assert numpy.array_equal(
+        pbprs.decode_presence_bitmap(bitmap=bitmap), indices,
+    )